@@ -1,17 +1,171 @@
+REPO_ROOT := $(abspath $(dir $(lastword $(MAKEFILE_LIST))))
+
+# DIM=3 runs the 3D 7-point stages (*_3d) on a GRID_SIZE^3 cube instead
+DIM ?= 2
 GRID_SIZE := 200
 TIME_STEPS := 20000
+ifeq ($(DIM),3)
+    GRID_SIZE := 64
+    TIME_STEPS := 1000
+endif
 ALPHA := 0.2
 DX := 0.01
 
+# Stage 00 engine: loop | numpy | numpy-inplace | numpy-mp (shared-memory worker processes)
+# | numpy-f32 | numpy-mixed (float32 fields, mixed computes each step in float64)
+PY_ENGINE := loop
+
+# Write each stage's final field to field.npy for `make validate` (0 | 1).
+# Without it validation compares the checksum/norm summary in metrics.json.
+DUMP_FIELD := 0
+# Record perf_event counters per phase in metrics.json (0 | 1, Linux only)
+PERF := 0
+# Start every stage from an .npy field instead of the hot spot, write
+# checkpoint.npy every CHECKPOINT_EVERY steps (0 disables), or resume from the
+# checkpoint in RESTART (a stage results directory; TIME_STEPS stays the total)
+INITIAL_FIELD :=
+CHECKPOINT_EVERY := 0
+RESTART :=
+STAGE_ARGS = --dump-field=$(DUMP_FIELD) --perf=$(PERF) --checkpoint-every=$(CHECKPOINT_EVERY) \
+	$(if $(INITIAL_FIELD),--initial-field=$(INITIAL_FIELD)) $(if $(RESTART),--restart=$(RESTART))
+
+# Stage 08: field snapshot every SNAPSHOT_EVERY steps (0 disables), handed to a
+# background writer thread; optionally float32 and zlib-compressed in row chunks
+# (SNAPSHOT_COMPRESS is the zlib level, needs zlib)
+SNAPSHOT_EVERY := 0
+SNAPSHOT_FLOAT32 := 0
+SNAPSHOT_COMPRESS := 0
+SNAPSHOT_ARGS = --snapshot-every=$(SNAPSHOT_EVERY) --snapshot-float32=$(SNAPSHOT_FLOAT32) \
+	--snapshot-compress=$(SNAPSHOT_COMPRESS)
+
+# Stages 05-09: stop at steady state once the update residual (max | l2) checked
+# every CONVERGE_EVERY steps drops below CONVERGE_TOL; TIME_STEPS is then the
+# step limit (0 always runs TIME_STEPS)
+CONVERGE_TOL := 0
+CONVERGE_EVERY := 100
+RESIDUAL := max
+CONVERGE_ARGS = --converge-tol=$(CONVERGE_TOL) --converge-every=$(CONVERGE_EVERY) --residual=$(RESIDUAL)
+
+# Stages 06-09 and the NumPy engines: only compute the tiles (NumPy: the box)
+# the heat front can have reached from the nonzero cells of the start field,
+# the full sweep once it covers the grid (0 | 1)
+ACTIVE_REGION := 0
+ACTIVE_ARGS = --active-region=$(ACTIVE_REGION)
+
+# Field precision of stages 05-09: 64 | 32 | mixed (float32 storage, float64
+# arithmetic). Each precision builds its own binary: solver, solver_f32, solver_mixed
+PRECISION := 64
+ifeq ($(PRECISION),32)
+    PRECISION_CFLAGS := -DHEATKERNEL_FLOAT32
+    PRECISION_SUFFIX := _f32
+else ifeq ($(PRECISION),mixed)
+    PRECISION_CFLAGS := -DHEATKERNEL_MIXED
+    PRECISION_SUFFIX := _mixed
+endif
+
+# `make bench`: untimed warmup runs and timed repetitions per point, and the
+# thread counts tried for stages 08/09
+WARMUP := 1
+REPETITIONS := 5
+BENCH_THREADS := 1-$(shell nproc 2>/dev/null || sysctl -n hw.ncpu 2>/dev/null || echo 4)
+
+# Thread counts of the `make run` scaling loop in stages 08/09
+THREAD_COUNTS := 1 2 3 4 5 6 7 8 9 10 11 12 13 14 15 16 17 18 19 20
+
+# Stages 08/09 on NUMA machines: FIRST_TOUCH=1 zeroes the fields with the
+# stencil loop's static tile schedule, so each page starts on the node of the
+# thread that updates it. PLACEMENTS are the thread placements of the
+# `make run`/`make bench` thread sweeps, each <OMP_PROC_BIND>@<OMP_PLACES>
+# (close@cores, spread@sockets, explicit CPUs as 'close@{0},{8},{1},{9}') or
+# default (neither set). Non-default placements write
+# <stage>/placement_<bind>_<places>/threads_<n>/.
+FIRST_TOUCH := 0
+PLACEMENTS := default
+NUMA_ARGS = --first-touch=$(FIRST_TOUCH)
+# Shell fragment of the stage scaling loops: results directory and OMP_* variables of $$placement
+PLACEMENT_SETUP = PLACEMENT_DIR="$(STAGE_RESULTS)"; PLACEMENT_ENV=""; \
+	if [ "$$placement" != default ]; then \
+		PLACEMENT_DIR="$(STAGE_RESULTS)/placement_$$(printf '%s' "$$placement" | tr -cs 'A-Za-z0-9' '_' | sed 's/^_//;s/_$$//')"; \
+		PLACEMENT_ENV="OMP_PROC_BIND=$${placement%%@*}"; \
+		case "$$placement" in *@*) PLACEMENT_ENV="$$PLACEMENT_ENV OMP_PLACES=$${placement\#*@}" ;; esac; \
+	fi
+
+# Tile shapes written by `make autotune` and picked up by stages 06-09
+export HEATKERNEL_TUNING_CACHE ?= $(REPO_ROOT)/results/tuning_cache.txt
+AUTOTUNE_THREADS := $(shell nproc 2>/dev/null || sysctl -n hw.ncpu 2>/dev/null || echo 4)
+
+# Stage 10 ranks; MPI=1 builds it with MPICC and launches it with MPIRUN,
+# otherwise the ranks are forked locally (no MPI install needed)
+RANKS := 4
+MPI := 0
+MPICC := mpicc
+MPIRUN := mpirun
+MPIRUN_FLAGS :=
+
+# `make mp_scaling`: worker counts of the multi-process Python solver
+MP_WORKERS := $(BENCH_THREADS)
+
+# `make persistent`: small grids where stage 08's per-pass fork/join shows
+PERSISTENT_SIZES := 50 100 200
+
+# `make bench_batch`: scenarios per batch, each a GRID_SIZE grid
+BATCH_SIZES := 1 4 16 64 256
+
+# Stage 11 (implicit ADI): time step in seconds, empty keeps the explicit
+# 0.24*dx^2/alpha. `make implicit` reaches the physical time of TIME_STEPS
+# explicit steps with each multiple of the explicit dt in IMPLICIT_DT_FACTORS
+# and counts the runs within IMPLICIT_TOLERANCE (relative L2 against the
+# exact-in-time solution, see heatkernel.exact)
+IMPLICIT_DT :=
+IMPLICIT_DT_FACTORS := 1 4 16 64 256 1024
+IMPLICIT_TOLERANCE := 1e-3
+
+# `make regression`: RESULTS_DIR against the REGRESSION_BASELINES most recent
+# archives (0 pools all), failing on a median time per step more than
+# REGRESSION_THRESHOLD (relative) slower with Mann-Whitney p < REGRESSION_ALPHA
+REGRESSION_BASELINES := 1
+REGRESSION_THRESHOLD := 0.05
+REGRESSION_ALPHA := 0.05
+
+# `make sweep`: declarative matrix (see src/heatkernel/sweep.py) and result store
+SWEEP_MATRIX := src/utils/sweeps/tiles.json
+SWEEP_STORE := results/heatkernel.db
+
 CC := gcc
 CFLAGS_O0 := -O0
 CFLAGS_O3 := -O3
 
-OPENMP_CFLAGS := -Xpreprocessor -fopenmp -I/opt/homebrew/opt/libomp/include
-OPENMP_LDFLAGS := -L/opt/homebrew/opt/libomp/lib -lomp
+# Platform specific OpenMP, CPU tuning and shared library settings
+UNAME_S := $(shell uname -s)
+ifeq ($(UNAME_S),Darwin)
+    OPENMP_CFLAGS := -Xpreprocessor -fopenmp -I/opt/homebrew/opt/libomp/include
+    OPENMP_LDFLAGS := -L/opt/homebrew/opt/libomp/lib -lomp
+    CPU_CFLAGS := -mcpu=apple-m4
+    SHLIB_EXT := dylib
+    SHLIB_LDFLAGS := -dynamiclib
+else
+    OPENMP_CFLAGS := -fopenmp
+    OPENMP_LDFLAGS := -fopenmp
+    CPU_CFLAGS := -mtune=native
+    SHLIB_EXT := so
+    SHLIB_LDFLAGS := -shared
+endif
+
+# zlib for compressed snapshots, used when its header is found
+HAVE_ZLIB := $(shell printf '\043include <zlib.h>\n' | $(CC) -E - >/dev/null 2>&1 && echo 1)
+ifeq ($(HAVE_ZLIB),1)
+    ZLIB_CFLAGS := -DHEATKERNEL_ZLIB
+    ZLIB_LDFLAGS := -lz
+endif
+
+# clock_gettime/CLOCK_MONOTONIC (and syscall() for perf counters) are hidden by -std=c99 on glibc
+POSIX_CFLAGS := -D_POSIX_C_SOURCE=200809L -D_DEFAULT_SOURCE
 
 RESULTS_DIR := results/latest
 STAGE_RESULTS_DIR := $(RESULTS_DIR)/stage_results
+# metrics.json index of RESULTS_DIR (heatkernel.store), added to as each stage finishes;
+# reports and plots look for it in RESULTS_DIR
+RESULTS_STORE = $(RESULTS_DIR)/results_index.db
 ARCHIVE_DIR := results/archive
 
 .PHONY: help
\ No newline at end of file
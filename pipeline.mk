@@ -9,7 +9,20 @@ PIPELINE_STAGES := \
     06_cache_blocking \
     07_vectorization \
     08_openmp_parallel \
-    09_arch_specific
+    09_arch_specific \
+    10_distributed_halo
+
+ifeq ($(DIM),3)
+PIPELINE_STAGES := \
+    00_numpy_3d \
+    01_naive_3d \
+    06_cache_blocking_3d \
+    07_vectorization_3d \
+    08_openmp_parallel_3d
+endif
+
+# Variants of the pipeline, run by their own targets (make persistent, make implicit)
+VARIANT_STAGES := 08_openmp_persistent 11_implicit_adi
 
 PIPELINE_TARGETS := $(addprefix run_,$(PIPELINE_STAGES))
 CLEAN_TARGETS := $(addprefix clean_,$(PIPELINE_STAGES))
@@ -0,0 +1,136 @@
+#ifndef ACTIVE_REGION_H
+#define ACTIVE_REGION_H
+
+#include <stdio.h>
+#include "metrics.h"
+#include "options.h"
+#include "precision.h"
+
+// --active-region: skip the tiles the heat front has not reached yet.
+//
+// A cell whose 5-point neighbourhood is all zero stays zero, so the cells that
+// can be nonzero after n steps are the nonzero cells of the start field grown
+// by n cells in every direction (the Neumann copies move values by one cell
+// too). The region is kept as a bounding box over the whole grid, ghost cells
+// included. A pass of k steps first grows it by k, then only the tiles whose
+// core overlaps it are computed: the tile loops run over [i_first, i_end) x
+// [j_first, j_end) instead of the whole interior. Skipped tiles are zero in
+// both fields, since a tile once computed stays inside the growing box and the
+// fields start zeroed (grid_create_real / grid_first_touch_real).
+//
+// Once the box covers the grid the loops are the full sweep again and the box
+// is no longer touched. Without --active-region the bounds are the full sweep
+// from the start and nothing is counted.
+
+typedef struct
+{
+    int enabled;
+    int size;
+    int i_lo, i_hi, j_lo, j_hi; // cells [lo, hi) that may be nonzero, empty if lo >= hi
+    int i_first, i_end;         // tile start rows of the next pass
+    int j_first, j_end;         // tile start columns
+    int full_step;              // step from which the full grid was swept, -1 if never
+    double cells;               // interior cells updated, summed over steps
+} active_region;
+
+static inline int ar_min(int a, int b) { return a < b ? a : b; }
+static inline int ar_max(int a, int b) { return a > b ? a : b; }
+
+static inline void active_region_full(active_region *r)
+{
+    r->i_lo = r->j_lo = 0;
+    r->i_hi = r->j_hi = r->size;
+    r->i_first = r->j_first = 1;
+    r->i_end = r->j_end = r->size - 1;
+}
+
+// Bounding box of the nonzero cells of the start field T (ghost cells included)
+static inline void active_region_init(active_region *r, const solver_options *opts, const real *T, int size)
+{
+    r->enabled = opts->active_region;
+    r->size = size;
+    r->full_step = -1;
+    r->cells = 0.0;
+    active_region_full(r);
+    if (!r->enabled)
+        return;
+
+    r->i_lo = r->j_lo = size;
+    r->i_hi = r->j_hi = 0;
+    for (int i = 0; i < size; i++)
+        for (int j = 0; j < size; j++)
+            if (T[(size_t)i * size + j] != 0)
+            {
+                r->i_lo = ar_min(r->i_lo, i);
+                r->i_hi = ar_max(r->i_hi, i + 1);
+                r->j_lo = ar_min(r->j_lo, j);
+                r->j_hi = ar_max(r->j_hi, j + 1);
+            }
+}
+
+// Tile starts start + m * block whose core overlaps [lo, hi)
+static inline void active_region_starts(int lo, int hi, int block, int size, int *first, int *end)
+{
+    *first = 1 + (ar_max(lo, 1) - 1) / block * block;
+    *end = ar_min(hi, size - 1);
+}
+
+// Interior cells of the tiles with starts in [first, end)
+static inline int active_region_span(int first, int end, int block, int size)
+{
+    if (first >= end)
+        return 0;
+    int last = first + (end - 1 - first) / block * block;
+    return ar_min(last + block, size - 1) - first;
+}
+
+// Grow the box by the k steps of the pass from `step` and set the tile bounds
+static inline void active_region_pass(active_region *r, int step, int k, int row_block, int col_block)
+{
+    int n = r->size;
+    if (!r->enabled)
+        return;
+    if (r->full_step < 0 && r->i_lo < r->i_hi && r->j_lo < r->j_hi)
+    {
+        r->i_lo = ar_max(r->i_lo - k, 0);
+        r->i_hi = ar_min(r->i_hi + k, n);
+        r->j_lo = ar_max(r->j_lo - k, 0);
+        r->j_hi = ar_min(r->j_hi + k, n);
+        if (r->i_lo == 0 && r->j_lo == 0 && r->i_hi == n && r->j_hi == n)
+        {
+            r->full_step = step;
+            active_region_full(r);
+        }
+        else
+        {
+            active_region_starts(r->i_lo, r->i_hi, row_block, n, &r->i_first, &r->i_end);
+            active_region_starts(r->j_lo, r->j_hi, col_block, n, &r->j_first, &r->j_end);
+        }
+    }
+    else if (r->full_step < 0)
+    {
+        // All zero: nothing to compute, ever
+        r->i_first = r->i_end = r->j_first = r->j_end = 1;
+    }
+    r->cells += (double)k * active_region_span(r->i_first, r->i_end, row_block, n)
+                * active_region_span(r->j_first, r->j_end, col_block, n);
+}
+
+// "active_region" block of metrics.json: interior cells updated per step next
+// to the steps per second of the run
+static inline void active_region_report(const active_region *r, metrics_extra *m, int steps, double total_time)
+{
+    if (!r->enabled)
+        return;
+    double interior = (double)(r->size - 2) * (r->size - 2);
+    double per_step = steps > 0 ? r->cells / steps : 0.0;
+    char buf[512];
+    snprintf(buf, sizeof(buf),
+             "{\n    \"cells_updated\": %.17g,\n    \"cells_per_step\": %.17g,\n    \"fraction\": %.17g,\n"
+             "    \"full_sweep_step\": %d,\n    \"steps_per_second\": %.17g,\n    \"cell_updates_per_second\": %.17g\n  }",
+             r->cells, per_step, interior > 0 ? per_step / interior : 0.0, r->full_step,
+             total_time > 0 ? steps / total_time : 0.0, total_time > 0 ? r->cells / total_time : 0.0);
+    metrics_add_raw(m, "active_region", buf);
+}
+
+#endif
@@ -2,6 +2,8 @@
 #define BOUNDARY_CONDITIONS_H
 
 #include <stdlib.h>
+#include <string.h>
+#include "precision.h"
 
 static inline void neumann_boundaries_ptr(double **data, int size)
 {
@@ -32,4 +34,41 @@ static inline void neumann_boundaries_contig(double *data, int size)
     }
 }
 
+static inline void neumann_boundaries_real(real *data, int size)
+{
+    for (int i = 0; i < size; i++)
+    {
+        data[i * size] = data[i * size + 1];                   // left
+        data[i * size + size - 1] = data[i * size + size - 2]; // right
+    }
+
+    for (int j = 0; j < size; j++)
+    {
+        data[j] = data[size + j];                                  // top
+        data[(size - 1) * size + j] = data[(size - 2) * size + j]; // bottom
+    }
+}
+
+// Zero-gradient on all 6 faces; like the 2D version the fastest-varying index
+// is copied first (k faces, then j, then i), so edges and corners end up
+// equal to their nearest interior cell
+static inline void neumann_boundaries_3d(double *data, int size)
+{
+    size_t n = (size_t)size;
+    for (size_t p = 0; p < n * n; p++)
+    {
+        double *line = &data[p * n];
+        line[0] = line[1];               // k = 0
+        line[n - 1] = line[n - 2];       // k = size - 1
+    }
+    for (size_t i = 0; i < n; i++)
+    {
+        double *plane = &data[i * n * n];
+        memcpy(plane, plane + n, n * sizeof(double));                         // j = 0
+        memcpy(plane + (n - 1) * n, plane + (n - 2) * n, n * sizeof(double)); // j = size - 1
+    }
+    memcpy(data, data + n * n, n * n * sizeof(double));                                 // i = 0
+    memcpy(data + (n - 1) * n * n, data + (n - 2) * n * n, n * n * sizeof(double));     // i = size - 1
+}
+
 #endif
\ No newline at end of file
@@ -0,0 +1,426 @@
+#ifndef CHECKPOINT_H
+#define CHECKPOINT_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#include "field_io.h"
+#include "metrics.h"
+#include "options.h"
+#include "timing.h"
+
+// Initial fields and checkpoints are .npy files (little-endian float64, C
+// order) read and written through mmap: a start field is copied straight
+// from the mapped file into the grid, and a checkpoint is the grid copied
+// into a shared mapping of the file, with no stdio buffer in between.
+//
+// A checkpoint is output_dir/checkpoint.npy plus checkpoint.json with the
+// step it was taken at and the --initial-field the run started from, so a
+// restarted run can still be validated against a run from step 0. Both are
+// written under a .tmp name and renamed, an interrupted write keeps the
+// previous checkpoint.
+
+typedef struct
+{
+    int fd;
+    void *base;    // the whole file, header included
+    size_t length;
+    double *data;  // first cell
+} field_map;
+
+typedef struct
+{
+    const char *dir;     // output_dir
+    int every;           // steps between checkpoints, 0 disables them
+    int start;           // step a restarted run resumed from
+    int count;           // checkpoints written
+    int failed;          // a checkpoint write failed: the stage exits non-zero
+    double time;         // seconds spent writing them, reported as checkpoint_time
+    char origin[1024];   // absolute --initial-field path, "" for the hot spot
+} checkpoint_ctx;
+
+// Data offset of an .npy file holding a (size,) * dims float64 C-order
+// array, -1 if the header says anything else
+static inline long npy_parse_header(const unsigned char *buf, size_t len, int size, int dims)
+{
+    size_t header_len, offset;
+    if (len < 10 || memcmp(buf, "\x93NUMPY", 6) != 0)
+        return -1;
+    if (buf[6] == 1)
+    {
+        header_len = buf[8] | (size_t)buf[9] << 8;
+        offset = 10;
+    }
+    else if ((buf[6] == 2 || buf[6] == 3) && len >= 12)
+    {
+        header_len = buf[8] | (size_t)buf[9] << 8 | (size_t)buf[10] << 16 | (size_t)buf[11] << 24;
+        offset = 12;
+    }
+    else
+        return -1;
+
+    char dict[1024];
+    if (header_len >= sizeof(dict) || offset + header_len > len)
+        return -1;
+    memcpy(dict, buf + offset, header_len);
+    dict[header_len] = '\0';
+    if (!strstr(dict, "'descr': '<f8'") || !strstr(dict, "'fortran_order': False"))
+        return -1;
+    const char *p = strstr(dict, "'shape': (");
+    if (!p)
+        return -1;
+    p += strlen("'shape': (");
+    for (int d = 0; d < dims; d++)
+    {
+        char *end;
+        long n = strtol(p, &end, 10);
+        if (end == p || n != size)
+            return -1;
+        for (p = end; *p == ',' || *p == ' '; p++)
+            ;
+    }
+    return *p == ')' ? (long)(offset + header_len) : -1;
+}
+
+static inline void field_map_close(field_map *m)
+{
+    if (m->base)
+        munmap(m->base, m->length);
+    if (m->fd >= 0)
+        close(m->fd);
+    m->base = NULL;
+    m->fd = -1;
+}
+
+// Map an existing .npy field. Writable maps are shared, so stores go to the file.
+static inline int field_map_open(field_map *m, const char *path, int size, int dims, int writable)
+{
+    struct stat st;
+    memset(m, 0, sizeof(*m));
+    m->fd = open(path, writable ? O_RDWR : O_RDONLY);
+    if (m->fd < 0 || fstat(m->fd, &st) != 0)
+    {
+        fprintf(stderr, "Cannot open %s\n", path);
+        field_map_close(m);
+        return -1;
+    }
+    m->length = (size_t)st.st_size;
+    m->base = mmap(NULL, m->length, writable ? PROT_READ | PROT_WRITE : PROT_READ,
+                   writable ? MAP_SHARED : MAP_PRIVATE, m->fd, 0);
+    if (m->base == MAP_FAILED)
+    {
+        m->base = NULL;
+        fprintf(stderr, "Cannot map %s\n", path);
+        field_map_close(m);
+        return -1;
+    }
+
+    long offset = npy_parse_header((const unsigned char *)m->base, m->length, size, dims);
+    if (offset < 0 || offset % sizeof(double) != 0 ||
+        m->length - (size_t)offset < field_cells(size, dims) * sizeof(double))
+    {
+        fprintf(stderr, "%s is not a float64 .npy field of %d^%d cells\n", path, size, dims);
+        field_map_close(m);
+        return -1;
+    }
+    m->data = (double *)((char *)m->base + offset);
+    if (!writable)
+        madvise(m->base, m->length, MADV_SEQUENTIAL);
+    return 0;
+}
+
+// Create (or truncate) an .npy field file at its final length and map it for writing
+static inline int field_map_create(field_map *m, const char *path, int size, int dims)
+{
+    char header[256];
+    int n = npy_format_header(header, sizeof(header), size, dims);
+    memset(m, 0, sizeof(*m));
+    m->length = (size_t)n + field_cells(size, dims) * sizeof(double);
+    m->fd = open(path, O_RDWR | O_CREAT | O_TRUNC, 0644);
+    if (n < 0 || m->fd < 0 || ftruncate(m->fd, (off_t)m->length) != 0)
+    {
+        fprintf(stderr, "Cannot create %s\n", path);
+        field_map_close(m);
+        return -1;
+    }
+    m->base = mmap(NULL, m->length, PROT_READ | PROT_WRITE, MAP_SHARED, m->fd, 0);
+    if (m->base == MAP_FAILED)
+    {
+        m->base = NULL;
+        fprintf(stderr, "Cannot map %s\n", path);
+        field_map_close(m);
+        return -1;
+    }
+    memcpy(m->base, header, (size_t)n);
+    m->data = (double *)((char *)m->base + n);
+    return 0;
+}
+
+static inline void checkpoint_init(checkpoint_ctx *c, const solver_options *opts, const char *output_dir)
+{
+    memset(c, 0, sizeof(*c));
+    c->dir = output_dir;
+    c->every = opts->checkpoint_every > 0 ? opts->checkpoint_every : 0;
+}
+
+// Step and origin recorded in DIR/checkpoint.json
+static inline int checkpoint_read_info(const char *dir, int *step, char *origin, size_t len)
+{
+    char path[1024], buf[4096];
+    snprintf(path, sizeof(path), "%s/checkpoint.json", dir);
+    FILE *f = fopen(path, "r");
+    if (!f)
+    {
+        fprintf(stderr, "Cannot open %s\n", path);
+        return -1;
+    }
+    size_t n = fread(buf, 1, sizeof(buf) - 1, f);
+    fclose(f);
+    buf[n] = '\0';
+
+    const char *p = strstr(buf, "\"step\":");
+    if (!p)
+    {
+        fprintf(stderr, "%s has no step\n", path);
+        return -1;
+    }
+    *step = atoi(p + strlen("\"step\":"));
+    origin[0] = '\0';
+    const char *q;
+    if ((p = strstr(buf, "\"initial_field\": \"")) && (q = strchr(p += strlen("\"initial_field\": \""), '"')))
+        snprintf(origin, len, "%.*s", (int)(q - p), p);
+    return 0;
+}
+
+// Map the field the run starts from: the --restart checkpoint, which also
+// reduces *timesteps to the steps left, or --initial-field. Returns 1 when a
+// field was mapped, 0 for the default hot spot and -1 on errors.
+static inline int checkpoint_map_start(checkpoint_ctx *c, const solver_options *opts, int size, int dims,
+                                       int *timesteps, field_map *m)
+{
+    char path[1024];
+    if (opts->restart)
+    {
+        if (checkpoint_read_info(opts->restart, &c->start, c->origin, sizeof(c->origin)) != 0)
+            return -1;
+        if (c->start >= *timesteps)
+        {
+            fprintf(stderr, "%s is already at step %d of %d\n", opts->restart, c->start, *timesteps);
+            return -1;
+        }
+        *timesteps -= c->start;
+        snprintf(path, sizeof(path), "%s/checkpoint.npy", opts->restart);
+    }
+    else if (opts->initial_field)
+    {
+        char *resolved = realpath(opts->initial_field, NULL);
+        snprintf(c->origin, sizeof(c->origin), "%s", resolved ? resolved : opts->initial_field);
+        free(resolved);
+        snprintf(path, sizeof(path), "%s", opts->initial_field);
+    }
+    else
+        return 0;
+    return field_map_open(m, path, size, dims, 0) == 0 ? 1 : -1;
+}
+
+// Fill a contiguous size^dims grid with the start field (hot spot by default)
+static inline int checkpoint_start_contig(checkpoint_ctx *c, const solver_options *opts, double *T, int size, int dims,
+                                          int *timesteps)
+{
+    field_map m;
+    int rc = checkpoint_map_start(c, opts, size, dims, timesteps, &m);
+    if (rc < 0)
+        return -1;
+    if (rc == 0)
+    {
+        size_t center = 0;
+        for (int d = 0; d < dims; d++)
+            center = center * size + size / 2;
+        T[center] = 100.0;
+        return 0;
+    }
+    memcpy(T, m.data, field_cells(size, dims) * sizeof(double));
+    field_map_close(&m);
+    return 0;
+}
+
+// Same for a grid of the build's precision; files on disk stay float64
+static inline int checkpoint_start_real(checkpoint_ctx *c, const solver_options *opts, real *T, int size, int dims,
+                                        int *timesteps)
+{
+#ifdef HEATKERNEL_REAL_IS_DOUBLE
+    return checkpoint_start_contig(c, opts, T, size, dims, timesteps);
+#else
+    field_map m;
+    int rc = checkpoint_map_start(c, opts, size, dims, timesteps, &m);
+    if (rc < 0)
+        return -1;
+    if (rc == 0)
+    {
+        size_t center = 0;
+        for (int d = 0; d < dims; d++)
+            center = center * size + size / 2;
+        T[center] = (real)100.0;
+        return 0;
+    }
+    size_t cells = field_cells(size, dims);
+    for (size_t i = 0; i < cells; i++)
+        T[i] = (real)m.data[i];
+    field_map_close(&m);
+    return 0;
+#endif
+}
+
+static inline int checkpoint_start_ptr(checkpoint_ctx *c, const solver_options *opts, double **T, int size, int *timesteps)
+{
+    field_map m;
+    int rc = checkpoint_map_start(c, opts, size, 2, timesteps, &m);
+    if (rc < 0)
+        return -1;
+    if (rc == 0)
+    {
+        T[size / 2][size / 2] = 100.0;
+        return 0;
+    }
+    for (int i = 0; i < size; i++)
+        memcpy(T[i], &m.data[(size_t)i * size], (size_t)size * sizeof(double));
+    field_map_close(&m);
+    return 0;
+}
+
+// Whether a multiple of `every` lies in (prev_step, step], steps counted from the run's start
+static inline int checkpoint_due(const checkpoint_ctx *c, int prev_step, int step)
+{
+    return c->every > 0 && (c->start + step) / c->every > (c->start + prev_step) / c->every;
+}
+
+static inline void checkpoint_tmp_path(const checkpoint_ctx *c, char *path, size_t len)
+{
+    snprintf(path, len, "%s/checkpoint.npy.tmp", c->dir);
+}
+
+// Unmap the finished .tmp field and publish it with its checkpoint.json
+static inline int checkpoint_commit(checkpoint_ctx *c, field_map *m, int size, int step)
+{
+    char tmp[1024], path[1024], info_tmp[1024], info[1024];
+    field_map_close(m);
+    checkpoint_tmp_path(c, tmp, sizeof(tmp));
+    snprintf(path, sizeof(path), "%s/checkpoint.npy", c->dir);
+    snprintf(info_tmp, sizeof(info_tmp), "%s/checkpoint.json.tmp", c->dir);
+    snprintf(info, sizeof(info), "%s/checkpoint.json", c->dir);
+
+    FILE *f = fopen(info_tmp, "w");
+    if (!f)
+        return -1;
+    fprintf(f, "{\n  \"step\": %d,\n  \"grid_size\": %d,\n  \"initial_field\": ", step, size);
+    if (c->origin[0])
+        fprintf(f, "\"%s\"\n}\n", c->origin);
+    else
+        fprintf(f, "null\n}\n");
+    fclose(f);
+    if (rename(tmp, path) != 0 || rename(info_tmp, info) != 0)
+        return -1;
+    c->count++;
+    return 0;
+}
+
+static inline void checkpoint_failed(checkpoint_ctx *c)
+{
+    fprintf(stderr, "Failed to write a checkpoint to %s, checkpoints disabled\n", c->dir);
+    c->every = 0;
+    c->failed = 1;
+}
+
+// Checkpoint a contiguous size^dims grid if one is due between the two steps
+static inline void checkpoint_contig(checkpoint_ctx *c, const double *T, int size, int dims, int prev_step, int step)
+{
+    if (!checkpoint_due(c, prev_step, step))
+        return;
+    struct timespec t0, t1;
+    get_time(&t0);
+    char tmp[1024];
+    field_map m;
+    checkpoint_tmp_path(c, tmp, sizeof(tmp));
+    if (field_map_create(&m, tmp, size, dims) != 0)
+        checkpoint_failed(c);
+    else
+    {
+        memcpy(m.data, T, field_cells(size, dims) * sizeof(double));
+        if (checkpoint_commit(c, &m, size, c->start + step) != 0)
+            checkpoint_failed(c);
+    }
+    get_time(&t1);
+    c->time += time_diff(&t0, &t1);
+}
+
+static inline void checkpoint_real(checkpoint_ctx *c, const real *T, int size, int dims, int prev_step, int step)
+{
+#ifdef HEATKERNEL_REAL_IS_DOUBLE
+    checkpoint_contig(c, T, size, dims, prev_step, step);
+#else
+    if (!checkpoint_due(c, prev_step, step))
+        return;
+    struct timespec t0, t1;
+    get_time(&t0);
+    char tmp[1024];
+    field_map m;
+    checkpoint_tmp_path(c, tmp, sizeof(tmp));
+    if (field_map_create(&m, tmp, size, dims) != 0)
+        checkpoint_failed(c);
+    else
+    {
+        size_t cells = field_cells(size, dims);
+        for (size_t i = 0; i < cells; i++)
+            m.data[i] = T[i];
+        if (checkpoint_commit(c, &m, size, c->start + step) != 0)
+            checkpoint_failed(c);
+    }
+    get_time(&t1);
+    c->time += time_diff(&t0, &t1);
+#endif
+}
+
+static inline void checkpoint_ptr(checkpoint_ctx *c, double **T, int size, int prev_step, int step)
+{
+    if (!checkpoint_due(c, prev_step, step))
+        return;
+    struct timespec t0, t1;
+    get_time(&t0);
+    char tmp[1024];
+    field_map m;
+    checkpoint_tmp_path(c, tmp, sizeof(tmp));
+    if (field_map_create(&m, tmp, size, 2) != 0)
+        checkpoint_failed(c);
+    else
+    {
+        for (int i = 0; i < size; i++)
+            memcpy(&m.data[(size_t)i * size], T[i], (size_t)size * sizeof(double));
+        if (checkpoint_commit(c, &m, size, c->start + step) != 0)
+            checkpoint_failed(c);
+    }
+    get_time(&t1);
+    c->time += time_diff(&t0, &t1);
+}
+
+// Start field and checkpoint entries of metrics.json; checkpoint_time is its own breakdown bucket
+static inline void checkpoint_report(const checkpoint_ctx *c, metrics_extra *m)
+{
+    if (c->origin[0])
+        metrics_add_string(m, "initial_field", c->origin);
+    if (c->start > 0)
+        metrics_add_int(m, "start_step", c->start);
+    if (c->every > 0 || c->count > 0)
+    {
+        char buf[256];
+        snprintf(buf, sizeof(buf), "{\n    \"every\": %d,\n    \"count\": %d,\n    \"time\": %.6f\n  }",
+                 c->every, c->count, c->time);
+        metrics_add_raw(m, "checkpoints", buf);
+        metrics_add_breakdown(m, "checkpoint_time", c->time);
+    }
+}
+
+#endif
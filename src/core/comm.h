@@ -0,0 +1,263 @@
+#ifndef COMM_H
+#define COMM_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+// Minimal message layer for the distributed-memory stage: non-blocking
+// point-to-point messages, barrier and gather on doubles.
+//
+// Built with -DHEATKERNEL_MPI (mpicc) it maps 1:1 onto MPI and the ranks come
+// from mpirun. Without it, a local stand-in forks `local_ranks` processes
+// that exchange messages through mailboxes in one shared mapping, so the
+// stage runs on any POSIX box without an MPI install. Stand-in rules: at most
+// one sender per (destination, tag), messages up to `message_capacity`
+// doubles, gathers up to `gather_capacity` doubles per rank. Sends complete
+// immediately unless the receiver is two messages behind on that mailbox.
+
+#define COMM_TAGS 8
+
+#ifdef HEATKERNEL_MPI
+#include <mpi.h>
+
+typedef struct
+{
+    int rank;
+    int size;
+} comm_ctx;
+
+typedef MPI_Request comm_request;
+
+static inline int comm_init(comm_ctx *c, int *argc, char ***argv, int local_ranks,
+                            size_t message_capacity, size_t gather_capacity)
+{
+    (void)message_capacity;
+    (void)gather_capacity;
+    MPI_Init(argc, argv);
+    MPI_Comm_rank(MPI_COMM_WORLD, &c->rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &c->size);
+    if (c->rank == 0 && local_ranks > 1 && local_ranks != c->size)
+        fprintf(stderr, "--ranks=%d ignored, using the %d MPI ranks from the launcher\n", local_ranks, c->size);
+    return 0;
+}
+
+static inline void comm_isend(comm_ctx *c, const double *buf, int count, int dest, int tag, comm_request *req)
+{
+    (void)c;
+    MPI_Isend((void *)buf, count, MPI_DOUBLE, dest, tag, MPI_COMM_WORLD, req);
+}
+
+static inline void comm_irecv(comm_ctx *c, double *buf, int count, int src, int tag, comm_request *req)
+{
+    (void)c;
+    MPI_Irecv(buf, count, MPI_DOUBLE, src, tag, MPI_COMM_WORLD, req);
+}
+
+static inline void comm_waitall(comm_ctx *c, int n, comm_request *reqs)
+{
+    (void)c;
+    MPI_Waitall(n, reqs, MPI_STATUSES_IGNORE);
+}
+
+static inline void comm_barrier(comm_ctx *c)
+{
+    (void)c;
+    MPI_Barrier(MPI_COMM_WORLD);
+}
+
+// count doubles from every rank into recv (count * size doubles) on rank 0
+static inline void comm_gather(comm_ctx *c, const double *send, int count, double *recv)
+{
+    (void)c;
+    MPI_Gather((void *)send, count, MPI_DOUBLE, recv, count, MPI_DOUBLE, 0, MPI_COMM_WORLD);
+}
+
+static inline void comm_finalize(comm_ctx *c)
+{
+    (void)c;
+    MPI_Finalize();
+}
+
+static inline const char *comm_backend(void)
+{
+    return "mpi";
+}
+
+#else
+#include <sched.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+
+typedef struct
+{
+    long barrier_count;
+    long barrier_sense;
+} comm_shared;
+
+typedef struct
+{
+    long sent;     // messages written by the sender
+    long consumed; // messages copied out by the receiver
+} comm_mailbox;
+
+typedef struct
+{
+    int rank;
+    int size;
+    size_t message_capacity;
+    size_t gather_capacity;
+    void *mapping;
+    size_t mapping_bytes;
+    comm_shared *shared;
+    comm_mailbox *mailboxes; // [size][COMM_TAGS]
+    double *messages;        // [size][COMM_TAGS][2][message_capacity]
+    double *gather;          // [size][gather_capacity]
+    long received[COMM_TAGS];
+    long barrier_sense;
+    pid_t *children;
+} comm_ctx;
+
+typedef struct
+{
+    double *buf; // NULL for sends, which complete in comm_isend
+    int count;
+    int tag;
+    long seq;
+} comm_request;
+
+#define COMM_SPIN_UNTIL(cond) \
+    while (!(cond))           \
+    sched_yield()
+
+static inline double *comm_slot(comm_ctx *c, int dest, int tag, long seq)
+{
+    return c->messages + (((size_t)dest * COMM_TAGS + tag) * 2 + (size_t)(seq & 1)) * c->message_capacity;
+}
+
+// Maps the shared mailboxes and forks ranks 1..local_ranks-1; every process returns as its own rank
+static inline int comm_init(comm_ctx *c, int *argc, char ***argv, int local_ranks,
+                            size_t message_capacity, size_t gather_capacity)
+{
+    (void)argc;
+    (void)argv;
+    memset(c, 0, sizeof(*c));
+    c->size = local_ranks > 0 ? local_ranks : 1;
+    c->message_capacity = message_capacity;
+    c->gather_capacity = gather_capacity;
+
+    size_t mailbox_bytes = (size_t)c->size * COMM_TAGS * sizeof(comm_mailbox);
+    size_t message_doubles = (size_t)c->size * COMM_TAGS * 2 * message_capacity;
+    c->mapping_bytes = sizeof(comm_shared) + mailbox_bytes +
+                       (message_doubles + (size_t)c->size * gather_capacity) * sizeof(double);
+    c->mapping = mmap(NULL, c->mapping_bytes, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANONYMOUS, -1, 0);
+    if (c->mapping == MAP_FAILED)
+    {
+        perror("comm_init: mmap");
+        return -1;
+    }
+    c->shared = (comm_shared *)c->mapping;
+    c->mailboxes = (comm_mailbox *)(c->shared + 1);
+    c->messages = (double *)((char *)c->mailboxes + mailbox_bytes);
+    c->gather = c->messages + message_doubles;
+
+    c->children = (pid_t *)calloc(c->size, sizeof(pid_t));
+    fflush(NULL); // or buffered output is written once per rank
+    for (int r = 1; r < c->size; r++)
+    {
+        pid_t pid = fork();
+        if (pid < 0)
+        {
+            perror("comm_init: fork");
+            return -1;
+        }
+        if (pid == 0)
+        {
+            c->rank = r;
+            return 0;
+        }
+        c->children[r] = pid;
+    }
+    return 0;
+}
+
+static inline void comm_isend(comm_ctx *c, const double *buf, int count, int dest, int tag, comm_request *req)
+{
+    comm_mailbox *box = &c->mailboxes[dest * COMM_TAGS + tag];
+    long seq = box->sent; // only this rank writes it
+    COMM_SPIN_UNTIL(__atomic_load_n(&box->consumed, __ATOMIC_ACQUIRE) >= seq - 1);
+    memcpy(comm_slot(c, dest, tag, seq), buf, (size_t)count * sizeof(double));
+    __atomic_store_n(&box->sent, seq + 1, __ATOMIC_RELEASE);
+    req->buf = NULL;
+}
+
+static inline void comm_irecv(comm_ctx *c, double *buf, int count, int src, int tag, comm_request *req)
+{
+    (void)src; // a mailbox has a single sender
+    req->buf = buf;
+    req->count = count;
+    req->tag = tag;
+    req->seq = c->received[tag]++;
+}
+
+static inline void comm_waitall(comm_ctx *c, int n, comm_request *reqs)
+{
+    for (int i = 0; i < n; i++)
+    {
+        comm_request *req = &reqs[i];
+        if (!req->buf)
+            continue;
+        comm_mailbox *box = &c->mailboxes[c->rank * COMM_TAGS + req->tag];
+        COMM_SPIN_UNTIL(__atomic_load_n(&box->sent, __ATOMIC_ACQUIRE) > req->seq);
+        memcpy(req->buf, comm_slot(c, c->rank, req->tag, req->seq), (size_t)req->count * sizeof(double));
+        __atomic_store_n(&box->consumed, req->seq + 1, __ATOMIC_RELEASE);
+        req->buf = NULL;
+    }
+}
+
+// Sense-reversing barrier
+static inline void comm_barrier(comm_ctx *c)
+{
+    c->barrier_sense = !c->barrier_sense;
+    if (__atomic_add_fetch(&c->shared->barrier_count, 1, __ATOMIC_ACQ_REL) == c->size)
+    {
+        __atomic_store_n(&c->shared->barrier_count, 0, __ATOMIC_RELAXED);
+        __atomic_store_n(&c->shared->barrier_sense, c->barrier_sense, __ATOMIC_RELEASE);
+    }
+    else
+        COMM_SPIN_UNTIL(__atomic_load_n(&c->shared->barrier_sense, __ATOMIC_ACQUIRE) == c->barrier_sense);
+}
+
+static inline void comm_gather(comm_ctx *c, const double *send, int count, double *recv)
+{
+    memcpy(c->gather + (size_t)c->rank * c->gather_capacity, send, (size_t)count * sizeof(double));
+    comm_barrier(c);
+    if (c->rank == 0)
+        for (int r = 0; r < c->size; r++)
+            memcpy(recv + (size_t)r * count, c->gather + (size_t)r * c->gather_capacity, (size_t)count * sizeof(double));
+    comm_barrier(c);
+}
+
+// Rank 0 waits for the other ranks; they exit here
+static inline void comm_finalize(comm_ctx *c)
+{
+    if (c->rank != 0)
+    {
+        fflush(NULL);
+        _exit(0);
+    }
+    for (int r = 1; r < c->size; r++)
+        waitpid(c->children[r], NULL, 0);
+    munmap(c->mapping, c->mapping_bytes);
+    free(c->children);
+}
+
+static inline const char *comm_backend(void)
+{
+    return "local";
+}
+#endif
+
+#endif
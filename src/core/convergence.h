@@ -0,0 +1,109 @@
+#ifndef CONVERGENCE_H
+#define CONVERGENCE_H
+
+#include <stdio.h>
+#include <math.h>
+#include "metrics.h"
+#include "options.h"
+
+// Run to steady state: every `every` steps the update residual of the last
+// step, max |T^(n+1) - T^n| or sqrt(sum (T^(n+1) - T^n)^2) over the interior
+// cells, is reduced inside the stencil pass (per tile in trapezoid_tile_residual,
+// an OpenMP reduction in stages 08/09) and the run stops once it is below
+// `tol`. Passes are clipped so the checks land on exact multiples of `every`.
+//
+// The residual is fused with the stencil, so its cost is estimated: the
+// stencil time of the check passes minus the same number of steps at the
+// per-step time of the passes without a check.
+
+#define RESIDUAL_MAX 0
+#define RESIDUAL_L2 1
+
+typedef struct
+{
+    double tol;        // stop below this residual, 0 disables convergence checks
+    int every;         // steps between checks
+    int norm;          // RESIDUAL_MAX or RESIDUAL_L2
+    int converged;
+    int checks;
+    double residual;   // last residual checked
+    double check_time; // stencil time of passes with a residual check
+    long check_steps;
+    double pass_time;  // stencil time of the other passes
+    long pass_steps;
+} convergence_ctx;
+
+static inline void convergence_init(convergence_ctx *c, const solver_options *opts)
+{
+    c->tol = opts->converge_tol;
+    c->every = opts->converge_every > 0 ? opts->converge_every : 100;
+    c->norm = opts->residual_norm;
+    c->converged = 0;
+    c->checks = 0;
+    c->residual = -1.0;
+    c->check_time = c->pass_time = 0.0;
+    c->check_steps = c->pass_steps = 0;
+}
+
+// Whether a check falls in (prev_step, step]
+static inline int convergence_due(const convergence_ctx *c, int prev_step, int step)
+{
+    return c->tol > 0 && step / c->every > prev_step / c->every;
+}
+
+// Shorten a pass of k steps from `step` so it ends on the next check
+static inline int convergence_clip(const convergence_ctx *c, int step, int k)
+{
+    if (c->tol <= 0)
+        return k;
+    int left = c->every - step % c->every;
+    return k < left ? k : left;
+}
+
+// Book a pass of k steps that took `seconds` of stencil time
+static inline void convergence_record(convergence_ctx *c, int check, int k, double seconds)
+{
+    if (check)
+    {
+        c->check_time += seconds;
+        c->check_steps += k;
+    }
+    else
+    {
+        c->pass_time += seconds;
+        c->pass_steps += k;
+    }
+}
+
+// Residual from the reduced max and sum of squares; returns 1 once converged
+static inline int convergence_test(convergence_ctx *c, double res_max, double res_sq)
+{
+    c->residual = c->norm == RESIDUAL_L2 ? sqrt(res_sq) : res_max;
+    c->checks++;
+    c->converged = c->residual < c->tol;
+    return c->converged;
+}
+
+// "convergence" block of metrics.json; time_steps of the run are the steps taken
+static inline void convergence_report(const convergence_ctx *c, metrics_extra *m, int steps, double total_time)
+{
+    if (c->tol <= 0)
+        return;
+    double cost = c->check_time;
+    if (c->pass_steps > 0)
+        cost -= c->check_steps * (c->pass_time / c->pass_steps);
+    char residual[32] = "null", converge_time[32] = "null", buf[512];
+    if (c->checks > 0)
+        snprintf(residual, sizeof(residual), "%.17g", c->residual);
+    if (c->converged)
+        snprintf(converge_time, sizeof(converge_time), "%.6f", total_time);
+    snprintf(buf, sizeof(buf),
+             "{\n    \"tolerance\": %.17g,\n    \"norm\": \"%s\",\n    \"every\": %d,\n    \"converged\": %s,\n"
+             "    \"steps\": %d,\n    \"residual\": %s,\n    \"checks\": %d,\n    \"time_to_converge\": %s,\n"
+             "    \"check_time\": %.6f,\n    \"check_cost\": %.6f\n  }",
+             c->tol, c->norm == RESIDUAL_L2 ? "l2" : "max", c->every, c->converged ? "true" : "false",
+             steps, residual, c->checks, converge_time, c->check_time, cost > 0 ? cost : 0.0);
+    metrics_add_raw(m, "convergence", buf);
+}
+
+#endif
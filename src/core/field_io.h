@@ -0,0 +1,262 @@
+#ifndef FIELD_IO_H
+#define FIELD_IO_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+#include <string.h>
+#include <math.h>
+#include "metrics.h"
+#include "precision.h"
+
+// Final field summary and .npy dumps used to validate stage outputs.
+
+typedef struct
+{
+    uint64_t checksum; // sum of splitmix64(bits + position) over cells, row-major
+    uint64_t count;
+    double sum;
+    double l2;   // sqrt(sum T^2)
+    double linf; // max |T|
+} field_stats;
+
+// Cells of a size^dims field
+static inline size_t field_cells(int size, int dims)
+{
+    size_t cells = 1;
+    for (int d = 0; d < dims; d++)
+        cells *= (size_t)size;
+    return cells;
+}
+
+static inline void field_stats_init(field_stats *s)
+{
+    s->checksum = 0;
+    s->count = 0;
+    s->sum = 0.0;
+    s->l2 = 0.0;
+    s->linf = 0.0;
+}
+
+static inline void field_stats_row(field_stats *s, const double *row, int n)
+{
+    for (int j = 0; j < n; j++)
+    {
+        double v = row[j];
+        uint64_t z;
+        memcpy(&z, &v, sizeof(z));
+        z += ++s->count * 0x9E3779B97F4A7C15ULL;
+        z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+        z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+        s->checksum += z ^ (z >> 31);
+
+        s->sum += v;
+        s->l2 += v * v;
+        if (fabs(v) > s->linf || v != v)
+            s->linf = fabs(v);
+    }
+}
+
+static inline void field_stats_finish(field_stats *s)
+{
+    s->l2 = sqrt(s->l2);
+}
+
+static inline field_stats field_stats_contig(const double *data, int size)
+{
+    field_stats s;
+    field_stats_init(&s);
+    for (int i = 0; i < size; i++)
+        field_stats_row(&s, &data[(size_t)i * size], size);
+    field_stats_finish(&s);
+    return s;
+}
+
+static inline field_stats field_stats_ptr(double **data, int size)
+{
+    field_stats s;
+    field_stats_init(&s);
+    for (int i = 0; i < size; i++)
+        field_stats_row(&s, data[i], size);
+    field_stats_finish(&s);
+    return s;
+}
+
+// JSON object for metrics.json
+static inline void field_stats_json(const field_stats *s, char *buf, size_t len)
+{
+    snprintf(buf, len,
+             "{\n    \"checksum\": \"%016llx\",\n    \"sum\": %.17g,\n    \"l2\": %.17g,\n    \"linf\": %.17g\n  }",
+             (unsigned long long)s->checksum, s->sum, s->l2, s->linf);
+}
+
+// .npy v1.0 header for a C-ordered cube of `dims` x size with dtype `descr`
+// ("<f8", "<f4"), padded to a multiple of 64 bytes. Returns its length in bytes.
+static inline int npy_format_header_dtype(char *buf, size_t len, int size, int dims, const char *descr)
+{
+    char shape[64];
+    int n = 0;
+    for (int d = 0; d < dims; d++)
+        n += snprintf(shape + n, sizeof(shape) - n, "%d, ", size);
+    char dict[128];
+    int dict_len = snprintf(dict, sizeof(dict), "{'descr': '%s', 'fortran_order': False, 'shape': (%.*s), }",
+                            descr, dims == 1 ? n - 1 : n - 2, shape);
+    int total = 10 + dict_len + 1;
+    int pad = (64 - total % 64) % 64;
+    unsigned short header_len = (unsigned short)(dict_len + pad + 1);
+    if ((size_t)(total + pad) > len)
+        return -1;
+
+    memcpy(buf, "\x93NUMPY\x01\x00", 8);
+    buf[8] = (char)(header_len & 0xff);
+    buf[9] = (char)(header_len >> 8);
+    memcpy(buf + 10, dict, (size_t)dict_len);
+    memset(buf + 10 + dict_len, ' ', (size_t)pad);
+    buf[total + pad - 1] = '\n';
+    return total + pad;
+}
+
+static inline int npy_format_header(char *buf, size_t len, int size, int dims)
+{
+    return npy_format_header_dtype(buf, len, size, dims, "<f8");
+}
+
+static inline int npy_write_header_dims(FILE *f, int size, int dims)
+{
+    char header[256];
+    int n = npy_format_header(header, sizeof(header), size, dims);
+    if (n < 0)
+        return -1;
+    fwrite(header, 1, (size_t)n, f);
+    return ferror(f) ? -1 : 0;
+}
+
+static inline int npy_write_header(FILE *f, int size)
+{
+    return npy_write_header_dims(f, size, 2);
+}
+
+static inline int field_write_npy_contig(const char *path, const double *data, int size)
+{
+    FILE *f = fopen(path, "wb");
+    if (!f)
+        return -1;
+    int rc = npy_write_header(f, size);
+    if (rc == 0 && fwrite(data, sizeof(double), (size_t)size * size, f) != (size_t)size * size)
+        rc = -1;
+    fclose(f);
+    return rc;
+}
+
+static inline int field_write_npy_ptr(const char *path, double **data, int size)
+{
+    FILE *f = fopen(path, "wb");
+    if (!f)
+        return -1;
+    int rc = npy_write_header(f, size);
+    for (int i = 0; rc == 0 && i < size; i++)
+        if (fwrite(data[i], sizeof(double), (size_t)size, f) != (size_t)size)
+            rc = -1;
+    fclose(f);
+    return rc;
+}
+
+static inline int field_write_npy_3d(const char *path, const double *data, int size)
+{
+    size_t cells = (size_t)size * size * size;
+    FILE *f = fopen(path, "wb");
+    if (!f)
+        return -1;
+    int rc = npy_write_header_dims(f, size, 3);
+    if (rc == 0 && fwrite(data, sizeof(double), cells, f) != cells)
+        rc = -1;
+    fclose(f);
+    return rc;
+}
+
+// Record the final field in metrics.json and optionally dump it as field.npy.
+// Returns -1 (after reporting it) when the dump fails.
+static inline int field_report_contig(metrics_extra *m, const char *output_dir, const double *data, int size, int dump)
+{
+    char buf[512];
+    field_stats s = field_stats_contig(data, size);
+    field_stats_json(&s, buf, sizeof(buf));
+    metrics_add_raw(m, "field", buf);
+    if (dump)
+    {
+        char path[256];
+        snprintf(path, sizeof(path), "%s/field.npy", output_dir);
+        if (field_write_npy_contig(path, data, size) != 0)
+        {
+            fprintf(stderr, "Failed to write %s\n", path);
+            return -1;
+        }
+    }
+    return 0;
+}
+
+// Grid of the build's precision: stats and field.npy use its float64 values
+static inline int field_report_real(metrics_extra *m, const char *output_dir, const real *data, int size, int dump)
+{
+#ifdef HEATKERNEL_REAL_IS_DOUBLE
+    return field_report_contig(m, output_dir, data, size, dump);
+#else
+    size_t cells = (size_t)size * size;
+    double *wide = (double *)malloc(cells * sizeof(double));
+    if (!wide)
+    {
+        fprintf(stderr, "Out of memory for the field report\n");
+        return -1;
+    }
+    for (size_t c = 0; c < cells; c++)
+        wide[c] = data[c];
+    int rc = field_report_contig(m, output_dir, wide, size, dump);
+    free(wide);
+    return rc;
+#endif
+}
+
+static inline int field_report_ptr(metrics_extra *m, const char *output_dir, double **data, int size, int dump)
+{
+    char buf[512];
+    field_stats s = field_stats_ptr(data, size);
+    field_stats_json(&s, buf, sizeof(buf));
+    metrics_add_raw(m, "field", buf);
+    if (dump)
+    {
+        char path[256];
+        snprintf(path, sizeof(path), "%s/field.npy", output_dir);
+        if (field_write_npy_ptr(path, data, size) != 0)
+        {
+            fprintf(stderr, "Failed to write %s\n", path);
+            return -1;
+        }
+    }
+    return 0;
+}
+
+// 3D cube: the checksum runs over the cells in row-major order, as for 2D
+static inline int field_report_3d(metrics_extra *m, const char *output_dir, const double *data, int size, int dump)
+{
+    char buf[512];
+    field_stats s;
+    field_stats_init(&s);
+    for (size_t row = 0; row < (size_t)size * size; row++)
+        field_stats_row(&s, &data[row * size], size);
+    field_stats_finish(&s);
+    field_stats_json(&s, buf, sizeof(buf));
+    metrics_add_raw(m, "field", buf);
+    if (dump)
+    {
+        char path[256];
+        snprintf(path, sizeof(path), "%s/field.npy", output_dir);
+        if (field_write_npy_3d(path, data, size) != 0)
+        {
+            fprintf(stderr, "Failed to write %s\n", path);
+            return -1;
+        }
+    }
+    return 0;
+}
+
+#endif
@@ -4,6 +4,7 @@
 #include <stdlib.h>
 #include <stdio.h>
 #include <string.h>
+#include "precision.h"
 
 static inline double **grid_create_ptr(int size)
 {
@@ -36,4 +37,26 @@ static inline void grid_destroy_contig(double *ptr)
     free(ptr);
 }
 
+// Contiguous grid of the build's field precision (precision.h)
+static inline real *grid_create_real(int size)
+{
+    return (real *)calloc((size_t)size * size, sizeof(real));
+}
+
+static inline void grid_destroy_real(real *ptr)
+{
+    free(ptr);
+}
+
+// size^3 cube, row-major: cell (i, j, k) is ptr[(i * size + j) * size + k]
+static inline double *grid_create_3d(int size)
+{
+    return (double *)calloc((size_t)size * size * size, sizeof(double));
+}
+
+static inline void grid_destroy_3d(double *ptr)
+{
+    free(ptr);
+}
+
 #endif
\ No newline at end of file
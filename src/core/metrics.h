@@ -3,32 +3,117 @@
 
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
 
-static inline void save_metrics_detailed(const char *output_dir, double total_time, double stencil_time,
-                                         double boundary_time, double swap_time, double other_time, int size, int timesteps, const char *stage_name)
+// Optional metrics.json entries on top of the fixed schema. Values are stored
+// as raw JSON so nested objects can be added; breakdown entries are extra
+// timing buckets appended to "breakdown". "host" is the gethostname() of the
+// machine, so runs from different hosts are never compared (see regression.py).
+#define METRICS_MAX_EXTRA 32
+#define METRICS_MAX_BREAKDOWN 8
+#define METRICS_KEY_LEN 64
+#define METRICS_VALUE_LEN 4096
+
+typedef struct
+{
+    int count;
+    char key[METRICS_MAX_EXTRA][METRICS_KEY_LEN];
+    char value[METRICS_MAX_EXTRA][METRICS_VALUE_LEN];
+    int breakdown_count;
+    char breakdown_key[METRICS_MAX_BREAKDOWN][METRICS_KEY_LEN];
+    double breakdown_value[METRICS_MAX_BREAKDOWN];
+} metrics_extra;
+
+static inline void metrics_add_raw(metrics_extra *m, const char *key, const char *json)
+{
+    if (m->count >= METRICS_MAX_EXTRA)
+        return;
+    snprintf(m->key[m->count], METRICS_KEY_LEN, "%s", key);
+    snprintf(m->value[m->count], METRICS_VALUE_LEN, "%s", json);
+    m->count++;
+}
+
+static inline void metrics_add_number(metrics_extra *m, const char *key, double value)
+{
+    char buf[64];
+    snprintf(buf, sizeof(buf), "%.17g", value);
+    metrics_add_raw(m, key, buf);
+}
+
+static inline void metrics_add_int(metrics_extra *m, const char *key, long value)
+{
+    char buf[32];
+    snprintf(buf, sizeof(buf), "%ld", value);
+    metrics_add_raw(m, key, buf);
+}
+
+static inline void metrics_add_string(metrics_extra *m, const char *key, const char *value)
+{
+    char buf[METRICS_VALUE_LEN];
+    snprintf(buf, sizeof(buf), "\"%s\"", value);
+    metrics_add_raw(m, key, buf);
+}
+
+static inline void metrics_add_breakdown(metrics_extra *m, const char *key, double seconds)
+{
+    if (m->breakdown_count >= METRICS_MAX_BREAKDOWN)
+        return;
+    snprintf(m->breakdown_key[m->breakdown_count], METRICS_KEY_LEN, "%s", key);
+    m->breakdown_value[m->breakdown_count] = seconds;
+    m->breakdown_count++;
+}
+
+// Returns -1 (after reporting it) when metrics.json cannot be written
+static inline int save_metrics_extended(const char *output_dir, double total_time, double stencil_time,
+                                        double boundary_time, double swap_time, double other_time, int size, int timesteps,
+                                        const char *stage_name, const metrics_extra *extra)
 {
     char filename[256];
     snprintf(filename, sizeof(filename), "%s/metrics.json", output_dir);
 
+    char host[256] = "";
+    gethostname(host, sizeof(host) - 1);
+
     FILE *file = fopen(filename, "w");
-    if (file)
+    if (!file)
+    {
+        fprintf(stderr, "Failed to write %s\n", filename);
+        return -1;
+    }
+    fprintf(file, "{\n");
+    fprintf(file, "  \"stage\": \"%s\",\n", stage_name);
+    fprintf(file, "  \"host\": \"%s\",\n", host);
+    fprintf(file, "  \"grid_size\": %d,\n", size);
+    fprintf(file, "  \"time_steps\": %d,\n", timesteps);
+    fprintf(file, "  \"total_time\": %.6f,\n", total_time);
+    fprintf(file, "  \"time_per_step\": %.6f,\n", total_time / timesteps * 1000);
+    fprintf(file, "  \"performance\": %.6f,\n", timesteps / total_time);
+    fprintf(file, "  \"breakdown\": {\n");
+    fprintf(file, "    \"stencil_time\": %.6f,\n", stencil_time);
+    fprintf(file, "    \"boundary_time\": %.6f,\n", boundary_time);
+    fprintf(file, "    \"swap_time\": %.6f,\n", swap_time);
+    fprintf(file, "    \"other_time\": %.6f", other_time);
+    for (int i = 0; extra && i < extra->breakdown_count; i++)
+        fprintf(file, ",\n    \"%s\": %.6f", extra->breakdown_key[i], extra->breakdown_value[i]);
+    fprintf(file, "\n  }");
+    for (int i = 0; extra && i < extra->count; i++)
+        fprintf(file, ",\n  \"%s\": %s", extra->key[i], extra->value[i]);
+    fprintf(file, "\n}\n");
+    int error = ferror(file);
+    if (fclose(file) != 0 || error)
     {
-        fprintf(file, "{\n");
-        fprintf(file, "  \"stage\": \"%s\",\n", stage_name);
-        fprintf(file, "  \"grid_size\": %d,\n", size);
-        fprintf(file, "  \"time_steps\": %d,\n", timesteps);
-        fprintf(file, "  \"total_time\": %.6f,\n", total_time);
-        fprintf(file, "  \"time_per_step\": %.6f,\n", total_time / timesteps * 1000);
-        fprintf(file, "  \"performance\": %.6f,\n", timesteps / total_time);
-        fprintf(file, "  \"breakdown\": {\n");
-        fprintf(file, "    \"stencil_time\": %.6f,\n", stencil_time);
-        fprintf(file, "    \"boundary_time\": %.6f,\n", boundary_time);
-        fprintf(file, "    \"swap_time\": %.6f,\n", swap_time);
-        fprintf(file, "    \"other_time\": %.6f\n", other_time);
-        fprintf(file, "  }\n");
-        fprintf(file, "}\n");
-        fclose(file);
+        fprintf(stderr, "Failed to write %s\n", filename);
+        return -1;
     }
+    return 0;
+}
+
+static inline int save_metrics_detailed(const char *output_dir, double total_time, double stencil_time,
+                                        double boundary_time, double swap_time, double other_time, int size, int timesteps, const char *stage_name)
+{
+    return save_metrics_extended(output_dir, total_time, stencil_time, boundary_time, swap_time, other_time,
+                                 size, timesteps, stage_name, NULL);
 }
 
-#endif
\ No newline at end of file
+#endif
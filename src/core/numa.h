@@ -0,0 +1,128 @@
+#ifndef NUMA_H
+#define NUMA_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <omp.h>
+#include "metrics.h"
+#include "precision.h"
+#include "temporal_blocking.h"
+#ifdef __linux__
+#include <unistd.h>
+#include <sys/syscall.h>
+#endif
+
+// NUMA placement for the OpenMP stages (08/09).
+//
+// Linux places a page on the NUMA node of the thread that first writes it.
+// calloc/memset from the master thread therefore put the whole grid on one
+// node, and every other socket reads its tiles across the interconnect. With
+// --first-touch the fields are zeroed by a parallel loop over the same tiles
+// with the same collapse(2) schedule(static) as the stencil loop, so each page
+// starts on the node of the thread that later updates it. Each thread also
+// zeroes its own scratch buffers.
+//
+// Thread placement itself comes from OMP_PROC_BIND/OMP_PLACES (PLACEMENTS in
+// config.mk). placement_report records the binding in effect and the CPU and
+// node each thread ran on.
+
+// Fields allocated uninitialized and zeroed tile by tile by the thread team
+static inline real *grid_first_touch_real(int size, int row_block, int col_block)
+{
+    real *ptr = (real *)malloc((size_t)size * size * sizeof(real));
+    if (!ptr)
+        return NULL;
+#pragma omp parallel for collapse(2) schedule(static)
+    for (int i_start = 1; i_start < size - 1; i_start += row_block)
+    {
+        for (int j_start = 1; j_start < size - 1; j_start += col_block)
+        {
+            int i_lo, i_hi, j_lo, j_hi;
+            trapezoid_tile_bounds(i_start, row_block, size, &i_lo, &i_hi);
+            trapezoid_tile_bounds(j_start, col_block, size, &j_lo, &j_hi);
+            for (int i = i_lo; i < i_hi; i++)
+                memset(ptr + (size_t)i * size + j_lo, 0, (size_t)(j_hi - j_lo) * sizeof(real));
+        }
+    }
+    return ptr;
+}
+
+// Per-thread scratch pairs (2 * scratch_size values each), zeroed by their owners
+static inline void scratch_first_touch(real *scratch, size_t scratch_size)
+{
+#pragma omp parallel
+    memset(scratch + (size_t)omp_get_thread_num() * 2 * scratch_size, 0, 2 * scratch_size * sizeof(real));
+}
+
+static inline const char *proc_bind_name(omp_proc_bind_t bind)
+{
+    switch (bind)
+    {
+    case omp_proc_bind_false:
+        return "false";
+    case omp_proc_bind_true:
+        return "true";
+    case omp_proc_bind_master:
+        return "master";
+    case omp_proc_bind_close:
+        return "close";
+    case omp_proc_bind_spread:
+        return "spread";
+    default:
+        return "unknown";
+    }
+}
+
+// CPU and NUMA node the calling thread runs on, -1 where unknown
+static inline void current_cpu(int *cpu, int *node)
+{
+    *cpu = *node = -1;
+#if defined(__linux__) && defined(SYS_getcpu)
+    unsigned c, n;
+    if (syscall(SYS_getcpu, &c, &n, NULL) == 0)
+    {
+        *cpu = (int)c;
+        *node = (int)n;
+    }
+#endif
+}
+
+// "placement" block of metrics.json
+static inline void placement_report(metrics_extra *m, int first_touch)
+{
+    int threads = omp_get_max_threads();
+    int *cpus = (int *)malloc(2 * (size_t)threads * sizeof(int));
+    if (!cpus)
+        return;
+    int *nodes = cpus + threads;
+#pragma omp parallel num_threads(threads)
+    current_cpu(&cpus[omp_get_thread_num()], &nodes[omp_get_thread_num()]);
+
+    const char *places = getenv("OMP_PLACES");
+    char buf[METRICS_VALUE_LEN], cpu_list[METRICS_VALUE_LEN / 2] = "", node_list[METRICS_VALUE_LEN / 4] = "";
+    int used_nodes = 0;
+    size_t c = 0, n = 0;
+    for (int t = 0; t < threads; t++)
+    {
+        int seen = 0;
+        for (int u = 0; u < t; u++)
+            seen |= nodes[u] == nodes[t];
+        used_nodes += !seen && nodes[t] >= 0;
+        // Lists stop at whole entries on very large teams rather than overflow the metrics entry
+        if (c + 16 < sizeof(cpu_list))
+            c += snprintf(cpu_list + c, sizeof(cpu_list) - c, "%s%d", t ? ", " : "", cpus[t]);
+        if (n + 16 < sizeof(node_list))
+            n += snprintf(node_list + n, sizeof(node_list) - n, "%s%d", t ? ", " : "", nodes[t]);
+    }
+    snprintf(buf, sizeof(buf),
+             "{\n    \"first_touch\": %s,\n    \"proc_bind\": \"%s\",\n    \"places\": %s%s%s,\n"
+             "    \"num_places\": %d,\n    \"numa_nodes_used\": %d,\n    \"cpus\": [%s],\n    \"numa_nodes\": [%s]\n  }",
+             first_touch ? "true" : "false", proc_bind_name(omp_get_proc_bind()),
+             places ? "\"" : "", places ? places : "null", places ? "\"" : "",
+             omp_get_num_places(), used_nodes, cpu_list, node_list);
+    metrics_add_raw(m, "placement", buf);
+    free(cpus);
+}
+
+#endif
@@ -0,0 +1,152 @@
+#ifndef OPTIONS_H
+#define OPTIONS_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+// Optional --flag / --name=value arguments accepted after the positional
+// <size> <timesteps> <alpha> <dx> <output_dir> arguments of every stage.
+// --dump-field, --perf and the checkpoint options are taken by every stage;
+// the other groups only by the stages that implement them, which list them
+// in their parse_solver_options call. A stage rejects the rest instead of
+// running without them.
+enum
+{
+    OPT_TILES = 1 << 0,         // --row-block --col-block --temporal-block --tuning-cache
+    OPT_CONVERGE = 1 << 1,      // --converge-tol --converge-every --residual
+    OPT_ACTIVE_REGION = 1 << 2, // --active-region
+    OPT_FIRST_TOUCH = 1 << 3,   // --first-touch
+    OPT_SNAPSHOT = 1 << 4,      // --snapshot-every --snapshot-float32 --snapshot-compress
+    OPT_RANKS = 1 << 5,         // --ranks
+    OPT_IMPLICIT = 1 << 6,      // --dt --damping-steps
+};
+
+typedef struct
+{
+    int dump_field;     // --dump-field: write the final field to output_dir/field.npy
+    int row_block;      // --row-block=N: tile rows (stages 06-09), 0 keeps the stage default
+    int col_block;      // --col-block=N: tile columns
+    int temporal_block; // --temporal-block=N: time steps per tile pass
+    const char *tuning_cache; // --tuning-cache=PATH: autotuned tiles (see tuning.h), empty disables
+    int perf;           // --perf: hardware counters per phase (see perf_counters.h)
+    int ranks;          // --ranks=N: local ranks of the distributed stage without MPI (see comm.h)
+    const char *initial_field; // --initial-field=PATH: .npy start field instead of the hot spot (see checkpoint.h)
+    const char *restart;       // --restart=DIR: resume from DIR/checkpoint.npy
+    int checkpoint_every;      // --checkpoint-every=N: write output_dir/checkpoint.npy every N steps
+    int snapshot_every;        // --snapshot-every=N: queue a snapshot every N steps (see snapshot.h)
+    int snapshot_float32;      // --snapshot-float32: downcast snapshots
+    int snapshot_compress;     // --snapshot-compress=LEVEL: zlib level of chunked snapshots, 0 for plain .npy
+    double converge_tol;       // --converge-tol=TOL: stop at steady state (see convergence.h), 0 runs all steps
+    int converge_every;        // --converge-every=K: steps between residual checks
+    int residual_norm;         // --residual=max|l2: residual norm, 0 for max
+    int first_touch;           // --first-touch: stages 08/09 zero the fields in parallel (see numa.h)
+    double dt;                 // --dt=SECONDS: time step of the implicit stage (see adi.h), 0 keeps 0.24*dx^2/alpha
+    int damping_steps;         // --damping-steps=N: implicit stage steps taken as damped half steps, -1 for the default
+    int active_region;         // --active-region: stages 06-09 skip tiles the front has not reached (see active_region.h)
+} solver_options;
+
+// Returns the value of "--name=value", "" for a bare "--name", NULL otherwise
+static inline const char *option_value(const char *arg, const char *name)
+{
+    size_t n = strlen(name);
+    if (strncmp(arg, name, n) != 0)
+        return NULL;
+    if (arg[n] == '\0')
+        return "";
+    if (arg[n] == '=')
+        return arg + n + 1;
+    return NULL;
+}
+
+// Option group of argv[i], 0 for the options every stage takes
+static inline unsigned option_group(const char *arg)
+{
+    static const struct
+    {
+        const char *name;
+        unsigned group;
+    } groups[] = {
+        {"--row-block", OPT_TILES}, {"--col-block", OPT_TILES}, {"--temporal-block", OPT_TILES},
+        {"--tuning-cache", OPT_TILES}, {"--converge-tol", OPT_CONVERGE}, {"--converge-every", OPT_CONVERGE},
+        {"--residual", OPT_CONVERGE}, {"--active-region", OPT_ACTIVE_REGION}, {"--first-touch", OPT_FIRST_TOUCH},
+        {"--snapshot-every", OPT_SNAPSHOT}, {"--snapshot-float32", OPT_SNAPSHOT},
+        {"--snapshot-compress", OPT_SNAPSHOT}, {"--ranks", OPT_RANKS}, {"--dt", OPT_IMPLICIT},
+        {"--damping-steps", OPT_IMPLICIT},
+    };
+    for (size_t g = 0; g < sizeof(groups) / sizeof(groups[0]); g++)
+        if (option_value(arg, groups[g].name))
+            return groups[g].group;
+    return 0;
+}
+
+// supported: the OPT_* groups the stage implements
+static inline int parse_solver_options(int argc, char *argv[], int first, const char *stage, unsigned supported,
+                                       solver_options *opts)
+{
+    memset(opts, 0, sizeof(*opts));
+    opts->damping_steps = -1;
+    for (int i = first; i < argc; i++)
+    {
+        if (option_group(argv[i]) & ~supported)
+        {
+            fprintf(stderr, "%s does not support %s\n", stage, argv[i]);
+            return -1;
+        }
+        const char *v;
+        if ((v = option_value(argv[i], "--dump-field")))
+            opts->dump_field = *v ? atoi(v) : 1;
+        else if ((v = option_value(argv[i], "--row-block")) && (opts->row_block = atoi(v)) > 0)
+            ;
+        else if ((v = option_value(argv[i], "--col-block")) && (opts->col_block = atoi(v)) > 0)
+            ;
+        else if ((v = option_value(argv[i], "--temporal-block")) && (opts->temporal_block = atoi(v)) > 0)
+            ;
+        else if ((v = option_value(argv[i], "--ranks")) && (opts->ranks = atoi(v)) > 0)
+            ;
+        else if ((v = option_value(argv[i], "--perf")))
+            opts->perf = *v ? atoi(v) : 1;
+        else if ((v = option_value(argv[i], "--tuning-cache")))
+            opts->tuning_cache = v;
+        else if ((v = option_value(argv[i], "--initial-field")))
+            opts->initial_field = *v ? v : NULL;
+        else if ((v = option_value(argv[i], "--restart")))
+            opts->restart = *v ? v : NULL;
+        else if ((v = option_value(argv[i], "--checkpoint-every")))
+            opts->checkpoint_every = atoi(v);
+        else if ((v = option_value(argv[i], "--snapshot-every")))
+            opts->snapshot_every = atoi(v);
+        else if ((v = option_value(argv[i], "--snapshot-float32")))
+            opts->snapshot_float32 = *v ? atoi(v) : 1;
+        else if ((v = option_value(argv[i], "--snapshot-compress")))
+            opts->snapshot_compress = *v ? atoi(v) : 6;
+        else if ((v = option_value(argv[i], "--converge-tol")))
+            opts->converge_tol = atof(v);
+        else if ((v = option_value(argv[i], "--converge-every")))
+            opts->converge_every = atoi(v);
+        else if ((v = option_value(argv[i], "--residual")) && (!strcmp(v, "max") || !strcmp(v, "l2")))
+            opts->residual_norm = !strcmp(v, "l2");
+        else if ((v = option_value(argv[i], "--first-touch")))
+            opts->first_touch = *v ? atoi(v) : 1;
+        else if ((v = option_value(argv[i], "--dt")) && (opts->dt = atof(v)) > 0)
+            ;
+        else if ((v = option_value(argv[i], "--active-region")))
+            opts->active_region = *v ? atoi(v) : 1;
+        else if ((v = option_value(argv[i], "--damping-steps")) && (opts->damping_steps = atoi(v)) >= 0)
+            ;
+        else
+        {
+            fprintf(stderr, "Unknown or invalid option: %s\n", argv[i]);
+            return -1;
+        }
+    }
+    return 0;
+}
+
+// Option value if it was given, the compiled-in default otherwise
+static inline int option_or(int value, int fallback)
+{
+    return value > 0 ? value : fallback;
+}
+
+#endif
@@ -0,0 +1,231 @@
+#ifndef PERF_COUNTERS_H
+#define PERF_COUNTERS_H
+
+#include <stdio.h>
+#include <stdint.h>
+#include <string.h>
+#include "metrics.h"
+
+// Opt-in (--perf) hardware/software counters per timed phase via Linux
+// perf_event_open. Counters are opened with inherit so threads started later
+// (the OpenMP team) are included. inherit does not reach threads that already
+// exist, so stages open them before their first parallel region, including
+// --first-touch allocation. Values are summed over all threads and
+// scaled when the kernel multiplexes them. Events the host does not provide
+// (containers, VMs, perf_event_paranoid, other OSes) are left out and the
+// reason is recorded. Reading counters adds a few syscalls per phase, so
+// timings of profiled runs include that overhead.
+
+typedef enum
+{
+    PERF_PHASE_STENCIL,
+    PERF_PHASE_BOUNDARY,
+    PERF_PHASE_SWAP,
+    PERF_PHASE_COUNT
+} perf_phase;
+
+typedef enum
+{
+    PERF_CYCLES,
+    PERF_INSTRUCTIONS,
+    PERF_L1D_LOADS,
+    PERF_L1D_MISSES,
+    PERF_LLC_REFERENCES,
+    PERF_LLC_MISSES,
+    PERF_STALLED_BACKEND, // memory-bound proxy, not offered by every PMU
+    PERF_TASK_CLOCK,      // software events below work without a PMU
+    PERF_CONTEXT_SWITCHES,
+    PERF_CPU_MIGRATIONS,
+    PERF_PAGE_FAULTS,
+    PERF_EVENT_COUNT
+} perf_event_id;
+
+static const char *const perf_event_names[PERF_EVENT_COUNT] = {
+    "cycles", "instructions", "l1d_loads", "l1d_misses", "llc_references", "llc_misses",
+    "stalled_cycles_backend", "task_clock_ns", "context_switches", "cpu_migrations", "page_faults"};
+
+static const char *const perf_phase_names[PERF_PHASE_COUNT] = {"stencil", "boundary", "swap"};
+
+typedef struct
+{
+    int enabled;
+    int fd[PERF_EVENT_COUNT]; // -1 when unavailable
+    double start[PERF_EVENT_COUNT];
+    double phase[PERF_PHASE_COUNT][PERF_EVENT_COUNT];
+    int phase_used[PERF_PHASE_COUNT];
+    char reason[160];
+} perf_counters;
+
+#ifdef __linux__
+#include <errno.h>
+#include <unistd.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <linux/perf_event.h>
+
+static inline void perf_event_config(perf_event_id id, uint32_t *type, uint64_t *config)
+{
+    const uint64_t l1d = PERF_COUNT_HW_CACHE_L1D | (PERF_COUNT_HW_CACHE_OP_READ << 8);
+    switch (id)
+    {
+    case PERF_CYCLES: *type = PERF_TYPE_HARDWARE; *config = PERF_COUNT_HW_CPU_CYCLES; break;
+    case PERF_INSTRUCTIONS: *type = PERF_TYPE_HARDWARE; *config = PERF_COUNT_HW_INSTRUCTIONS; break;
+    case PERF_L1D_LOADS: *type = PERF_TYPE_HW_CACHE; *config = l1d | (PERF_COUNT_HW_CACHE_RESULT_ACCESS << 16); break;
+    case PERF_L1D_MISSES: *type = PERF_TYPE_HW_CACHE; *config = l1d | (PERF_COUNT_HW_CACHE_RESULT_MISS << 16); break;
+    case PERF_LLC_REFERENCES: *type = PERF_TYPE_HARDWARE; *config = PERF_COUNT_HW_CACHE_REFERENCES; break;
+    case PERF_LLC_MISSES: *type = PERF_TYPE_HARDWARE; *config = PERF_COUNT_HW_CACHE_MISSES; break;
+    case PERF_STALLED_BACKEND: *type = PERF_TYPE_HARDWARE; *config = PERF_COUNT_HW_STALLED_CYCLES_BACKEND; break;
+    case PERF_TASK_CLOCK: *type = PERF_TYPE_SOFTWARE; *config = PERF_COUNT_SW_TASK_CLOCK; break;
+    case PERF_CONTEXT_SWITCHES: *type = PERF_TYPE_SOFTWARE; *config = PERF_COUNT_SW_CONTEXT_SWITCHES; break;
+    case PERF_CPU_MIGRATIONS: *type = PERF_TYPE_SOFTWARE; *config = PERF_COUNT_SW_CPU_MIGRATIONS; break;
+    default: *type = PERF_TYPE_SOFTWARE; *config = PERF_COUNT_SW_PAGE_FAULTS; break;
+    }
+}
+
+static inline void perf_counters_open(perf_counters *pc, int enabled)
+{
+    memset(pc, 0, sizeof(*pc));
+    for (int e = 0; e < PERF_EVENT_COUNT; e++)
+        pc->fd[e] = -1;
+    pc->enabled = enabled;
+    if (!enabled)
+        return;
+
+    int hardware = 0;
+    for (int e = 0; e < PERF_EVENT_COUNT; e++)
+    {
+        struct perf_event_attr attr;
+        memset(&attr, 0, sizeof(attr));
+        attr.size = sizeof(attr);
+        uint32_t type;
+        uint64_t config;
+        perf_event_config((perf_event_id)e, &type, &config);
+        attr.type = type;
+        attr.config = config;
+        attr.inherit = 1;
+        attr.exclude_kernel = 1;
+        attr.exclude_hv = 1;
+        attr.read_format = PERF_FORMAT_TOTAL_TIME_ENABLED | PERF_FORMAT_TOTAL_TIME_RUNNING;
+        pc->fd[e] = (int)syscall(SYS_perf_event_open, &attr, 0, -1, -1, 0);
+        if (pc->fd[e] >= 0)
+            hardware += attr.type != PERF_TYPE_SOFTWARE;
+        else if (!pc->reason[0] && attr.type != PERF_TYPE_SOFTWARE)
+            snprintf(pc->reason, sizeof(pc->reason), "hardware counters unavailable: %s", strerror(errno));
+    }
+    if (hardware > 0)
+        pc->reason[0] = '\0';
+}
+
+// Current value of one counter, scaled for multiplexing
+static inline double perf_read(int fd)
+{
+    uint64_t v[3];
+    if (fd < 0 || read(fd, v, sizeof(v)) != (ssize_t)sizeof(v))
+        return 0.0;
+    return v[2] ? (double)v[0] * ((double)v[1] / (double)v[2]) : 0.0;
+}
+
+static inline void perf_counters_close(perf_counters *pc)
+{
+    for (int e = 0; e < PERF_EVENT_COUNT; e++)
+        if (pc->fd[e] >= 0)
+            close(pc->fd[e]);
+}
+#else
+static inline void perf_counters_open(perf_counters *pc, int enabled)
+{
+    memset(pc, 0, sizeof(*pc));
+    for (int e = 0; e < PERF_EVENT_COUNT; e++)
+        pc->fd[e] = -1;
+    pc->enabled = enabled;
+    snprintf(pc->reason, sizeof(pc->reason), "perf_event_open is Linux only");
+}
+
+static inline double perf_read(int fd)
+{
+    (void)fd;
+    return 0.0;
+}
+
+static inline void perf_counters_close(perf_counters *pc)
+{
+    (void)pc;
+}
+#endif
+
+static inline void perf_phase_begin(perf_counters *pc)
+{
+    if (!pc->enabled)
+        return;
+    for (int e = 0; e < PERF_EVENT_COUNT; e++)
+        if (pc->fd[e] >= 0)
+            pc->start[e] = perf_read(pc->fd[e]);
+}
+
+static inline void perf_phase_end(perf_counters *pc, perf_phase phase)
+{
+    if (!pc->enabled)
+        return;
+    for (int e = 0; e < PERF_EVENT_COUNT; e++)
+        if (pc->fd[e] >= 0)
+            pc->phase[phase][e] += perf_read(pc->fd[e]) - pc->start[e];
+    pc->phase_used[phase] = 1;
+}
+
+static inline int perf_json_counts(char *buf, size_t len, const perf_counters *pc, const double *values)
+{
+    int n = snprintf(buf, len, "{");
+    int first = 1;
+    for (int e = 0; e < PERF_EVENT_COUNT && n < (int)len; e++)
+    {
+        if (pc->fd[e] < 0)
+            continue;
+        n += snprintf(buf + n, len - n, "%s\"%s\": %.0f", first ? "" : ", ", perf_event_names[e], values[e]);
+        first = 0;
+    }
+    if (n < (int)len && pc->fd[PERF_CYCLES] >= 0 && pc->fd[PERF_INSTRUCTIONS] >= 0 && values[PERF_CYCLES] > 0)
+        n += snprintf(buf + n, len - n, ", \"ipc\": %.4f", values[PERF_INSTRUCTIONS] / values[PERF_CYCLES]);
+    if (n < (int)len)
+        n += snprintf(buf + n, len - n, "}");
+    return n;
+}
+
+// "perf" block of metrics.json: per-phase counts, their total and availability
+static inline void perf_counters_report(const perf_counters *pc, metrics_extra *m)
+{
+    if (!pc->enabled)
+        return;
+
+    char buf[METRICS_VALUE_LEN];
+    int n = 0;
+    size_t len = sizeof(buf);
+    int any = 0;
+    for (int e = 0; e < PERF_EVENT_COUNT; e++)
+        any |= pc->fd[e] >= 0;
+
+    n += snprintf(buf + n, len - n, "{\n    \"available\": %s,\n    \"hardware\": %s,\n    \"reason\": \"%s\"",
+                  any ? "true" : "false", pc->reason[0] ? "false" : "true",
+                  pc->reason[0] ? pc->reason : "");
+    if (any)
+    {
+        double total[PERF_EVENT_COUNT] = {0};
+        n += snprintf(buf + n, len - n, ",\n    \"phases\": {");
+        int first = 1;
+        for (int p = 0; p < PERF_PHASE_COUNT; p++)
+        {
+            if (!pc->phase_used[p])
+                continue;
+            for (int e = 0; e < PERF_EVENT_COUNT; e++)
+                total[e] += pc->phase[p][e];
+            n += snprintf(buf + n, len - n, "%s\n      \"%s\": ", first ? "" : ",", perf_phase_names[p]);
+            n += perf_json_counts(buf + n, len - n, pc, pc->phase[p]);
+            first = 0;
+        }
+        n += snprintf(buf + n, len - n, "\n    },\n    \"total\": ");
+        n += perf_json_counts(buf + n, len - n, pc, total);
+    }
+    snprintf(buf + n, len - n, "\n  }");
+    metrics_add_raw(m, "perf", buf);
+}
+
+#endif
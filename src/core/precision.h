@@ -0,0 +1,26 @@
+#ifndef PRECISION_H
+#define PRECISION_H
+
+// Field precision of stages 05-09, chosen at build time (PRECISION in config.mk):
+//   default            - double storage, double arithmetic ("float64")
+//   HEATKERNEL_FLOAT32 - float storage, float arithmetic ("float32")
+//   HEATKERNEL_MIXED   - float storage, each update computed in double ("mixed")
+// `real` is the type of the grids, `real_acc` the type the stencil is evaluated
+// in. Start fields, checkpoints and field.npy dumps stay float64 on disk.
+
+#if defined(HEATKERNEL_FLOAT32)
+typedef float real;
+typedef float real_acc;
+#define PRECISION_NAME "float32"
+#elif defined(HEATKERNEL_MIXED)
+typedef float real;
+typedef double real_acc;
+#define PRECISION_NAME "mixed"
+#else
+typedef double real;
+typedef double real_acc;
+#define PRECISION_NAME "float64"
+#define HEATKERNEL_REAL_IS_DOUBLE
+#endif
+
+#endif
@@ -0,0 +1,63 @@
+#ifndef ROOFLINE_H
+#define ROOFLINE_H
+
+#include <stdio.h>
+#include "metrics.h"
+#include "precision.h"
+
+// Roofline inputs of the 5-point stencil per interior cell update:
+//   7 flops  - 3 adds for the neighbours, 4*center, the subtraction, the
+//              scaling by alpha*dt/dx^2 and the add to center
+//   16 bytes - one 8-byte read and one 8-byte write of main memory, assuming
+//              neighbours are reused from cache; temporal blocking of depth k
+//              divides this by k
+// These are algorithmic minimums: redundant halo work of overlapped tiles and
+// write-allocate traffic are not counted.
+// The 7-point 3D stencil adds two neighbours: 9 flops, same 16 bytes.
+// float32 and mixed grids (precision.h) move half of it, 2 * sizeof(real).
+#define STENCIL_FLOPS_PER_CELL 7.0
+#define STENCIL_3D_FLOPS_PER_CELL 9.0
+#define STENCIL_BYTES_PER_CELL 16.0
+
+// Any per-cell model, e.g. the implicit stage's (see adi.h)
+static inline void roofline_report_model(metrics_extra *m, int dims, int size, int timesteps, double seconds,
+                                         double flops_per_cell, double bytes_per_cell)
+{
+    double cells = 1.0;
+    for (int d = 0; d < dims; d++)
+        cells *= size - 2;
+    double flops = flops_per_cell * cells;
+    double bytes = bytes_per_cell * cells;
+    double rate = seconds > 0 ? timesteps / seconds : 0.0;
+    char buf[512];
+    snprintf(buf, sizeof(buf),
+             "{\n    \"flops_per_step\": %.17g,\n    \"bytes_per_step\": %.17g,\n    \"arithmetic_intensity\": %.17g,\n"
+             "    \"gflops\": %.17g,\n    \"gbytes_per_s\": %.17g\n  }",
+             flops, bytes, flops / bytes, flops * rate * 1e-9, bytes * rate * 1e-9);
+    metrics_add_raw(m, "roofline", buf);
+}
+
+static inline void roofline_report_bytes(metrics_extra *m, int dims, int size, int timesteps, double seconds,
+                                         int temporal_block, double bytes_per_cell)
+{
+    roofline_report_model(m, dims, size, timesteps, seconds, dims == 3 ? STENCIL_3D_FLOPS_PER_CELL : STENCIL_FLOPS_PER_CELL,
+                          bytes_per_cell / (temporal_block > 0 ? temporal_block : 1));
+}
+
+static inline void roofline_report_dims(metrics_extra *m, int dims, int size, int timesteps, double seconds, int temporal_block)
+{
+    roofline_report_bytes(m, dims, size, timesteps, seconds, temporal_block, STENCIL_BYTES_PER_CELL);
+}
+
+// 2D grid of the build's precision
+static inline void roofline_report_real(metrics_extra *m, int size, int timesteps, double seconds, int temporal_block)
+{
+    roofline_report_bytes(m, 2, size, timesteps, seconds, temporal_block, 2.0 * sizeof(real));
+}
+
+static inline void roofline_report(metrics_extra *m, int size, int timesteps, double seconds, int temporal_block)
+{
+    roofline_report_dims(m, 2, size, timesteps, seconds, temporal_block);
+}
+
+#endif
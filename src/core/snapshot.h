@@ -0,0 +1,298 @@
+#ifndef SNAPSHOT_H
+#define SNAPSHOT_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include <pthread.h>
+#include <sys/stat.h>
+#include "field_io.h"
+#include "metrics.h"
+#include "options.h"
+#include "precision.h"
+#include "timing.h"
+#ifdef HEATKERNEL_ZLIB
+#include <zlib.h>
+#endif
+
+// Field snapshots every N steps, written by a background thread.
+//
+// The solver copies the field into one of SNAPSHOT_SLOTS buffers (downcast
+// to float32 on request) and hands it to the writer thread. It only blocks
+// when every slot is still waiting to be written. Files go to
+// output_dir/snapshots/: snapshot_<step>.npy, or with compression
+// snapshot_<step>.npyz, which is an .npy header followed by a uint32 chunk
+// count, one uint64 compressed size per chunk and the zlib-compressed chunks
+// of SNAPSHOT_CHUNK_ROWS rows each. Every finished file is appended to
+// index.jsonl and a final {"done": true} line closes the run, so readers can
+// follow a run in progress (see heatkernel.snapshots).
+//
+// Compression needs zlib (built with -DHEATKERNEL_ZLIB -lz); without it
+// snapshots are written uncompressed.
+
+#define SNAPSHOT_SLOTS 2
+#define SNAPSHOT_CHUNK_ROWS 64
+
+typedef struct
+{
+    void *data;
+    int step;
+    int full;
+} snapshot_slot;
+
+typedef struct
+{
+    int every;          // steps between snapshots, 0 disables them
+    int float32;        // downcast to float32 when copying
+    int level;          // zlib level, 0 writes plain .npy
+    int size, dims;
+    size_t cells, elem;
+    char dir[1024];
+    FILE *index;
+
+    snapshot_slot slot[SNAPSHOT_SLOTS];
+    int head, tail, stop;
+    pthread_t thread;
+    pthread_mutex_t lock;
+    pthread_cond_t filled, drained;
+
+    int count;             // snapshots written
+    double blocked_time;   // solver time waiting for a free slot
+    double copy_time;      // solver time copying into a slot
+    double write_time;     // writer thread time, overlapped with the solver
+    uint64_t raw_bytes, written_bytes;
+} snapshot_writer;
+
+static inline int snapshot_write_npyz(snapshot_writer *w, FILE *f, const unsigned char *data, size_t bytes)
+{
+#ifdef HEATKERNEL_ZLIB
+    size_t chunk = (size_t)SNAPSHOT_CHUNK_ROWS * w->size * w->elem;
+    uint32_t chunks = (uint32_t)((bytes + chunk - 1) / chunk);
+    uint64_t *sizes = (uint64_t *)calloc(chunks, sizeof(uint64_t));
+    uLongf bound = compressBound((uLong)chunk);
+    unsigned char *out = (unsigned char *)malloc(bound);
+    long table = 0;
+    int rc = sizes && out ? 0 : -1;
+
+    if (rc == 0 && fwrite(&chunks, sizeof(chunks), 1, f) == 1)
+    {
+        table = ftell(f);
+        rc = fwrite(sizes, sizeof(uint64_t), chunks, f) == chunks ? 0 : -1;
+    }
+    for (uint32_t c = 0; rc == 0 && c < chunks; c++)
+    {
+        size_t n = bytes - c * chunk < chunk ? bytes - c * chunk : chunk;
+        uLongf len = bound;
+        if (compress2(out, &len, data + c * chunk, (uLong)n, w->level) != Z_OK || fwrite(out, 1, len, f) != len)
+            rc = -1;
+        sizes[c] = len;
+    }
+    if (rc == 0 && (fseek(f, table, SEEK_SET) != 0 || fwrite(sizes, sizeof(uint64_t), chunks, f) != chunks))
+        rc = -1;
+    free(sizes);
+    free(out);
+    return rc;
+#else
+    (void)w;
+    (void)f;
+    (void)data;
+    (void)bytes;
+    return -1;
+#endif
+}
+
+// Writer thread side: one slot to a file, then its index line
+static inline void snapshot_write_slot(snapshot_writer *w, const snapshot_slot *s)
+{
+    char name[64], path[1200], tmp[1210], header[256];
+    snprintf(name, sizeof(name), "snapshot_%08d.%s", s->step, w->level ? "npyz" : "npy");
+    snprintf(path, sizeof(path), "%s/%s", w->dir, name);
+    snprintf(tmp, sizeof(tmp), "%s.tmp", path);
+    size_t bytes = w->cells * w->elem;
+    int n = npy_format_header_dtype(header, sizeof(header), w->size, w->dims, w->float32 ? "<f4" : "<f8");
+
+    FILE *f = fopen(tmp, "wb");
+    int rc = f && n > 0 && fwrite(header, 1, (size_t)n, f) == (size_t)n ? 0 : -1;
+    if (rc == 0)
+        rc = w->level ? snapshot_write_npyz(w, f, (const unsigned char *)s->data, bytes)
+                      : (fwrite(s->data, 1, bytes, f) == bytes ? 0 : -1);
+    long written = f ? ftell(f) : 0;
+    if (f)
+        fclose(f);
+    if (rc != 0 || rename(tmp, path) != 0)
+    {
+        fprintf(stderr, "Failed to write snapshot %s\n", path);
+        return;
+    }
+
+    fprintf(w->index, "{\"step\": %d, \"file\": \"%s\", \"dtype\": \"%s\", \"compressed\": %s, \"bytes\": %ld}\n",
+            s->step, name, w->float32 ? "float32" : "float64", w->level ? "true" : "false", written);
+    fflush(w->index);
+    w->count++;
+    w->raw_bytes += bytes;
+    w->written_bytes += (uint64_t)written;
+}
+
+static inline void *snapshot_writer_main(void *arg)
+{
+    snapshot_writer *w = (snapshot_writer *)arg;
+    for (;;)
+    {
+        pthread_mutex_lock(&w->lock);
+        while (!w->slot[w->tail].full && !w->stop)
+            pthread_cond_wait(&w->filled, &w->lock);
+        snapshot_slot *s = &w->slot[w->tail];
+        int full = s->full;
+        pthread_mutex_unlock(&w->lock);
+        if (!full)
+            return NULL; // stopped and drained
+
+        struct timespec t0, t1;
+        get_time(&t0);
+        snapshot_write_slot(w, s);
+        get_time(&t1);
+
+        pthread_mutex_lock(&w->lock);
+        w->write_time += time_diff(&t0, &t1);
+        s->full = 0;
+        w->tail = (w->tail + 1) % SNAPSHOT_SLOTS;
+        pthread_cond_signal(&w->drained);
+        pthread_mutex_unlock(&w->lock);
+    }
+}
+
+// Start the writer thread if --snapshot-every asks for snapshots
+static inline int snapshot_writer_open(snapshot_writer *w, const solver_options *opts, const char *output_dir,
+                                       int size, int dims)
+{
+    memset(w, 0, sizeof(*w));
+    if (opts->snapshot_every <= 0)
+        return 0;
+    w->every = opts->snapshot_every;
+    w->float32 = opts->snapshot_float32;
+    w->level = opts->snapshot_compress;
+#ifndef HEATKERNEL_ZLIB
+    if (w->level)
+    {
+        fprintf(stderr, "Built without zlib, snapshots are written uncompressed\n");
+        w->level = 0;
+    }
+#endif
+    w->size = size;
+    w->dims = dims;
+    w->cells = field_cells(size, dims);
+    w->elem = w->float32 ? sizeof(float) : sizeof(double);
+
+    snprintf(w->dir, sizeof(w->dir), "%s/snapshots", output_dir);
+    mkdir(w->dir, 0755);
+    char path[1100];
+    snprintf(path, sizeof(path), "%s/index.jsonl", w->dir);
+    w->index = fopen(path, "w");
+    for (int i = 0; i < SNAPSHOT_SLOTS; i++)
+        w->slot[i].data = malloc(w->cells * w->elem);
+    if (!w->index || !w->slot[SNAPSHOT_SLOTS - 1].data || !w->slot[0].data)
+    {
+        fprintf(stderr, "Cannot set up snapshots in %s\n", w->dir);
+        return -1;
+    }
+    pthread_mutex_init(&w->lock, NULL);
+    pthread_cond_init(&w->filled, NULL);
+    pthread_cond_init(&w->drained, NULL);
+    return pthread_create(&w->thread, NULL, snapshot_writer_main, w) == 0 ? 0 : -1;
+}
+
+// Whether a multiple of `every` lies in (prev_step, step]
+static inline int snapshot_due(const snapshot_writer *w, int prev_step, int step)
+{
+    return w->every > 0 && step / w->every > prev_step / w->every;
+}
+
+// Shorten a pass of k steps from `step` so it ends on the next snapshot
+// step; temporally blocked loops only have the field at pass boundaries
+static inline int snapshot_clip(const snapshot_writer *w, int step, int k)
+{
+    if (w->every <= 0)
+        return k;
+    int left = w->every - step % w->every;
+    return k < left ? k : left;
+}
+
+// Queue a copy of a contiguous field (of the build's precision, see
+// precision.h); blocks only while all slots are taken
+static inline void snapshot_submit(snapshot_writer *w, const real *T, int step)
+{
+    struct timespec t0, t1, t2;
+    get_time(&t0);
+    pthread_mutex_lock(&w->lock);
+    while (w->slot[w->head].full)
+        pthread_cond_wait(&w->drained, &w->lock);
+    snapshot_slot *s = &w->slot[w->head];
+    pthread_mutex_unlock(&w->lock);
+    get_time(&t1);
+
+    long cells = (long)w->cells;
+    if (w->float32)
+    {
+        float *out = (float *)s->data;
+#pragma omp parallel for schedule(static)
+        for (long c = 0; c < cells; c++)
+            out[c] = (float)T[c];
+    }
+    else
+    {
+        double *out = (double *)s->data;
+#pragma omp parallel for schedule(static)
+        for (long c = 0; c < cells; c++)
+            out[c] = T[c];
+    }
+    get_time(&t2);
+
+    pthread_mutex_lock(&w->lock);
+    s->step = step;
+    s->full = 1;
+    w->head = (w->head + 1) % SNAPSHOT_SLOTS;
+    pthread_cond_signal(&w->filled);
+    pthread_mutex_unlock(&w->lock);
+    w->blocked_time += time_diff(&t0, &t1);
+    w->copy_time += time_diff(&t1, &t2);
+}
+
+// Drain the queue, stop the writer and close the index
+static inline void snapshot_writer_close(snapshot_writer *w)
+{
+    if (w->every <= 0)
+        return;
+    pthread_mutex_lock(&w->lock);
+    w->stop = 1;
+    pthread_cond_signal(&w->filled);
+    pthread_mutex_unlock(&w->lock);
+    pthread_join(w->thread, NULL);
+    fprintf(w->index, "{\"done\": true}\n");
+    fclose(w->index);
+    for (int i = 0; i < SNAPSHOT_SLOTS; i++)
+        free(w->slot[i].data);
+    pthread_mutex_destroy(&w->lock);
+    pthread_cond_destroy(&w->filled);
+    pthread_cond_destroy(&w->drained);
+}
+
+// "snapshots" block and the solver-side snapshot_copy_time/snapshot_blocked_time buckets
+static inline void snapshot_report(const snapshot_writer *w, metrics_extra *m)
+{
+    if (w->every <= 0)
+        return;
+    char buf[512];
+    snprintf(buf, sizeof(buf),
+             "{\n    \"every\": %d,\n    \"count\": %d,\n    \"dtype\": \"%s\",\n    \"compression\": %d,\n"
+             "    \"slots\": %d,\n    \"blocked_time\": %.6f,\n    \"copy_time\": %.6f,\n    \"write_time\": %.6f,\n"
+             "    \"raw_bytes\": %llu,\n    \"written_bytes\": %llu\n  }",
+             w->every, w->count, w->float32 ? "float32" : "float64", w->level, SNAPSHOT_SLOTS,
+             w->blocked_time, w->copy_time, w->write_time,
+             (unsigned long long)w->raw_bytes, (unsigned long long)w->written_bytes);
+    metrics_add_raw(m, "snapshots", buf);
+    metrics_add_breakdown(m, "snapshot_copy_time", w->copy_time);
+    metrics_add_breakdown(m, "snapshot_blocked_time", w->blocked_time);
+}
+
+#endif
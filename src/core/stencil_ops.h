@@ -1,6 +1,8 @@
 #ifndef STENCIL_OPS_H
 #define STENCIL_OPS_H
 
+#include "precision.h"
+
 static inline double heat_stencil(double center, double left, double right,
                                   double top, double bottom,
                                   double alpha, double dt, double dx)
@@ -8,4 +10,20 @@ static inline double heat_stencil(double center, double left, double right,
     return center + alpha * dt / (dx * dx) * (left + right + top + bottom - 4.0 * center);
 }
 
+// heat_stencil in the build's arithmetic precision; identical to it for float64
+static inline real_acc heat_stencil_real(real_acc center, real_acc left, real_acc right,
+                                         real_acc top, real_acc bottom,
+                                         real_acc alpha, real_acc dt, real_acc dx)
+{
+    return center + alpha * dt / (dx * dx) * (left + right + top + bottom - (real_acc)4.0 * center);
+}
+
+// 7-point counterpart: neighbours along i, j and k
+static inline double heat_stencil_3d(double center, double i_next, double i_prev,
+                                     double j_next, double j_prev, double k_next, double k_prev,
+                                     double alpha, double dt, double dx)
+{
+    return center + alpha * dt / (dx * dx) * (i_next + i_prev + j_next + j_prev + k_next + k_prev - 6.0 * center);
+}
+
 #endif
\ No newline at end of file
@@ -0,0 +1,143 @@
+#ifndef TEMPORAL_BLOCKING_H
+#define TEMPORAL_BLOCKING_H
+
+#include <string.h>
+#include "stencil_ops.h"
+
+// Overlapped (trapezoidal) temporal blocking.
+//
+// The interior is split into row_block x col_block tiles as in the spatially
+// blocked stages; tiles on the domain edge also own the adjacent boundary
+// cells (see trapezoid_tile_bounds). For each tile the region grown by k halo
+// cells is copied into a private pair of scratch buffers and advanced k
+// genuine time steps there; the valid region
+// shrinks by one cell per step, so after k steps the tile core is exact and is
+// written to T_out. Neumann copies are applied inside the tile wherever it
+// touches the domain edge, in the same order as neumann_boundaries_contig, so
+// the result matches stepping the whole grid k times.
+// Tiles hold `real` values, double unless built for float32 or mixed (precision.h).
+
+// Values needed per scratch buffer (two are needed per tile/thread).
+// Edge tiles carry up to two extra boundary cells per dimension.
+static inline size_t trapezoid_scratch_size(int row_block, int col_block, int k)
+{
+    return (size_t)(row_block + 2 + 2 * k) * (size_t)(col_block + 2 + 2 * k);
+}
+
+static inline int tb_min(int a, int b) { return a < b ? a : b; }
+static inline int tb_max(int a, int b) { return a > b ? a : b; }
+
+// Core rows (or columns) [*lo, *hi) of the tile whose interior starts at `start`.
+// A boundary cell is always owned together with the interior cell it copies.
+static inline void trapezoid_tile_bounds(int start, int block, int size, int *lo, int *hi)
+{
+    int end = tb_min(start + block, size - 1);
+    *lo = start == 1 ? 0 : start;
+    *hi = end == size - 1 ? size : end;
+}
+
+// Advance tile [i0,i1) x [j0,j1) of T by k steps and store it in T_out.
+// With res_max/res_sq, also reduce the last step's update over the tile's
+// interior cells into them (see convergence.h).
+static inline void trapezoid_tile_pass(const real *restrict T, real *restrict T_out, int size,
+                                       int i0, int i1, int j0, int j1, int k,
+                                       double alpha, double dt, double dx,
+                                       real *restrict buf_a, real *restrict buf_b,
+                                       double *res_max, double *res_sq)
+{
+    real_acc a = (real_acc)alpha, h = (real_acc)dt, d = (real_acc)dx;
+
+    // Halo region in global coordinates
+    int a_i = tb_max(0, i0 - k), b_i = tb_min(size, i1 + k);
+    int a_j = tb_max(0, j0 - k), b_j = tb_min(size, j1 + k);
+    int w = b_j - a_j;
+
+    for (int i = a_i; i < b_i; i++)
+        memcpy(&buf_a[(i - a_i) * w], &T[i * size + a_j], (size_t)w * sizeof(real));
+
+    real *restrict cur = buf_a;
+    real *restrict nxt = buf_b;
+
+    for (int t = 1; t <= k; t++)
+    {
+        // Region still exact after t steps; it only shrinks on sides facing other tiles
+        int ra = a_i > 0 ? a_i + t : 0;
+        int rb = b_i < size ? b_i - t : size;
+        int ca = a_j > 0 ? a_j + t : 0;
+        int cb = b_j < size ? b_j - t : size;
+
+        int r_lo = tb_max(ra, 1), r_hi = tb_min(rb, size - 1);
+        int c_lo = tb_max(ca, 1), c_hi = tb_min(cb, size - 1);
+
+        for (int i = r_lo; i < r_hi; i++)
+        {
+            int base = (i - a_i) * w - a_j; // global column j lives at base + j
+#pragma omp simd
+            for (int j = c_lo; j < c_hi; j++)
+            {
+                nxt[base + j] = heat_stencil_real(cur[base + j], cur[base + w + j], cur[base - w + j], cur[base + j + 1], cur[base + j - 1], a, h, d);
+            }
+        }
+
+        // Neumann boundaries: left/right first, then top/bottom including corners
+        if (ca == 0)
+            for (int i = r_lo; i < r_hi; i++)
+                nxt[(i - a_i) * w] = nxt[(i - a_i) * w + 1];
+        if (cb == size)
+            for (int i = r_lo; i < r_hi; i++)
+                nxt[(i - a_i) * w + size - 1 - a_j] = nxt[(i - a_i) * w + size - 2 - a_j];
+        if (ra == 0)
+            memcpy(&nxt[ca - a_j], &nxt[w + ca - a_j], (size_t)(cb - ca) * sizeof(real));
+        if (rb == size)
+            memcpy(&nxt[(size - 1 - a_i) * w + ca - a_j], &nxt[(size - 2 - a_i) * w + ca - a_j],
+                   (size_t)(cb - ca) * sizeof(real));
+
+        real *tmp = cur;
+        cur = nxt;
+        nxt = tmp;
+    }
+
+    for (int i = i0; i < i1; i++)
+        memcpy(&T_out[i * size + j0], &cur[(i - a_i) * w + j0 - a_j], (size_t)(j1 - j0) * sizeof(real));
+
+    if (res_max)
+    {
+        // nxt still holds step k - 1 on the core, so the reduction stays in the tile buffers
+        double m = *res_max, sq = *res_sq;
+        int c_lo = tb_max(j0, 1), c_hi = tb_min(j1, size - 1);
+        for (int i = tb_max(i0, 1); i < tb_min(i1, size - 1); i++)
+        {
+            int base = (i - a_i) * w - a_j;
+#pragma omp simd reduction(max : m) reduction(+ : sq)
+            for (int j = c_lo; j < c_hi; j++)
+            {
+                double d = (double)cur[base + j] - (double)nxt[base + j];
+                d = d < 0 ? -d : d;
+                m = d > m ? d : m;
+                sq += d * d;
+            }
+        }
+        *res_max = m;
+        *res_sq = sq;
+    }
+}
+
+static inline void trapezoid_tile(const real *restrict T, real *restrict T_out, int size,
+                                  int i0, int i1, int j0, int j1, int k,
+                                  double alpha, double dt, double dx,
+                                  real *restrict buf_a, real *restrict buf_b)
+{
+    trapezoid_tile_pass(T, T_out, size, i0, i1, j0, j1, k, alpha, dt, dx, buf_a, buf_b, NULL, NULL);
+}
+
+// trapezoid_tile plus the fused residual of its last step
+static inline void trapezoid_tile_residual(const real *restrict T, real *restrict T_out, int size,
+                                           int i0, int i1, int j0, int j1, int k,
+                                           double alpha, double dt, double dx,
+                                           real *restrict buf_a, real *restrict buf_b,
+                                           double *res_max, double *res_sq)
+{
+    trapezoid_tile_pass(T, T_out, size, i0, i1, j0, j1, k, alpha, dt, dx, buf_a, buf_b, res_max, res_sq);
+}
+
+#endif
@@ -0,0 +1,85 @@
+#ifndef TUNING_H
+#define TUNING_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include "options.h"
+
+// Tile shapes found by src/utils/autotune.py. The cache file holds one line per
+// (host, stage, grid size, threads):
+//   host stage grid threads row_block col_block temporal_block performance
+// Its path comes from --tuning-cache=PATH or $HEATKERNEL_TUNING_CACHE.
+#define TUNING_CACHE_ENV "HEATKERNEL_TUNING_CACHE"
+
+typedef struct
+{
+    int row_block;
+    int col_block;
+    int temporal_block;
+} tile_shape;
+
+static inline const char *tuning_cache_path(const solver_options *opts)
+{
+    if (opts->tuning_cache)
+        return *opts->tuning_cache ? opts->tuning_cache : NULL; // --tuning-cache= disables
+    return getenv(TUNING_CACHE_ENV);
+}
+
+// Entry for this host, stage and grid size with the closest thread count
+// (later lines win ties). Returns 1 when one was found.
+static inline int tuning_lookup(const char *path, const char *stage, int size, int threads, tile_shape *tile)
+{
+    if (!path)
+        return 0;
+    FILE *f = fopen(path, "r");
+    if (!f)
+        return 0;
+
+    char host[256] = "";
+    gethostname(host, sizeof(host) - 1);
+
+    char line[512];
+    int best = -1;
+    while (fgets(line, sizeof(line), f))
+    {
+        char h[256], s[128];
+        int g, t, rb, cb, k;
+        if (line[0] == '#' || sscanf(line, "%255s %127s %d %d %d %d %d", h, s, &g, &t, &rb, &cb, &k) != 7)
+            continue;
+        if (strcmp(h, host) != 0 || strcmp(s, stage) != 0 || g != size || rb <= 0 || cb <= 0 || k <= 0)
+            continue;
+        int distance = abs(t - threads);
+        if (best < 0 || distance <= best)
+        {
+            best = distance;
+            tile->row_block = rb;
+            tile->col_block = cb;
+            tile->temporal_block = k;
+        }
+    }
+    fclose(f);
+    return best >= 0;
+}
+
+// Tile shape for a run: command line options, then the tuning cache, then the
+// compiled-in defaults. Returns "option", "tuned" or "default".
+static inline const char *tile_select(const solver_options *opts, const char *stage, int size, int threads,
+                                      tile_shape defaults, tile_shape *tile)
+{
+    const char *source = "default";
+    *tile = defaults;
+    if (tuning_lookup(tuning_cache_path(opts), stage, size, threads, tile))
+        source = "tuned";
+    if (opts->row_block || opts->col_block || opts->temporal_block)
+    {
+        tile->row_block = option_or(opts->row_block, tile->row_block);
+        tile->col_block = option_or(opts->col_block, tile->col_block);
+        tile->temporal_block = option_or(opts->temporal_block, tile->temporal_block);
+        source = "option";
+    }
+    return source;
+}
+
+#endif
@@ -0,0 +1,28 @@
+"""heatKernel: 2D heat equation stencil solvers.
+
+Importing the package only loads NumPy; plotting and CLI code live in
+src/visualization and the stage scripts.
+
+    >>> import heatkernel
+    >>> result = heatkernel.solve(200, 1000, backend='numpy-inplace')
+    >>> result.field, result.timings
+
+Many small independent grids can be solved as one stack with
+`solve_batch` (see heatkernel.batch).
+"""
+
+from .backends import available_backends, get_backend, register_backend
+from .batch import BatchResult, solve_batch
+from .solver import DEFAULT_BACKEND, SolveResult, Solver, solve
+
+__all__ = [
+    'BatchResult',
+    'DEFAULT_BACKEND',
+    'SolveResult',
+    'Solver',
+    'available_backends',
+    'get_backend',
+    'register_backend',
+    'solve',
+    'solve_batch',
+]
@@ -0,0 +1,200 @@
+"""Model-guided autotuning of the trapezoid tile shape (stages 06-09).
+
+The search starts from the tile shapes a simple cache model ranks highest for
+the detected L1/L2 sizes, measures them with the real stage binary, then
+hill-climbs from the best measured shape (halving/doubling each dimension)
+until no neighbour improves or the measurement budget is spent. The winner is
+stored per (host, stage, grid, threads) in a text cache that the stages read
+through src/core/tuning.h.
+"""
+
+import glob
+import math
+import os
+import socket
+import subprocess
+
+from .benchmark import benchmark_point
+from .paths import TUNING_CACHE
+
+DEFAULT_TILE = (32, 64, 4)
+ROW_BLOCKS = (4, 8, 16, 32, 64, 128, 256, 512)
+COL_BLOCKS = (8, 16, 32, 64, 128, 256, 512, 1024)
+TEMPORAL_BLOCKS = (1, 2, 3, 4, 6, 8, 12, 16)
+TUNE_STEP_MULTIPLE = 48  # every temporal block divides it, so no short final pass
+
+
+def _parse_size(text):
+    text = text.strip().upper()
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def cache_sizes():
+    """Per-core L1 data and L2 cache sizes in bytes as {'l1': .., 'l2': ..}"""
+    sizes = {}
+    for index in sorted(glob.glob('/sys/devices/system/cpu/cpu0/cache/index*')):
+        try:
+            with open(os.path.join(index, 'level')) as f:
+                level = int(f.read())
+            with open(os.path.join(index, 'type')) as f:
+                kind = f.read().strip()
+            with open(os.path.join(index, 'size')) as f:
+                size = _parse_size(f.read())
+        except (OSError, ValueError):
+            continue
+        if kind in ('Data', 'Unified') and level in (1, 2):
+            sizes[f'l{level}'] = size
+
+    if not sizes:
+        # macOS: performance-core values where available
+        for key, names in (('l1', ('hw.perflevel0.l1dcachesize', 'hw.l1dcachesize')),
+                           ('l2', ('hw.perflevel0.l2cachesize', 'hw.l2cachesize'))):
+            for name in names:
+                try:
+                    out = subprocess.run(['sysctl', '-n', name], capture_output=True, text=True, check=True)
+                    sizes[key] = int(out.stdout)
+                    break
+                except (OSError, ValueError, subprocess.CalledProcessError):
+                    continue
+
+    sizes.setdefault('l1', 32 << 10)
+    sizes.setdefault('l2', 1 << 20)
+    return sizes
+
+
+def scratch_bytes(rb, cb, k):
+    """Working set of one tile: two halo-extended buffers (see temporal_blocking.h)"""
+    return 2 * (rb + 2 + 2 * k) * (cb + 2 + 2 * k) * 8
+
+
+def model_cost(tile, size, threads, caches):
+    """Relative cost per cell update predicted for a tile shape (lower is better).
+
+    Combines the redundant halo work of overlapped tiling, a compute cost that
+    grows once the tile leaves L1/L2, main memory traffic amortised over k
+    steps (only while the tile stays cache resident) and thread imbalance.
+    """
+    rb, cb, k = tile
+    interior = size - 2
+    rb, cb = min(rb, interior), min(cb, interior)
+
+    redundant = sum((rb + 2 * (k - s)) * (cb + 2 * (k - s)) for s in range(1, k + 1)) / (k * rb * cb)
+    ws = scratch_bytes(rb, cb, k)
+    if ws <= caches['l1']:
+        compute, reuse = 1.0, k
+    elif ws <= caches['l2']:
+        compute, reuse = 1.2, k
+    else:
+        compute, reuse = 2.0, 1
+    traffic = 16 * (rb + 2 * k) * (cb + 2 * k) / (rb * cb) / reuse
+
+    tiles = math.ceil(interior / rb) * math.ceil(interior / cb)
+    imbalance = math.ceil(tiles / threads) * threads / tiles
+    short_rows = 1.0 + 4.0 / cb  # per-row loop overhead and SIMD remainder
+    return (redundant * compute * short_rows + 0.25 * traffic) * imbalance
+
+
+def candidates(size):
+    """Tile shapes worth considering for a grid (clipped to the interior)"""
+    interior = size - 2
+    shapes = set()
+    for rb in ROW_BLOCKS:
+        for cb in COL_BLOCKS:
+            for k in TEMPORAL_BLOCKS:
+                shapes.add((min(rb, interior), min(cb, interior), k))
+    return sorted(shapes)
+
+
+def neighbours(tile, size):
+    rb, cb, k = tile
+    interior = size - 2
+    ks = TEMPORAL_BLOCKS
+    i = ks.index(k) if k in ks else 0
+    options = [(rb * 2, cb, k), (rb // 2, cb, k), (rb, cb * 2, k), (rb, cb // 2, k)]
+    if i + 1 < len(ks):
+        options.append((rb, cb, ks[i + 1]))
+    if i > 0:
+        options.append((rb, cb, ks[i - 1]))
+    return [(min(r, interior), min(c, interior), t) for r, c, t in options if r >= 2 and c >= 2]
+
+
+def tuning_steps(size, steps=None):
+    """Short but measurable run length, rounded to TUNE_STEP_MULTIPLE"""
+    if steps is None:
+        steps = max(1, int(4e7 / (size * size)))
+    return max(TUNE_STEP_MULTIPLE, math.ceil(steps / TUNE_STEP_MULTIPLE) * TUNE_STEP_MULTIPLE)
+
+
+def autotune(stage, size, threads=1, steps=None, alpha=0.2, dx=0.01, seeds=6, budget=24,
+             repetitions=3, caches=None, log=print):
+    """Search the tile space of `stage` for one grid size and thread count.
+
+    Returns {'tile': (rb, cb, k), 'performance': .., 'measured': {tile: perf}}.
+    """
+    caches = caches or cache_sizes()
+    steps = tuning_steps(size, steps)
+    ranked = sorted(candidates(size), key=lambda t: model_cost(t, size, threads, caches))
+    log(f"{stage} grid={size} threads={threads}: L1={caches['l1'] >> 10}K L2={caches['l2'] >> 10}K, "
+        f"{len(ranked)} candidates, model picks {ranked[:seeds]}")
+
+    measured = {}
+
+    def measure(tile):
+        if tile in measured or len(measured) >= budget:
+            return measured.get(tile, 0.0)
+        rb, cb, k = tile
+        metrics = benchmark_point(stage, size, steps, alpha, dx, threads=threads, warmup=1,
+                                  repetitions=repetitions,
+                                  args=[f'--row-block={rb}', f'--col-block={cb}', f'--temporal-block={k}'])
+        measured[tile] = metrics['performance']
+        log(f"  {rb}x{cb}x{k}: {metrics['performance']:,.0f} steps/s")
+        return measured[tile]
+
+    default = (min(DEFAULT_TILE[0], size - 2), min(DEFAULT_TILE[1], size - 2), DEFAULT_TILE[2])
+    for tile in ranked[:seeds] + [default]:
+        measure(tile)
+
+    best = max(measured, key=measured.get)
+    improved = True
+    while improved and len(measured) < budget:
+        improved = False
+        for tile in neighbours(best, size):
+            if tile not in measured and measure(tile) > measured[best]:
+                best, improved = tile, True
+                break
+
+    return {'tile': best, 'performance': measured[best], 'measured': measured}
+
+
+def host_name():
+    """Host key of the tuning cache (matches gethostname() in tuning.h)"""
+    return socket.gethostname()
+
+
+def read_cache(path=TUNING_CACHE):
+    """{(host, stage, grid, threads): (rb, cb, k, performance)}"""
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith('#') or len(fields) < 8:
+                continue
+            host, stage, grid, threads, rb, cb, k, perf = fields[:8]
+            entries[(host, stage, int(grid), int(threads))] = (int(rb), int(cb), int(k), float(perf))
+    return entries
+
+
+def write_cache_entry(stage, size, threads, tile, performance, path=TUNING_CACHE, host=None):
+    """Add or replace one tuned tile shape in the cache file"""
+    entries = read_cache(path)
+    entries[(host or host_name(), stage, size, threads)] = (*tile, performance)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write("# host stage grid threads row_block col_block temporal_block performance\n")
+        for (h, s, g, t), (rb, cb, k, perf) in sorted(entries.items()):
+            f.write(f"{h} {s} {g} {t} {rb} {cb} {k} {perf:.1f}\n")
@@ -0,0 +1,34 @@
+"""Backend registry.
+
+A backend is a callable ``run(size, steps, alpha, dx, initial=None, **options)``
+returning ``(field, timings, extras)`` where ``timings`` holds the usual
+stencil/boundary/swap/other breakdown and ``extras`` any backend-specific
+metrics. ``field`` may be None for backends that cannot return it.
+"""
+
+_BACKENDS = {}
+
+
+def register_backend(name):
+    """Decorator registering a backend under `name`"""
+    def decorator(func):
+        _BACKENDS[name] = func
+        return func
+    return decorator
+
+
+def get_backend(name):
+    """Look up a registered backend"""
+    try:
+        return _BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}', available: {', '.join(available_backends())}") from None
+
+
+def available_backends():
+    """Names of all registered backends"""
+    return sorted(_BACKENDS)
+
+
+# Built-in backends register themselves on import
+from . import python_loop, numpy_engine, multiprocess, c_stage, native, adi, spectral  # noqa: E402,F401
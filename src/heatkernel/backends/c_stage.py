@@ -0,0 +1,138 @@
+"""Compiled C stages, run as subprocesses through their stage binary."""
+
+import json
+import os
+import re
+import subprocess
+import tempfile
+
+from ..paths import TUNING_CACHE, stage_dir
+from . import register_backend
+
+C_STAGES = (
+    '01_c_baseline',
+    '02_compiler_O3',
+    '03_loop',
+    '04_cache_utilization',
+    '05_contiguous_memory',
+    '06_cache_blocking',
+    '07_vectorization',
+    '08_openmp_parallel',
+    '09_arch_specific',
+    '10_distributed_halo',
+)
+
+C_STAGES_3D = (
+    '01_naive_3d',
+    '06_cache_blocking_3d',
+    '07_vectorization_3d',
+    '08_openmp_parallel_3d',
+)
+
+# Variants of a pipeline stage, run and benchmarked on their own (not in PIPELINE_STAGES)
+C_STAGE_VARIANTS = (
+    '08_openmp_persistent',
+    '11_implicit_adi',
+)
+
+# Stages taking --dt: implicit schemes, not bound by the explicit stability limit
+IMPLICIT_STAGES = ('11_implicit_adi',)
+
+# Stages with --ranks: the grid split over ranks, forked locally by the stand-in in src/core/comm.h
+RANK_STAGES = ('10_distributed_halo',)
+DEFAULT_RANKS = 4  # RANKS in config.mk
+
+# Stages with --active-region, skipping the tiles the heat front has not reached (src/core/active_region.h)
+ACTIVE_REGION_STAGES = ('06_cache_blocking', '07_vectorization', '08_openmp_parallel', '09_arch_specific')
+
+# Stages built per field precision (PRECISION in config.mk): make value and binary name
+PRECISION_STAGES = C_STAGES[4:9] + ('08_openmp_persistent',)
+PRECISION_BUILDS = {
+    'float64': ('64', 'solver'),
+    'float32': ('32', 'solver_f32'),
+    'mixed': ('mixed', 'solver_mixed'),
+}
+
+
+# Stages with --first-touch and a "placement" block in metrics.json (src/core/numa.h)
+NUMA_STAGES = ('08_openmp_parallel', '09_arch_specific', '08_openmp_persistent')
+
+
+def placement_env(placement):
+    """OMP_PROC_BIND/OMP_PLACES of a '<bind>@<places>' placement, {} for 'default' or None"""
+    if placement in (None, 'default'):
+        return {}
+    bind, _, places = placement.partition('@')
+    env = {'OMP_PROC_BIND': bind}
+    if places:
+        env['OMP_PLACES'] = places
+    return env
+
+
+def placement_dir(placement):
+    """Results subdirectory of a non-default placement, as in the stage Makefiles"""
+    return 'placement_' + re.sub(r'[^A-Za-z0-9]+', '_', placement).strip('_')
+
+
+def stage_binary(stage, build=True, precision='float64'):
+    """Path to a stage's solver binary, building it with make if needed"""
+    if precision != 'float64' and stage not in PRECISION_STAGES:
+        raise ValueError(f"Stage '{stage}' is only built for float64, "
+                         f"{precision} builds exist for {', '.join(PRECISION_STAGES)}")
+    make_precision, name = PRECISION_BUILDS[precision]
+    directory = stage_dir(stage)
+    binary = os.path.join(directory, name)
+    if build and not os.path.exists(binary):
+        subprocess.run(['make', '-s', '-C', directory, f'PRECISION={make_precision}', name], check=True)
+    return binary
+
+
+def run_stage(stage, size, steps, alpha, dx, threads=None, args=(), output_dir=None, precision='float64',
+              placement=None):
+    """Run a stage binary once and return its parsed metrics.json"""
+    env = dict(os.environ)
+    env.setdefault('HEATKERNEL_TUNING_CACHE', TUNING_CACHE)
+    if threads is not None:
+        env['OMP_NUM_THREADS'] = str(threads)
+    env.update(placement_env(placement))
+    binary = stage_binary(stage, precision=precision)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = output_dir or tmp
+        os.makedirs(out, exist_ok=True)
+        subprocess.run([binary, str(size), str(steps), repr(alpha), repr(dx), out, *args],
+                       check=True, env=env, cwd=stage_dir(stage))
+        with open(os.path.join(out, 'metrics.json')) as f:
+            return json.load(f)
+
+
+def _make_backend(stage):
+    def run(size, steps, alpha, dx, initial=None, threads=None, dt=None, active_region=False, ranks=None):
+        if initial is not None:
+            raise ValueError(f"Backend '{stage}' only supports the default hot-spot initial field")
+        if dt is not None and stage not in IMPLICIT_STAGES:
+            raise ValueError(f"Backend '{stage}' uses the explicit time step, dt is only taken by {', '.join(IMPLICIT_STAGES)}")
+        if active_region and stage not in ACTIVE_REGION_STAGES:
+            raise ValueError(f"Backend '{stage}' sweeps the full grid, active_region is only taken by "
+                             f"{', '.join(ACTIVE_REGION_STAGES)}")
+        if ranks is not None and stage not in RANK_STAGES:
+            raise ValueError(f"Backend '{stage}' runs as one process, ranks is only taken by {', '.join(RANK_STAGES)}")
+        args = [f'--dt={dt!r}'] if dt else []
+        if active_region:
+            args.append('--active-region')
+        if stage in RANK_STAGES:
+            args.append(f'--ranks={ranks or DEFAULT_RANKS}')
+        metrics = run_stage(stage, size, steps, alpha, dx, threads=threads, args=args)
+        timings = dict(metrics['breakdown'])
+        timings['total_time'] = metrics['total_time']
+        extras = {'threads': threads} if threads is not None else {}
+        for key in ('dimension', 'method', 'dt', 'damping_steps', 'active_region', 'ranks'):
+            if key in metrics:
+                extras[key] = metrics[key]
+        return None, timings, extras
+    run.__name__ = f'run_{stage}'
+    return run
+
+
+for _stage in C_STAGES + C_STAGES_3D + C_STAGE_VARIANTS:
+    register_backend(_stage)(_make_backend(_stage))
@@ -0,0 +1,143 @@
+"""Multi-process NumPy backend: row strips over a shared-memory field.
+
+Both ping-pong buffers live in one ``multiprocessing.shared_memory`` block.
+Each worker process owns a strip of interior rows and updates it with the
+in-place NumPy step, reading its one-row halos straight from the neighbours'
+strips in shared memory, so nothing is pickled per step. The first and last
+workers also own the top and bottom boundary rows. One barrier per step
+makes every strip (and so every halo row) of the new field visible before
+anyone reads it, and keeps anyone from overwriting the old field while a
+neighbour may still read it. The result is bitwise identical to the
+``numpy``/``numpy-inplace`` backends.
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+
+import numpy as np
+
+from ..grid import prepare_field, stencil_coefficient
+from . import register_backend
+from .numpy_engine import numpy_inplace_step
+
+
+def strip_bounds(size, workers):
+    """Interior row boundaries [r_0, r_1, ..., r_workers] of the worker strips"""
+    return [1 + (size - 2) * rank // workers for rank in range(workers + 1)]
+
+
+def _worker(rank, workers, name, size, steps, coef, barrier, results):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        fields = np.ndarray((2, size, size), dtype=np.float64, buffer=shm.buf)
+        r0, r1 = strip_bounds(size, workers)[rank:rank + 2]
+        first, last = rank == 0, rank == workers - 1
+        lo, hi = (0 if first else r0), (size if last else r1)
+        acc = np.empty((r1 - r0, size - 2))
+        tmp = np.empty((r1 - r0, size - 2))
+
+        total_stencil_time = 0.0
+        total_boundary_time = 0.0
+        total_swap_time = 0.0
+
+        barrier.wait()
+        start_time = time.time()
+
+        for step in range(steps):
+            T, T_new = fields[step % 2], fields[(step + 1) % 2]
+
+            start_stencil_time = time.time()
+            numpy_inplace_step(T[r0 - 1:r1 + 1], T_new[r0 - 1:r1 + 1], coef, acc, tmp)
+            total_stencil_time += time.time() - start_stencil_time
+
+            # Same order as neumann_boundaries, restricted to the owned rows
+            start_boundary_time = time.time()
+            if first:
+                T_new[0, :] = T_new[1, :]
+            if last:
+                T_new[-1, :] = T_new[-2, :]
+            T_new[lo:hi, 0] = T_new[lo:hi, 1]
+            T_new[lo:hi, -1] = T_new[lo:hi, -2]
+            total_boundary_time += time.time() - start_boundary_time
+
+            # The swap is implicit (buffer parity); the barrier is the halo exchange
+            start_swap_time = time.time()
+            barrier.wait()
+            total_swap_time += time.time() - start_swap_time
+
+        total_time = time.time() - start_time
+        del T, T_new, fields
+        results.put((rank, {
+            'total_time': total_time,
+            'stencil_time': total_stencil_time,
+            'boundary_time': total_boundary_time,
+            'swap_time': total_swap_time,
+            'other_time': total_time - total_stencil_time - total_boundary_time - total_swap_time,
+        }))
+    except BrokenBarrierError:
+        sys.exit(1)
+    finally:
+        shm.close()
+
+
+def _collect(procs, barrier, results):
+    """Per-worker timings; aborts the barrier and raises if a worker dies"""
+    timings = {}
+    while len(timings) < len(procs):
+        try:
+            rank, worker_timings = results.get(timeout=0.2)
+            timings[rank] = worker_timings
+        except queue.Empty:
+            failed = [p for p in procs if p.exitcode not in (None, 0)]
+            if failed:
+                barrier.abort()
+                for p in procs:
+                    p.terminate()
+                raise RuntimeError(f"numpy-mp worker exited with code {failed[0].exitcode}")
+    for p in procs:
+        p.join()
+    return [timings[rank] for rank in range(len(procs))]
+
+
+@register_backend('numpy-mp')
+def run_multiprocess(size, steps, alpha, dx, initial=None, workers=None):
+    workers = max(1, min(workers or os.cpu_count() or 1, size - 2))
+    coef = stencil_coefficient(alpha, dx)
+    T = prepare_field(size, initial)
+
+    shm = shared_memory.SharedMemory(create=True, size=2 * T.nbytes)
+    fields = None
+    try:
+        fields = np.ndarray((2, size, size), dtype=np.float64, buffer=shm.buf)
+        fields[0] = T
+        fields[1] = T
+
+        ctx = mp.get_context()
+        barrier = ctx.Barrier(workers)
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(rank, workers, shm.name, size, steps, coef, barrier, results),
+                             daemon=True)
+                 for rank in range(workers)]
+        for p in procs:
+            p.start()
+        per_worker = _collect(procs, barrier, results)
+
+        field = fields[steps % 2].copy()
+    finally:
+        fields = None  # no views may outlive the mapping
+        shm.close()
+        shm.unlink()
+
+    # The slowest worker bounds the step rate; its breakdown is the one reported
+    timings = max(per_worker, key=lambda t: t['total_time'])
+    stencil_times = [t['stencil_time'] for t in per_worker]
+    mean_stencil = sum(stencil_times) / workers
+    return field, timings, {
+        'workers': workers,
+        'load_imbalance': max(stencil_times) / mean_stencil if mean_stencil > 0 else 1.0,
+    }
@@ -0,0 +1,24 @@
+"""In-process C kernels through the shared library (see heatkernel.native)."""
+
+from ..grid import prepare_field
+from . import register_backend
+
+_handles = {}
+
+
+@register_backend('native')
+def run_native(size, steps, alpha, dx, initial=None, kernel='openmp', threads=0, tile=None):
+    # Imported lazily so the package import never loads the shared library
+    from ..native import NativeKernel
+
+    key = (kernel, threads, tuple(tile) if tile else None)
+    if key not in _handles:
+        _handles[key] = NativeKernel(kernel, threads, tile)
+    T = prepare_field(size, initial)
+    handle = _handles[key]
+    timings = handle.advance(T, steps, alpha, dx)
+    extras = {'kernel': kernel, 'threads': threads}
+    if handle.last_tile:
+        # Same keys as the stages' metrics.json
+        extras.update(zip(('row_block', 'col_block', 'temporal_block'), handle.last_tile))
+    return T, timings, extras
@@ -0,0 +1,238 @@
+"""Vectorized NumPy backends using slice arithmetic and ping-pong buffers."""
+
+import time
+
+import numpy as np
+
+from ..grid import neumann_boundaries, neumann_boundaries_3d, prepare_field, stencil_coefficient
+from . import register_backend
+
+
+def numpy_step(T, T_new, coef):
+    # Same operation order as the loop backend so both give identical fields
+    T_new[1:-1, 1:-1] = T[1:-1, 1:-1] + coef * (T[2:, 1:-1] + T[:-2, 1:-1] + T[1:-1, 2:] + T[1:-1, :-2] - 4*T[1:-1, 1:-1])
+
+
+def numpy_inplace_step(T, T_new, coef, acc, tmp):
+    # Every ufunc writes into a preallocated buffer, so the step allocates nothing.
+    # T may also be a (batch, size, size) stack with coef of shape (batch, 1, 1).
+    np.add(T[..., 2:, 1:-1], T[..., :-2, 1:-1], out=acc)
+    np.add(acc, T[..., 1:-1, 2:], out=acc)
+    np.add(acc, T[..., 1:-1, :-2], out=acc)
+    np.multiply(T[..., 1:-1, 1:-1], 4, out=tmp)
+    np.subtract(acc, tmp, out=acc)
+    np.multiply(acc, coef, out=acc)
+    np.add(T[..., 1:-1, 1:-1], acc, out=T_new[..., 1:-1, 1:-1])
+
+
+def numpy3d_step(T, T_new, coef, acc, tmp):
+    # 7-point stencil, neighbours summed in the same order as heat_stencil_3d
+    c = T[1:-1, 1:-1, 1:-1]
+    np.add(T[2:, 1:-1, 1:-1], T[:-2, 1:-1, 1:-1], out=acc)
+    np.add(acc, T[1:-1, 2:, 1:-1], out=acc)
+    np.add(acc, T[1:-1, :-2, 1:-1], out=acc)
+    np.add(acc, T[1:-1, 1:-1, 2:], out=acc)
+    np.add(acc, T[1:-1, 1:-1, :-2], out=acc)
+    np.multiply(c, 6, out=tmp)
+    np.subtract(acc, tmp, out=acc)
+    np.multiply(acc, coef, out=acc)
+    np.add(c, acc, out=T_new[1:-1, 1:-1, 1:-1])
+
+
+# Field dtype and dtype the stencil is evaluated in, per precision (see src/core/precision.h)
+PRECISIONS = {
+    'float64': (np.float64, np.float64),
+    'float32': (np.float32, np.float32),
+    'mixed': (np.float32, np.float64),
+}
+
+
+def update_residual(T, T_old, norm, out):
+    """Max or L2 norm of the last update over the interior cells (as in src/core/convergence.h)"""
+    np.subtract(T[1:-1, 1:-1], T_old[1:-1, 1:-1], out=out, dtype=np.float64)
+    if norm == 'l2':
+        flat = out.ravel()
+        return float(np.sqrt(np.dot(flat, flat)))
+    return float(np.max(np.abs(out, out=out)))
+
+
+def nonzero_box(T):
+    """Bounding box (i_lo, i_hi, j_lo, j_hi) of the nonzero cells of T, None if there are none"""
+    rows = np.flatnonzero(T.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(T.any(axis=0))
+    return int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+
+
+def grow_box(box, size):
+    """Box grown by one cell on every side, clipped to the grid (ghost cells included)"""
+    i_lo, i_hi, j_lo, j_hi = box
+    return max(i_lo - 1, 0), min(i_hi + 1, size), max(j_lo - 1, 0), min(j_hi + 1, size)
+
+
+def _run(size, steps, alpha, dx, initial, inplace, precision='float64',
+         converge_tol=0.0, converge_every=100, residual='max', active_region=False):
+    """Ping-pong loop; with converge_tol > 0 the update residual is checked
+    every `converge_every` steps and the run stops once it is below it.
+
+    With active_region the stencil only covers the bounding box of the cells
+    that can be nonzero: those of the start field, grown by one cell per step
+    (see src/core/active_region.h). Both buffers start as the same field, so
+    the cells outside it are zero in each. Once the box covers the grid every
+    step is the full sweep.
+    """
+    if residual not in ('max', 'l2'):
+        raise ValueError(f"Unknown residual norm '{residual}', use 'max' or 'l2'")
+    dtype, acc_dtype = PRECISIONS[precision]
+    coef = acc_dtype(stencil_coefficient(alpha, dx))
+    T = prepare_field(size, initial, dtype)
+    T_new = T.copy()
+    acc = np.empty((size-2, size-2), dtype=acc_dtype)
+    tmp = np.empty((size-2, size-2), dtype=acc_dtype)
+    res = np.empty((size-2, size-2)) if converge_tol > 0 else None
+
+    total_stencil_time = 0.0
+    total_boundary_time = 0.0
+    total_swap_time = 0.0
+    check_time = 0.0
+    checks, last_residual, converged = 0, None, False
+    # Interior window [i0, i1) x [j0, j1) the stencil updates, the full interior unless active_region
+    window = (1, size - 1, 1, size - 1)
+    box = nonzero_box(T) if active_region else None
+    full_step = None if active_region and box != (0, size, 0, size) else 0
+    cells = 0
+
+    start_time = time.time()
+
+    for step in range(1, steps + 1):
+        if full_step is None:
+            box = box and grow_box(box, size)
+            if box == (0, size, 0, size):
+                full_step = step - 1
+                window = (1, size - 1, 1, size - 1)
+            elif box:
+                window = (max(box[0], 1), min(box[1], size - 1), max(box[2], 1), min(box[3], size - 1))
+            else:
+                window = (1, 1, 1, 1)
+
+        start_stencil_time = time.time()
+        i0, i1, j0, j1 = window
+        if i0 < i1 and j0 < j1:
+            sub = (slice(i0 - 1, i1 + 1), slice(j0 - 1, j1 + 1))
+            if inplace:
+                numpy_inplace_step(T[sub], T_new[sub], coef, acc[:i1 - i0, :j1 - j0], tmp[:i1 - i0, :j1 - j0])
+            else:
+                numpy_step(T[sub], T_new[sub], coef)
+            cells += (i1 - i0) * (j1 - j0)
+        total_stencil_time += time.time() - start_stencil_time
+
+        start_boundary_time = time.time()
+        neumann_boundaries(T_new)
+        total_boundary_time += time.time() - start_boundary_time
+
+        start_swap_time = time.time()
+        T, T_new = T_new, T
+        total_swap_time += time.time() - start_swap_time
+
+        if res is not None and step % converge_every == 0:
+            start_check_time = time.time()
+            last_residual = update_residual(T, T_new, residual, res)
+            checks += 1
+            check_time += time.time() - start_check_time
+            if last_residual < converge_tol:
+                converged = True
+                break
+
+    total_time = time.time() - start_time
+
+    extras = {} if precision == 'float64' else {'precision': precision}
+    if active_region:
+        done = step if steps else 0
+        extras['active_region'] = {
+            'cells_updated': cells,
+            'cells_per_step': cells / done if done else 0.0,
+            'fraction': cells / done / (size - 2) ** 2 if done else 0.0,
+            'full_sweep_step': -1 if full_step is None else full_step,
+            'steps_per_second': done / total_time if total_time > 0 else 0.0,
+            'cell_updates_per_second': cells / total_time if total_time > 0 else 0.0,
+        }
+    if res is not None:
+        extras['convergence'] = {
+            'tolerance': converge_tol,
+            'norm': residual,
+            'every': converge_every,
+            'converged': converged,
+            'steps': step if steps else 0,
+            'residual': last_residual,
+            'checks': checks,
+            'time_to_converge': total_time if converged else None,
+            'check_time': check_time,
+            'check_cost': check_time,
+        }
+    return T, {
+        'total_time': total_time,
+        'stencil_time': total_stencil_time,
+        'boundary_time': total_boundary_time,
+        'swap_time': total_swap_time,
+        'other_time': total_time - total_stencil_time - total_boundary_time - total_swap_time,
+    }, extras
+
+
+@register_backend('numpy')
+def run_numpy(size, steps, alpha, dx, initial=None, **options):
+    return _run(size, steps, alpha, dx, initial, inplace=False, **options)
+
+
+@register_backend('numpy-inplace')
+def run_numpy_inplace(size, steps, alpha, dx, initial=None, **options):
+    return _run(size, steps, alpha, dx, initial, inplace=True, **options)
+
+
+@register_backend('numpy-f32')
+def run_numpy_f32(size, steps, alpha, dx, initial=None, **options):
+    return _run(size, steps, alpha, dx, initial, inplace=True, precision='float32', **options)
+
+
+@register_backend('numpy-mixed')
+def run_numpy_mixed(size, steps, alpha, dx, initial=None, **options):
+    """float32 field, each step computed in float64 buffers and rounded on store"""
+    return _run(size, steps, alpha, dx, initial, inplace=True, precision='mixed', **options)
+
+
+@register_backend('numpy-3d')
+def run_numpy_3d(size, steps, alpha, dx, initial=None):
+    coef = stencil_coefficient(alpha, dx, dimension=3)
+    T = prepare_field(size, initial, dimension=3)
+    T_new = T.copy()
+    acc = np.empty((size-2,) * 3)
+    tmp = np.empty((size-2,) * 3)
+
+    total_stencil_time = 0.0
+    total_boundary_time = 0.0
+    total_swap_time = 0.0
+
+    start_time = time.time()
+
+    for step in range(1, steps + 1):
+        start_stencil_time = time.time()
+        numpy3d_step(T, T_new, coef, acc, tmp)
+        total_stencil_time += time.time() - start_stencil_time
+
+        start_boundary_time = time.time()
+        neumann_boundaries_3d(T_new)
+        total_boundary_time += time.time() - start_boundary_time
+
+        start_swap_time = time.time()
+        T, T_new = T_new, T
+        total_swap_time += time.time() - start_swap_time
+
+    total_time = time.time() - start_time
+
+    return T, {
+        'total_time': total_time,
+        'stencil_time': total_stencil_time,
+        'boundary_time': total_boundary_time,
+        'swap_time': total_swap_time,
+        'other_time': total_time - total_stencil_time - total_boundary_time - total_swap_time,
+    }, {'dimension': 3}
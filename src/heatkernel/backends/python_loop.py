@@ -0,0 +1,52 @@
+"""Pure-Python nested loop backend (the original stage 00 kernel)."""
+
+import time
+
+import numpy as np
+
+from ..grid import neumann_boundaries, prepare_field, stencil_coefficient
+from . import register_backend
+
+
+def loop_step(T, T_new, coef):
+    size = T.shape[0]
+    for i in range(1, size-1):
+        for j in range(1, size-1):
+            T_new[i,j] = T[i,j] + coef * (T[i+1,j] + T[i-1,j] + T[i,j+1] + T[i,j-1] - 4*T[i,j])
+
+
+@register_backend('loop')
+def run_loop(size, steps, alpha, dx, initial=None):
+    coef = stencil_coefficient(alpha, dx)
+    T = prepare_field(size, initial)
+
+    total_stencil_time = 0.0
+    total_boundary_time = 0.0
+    total_swap_time = 0.0
+
+    start_time = time.time()
+
+    for step in range(1, steps + 1):
+        T_new = np.zeros_like(T)
+
+        start_stencil_time = time.time()
+        loop_step(T, T_new, coef)
+        total_stencil_time += time.time() - start_stencil_time
+
+        start_boundary_time = time.time()
+        neumann_boundaries(T_new)
+        total_boundary_time += time.time() - start_boundary_time
+
+        start_swap_time = time.time()
+        T = T_new
+        total_swap_time += time.time() - start_swap_time
+
+    total_time = time.time() - start_time
+
+    return T, {
+        'total_time': total_time,
+        'stencil_time': total_stencil_time,
+        'boundary_time': total_boundary_time,
+        'swap_time': total_swap_time,
+        'other_time': total_time - total_stencil_time - total_boundary_time - total_swap_time,
+    }, {}
@@ -0,0 +1,51 @@
+"""Spectral fast-forward backends: the explicit scheme's result without stepping.
+
+The explicit stencil with Neumann ghost cells is diagonalized by cosine
+transforms (see heatkernel.exact), so the field after any number of steps is
+one forward transform, a power of the per-mode amplification factors and one
+inverse transform, O(N^d log N) whatever the step count. It agrees with the
+stepping engines to rounding (about 1e-14 relative after 20000 steps at
+200^2) and accumulates no per-step rounding, which also makes it the fast
+reference of `make validate`. Many output times from one forward transform
+are `heatkernel.exact.explicit_solution(initial, alpha, dx, [n1, n2, ...])`.
+
+It takes no steps, so its metrics have no roofline block: the stencil
+updates it stands in for would show a throughput never achieved.
+"""
+
+import time
+
+from ..exact import explicit_solution
+from ..grid import prepare_field
+from . import register_backend
+
+
+def _run(size, steps, alpha, dx, initial, dimension):
+    T = prepare_field(size, initial, dimension=dimension)
+
+    start_time = time.time()
+    field = explicit_solution(T, alpha, dx, steps)
+    total_time = time.time() - start_time
+
+    extras = {'method': 'spectral'}
+    if dimension == 3:
+        extras['dimension'] = 3
+    return field, {
+        'total_time': total_time,
+        'stencil_time': total_time,
+        'boundary_time': 0.0,
+        'swap_time': 0.0,
+        'other_time': 0.0,
+    }, extras
+
+
+@register_backend('spectral')
+def run_spectral(size, steps, alpha, dx, initial=None):
+    """Field after `steps` explicit steps by cosine transform, in one jump"""
+    return _run(size, steps, alpha, dx, initial, dimension=2)
+
+
+@register_backend('spectral-3d')
+def run_spectral_3d(size, steps, alpha, dx, initial=None):
+    """7-point counterpart of `spectral` on a size^3 cube"""
+    return _run(size, steps, alpha, dx, initial, dimension=3)
@@ -0,0 +1,131 @@
+"""Batched solves: many independent small grids (scenarios) advanced in one call.
+
+A batch is a (batch, size, size) stack of start fields with an alpha and dx
+per scenario. Instead of one process or one call per scenario, every step
+advances the whole stack:
+
+    numpy   the numpy-inplace step on the stack, scenarios along the first axis
+    native  heat_solve_batch in src/lib: with at least as many scenarios as
+            threads each thread runs whole scenarios from its cache,
+            otherwise one OpenMP loop over the tiles of all scenarios per
+            pass, so a few small grids still fill the thread team
+
+Both give the same fields as solving each scenario on its own.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .backends.numpy_engine import numpy_inplace_step
+from .grid import neumann_boundaries, stencil_coefficient, time_step
+from .validation import field_stats
+
+BATCH_BACKENDS = ('numpy', 'native')
+
+
+def hot_spot_stack(size, centers, value=100.0):
+    """(len(centers), size, size) stack with one hot spot per scenario at its (i, j)"""
+    T = np.zeros((len(centers), size, size))
+    for b, (i, j) in enumerate(centers):
+        T[b, i, j] = value
+    return T
+
+
+@dataclass
+class BatchResult:
+    """Final fields of a batch plus the timing breakdown of the whole call"""
+    fields: np.ndarray
+    timings: dict
+    backend: str
+    steps: int
+    alpha: np.ndarray
+    dx: np.ndarray
+
+    @property
+    def batch(self):
+        return self.fields.shape[0]
+
+    @property
+    def size(self):
+        return self.fields.shape[1]
+
+    @property
+    def scenarios_per_second(self):
+        return self.batch / self.timings['total_time']
+
+    def scenario(self, b):
+        """Per-scenario result: parameters and the field summary of metrics.json"""
+        return {
+            'alpha': float(self.alpha[b]),
+            'dx': float(self.dx[b]),
+            'dt': time_step(float(self.alpha[b]), float(self.dx[b])),
+            'field': field_stats(self.fields[b]),
+        }
+
+    def scenarios(self):
+        return [self.scenario(b) for b in range(self.batch)]
+
+
+def _run_numpy(T, steps, alpha, dx):
+    coef = stencil_coefficient(alpha, dx)[:, None, None]
+    T_new = T.copy()
+    acc = np.empty((T.shape[0], T.shape[1] - 2, T.shape[2] - 2))
+    tmp = np.empty_like(acc)
+
+    total_stencil_time = 0.0
+    total_boundary_time = 0.0
+    total_swap_time = 0.0
+
+    start_time = time.time()
+
+    for step in range(steps):
+        start_stencil_time = time.time()
+        numpy_inplace_step(T, T_new, coef, acc, tmp)
+        total_stencil_time += time.time() - start_stencil_time
+
+        start_boundary_time = time.time()
+        neumann_boundaries(T_new)
+        total_boundary_time += time.time() - start_boundary_time
+
+        start_swap_time = time.time()
+        T, T_new = T_new, T
+        total_swap_time += time.time() - start_swap_time
+
+    total_time = time.time() - start_time
+
+    return T, {
+        'total_time': total_time,
+        'stencil_time': total_stencil_time,
+        'boundary_time': total_boundary_time,
+        'swap_time': total_swap_time,
+        'other_time': total_time - total_stencil_time - total_boundary_time - total_swap_time,
+    }
+
+
+def solve_batch(fields, steps, alpha=0.2, dx=0.01, backend='numpy', threads=0, tile=None):
+    """Advance every scenario of a (batch, size, size) stack by `steps` steps.
+
+    `alpha` and `dx` are scalars or one value per scenario. The input stack
+    is not modified. `threads` sets the OpenMP team of the native backend and
+    `tile` its (row_block, col_block, temporal_block), by default the tuned
+    stage 08 tile (see NativeKernel).
+    """
+    if backend not in BATCH_BACKENDS:
+        raise ValueError(f"Unknown batch backend '{backend}', available: {', '.join(BATCH_BACKENDS)}")
+    if tile is not None and backend != 'native':
+        raise ValueError(f"Batch backend '{backend}' steps the whole grid, tile is only taken by 'native'")
+    T = np.array(fields, dtype=np.float64, order='C', copy=True)
+    if T.ndim != 3 or T.shape[1] != T.shape[2]:
+        raise ValueError(f"Expected a (batch, size, size) stack, got shape {T.shape}")
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), T.shape[:1]).copy()
+    dx = np.broadcast_to(np.asarray(dx, dtype=np.float64), T.shape[:1]).copy()
+
+    if backend == 'native':
+        # Imported lazily so the package import never loads the shared library
+        from .native import NativeKernel
+        timings = NativeKernel('openmp', threads, tile).advance_batch(T, steps, alpha, dx)
+    else:
+        T, timings = _run_numpy(T, steps, alpha, dx)
+    return BatchResult(T, timings, backend, steps, alpha, dx)
@@ -0,0 +1,105 @@
+"""Repeated stage runs with warmup and summary statistics.
+
+`benchmark_point` runs one (stage, grid, threads) point `warmup` times
+untimed and `repetitions` times timed, and returns a metrics.json dictionary
+whose headline numbers are medians. The raw samples and their summaries are
+kept under "statistics".
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from .backends.c_stage import C_STAGE_VARIANTS, C_STAGES, C_STAGES_3D, run_stage
+from .paths import stage_dir
+from .stats import summarize
+
+PYTHON_STAGE = '00_python_baseline'
+PYTHON_STAGE_3D = '00_numpy_3d'
+THREADED_STAGES = ('08_openmp_parallel', '09_arch_specific', '08_openmp_parallel_3d', '08_openmp_persistent',
+                   '11_implicit_adi')
+BENCH_STAGES = (PYTHON_STAGE,) + C_STAGES
+BENCH_STAGES_3D = (PYTHON_STAGE_3D,) + C_STAGES_3D
+
+
+def bench_stages(dimension=2):
+    """Stages benchmarked for a 2D or 3D pipeline"""
+    return BENCH_STAGES_3D if dimension == 3 else BENCH_STAGES
+
+
+def run_python_stage(size, steps, alpha, dx, engine='loop', args=(), output_dir=None, stage=PYTHON_STAGE):
+    """Run a Python stage CLI once in a fresh interpreter and return its metrics"""
+    # The 3D stage has a single engine, `engine` selects the stage 00 one
+    engine_args = ['--engine', engine] if stage == PYTHON_STAGE else []
+    with tempfile.TemporaryDirectory() as tmp:
+        out = output_dir or tmp
+        os.makedirs(out, exist_ok=True)
+        subprocess.run([sys.executable, 'solver.py', '--size', str(size), '--timesteps', str(steps),
+                        '--alpha', repr(alpha), '--dx', repr(dx), *engine_args,
+                        '--output-dir', out, *args],
+                       check=True, cwd=stage_dir(stage))
+        with open(os.path.join(out, 'metrics.json')) as f:
+            return json.load(f)
+
+
+def run_once(stage, size, steps, alpha, dx, threads=None, engine='loop', args=(), output_dir=None,
+             precision='float64', placement=None):
+    """One run; `precision` picks the C stage build, the stage 00 engine sets its own.
+
+    `placement` ('<bind>@<places>', see config.mk) sets the OpenMP thread binding of C stages.
+    """
+    if stage in (PYTHON_STAGE, PYTHON_STAGE_3D):
+        return run_python_stage(size, steps, alpha, dx, engine, args, output_dir, stage)
+    if stage not in C_STAGES + C_STAGES_3D + C_STAGE_VARIANTS:
+        raise ValueError(f"Unknown stage '{stage}'")
+    return run_stage(stage, size, steps, alpha, dx, threads=threads, args=args, output_dir=output_dir,
+                     precision=precision, placement=placement)
+
+
+def aggregate(runs, warmup=0, confidence=0.95):
+    """Merge repeated metrics dictionaries into one with median headline numbers"""
+    times = [run['total_time'] for run in runs]
+    median_time = float(np.median(times))
+    steps = runs[0]['time_steps']
+
+    # Keep everything else (field stats, extras) from the run closest to the median
+    metrics = dict(min(runs, key=lambda run: abs(run['total_time'] - median_time)))
+    metrics['total_time'] = median_time
+    metrics['time_per_step'] = median_time / steps * 1000
+    metrics['performance'] = steps / median_time
+    metrics['breakdown'] = {key: float(np.median([run['breakdown'][key] for run in runs]))
+                            for key in runs[0]['breakdown']}
+    metrics['statistics'] = {
+        'warmup': warmup,
+        'repetitions': len(runs),
+        'confidence': confidence,
+        'total_time': summarize(times, confidence),
+        'performance': summarize([steps / t for t in times], confidence),
+    }
+    return metrics
+
+
+def benchmark_point(stage, size, steps, alpha=0.2, dx=0.01, threads=None, warmup=1, repetitions=5,
+                    engine='loop', args=(), confidence=0.95, output_dir=None, precision='float64',
+                    placement=None):
+    """Warm up, run `repetitions` timed runs and return the aggregated metrics.
+
+    When `output_dir` is given, the aggregated metrics.json is written there;
+    the last timed run's other outputs (e.g. field.npy) are kept alongside.
+    """
+    for _ in range(warmup):
+        run_once(stage, size, steps, alpha, dx, threads, engine, args, precision=precision, placement=placement)
+    runs = [run_once(stage, size, steps, alpha, dx, threads, engine, args, output_dir, precision, placement)
+            for _ in range(repetitions)]
+
+    metrics = aggregate(runs, warmup, confidence)
+    if threads is not None:
+        metrics['threads'] = threads
+    if output_dir:
+        with open(os.path.join(output_dir, 'metrics.json'), 'w') as f:
+            json.dump(metrics, f, indent=2)
+    return metrics
@@ -0,0 +1,92 @@
+"""Start fields and checkpoints as memory-mapped .npy files (mirror of src/core/checkpoint.h).
+
+A checkpoint is ``checkpoint.npy`` plus ``checkpoint.json`` holding the step
+it was taken at and the ``--initial-field`` the run started from. Fields are
+read with ``np.load(mmap_mode='r')`` and written through ``open_memmap``
+under a .tmp name that is renamed into place once complete.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+CHECKPOINT_FIELD = 'checkpoint.npy'
+CHECKPOINT_INFO = 'checkpoint.json'
+
+
+def read_field_file(path, size, dimension=2):
+    """Memory-mapped float64 field of shape (size,) * dimension"""
+    field = np.load(path, mmap_mode='r')
+    if field.dtype != np.float64 or field.shape != (size,) * dimension:
+        raise ValueError(f"{path} holds a {field.dtype} array of shape {field.shape}, "
+                         f"expected float64 {(size,) * dimension}")
+    return field
+
+
+def read_checkpoint_info(directory):
+    with open(os.path.join(directory, CHECKPOINT_INFO)) as f:
+        return json.load(f)
+
+
+def start_field(size, steps, initial_field=None, restart=None, dimension=2):
+    """(initial, steps left, start step, origin) for a run.
+
+    `restart` is a directory holding a checkpoint and wins over
+    `initial_field`; `initial` is None for the default hot spot.
+    """
+    if restart:
+        info = read_checkpoint_info(restart)
+        if info['step'] >= steps:
+            raise ValueError(f"{restart} is already at step {info['step']} of {steps}")
+        field = read_field_file(os.path.join(restart, CHECKPOINT_FIELD), size, dimension)
+        return field, steps - info['step'], info['step'], info.get('initial_field')
+    if initial_field:
+        return read_field_file(initial_field, size, dimension), steps, 0, os.path.abspath(initial_field)
+    return None, steps, 0, None
+
+
+def write_checkpoint(directory, field, step, origin=None):
+    """Write `field` as directory/checkpoint.npy with its checkpoint.json"""
+    path = os.path.join(directory, CHECKPOINT_FIELD)
+    mapped = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=np.float64, shape=field.shape)
+    mapped[...] = field
+    mapped.flush()
+    del mapped
+    info = {'step': step, 'grid_size': field.shape[0], 'initial_field': origin}
+    with open(os.path.join(directory, CHECKPOINT_INFO + '.tmp'), 'w') as f:
+        json.dump(info, f, indent=2)
+    os.replace(path + '.tmp', path)
+    os.replace(os.path.join(directory, CHECKPOINT_INFO + '.tmp'), os.path.join(directory, CHECKPOINT_INFO))
+
+
+def run_with_checkpoints(run, size, steps, alpha, dx, initial, every, directory,
+                         start_step=0, origin=None, **options):
+    """Call a backend in chunks that end on multiples of `every` and checkpoint after each.
+
+    Timings are summed over the chunks, the checkpoint writes are reported
+    as "checkpoint_time" and included in "total_time".
+    """
+    os.makedirs(directory, exist_ok=True)
+    field, done, count = initial, 0, 0
+    timings, extras = {}, {}
+    checkpoint_time = 0.0
+    while done < steps:
+        chunk = min(every - (start_step + done) % every, steps - done)
+        field, chunk_timings, extras = run(size, chunk, alpha, dx, initial=field, **options)
+        if field is None:
+            raise ValueError("Backend does not return its field, the C stages checkpoint with --checkpoint-every")
+        for key, value in chunk_timings.items():
+            timings[key] = timings.get(key, 0.0) + value
+        done += chunk
+        if (start_step + done) % every == 0:
+            start = time.time()
+            write_checkpoint(directory, field, start_step + done, origin)
+            checkpoint_time += time.time() - start
+            count += 1
+
+    timings['checkpoint_time'] = checkpoint_time
+    timings['total_time'] = timings.get('total_time', 0.0) + checkpoint_time
+    extras = dict(extras, checkpoints={'every': every, 'count': count, 'time': checkpoint_time})
+    return field, timings, extras
@@ -0,0 +1,136 @@
+"""Closed-form solutions of the discretized heat equation.
+
+The stages discretize space with the 5-point (7-point in 3D) Laplacian and
+zero-gradient ghost cells. Its 1D factor on n interior cells is diagonalized
+by the DCT-II basis, cos(pi k (i + 1/2) / n), with eigenvalues
+mu_k = -4 sin^2(pi k / 2n), so every mode evolves on its own:
+
+    semi-discrete (exact in time)   exp(alpha t / dx^2 (mu_i + mu_j))
+    explicit scheme, n steps        (1 + r (mu_i + mu_j))^n,  r = alpha dt / dx^2
+
+`semi_discrete_solution` is the accuracy reference for comparing time
+stepping schemes at a physical time (see src/utils/bench_implicit.py).
+`explicit_solution` is the field the explicit stages compute after any number
+of steps, to rounding: one forward transform, a power of the amplification
+factors and one inverse transform per output, O(N^d log N) independent of the
+step count (the `spectral` backends). The transforms are NumPy FFTs of the
+reordered lines (Makhoul's algorithm), along every axis.
+"""
+
+import numpy as np
+
+from .grid import neumann_boundaries, neumann_boundaries_3d, stencil_coefficient
+
+
+def neumann_eigenvalues(n):
+    """Eigenvalues -4 sin^2(pi k / 2n) of the 1D Neumann Laplacian, in DCT-II order"""
+    return -4.0 * np.sin(np.pi * np.arange(n) / (2 * n)) ** 2
+
+
+def dct(x, axis=-1):
+    """Unnormalized DCT-II along `axis`: X_k = 2 sum_i x_i cos(pi k (2i + 1) / 2n)"""
+    x = np.moveaxis(x, axis, -1)
+    n = x.shape[-1]
+    v = np.concatenate([x[..., ::2], x[..., 1::2][..., ::-1]], axis=-1)
+    shift = 2.0 * np.exp(-0.5j * np.pi * np.arange(n) / n)
+    return np.moveaxis(np.real(np.fft.fft(v, axis=-1) * shift), -1, axis)
+
+
+def idct(X, axis=-1):
+    """Inverse of `dct` along `axis`"""
+    X = np.moveaxis(X, axis, -1)
+    n = X.shape[-1]
+    # X_{n-k}, with X_n = 0
+    mirrored = np.concatenate([np.zeros_like(X[..., :1]), X[..., :0:-1]], axis=-1)
+    shift = 0.5 * np.exp(0.5j * np.pi * np.arange(n) / n)
+    v = np.real(np.fft.ifft((X - 1j * mirrored) * shift, axis=-1))
+    x = np.empty_like(v)
+    half = (n + 1) // 2
+    x[..., ::2] = v[..., :half]
+    x[..., 1::2] = v[..., half:][..., ::-1]
+    return np.moveaxis(x, -1, axis)
+
+
+def modes(interior):
+    """Cosine coefficients of an interior block, transformed along every axis"""
+    X = np.asarray(interior, dtype=np.float64)
+    for axis in range(X.ndim):
+        X = dct(X, axis)
+    return X
+
+
+def field_from_modes(X, shape):
+    """Field of `shape` with the interior from cosine coefficients and Neumann ghost cells"""
+    for axis in range(X.ndim):
+        X = idct(X, axis)
+    T = np.empty(shape)
+    T[(slice(1, -1),) * X.ndim] = X
+    (neumann_boundaries_3d if X.ndim == 3 else neumann_boundaries)(T)
+    return T
+
+
+def laplacian_eigenvalues(shape):
+    """mu_i + mu_j (+ mu_k) of every interior mode, broadcast over the interior shape"""
+    dims = len(shape)
+    total = 0.0
+    for axis, n in enumerate(shape):
+        total = total + neumann_eigenvalues(n).reshape([n if a == axis else 1 for a in range(dims)])
+    return total
+
+
+def start_field(initial):
+    """`initial` as float64, checked to be a 2D or 3D field with interior cells"""
+    T = np.asarray(initial, dtype=np.float64)
+    if T.ndim not in (2, 3) or min(T.shape) < 3:
+        raise ValueError(f"Expected a 2D or 3D field of at least 3 cells per axis (ghost cells included), "
+                         f"got shape {T.shape}")
+    return T
+
+
+def semi_discrete_solution(initial, alpha, dx, t):
+    """Field at physical time t from `initial` (ghost cells included), exact in time"""
+    T = start_field(initial)
+    X = modes(T[(slice(1, -1),) * T.ndim])
+    X *= np.exp(alpha * t / (dx * dx) * laplacian_eigenvalues(X.shape))
+    return field_from_modes(X, T.shape)
+
+
+def explicit_solution(initial, alpha, dx, steps):
+    """Field after `steps` steps of the explicit stencil scheme from `initial` (ghost cells included).
+
+    `steps` may also be a sequence of step counts; the fields are then returned
+    as a list, all from one forward transform. The scheme reads the start
+    field's ghost cells in its first step, so a start field whose ghost cells
+    are not Neumann copies of the interior takes that step explicitly.
+    """
+    from .backends.numpy_engine import numpy3d_step, numpy_step
+
+    T = start_field(initial)
+    dims = T.ndim
+    coef = stencil_coefficient(alpha, dx, dims)
+    counts = [steps] if np.isscalar(steps) else list(steps)
+
+    start, offset = T, 0
+    bounded = T.copy()
+    (neumann_boundaries_3d if dims == 3 else neumann_boundaries)(bounded)
+    if not np.array_equal(bounded, T) and any(n > 0 for n in counts):
+        start = T.copy()
+        if dims == 3:
+            interior = tuple(n - 2 for n in T.shape)
+            numpy3d_step(T, start, coef, np.empty(interior), np.empty(interior))
+            neumann_boundaries_3d(start)
+        else:
+            numpy_step(T, start, coef)
+            neumann_boundaries(start)
+        offset = 1
+
+    X = modes(start[(slice(1, -1),) * dims])
+    growth = 1.0 + coef * laplacian_eigenvalues(X.shape)
+    fields = [T.copy() if n == 0 else field_from_modes(X * growth ** (n - offset), T.shape) for n in counts]
+    return fields[0] if np.isscalar(steps) else fields
+
+
+def relative_error(field, reference):
+    """Relative L2 error over the interior cells"""
+    diff = np.asarray(field)[1:-1, 1:-1] - reference[1:-1, 1:-1]
+    return float(np.linalg.norm(diff) / np.linalg.norm(reference[1:-1, 1:-1]))
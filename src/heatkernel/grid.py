@@ -0,0 +1,58 @@
+"""Grid helpers shared by the Python backends (mirror src/core/*.h)."""
+
+import numpy as np
+
+# dt = 0.24 * dx^2 / alpha keeps alpha*dt/dx^2 below the 0.25 stability limit;
+# the 3D stencil has six neighbours, so its limit is 1/6
+STABILITY_FACTOR = 0.24
+STABILITY_FACTOR_3D = 0.16
+
+
+def time_step(alpha, dx, dimension=2):
+    """Explicit time step used by every stage"""
+    factor = STABILITY_FACTOR_3D if dimension == 3 else STABILITY_FACTOR
+    return factor * dx * dx / alpha
+
+
+def stencil_coefficient(alpha, dx, dimension=2):
+    """alpha*dt/dx^2, evaluated in the same order as the stage solvers"""
+    dt = time_step(alpha, dx, dimension)
+    return alpha * dt/(dx*dx)
+
+
+def initial_field(size, dtype=np.float64, dimension=2):
+    """Zero field with a single hot spot at the centre"""
+    T = np.zeros((size,) * dimension, dtype=dtype)
+    T[(size // 2,) * dimension] = 100.0
+    return T
+
+
+def prepare_field(size, initial=None, dtype=np.float64, dimension=2):
+    """Return a writable copy of `initial`, or the default hot-spot field"""
+    if initial is None:
+        return initial_field(size, dtype, dimension)
+    T = np.array(initial, dtype=dtype, copy=True)
+    if T.shape != (size,) * dimension:
+        raise ValueError(f"Initial field has shape {T.shape}, expected {(size,) * dimension}")
+    return T
+
+
+def neumann_boundaries(T):
+    """Zero-gradient boundaries, same result as neumann_boundaries_contig.
+
+    Works on a single field or on a (batch, size, size) stack of them.
+    """
+    T[..., 0, :] = T[..., 1, :]
+    T[..., -1, :] = T[..., -2, :]
+    T[..., :, 0] = T[..., :, 1]
+    T[..., :, -1] = T[..., :, -2]
+
+
+def neumann_boundaries_3d(T):
+    """Zero-gradient faces, same order as neumann_boundaries_3d in C"""
+    T[:, :, 0] = T[:, :, 1]
+    T[:, :, -1] = T[:, :, -2]
+    T[:, 0, :] = T[:, 1, :]
+    T[:, -1, :] = T[:, -2, :]
+    T[0] = T[1]
+    T[-1] = T[-2]
@@ -0,0 +1,171 @@
+"""ctypes bindings to the shared stencil library in src/lib.
+
+NumPy arrays are handed to C as raw pointers, so the kernels read and write
+the caller's buffers directly. Arrays must be C-contiguous float64.
+"""
+
+import ctypes
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from .grid import prepare_field
+from .paths import REPO_ROOT, TUNING_CACHE
+
+LIB_DIR = os.path.join(REPO_ROOT, 'src', 'lib')
+LIB_NAME = 'libheatkernel.dylib' if sys.platform == 'darwin' else 'libheatkernel.so'
+ABI_VERSION = 3
+
+KERNELS = {
+    'contig': 5,
+    'blocked': 6,
+    'vectorized': 7,
+    'openmp': 8,
+    'arch': 9,
+}
+
+_STATUS = {
+    -1: 'invalid argument',
+    -2: 'out of memory',
+}
+
+_lib = None
+
+
+class NativeError(RuntimeError):
+    pass
+
+
+def library_path():
+    return os.environ.get('HEATKERNEL_LIB', os.path.join(LIB_DIR, LIB_NAME))
+
+
+def load_library(build=True):
+    """Load (building with make if missing) the shared kernel library once"""
+    global _lib
+    if _lib is not None:
+        return _lib
+
+    path = library_path()
+    if build and not os.path.exists(path):
+        subprocess.run(['make', '-s', '-C', LIB_DIR], check=True)
+
+    lib = ctypes.CDLL(path)
+    field = np.ctypeslib.ndpointer(dtype=np.float64, ndim=2, flags='C_CONTIGUOUS,WRITEABLE')
+    timings = np.ctypeslib.ndpointer(dtype=np.float64, ndim=1, flags='C_CONTIGUOUS,WRITEABLE')
+    tile = np.ctypeslib.ndpointer(dtype=np.intc, ndim=1, shape=(3,), flags='C_CONTIGUOUS,WRITEABLE')
+
+    lib.heat_kernels_version.restype = ctypes.c_int
+    lib.heat_kernels_version.argtypes = []
+    lib.heat_solve.restype = ctypes.c_int
+    lib.heat_solve.argtypes = [field, field, ctypes.c_int, ctypes.c_int, ctypes.c_double,
+                               ctypes.c_double, ctypes.c_int, ctypes.c_int, tile, ctypes.c_char_p, timings]
+
+    stack = np.ctypeslib.ndpointer(dtype=np.float64, ndim=3, flags='C_CONTIGUOUS,WRITEABLE')
+    params = np.ctypeslib.ndpointer(dtype=np.float64, ndim=1, flags='C_CONTIGUOUS')
+    lib.heat_solve_batch.restype = ctypes.c_int
+    lib.heat_solve_batch.argtypes = [stack, stack, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                     params, params, ctypes.c_int, tile, ctypes.c_char_p, timings]
+
+    version = lib.heat_kernels_version()
+    if version != ABI_VERSION:
+        raise NativeError(f"{path} has ABI version {version}, expected {ABI_VERSION}; rebuild with 'make -C src/lib'")
+
+    _lib = lib
+    return lib
+
+
+def _check(status, entry='heat_solve'):
+    if status != 0:
+        raise NativeError(f"{entry} failed: {_STATUS.get(status, status)}")
+
+
+def _kernel_id(kernel):
+    try:
+        return KERNELS[kernel]
+    except KeyError:
+        raise ValueError(f"Unknown kernel '{kernel}', expected one of {sorted(KERNELS)}") from None
+
+
+class NativeKernel:
+    """In-process handle on one kernel, reusing its scratch buffer between calls.
+
+    `tile` is the (row_block, col_block, temporal_block) of the blocked
+    kernels. None or 0 entries are chosen per call as the stage binaries
+    choose them: the autotune entry of the kernel's stage in `tuning_cache`
+    for this host, grid size and threads, else the stages' 32x64x4 default.
+    `tuning_cache=''` skips the cache. The shape of the last call is in
+    `last_tile`.
+    """
+
+    def __init__(self, kernel='openmp', threads=0, tile=None, tuning_cache=TUNING_CACHE):
+        self.lib = load_library()
+        self.kernel = kernel
+        self.kernel_id = _kernel_id(kernel)
+        self.threads = threads or 0
+        self.tile = tuple(tile) if tile else (0, 0, 0)
+        if len(self.tile) != 3:
+            raise ValueError(f"Expected tile as (row_block, col_block, temporal_block), got {tile}")
+        self.tuning_cache = os.fsencode(tuning_cache)
+        self.last_tile = None
+        self._scratch = None
+        self._timings = np.zeros(5)
+        self._tile = np.zeros(3, dtype=np.intc)
+
+    def _scratch_for(self, T):
+        if self._scratch is None or self._scratch.shape != T.shape:
+            self._scratch = np.empty_like(T)
+        return self._scratch
+
+    def advance(self, T, steps, alpha, dx):
+        """Advance T in place by `steps` steps; returns the timing breakdown"""
+        if T.ndim != 2 or T.shape[0] != T.shape[1]:
+            raise ValueError(f"Expected a square 2D field, got shape {T.shape}")
+        self._tile[:] = self.tile
+        _check(self.lib.heat_solve(T, self._scratch_for(T), T.shape[0], steps, alpha, dx,
+                                   self.threads, self.kernel_id, self._tile, self.tuning_cache, self._timings))
+        self.last_tile = None if self.kernel == 'contig' else tuple(self._tile.tolist())
+        return self._timing_dict()
+
+    def advance_batch(self, T, steps, alpha, dx):
+        """Advance a (batch, size, size) stack in place with heat_solve_batch.
+
+        `alpha` and `dx` are per-scenario arrays (or scalars shared by all).
+        All scenarios run through the OpenMP kernel whatever `kernel` is,
+        with the tuned tiles of stage 08.
+        """
+        if T.ndim != 3 or T.shape[1] != T.shape[2]:
+            raise ValueError(f"Expected a (batch, size, size) stack, got shape {T.shape}")
+        batch = T.shape[0]
+        alpha = np.ascontiguousarray(np.broadcast_to(np.asarray(alpha, dtype=np.float64), (batch,)))
+        dx = np.ascontiguousarray(np.broadcast_to(np.asarray(dx, dtype=np.float64), (batch,)))
+        self._tile[:] = self.tile
+        _check(self.lib.heat_solve_batch(T, self._scratch_for(T), batch, T.shape[1], steps, alpha, dx,
+                                         self.threads, self._tile, self.tuning_cache, self._timings),
+               'heat_solve_batch')
+        self.last_tile = tuple(self._tile.tolist())
+        return self._timing_dict()
+
+    def _timing_dict(self):
+        total, stencil, boundary, swap, other = self._timings.tolist()
+        return {
+            'total_time': total,
+            'stencil_time': stencil,
+            'boundary_time': boundary,
+            'swap_time': swap,
+            'other_time': other,
+        }
+
+
+def call_overhead(kernel='openmp', size=100, calls=200, threads=0):
+    """Mean wall time of a zero-step heat_solve call, i.e. the binding overhead"""
+    handle = NativeKernel(kernel, threads)
+    T = prepare_field(size)
+    handle.advance(T, 0, 0.2, 0.01)
+    start = time.perf_counter()
+    for _ in range(calls):
+        handle.advance(T, 0, 0.2, 0.01)
+    return (time.perf_counter() - start) / calls
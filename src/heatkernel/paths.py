@@ -0,0 +1,13 @@
+"""Repository locations used by the package."""
+
+import os
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(PACKAGE_DIR, '..', '..'))
+STAGES_DIR = os.path.join(REPO_ROOT, 'stages')
+RESULTS_DIR = os.path.join(REPO_ROOT, 'results', 'latest')
+TUNING_CACHE = os.environ.get('HEATKERNEL_TUNING_CACHE', os.path.join(REPO_ROOT, 'results', 'tuning_cache.txt'))
+
+
+def stage_dir(stage):
+    return os.path.join(STAGES_DIR, stage)
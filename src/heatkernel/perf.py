@@ -0,0 +1,39 @@
+"""Derived hardware-counter metrics from the "perf" block of metrics.json.
+
+The C stages write raw per-phase counts when run with ``--perf`` (see
+src/core/perf_counters.h); this turns them into rates that compare across
+grid sizes and thread counts: IPC, L1D/LLC miss rates, backend-stall
+fraction and counts per interior cell update.
+"""
+
+
+def _ratio(num, den):
+    return num / den if num is not None and den else None
+
+
+def derived_counters(counts, cell_updates):
+    """Rates of one phase (or the total) of a perf block; None where a counter is missing"""
+    cycles = counts.get('cycles')
+    return {
+        'ipc': _ratio(counts.get('instructions'), cycles),
+        'l1d_miss_rate': _ratio(counts.get('l1d_misses'), counts.get('l1d_loads')),
+        'llc_miss_rate': _ratio(counts.get('llc_misses'), counts.get('llc_references')),
+        'backend_stall_fraction': _ratio(counts.get('stalled_cycles_backend'), cycles),
+        'cycles_per_cell': _ratio(cycles, cell_updates),
+        'instructions_per_cell': _ratio(counts.get('instructions'), cell_updates),
+        'l1d_misses_per_cell': _ratio(counts.get('l1d_misses'), cell_updates),
+        'llc_misses_per_cell': _ratio(counts.get('llc_misses'), cell_updates),
+    }
+
+
+def perf_summary(metrics):
+    """Derived stencil and total counters of a metrics.json dict, or None without counters"""
+    perf = metrics.get('perf')
+    if not perf or not perf.get('available'):
+        return None
+    cell_updates = float(metrics['grid_size'] - 2) ** 2 * metrics['time_steps']
+    summary = {'hardware': perf.get('hardware', False), 'reason': perf.get('reason', '')}
+    summary['total'] = derived_counters(perf.get('total', {}), cell_updates)
+    for phase, counts in perf.get('phases', {}).items():
+        summary[phase] = derived_counters(counts, cell_updates)
+    return summary
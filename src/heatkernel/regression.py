@@ -0,0 +1,103 @@
+"""Performance regression check against archived results.
+
+`make archive` keeps past results directories under results/archive. A run
+point is identified by (stage, grid size, threads, host, precision), and its
+samples are the time per step of every timed repetition: the raw samples
+bench_runner.py stores under "statistics", or the single total_time of a
+plain run. Baseline samples are pooled over the archives given. Each
+directory is read through its own results index (heatkernel.store).
+
+Each point of the current results is compared with its baseline by the
+Mann-Whitney U test (heatkernel.stats). It is a regression when the test
+rejects at level `alpha` and the median time per step grows by more than
+`threshold`. Points whose sample counts cannot reach `alpha` at all (e.g. one
+plain `make run` against another) are reported as inconclusive, not passed.
+"""
+
+import glob
+import os
+
+import numpy as np
+
+from .stats import mann_whitney, min_p_value
+from .store import open_results, stage_runs
+
+KEY_FIELDS = ('stage', 'grid_size', 'threads', 'host', 'precision')
+
+
+def archive_dirs(archive_dir, count=1):
+    """The `count` most recent results_* archives (all for count <= 0), oldest first"""
+    dirs = sorted(d for d in glob.glob(os.path.join(archive_dir, 'results_*')) if os.path.isdir(d))
+    return dirs if count <= 0 else dirs[-count:]
+
+
+def stage_results_dirs(results_dir):
+    """stage_results directories of a results directory, one per grid for multi-size benches"""
+    dirs = [os.path.join(results_dir, 'stage_results')] + sorted(glob.glob(os.path.join(results_dir, 'grid_*', 'stage_results')))
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def run_key(stage, row):
+    """(stage, grid_size, threads, host, precision) of an indexed result row of `stage`.
+
+    The stage is its results directory name: metrics.json files written before
+    every stage recorded its own name do not tell them apart.
+    """
+    metrics = row['metrics']
+    threads = row['threads'] if row['threads'] is not None else metrics.get('threads')
+    return stage, metrics.get('grid_size'), threads, metrics.get('host'), metrics.get('precision', 'float64')
+
+
+def step_time_samples(metrics):
+    """Seconds per step of every timed repetition of a run"""
+    steps = metrics['time_steps']
+    samples = metrics.get('statistics', {}).get('total_time', {}).get('samples') or [metrics['total_time']]
+    return [t / steps for t in samples]
+
+
+def collect_samples(results_dir, store=None):
+    """{key: time per step samples} of the stage runs in `results_dir`, indexing it first.
+
+    `store` defaults to the results index of `results_dir`.
+    """
+    conn = open_results(results_dir, store)
+    samples = {}
+    for stage_results in stage_results_dirs(results_dir):
+        for stage, rows in stage_runs(conn, stage_results).items():
+            for row in rows:
+                if row['metrics'].get('time_steps'):
+                    samples.setdefault(run_key(stage, row), []).extend(step_time_samples(row['metrics']))
+    return samples
+
+
+def compare(baseline, current, alpha=0.05, threshold=0.05):
+    """One row per point of `current`, with its verdict against `baseline`.
+
+    Verdicts: slower (a regression), faster, unchanged, inconclusive (too few
+    samples for the test to reach `alpha`) and new (no baseline samples).
+    """
+    rows = []
+    for key in sorted(current, key=lambda k: tuple('' if v is None else str(v) for v in k)):
+        row = dict(zip(KEY_FIELDS, key))
+        cur = current[key]
+        row.update(current_median=float(np.median(cur)), current_count=len(cur),
+                   baseline_median=None, baseline_count=0, change=None, p_value=None)
+        base = baseline.get(key)
+        if not base:
+            row['verdict'] = 'new'
+            rows.append(row)
+            continue
+        row.update(baseline_median=float(np.median(base)), baseline_count=len(base))
+        row['change'] = row['current_median'] / row['baseline_median'] - 1.0
+        if min_p_value(len(cur), len(base)) > alpha:
+            row['verdict'] = 'inconclusive'
+        else:
+            _, row['p_value'] = mann_whitney(cur, base)
+            if row['p_value'] < alpha and row['change'] > threshold:
+                row['verdict'] = 'slower'
+            elif row['p_value'] < alpha and row['change'] < -threshold:
+                row['verdict'] = 'faster'
+            else:
+                row['verdict'] = 'unchanged'
+        rows.append(row)
+    return rows
@@ -0,0 +1,55 @@
+"""Roofline metrics of the stencils (same model as src/core/roofline.h).
+
+Per interior cell update the 5-point stencil does 7 flops (the 7-point 3D
+stencil 9) and, with neighbours reused from cache, moves 16 bytes of main
+memory (one read, one write); temporal blocking of depth k divides the
+traffic by k. float32 and mixed-precision fields move half the bytes. These
+are algorithmic minimums, so the NumPy engines' temporaries are not counted
+either. The implicit ADI scheme (method='adi', src/core/adi.h) does 20 flops
+and moves 32 bytes per cell and step. The spectral backends (method='spectral')
+take no steps at all, so they get no roofline block.
+"""
+
+import json
+import os
+
+FLOPS_PER_CELL = 7.0
+FLOPS_PER_CELL_3D = 9.0
+BYTES_PER_CELL = 16.0
+ADI_FLOPS_PER_CELL = 20.0
+ADI_BYTES_PER_CELL = 32.0
+VALUE_BYTES = {'float64': 8, 'float32': 4, 'mixed': 4}
+
+
+def roofline_metrics(size, steps, seconds, temporal_block=1, dimension=2, precision='float64', method='stencil'):
+    """The "roofline" block of metrics.json, None for a method without stencil steps"""
+    if method == 'spectral':
+        return None
+    cells = float(size - 2) ** dimension
+    if method == 'adi':
+        flops = ADI_FLOPS_PER_CELL * cells
+        bytes_ = ADI_BYTES_PER_CELL * cells
+    else:
+        flops = (FLOPS_PER_CELL_3D if dimension == 3 else FLOPS_PER_CELL) * cells
+        bytes_ = 2 * VALUE_BYTES[precision] * cells / max(temporal_block, 1)
+    rate = steps / seconds if seconds > 0 else 0.0
+    return {
+        'flops_per_step': flops,
+        'bytes_per_step': bytes_,
+        'arithmetic_intensity': flops / bytes_,
+        'gflops': flops * rate * 1e-9,
+        'gbytes_per_s': bytes_ * rate * 1e-9,
+    }
+
+
+def attainable_gflops(intensity, peak_gflops, bandwidth_gbs):
+    """Roofline bound min(peak, intensity * bandwidth)"""
+    return min(peak_gflops, intensity * bandwidth_gbs)
+
+
+def load_machine(path):
+    """Machine ceilings written by the roofline microbenchmark, or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
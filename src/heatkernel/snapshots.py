@@ -0,0 +1,87 @@
+"""Field snapshot streams (the reading side of src/core/snapshot.h).
+
+Stage 08 run with ``--snapshot-every=N`` writes ``snapshots/snapshot_<step>.npy``
+(or ``.npyz``, zlib-compressed row chunks) from a background thread and
+appends each finished file to ``snapshots/index.jsonl``; a ``{"done": true}``
+line ends the run. `iter_snapshots` follows that index and yields snapshots
+lazily, also while the run is still going. `solve_snapshots` produces the
+same stream in-process from a Python backend.
+"""
+
+import json
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from .backends import get_backend
+from .solver import DEFAULT_BACKEND
+
+INDEX = 'index.jsonl'
+
+
+def read_snapshot(path):
+    """Load a snapshot file, .npy (memory-mapped) or chunked .npyz"""
+    if not path.endswith('.npyz'):
+        return np.load(path, mmap_mode='r')
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran_order, dtype = read_header(f)
+        chunks, = struct.unpack('<I', f.read(4))
+        sizes = struct.unpack(f'<{chunks}Q', f.read(8 * chunks))
+        data = b''.join(zlib.decompress(f.read(n)) for n in sizes)
+    return np.frombuffer(data, dtype=dtype).reshape(shape, order='F' if fortran_order else 'C')
+
+
+def iter_snapshots(directory, follow=False, poll=0.1, timeout=None):
+    """Yield (step, field) for each snapshot in a run's snapshots directory.
+
+    With follow=True, wait for new snapshots until the writer marks the run
+    done, or until `timeout` seconds pass without a new one.
+    """
+    index = os.path.join(directory, INDEX)
+    last = time.time()
+    while follow and not os.path.exists(index):
+        if timeout is not None and time.time() - last > timeout:
+            return
+        time.sleep(poll)
+
+    with open(index) as f:
+        pending = ''
+        while True:
+            line = f.readline()
+            if not line.endswith('\n'):
+                # Not written yet (or only partly): wait for the rest of the line
+                pending += line
+                if not follow or (timeout is not None and time.time() - last > timeout):
+                    return
+                time.sleep(poll)
+                continue
+            entry = json.loads(pending + line)
+            pending = ''
+            if entry.get('done'):
+                return
+            last = time.time()
+            yield entry['step'], read_snapshot(os.path.join(directory, entry['file']))
+
+
+def solve_snapshots(size, steps, every, alpha=0.2, dx=0.01, backend=DEFAULT_BACKEND, initial=None,
+                    float32=False, **options):
+    """Generator running a Python backend `every` steps at a time and yielding (step, field).
+
+    Like stage 08 it yields at each multiple of `every` up to `steps`.
+    Nothing is computed until the next snapshot is requested, so a consumer
+    processes the run as a stream.
+    """
+    run = get_backend(backend)
+    field, done = initial, 0
+    while done + every <= steps:
+        field, _, _ = run(size, every, alpha, dx, initial=field, **options)
+        if field is None:
+            raise ValueError(f"Backend '{backend}' does not return its field, run stage 08 with --snapshot-every")
+        done += every
+        yield done, field.astype(np.float32) if float32 else field
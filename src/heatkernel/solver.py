@@ -0,0 +1,127 @@
+"""High level solver API."""
+
+import json
+import os
+import socket
+from dataclasses import dataclass, field as dc_field
+
+import numpy as np
+
+from .backends import get_backend
+from .checkpoint import run_with_checkpoints
+from .grid import time_step
+from .roofline import roofline_metrics
+from .validation import field_stats
+
+DEFAULT_BACKEND = 'numpy-inplace'
+
+
+@dataclass
+class SolveResult:
+    """Final field plus the timing breakdown of one solve"""
+    field: object
+    timings: dict
+    backend: str
+    size: int
+    steps: int
+    alpha: float
+    dx: float
+    extras: dict = dc_field(default_factory=dict)
+
+    @property
+    def dt(self):
+        # Implicit backends report the time step they were given
+        return self.extras.get('dt') or time_step(self.alpha, self.dx, self.extras.get('dimension', 2))
+
+    @property
+    def total_time(self):
+        return self.timings['total_time']
+
+    @property
+    def performance(self):
+        return self.steps / self.total_time
+
+    def to_metrics(self, stage=None):
+        """metrics.json dictionary in the same layout the stages write"""
+        metrics = {
+            'stage': stage or self.backend,
+            'backend': self.backend,
+            'host': socket.gethostname(),
+            'grid_size': self.size,
+            'time_steps': self.steps,
+            'total_time': self.total_time,
+            'time_per_step': self.total_time / self.steps * 1000,
+            'performance': self.performance,
+            'breakdown': {
+                'stencil_time': self.timings['stencil_time'],
+                'boundary_time': self.timings['boundary_time'],
+                'swap_time': self.timings['swap_time'],
+                'other_time': self.timings['other_time'],
+            },
+        }
+        if 'checkpoint_time' in self.timings:
+            metrics['breakdown']['checkpoint_time'] = self.timings['checkpoint_time']
+        metrics['alpha'] = self.alpha
+        metrics['dx'] = self.dx
+        if self.field is not None:
+            metrics['field'] = field_stats(self.field)
+        roofline = roofline_metrics(self.size, self.steps, self.total_time,
+                                    self.extras.get('temporal_block', 1),
+                                    self.extras.get('dimension', 2),
+                                    self.extras.get('precision', 'float64'),
+                                    self.extras.get('method', 'stencil'))
+        if roofline:
+            metrics['roofline'] = roofline
+        metrics.update(self.extras)
+        return metrics
+
+    def write_metrics(self, output_dir, stage=None, dump_field=False):
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, 'metrics.json'), 'w') as f:
+            json.dump(self.to_metrics(stage), f, indent=2)
+        if dump_field and self.field is not None:
+            np.save(os.path.join(output_dir, 'field.npy'), self.field)
+
+
+class Solver:
+    """Reusable solver bound to a default backend.
+
+    Backend options (e.g. ``threads`` for the C stages) given here are used
+    for every solve unless overridden per call.
+    """
+
+    def __init__(self, backend=DEFAULT_BACKEND, **options):
+        get_backend(backend)
+        self.backend = backend
+        self.options = options
+
+    def solve(self, size, steps, alpha=0.2, dx=0.01, backend=None, initial=None,
+              checkpoint_every=0, checkpoint_dir=None, start_step=0, origin=None, **options):
+        """Run `steps` steps from `initial` (default: the hot spot).
+
+        With `checkpoint_every`, checkpoint.npy is written to `checkpoint_dir`
+        whenever start_step + steps done is a multiple of it; `origin` is the
+        initial-field path recorded alongside (see checkpoint.py).
+        The NumPy engines also take converge_tol/converge_every/residual to
+        stop at steady state; `steps` is then an upper bound. active_region=True
+        makes them skip the cells the heat front has not reached yet.
+        """
+        name = backend or self.backend
+        run = get_backend(name)
+        merged = dict(self.options) if name == self.backend else {}
+        merged.update(options)
+        if checkpoint_every and options.get('converge_tol'):
+            raise ValueError("converge_tol cannot be combined with checkpoint_every in the Python backends")
+        if checkpoint_every:
+            field, timings, extras = run_with_checkpoints(run, size, steps, alpha, dx, initial, checkpoint_every,
+                                                          checkpoint_dir or '.', start_step, origin, **merged)
+        else:
+            field, timings, extras = run(size, steps, alpha, dx, initial=initial, **merged)
+        # A converged run reports the steps it took
+        steps = extras.get('convergence', {}).get('steps', steps)
+        return SolveResult(field, timings, name, size, steps, alpha, dx, extras)
+
+
+def solve(size, steps, alpha=0.2, dx=0.01, backend=DEFAULT_BACKEND, initial=None, **options):
+    """One-shot convenience wrapper around Solver.solve"""
+    return Solver(backend).solve(size, steps, alpha, dx, initial=initial, **options)
@@ -0,0 +1,120 @@
+"""Summary statistics and significance tests for repeated benchmark runs.
+
+Only NumPy is required: the Mann-Whitney U test uses the exact permutation
+distribution for small samples and the tie-corrected normal approximation
+otherwise.
+"""
+
+import math
+from itertools import combinations
+
+import numpy as np
+
+EXACT_LIMIT = 20000  # largest C(n1 + n2, n1) enumerated for the exact test
+
+
+def bootstrap_ci(samples, statistic=np.median, confidence=0.95, resamples=2000, seed=0):
+    """Percentile bootstrap confidence interval of `statistic`"""
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.size < 2:
+        value = float(statistic(samples))
+        return value, value
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, samples.size, size=(resamples, samples.size))
+    estimates = statistic(samples[idx], axis=1)
+    tail = (1.0 - confidence) / 2 * 100
+    low, high = np.percentile(estimates, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def summarize(samples, confidence=0.95, resamples=2000, seed=0):
+    """min/median/mean/stddev and a bootstrap CI of the median"""
+    samples = np.asarray(samples, dtype=np.float64)
+    ci_low, ci_high = bootstrap_ci(samples, np.median, confidence, resamples, seed)
+    return {
+        'count': int(samples.size),
+        'min': float(samples.min()),
+        'max': float(samples.max()),
+        'median': float(np.median(samples)),
+        'mean': float(samples.mean()),
+        'stddev': float(samples.std(ddof=1)) if samples.size > 1 else 0.0,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'samples': [float(s) for s in samples],
+    }
+
+
+def _rankdata(x):
+    """Ranks starting at 1, ties get the average rank"""
+    order = np.argsort(x, kind='mergesort')
+    ordered = x[order]
+    ranks = np.empty(x.size, dtype=np.float64)
+    i = 0
+    while i < x.size:
+        j = i
+        while j + 1 < x.size and ordered[j + 1] == ordered[i]:
+            j += 1
+        ranks[order[i:j + 1]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def mann_whitney(a, b):
+    """Two-sided Mann-Whitney U test, returns (U of `a`, p-value)"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    n1, n2 = a.size, b.size
+    ranks = _rankdata(np.concatenate([a, b]))
+    offset = n1 * (n1 + 1) / 2
+    u1 = ranks[:n1].sum() - offset
+    distance = abs(u1 - n1 * n2 / 2)
+
+    if math.comb(n1 + n2, n1) <= EXACT_LIMIT:
+        picks = np.array(list(combinations(range(n1 + n2), n1)))
+        u_perm = ranks[picks].sum(axis=1) - offset
+        p = float(np.mean(np.abs(u_perm - n1 * n2 / 2) >= distance - 1e-9))
+        return float(u1), p
+
+    n = n1 + n2
+    _, counts = np.unique(ranks, return_counts=True)
+    tie_term = float(np.sum(counts ** 3 - counts)) / (n * (n - 1))
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term))
+    if sigma == 0:
+        return float(u1), 1.0
+    z = max(distance - 0.5, 0.0) / sigma
+    return float(u1), math.erfc(z / math.sqrt(2))
+
+
+def min_p_value(n1, n2):
+    """Smallest two-sided p-value the test can produce for these sample sizes"""
+    if math.comb(n1 + n2, n1) <= EXACT_LIMIT:
+        return 2 / math.comb(n1 + n2, n1)
+    return 0.0
+
+
+def select_threads(times_by_threads, alpha=0.05):
+    """Pick a thread count from repeated total_time samples.
+
+    The fastest median wins, unless fewer threads are not significantly
+    slower (Mann-Whitney, level `alpha`); then the smallest such count is
+    chosen. With too few samples for the test to ever reject, this falls
+    back to the fastest median. Returns (threads, details).
+    """
+    medians = {t: float(np.median(s)) for t, s in times_by_threads.items()}
+    fastest = min(medians, key=medians.get)
+    details = {'fastest_median': fastest, 'alpha': alpha, 'p_values': {}}
+
+    chosen = fastest
+    for threads in sorted(times_by_threads):
+        if threads >= chosen:
+            break
+        a, b = times_by_threads[threads], times_by_threads[fastest]
+        if min_p_value(len(a), len(b)) > alpha:
+            continue
+        _, p = mann_whitney(a, b)
+        details['p_values'][threads] = p
+        if p >= alpha:
+            chosen = threads
+            break
+    details['chosen'] = chosen
+    return chosen, details
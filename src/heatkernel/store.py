@@ -0,0 +1,326 @@
+"""SQLite store of benchmark results.
+
+Table `runs`: one row per measured point (stage, grid, steps, threads, tile
+shape), keyed by a canonical point key so interrupted sweeps can skip what
+is already stored.
+
+Table `results`: an index of the metrics.json files of one results
+directory, one row per file keyed by its path. Each results directory
+(results/latest, an archive) has its own index, RESULTS_STORE inside it
+(`results_store`), so archives carry theirs and unrelated trees never share
+one. `make run` and bench_runner.py add each stage's files as it finishes;
+`ingest_results` only parses files that are new or changed (mtime, size)
+and drops rows of files that are gone, so reports and plots query the store
+instead of globbing and re-parsing every run. `threads` is set for
+threads_<n> directories and `parent` is the directory above them, so a
+thread sweep is `thread_results(conn, <stage dir>)`.
+
+Table `renders`: digest of the result rows each report or plot was last
+rendered from (see `stale_digest`), so unchanged outputs are skipped.
+
+The full metrics.json dictionary is kept as JSON next to the indexed columns.
+Paths below the store's own directory are stored relative to it, so a copied
+or moved results directory keeps a valid index. The schema version is
+PRAGMA user_version.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+from .paths import REPO_ROOT
+
+# Sweep store (`runs`); the metrics.json index of a results directory is RESULTS_STORE inside it
+DEFAULT_STORE = os.path.join(REPO_ROOT, 'results', 'heatkernel.db')
+RESULTS_STORE = 'results_index.db'
+
+POINT_FIELDS = ('stage', 'grid_size', 'time_steps', 'threads',
+                'row_block', 'col_block', 'temporal_block', 'alpha', 'dx')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    point_key TEXT UNIQUE NOT NULL,
+    sweep TEXT,
+    stage TEXT NOT NULL,
+    grid_size INTEGER NOT NULL,
+    time_steps INTEGER NOT NULL,
+    threads INTEGER,
+    row_block INTEGER,
+    col_block INTEGER,
+    temporal_block INTEGER,
+    alpha REAL,
+    dx REAL,
+    repetitions INTEGER,
+    total_time REAL,
+    performance REAL,
+    ci_low REAL,
+    ci_high REAL,
+    metrics TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_stage_grid ON runs (stage, grid_size, threads);
+CREATE INDEX IF NOT EXISTS runs_sweep ON runs (sweep);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    dir TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    stage TEXT,
+    threads INTEGER,
+    grid_size INTEGER,
+    time_steps INTEGER,
+    total_time REAL,
+    time_per_step REAL,
+    performance REAL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    metrics TEXT NOT NULL,
+    ingested REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_dir ON results (dir);
+CREATE INDEX IF NOT EXISTS results_parent ON results (parent, threads);
+CREATE INDEX IF NOT EXISTS results_stage ON results (stage, grid_size, threads);
+CREATE TABLE IF NOT EXISTS renders (
+    output TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    rendered REAL NOT NULL
+);
+PRAGMA user_version = 1;
+"""
+
+RESULT_COLUMNS = ('stage', 'grid_size', 'time_steps', 'total_time', 'time_per_step', 'performance')
+_THREADS_DIR = re.compile(r'threads?_(\d+)$')
+
+
+def connect(path=DEFAULT_STORE):
+    """Open (and create if needed) a result store"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def point_key(point):
+    """Canonical string identifying a point; unset fields are left out"""
+    return json.dumps({k: point[k] for k in POINT_FIELDS if point.get(k) is not None}, sort_keys=True)
+
+
+def completed_keys(conn, sweep=None):
+    """Point keys already stored, optionally restricted to one sweep"""
+    if sweep is None:
+        rows = conn.execute("SELECT point_key FROM runs")
+    else:
+        rows = conn.execute("SELECT point_key FROM runs WHERE sweep = ?", (sweep,))
+    return {row[0] for row in rows}
+
+
+def record_run(conn, point, metrics, sweep=None):
+    """Insert (or replace) the aggregated metrics of one point"""
+    stats = metrics.get('statistics', {}).get('performance', {})
+    row = {k: point.get(k) for k in POINT_FIELDS}
+    row.update(
+        point_key=point_key(point),
+        sweep=sweep,
+        repetitions=metrics.get('statistics', {}).get('repetitions', 1),
+        total_time=metrics['total_time'],
+        performance=metrics['performance'],
+        ci_low=stats.get('ci_low'),
+        ci_high=stats.get('ci_high'),
+        metrics=json.dumps(metrics),
+        created=time.time(),
+    )
+    columns = ', '.join(row)
+    placeholders = ', '.join(f':{k}' for k in row)
+    with conn:
+        conn.execute(f"INSERT OR REPLACE INTO runs ({columns}) VALUES ({placeholders})", row)
+
+
+def query_runs(conn, order_by='performance DESC', **filters):
+    """Stored runs matching column=value filters, with metrics parsed"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    unknown = set(filters) - columns
+    if unknown:
+        raise ValueError(f"Unknown run columns: {', '.join(sorted(unknown))}")
+    where = ' AND '.join(f"{k} IS ?" for k in filters) or '1'
+    rows = conn.execute(f"SELECT * FROM runs WHERE {where} ORDER BY {order_by}", tuple(filters.values()))
+    results = []
+    for row in rows:
+        result = dict(row)
+        result['metrics'] = json.loads(result['metrics'])
+        results.append(result)
+    return results
+
+
+def results_root(directory):
+    """Results directory `directory` belongs to: the nearest one holding a RESULTS_STORE,
+    else the one above its stage_results, else `directory` itself"""
+    directory = os.path.abspath(directory)
+    current = directory
+    while True:
+        if os.path.exists(os.path.join(current, RESULTS_STORE)):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    parts = directory.split(os.sep)
+    if 'stage_results' in parts:
+        return os.sep.join(parts[:parts.index('stage_results')]) or os.sep
+    return directory
+
+
+def results_store(directory):
+    """Path of the metrics.json index of the results directory holding `directory`"""
+    return os.path.join(results_root(directory), RESULTS_STORE)
+
+
+def store_base(conn):
+    """Directory the paths of a store are relative to: the one holding its file"""
+    filename = conn.execute("PRAGMA database_list").fetchone()[2]
+    return os.path.dirname(os.path.realpath(filename)) if filename else REPO_ROOT
+
+
+def path_key(conn, path):
+    """Key of a file or directory in the results index: relative to the store's directory when inside it"""
+    path = os.path.realpath(path)
+    base = store_base(conn)
+    if path == base or path.startswith(base + os.sep):
+        return os.path.relpath(path, base)
+    return path
+
+
+def ingest_results(conn, root):
+    """Index new or changed metrics.json files under `root` and forget deleted ones.
+
+    Returns (added, updated, removed) counts.
+    """
+    root_key = path_key(conn, root)
+    prefix = '' if root_key == os.curdir else root_key + os.sep
+    known = {row[0]: (row[1], row[2]) for row in conn.execute(
+        "SELECT path, mtime_ns, size FROM results WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))}
+
+    added = updated = 0
+    seen = set()
+    with conn:
+        for directory, _, files in os.walk(root):
+            if 'metrics.json' not in files:
+                continue
+            path = os.path.join(directory, 'metrics.json')
+            key = path_key(conn, path)
+            seen.add(key)
+            st = os.stat(path)
+            if known.get(key) == (st.st_mtime_ns, st.st_size):
+                continue
+            try:
+                with open(path) as f:
+                    metrics = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            match = _THREADS_DIR.search(os.path.basename(directory))
+            row = {k: metrics.get(k) for k in RESULT_COLUMNS}
+            row.update(
+                path=key,
+                dir=path_key(conn, directory),
+                parent=path_key(conn, os.path.dirname(directory)),
+                threads=int(match.group(1)) if match else None,
+                mtime_ns=st.st_mtime_ns,
+                size=st.st_size,
+                metrics=json.dumps(metrics),
+                ingested=time.time(),
+            )
+            columns = ', '.join(row)
+            placeholders = ', '.join(f':{k}' for k in row)
+            conn.execute(f"INSERT OR REPLACE INTO results ({columns}) VALUES ({placeholders})", row)
+            if key in known:
+                updated += 1
+            else:
+                added += 1
+        removed = set(known) - seen
+        conn.executemany("DELETE FROM results WHERE path = ?", [(key,) for key in removed])
+    return added, updated, len(removed)
+
+
+def open_results(root, path=None):
+    """Connect to the store with the results under `root` indexed and up to date.
+
+    The store defaults to the index of the results directory holding `root`.
+    """
+    conn = connect(path or results_store(root))
+    ingest_results(conn, root)
+    return conn
+
+
+def query_results(conn, order_by='path', **filters):
+    """Indexed results matching column=value filters, with metrics parsed.
+
+    `dir` and `parent` filters take plain paths and are converted with path_key.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+    unknown = set(filters) - columns
+    if unknown:
+        raise ValueError(f"Unknown result columns: {', '.join(sorted(unknown))}")
+    filters = {k: path_key(conn, v) if k in ('dir', 'parent', 'path') else v for k, v in filters.items()}
+    where = ' AND '.join(f"{k} IS ?" for k in filters) or '1'
+    rows = conn.execute(f"SELECT * FROM results WHERE {where} ORDER BY {order_by}", tuple(filters.values()))
+    results = []
+    for row in rows:
+        result = dict(row)
+        result['metrics'] = json.loads(result['metrics'])
+        results.append(result)
+    return results
+
+
+def stage_result(conn, directory):
+    """The result stored directly in `directory`, None if there is none"""
+    rows = query_results(conn, dir=directory)
+    return rows[0] if rows else None
+
+
+def thread_results(conn, directory):
+    """threads_<n> results under `directory`, by thread count"""
+    return [row for row in query_results(conn, order_by='threads', parent=directory) if row['threads'] is not None]
+
+
+def stage_runs(conn, stage_results_dir):
+    """{stage: rows} for the stage directories under `stage_results_dir`: their threads_<n> runs if any,
+    the stage's own result otherwise"""
+    runs = {os.path.basename(row['dir']): [row] for row in query_results(conn, order_by='dir', parent=stage_results_dir)}
+    prefix = path_key(conn, stage_results_dir) + os.sep
+    threaded = {}
+    rows = conn.execute("SELECT * FROM results WHERE threads IS NOT NULL AND substr(parent, 1, ?) = ? "
+                        "ORDER BY parent, threads", (len(prefix), prefix))
+    for row in rows:
+        if os.sep in row['parent'][len(prefix):]:
+            continue
+        result = dict(row)
+        result['metrics'] = json.loads(result['metrics'])
+        threaded.setdefault(os.path.basename(row['parent']), []).append(result)
+    runs.update(threaded)
+    return dict(sorted(runs.items()))
+
+
+def stale_digest(conn, output, rows, *extra):
+    """Digest of `rows` (and any `extra` inputs) if `output` must be re-rendered, None if it is up to date"""
+    h = hashlib.sha1()
+    for row in rows:
+        h.update(f"{row['path']}:{row['mtime_ns']}:{row['size']}\n".encode())
+    for item in extra:
+        h.update(repr(item).encode())
+    digest = h.hexdigest()
+    stored = conn.execute("SELECT digest FROM renders WHERE output = ?", (path_key(conn, output),)).fetchone()
+    if stored and stored[0] == digest and os.path.exists(output):
+        return None
+    return digest
+
+
+def mark_rendered(conn, output, digest):
+    """Remember the digest `output` was rendered from"""
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO renders (output, digest, rendered) VALUES (?, ?, ?)",
+                     (path_key(conn, output), digest, time.time()))
@@ -0,0 +1,136 @@
+"""Parameter sweeps over stages, grid sizes, thread counts and tile shapes.
+
+A sweep matrix is a dictionary (usually loaded from JSON)::
+
+    {
+      "stages": ["06_cache_blocking", "08_openmp_parallel"],
+      "sizes": [100, 200, 500],
+      "steps": 2000,                  # or {"100": 20000, "500": 2000}
+      "threads": [1, 2, 4, 8],        # stages 08/09 only
+      "tiles": {"row_block": [16, 32], "col_block": [64], "temporal_block": [1, 4]},
+      "warmup": 1, "repetitions": 3
+    }
+
+Thread counts only apply to the OpenMP stages and tile shapes only to the
+tiled stages 06-09; the other stages get one point per grid size.
+
+Single-threaded points run concurrently, each pinned to its own core.
+Multi-threaded points then run one at a time with the machine to
+themselves. Points already in the store are skipped, so an interrupted
+sweep resumes where it stopped.
+"""
+
+import os
+import queue
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import product
+
+from .benchmark import THREADED_STAGES, benchmark_point
+from .store import completed_keys, point_key, record_run
+
+TILED_STAGES = ('06_cache_blocking', '07_vectorization', '08_openmp_parallel', '09_arch_specific',
+                '08_openmp_persistent')
+TILE_OPTIONS = ('row_block', 'col_block', 'temporal_block')
+
+
+def _steps_for(spec, size):
+    steps = spec['steps']
+    if isinstance(steps, dict):
+        return int(steps.get(str(size), steps.get(size)))
+    return int(steps)
+
+
+def expand_matrix(spec):
+    """All points of a sweep matrix, in order and without duplicates"""
+    tiles = spec.get('tiles', {})
+    tile_shapes = list(product(*(tiles.get(name, [None]) for name in TILE_OPTIONS)))
+    points, seen = [], set()
+    for stage in spec['stages']:
+        threads = spec.get('threads', [1]) if stage in THREADED_STAGES else [None]
+        shapes = tile_shapes if stage in TILED_STAGES else [(None, None, None)]
+        for size, t, shape in product(spec['sizes'], threads, shapes):
+            point = dict(stage=stage, grid_size=size, time_steps=_steps_for(spec, size), threads=t,
+                         alpha=spec.get('alpha', 0.2), dx=spec.get('dx', 0.01))
+            point.update(zip(TILE_OPTIONS, shape))
+            key = point_key(point)
+            if key not in seen:
+                seen.add(key)
+                points.append(point)
+    return points
+
+
+def tile_args(point):
+    """Stage command line options for a point's tile shape"""
+    return [f"--{name.replace('_', '-')}={point[name]}" for name in TILE_OPTIONS if point.get(name)]
+
+
+def is_parallel(point):
+    return point.get('threads') not in (None, 1)
+
+
+def measure(point, spec):
+    """Aggregated metrics of one point"""
+    return benchmark_point(point['stage'], point['grid_size'], point['time_steps'], point['alpha'], point['dx'],
+                           threads=point['threads'], warmup=spec.get('warmup', 1),
+                           repetitions=spec.get('repetitions', 3), engine=spec.get('engine', 'loop'),
+                           args=tile_args(point))
+
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def run_sweep(spec, conn, jobs=None, sweep=None, log=print):
+    """Run every point of `spec` not yet in the store and record the results.
+
+    Returns the number of points measured in this call. `jobs` caps how many
+    single-threaded points run at once; it defaults to one per available core
+    where pinning is supported (Linux) and to 1 elsewhere.
+    """
+    points = expand_matrix(spec)
+    done = completed_keys(conn)
+    pending = [p for p in points if point_key(p) not in done]
+    log(f"{len(points)} points, {len(points) - len(pending)} already stored, {len(pending)} to run")
+
+    can_pin = hasattr(os, 'sched_setaffinity')
+    cpus = available_cpus()
+    jobs = min(jobs or (len(cpus) if can_pin else 1), len(cpus))
+    free_cpus = queue.Queue()
+    for cpu in cpus[:jobs]:
+        free_cpus.put(cpu)
+
+    def pinned(point):
+        # Child processes inherit the affinity of the thread that starts them
+        cpu = free_cpus.get()
+        try:
+            if can_pin:
+                os.sched_setaffinity(0, {cpu})
+            return measure(point, spec)
+        finally:
+            free_cpus.put(cpu)
+
+    def store(point, metrics):
+        record_run(conn, point, metrics, sweep)
+        log(f"{point_key(point)}: {metrics['performance']:,.0f} steps/s")
+
+    measured = 0
+    serial = [p for p in pending if is_parallel(p)]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(pinned, p): p for p in pending if not is_parallel(p)}
+        for future in as_completed(futures):
+            try:
+                store(futures[future], future.result())
+                measured += 1
+            except subprocess.CalledProcessError as e:
+                log(f"{point_key(futures[future])}: FAILED ({e})")
+
+    for point in serial:
+        try:
+            store(point, measure(point, spec))
+            measured += 1
+        except subprocess.CalledProcessError as e:
+            log(f"{point_key(point)}: FAILED ({e})")
+    return measured
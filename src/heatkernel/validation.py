@@ -0,0 +1,75 @@
+"""Field summaries and comparisons used to validate stage outputs.
+
+`field_stats` matches field_stats_contig in src/core/field_io.h, so Python and
+C outputs can be compared from metrics.json alone when no field.npy was dumped.
+"""
+
+import os
+
+import numpy as np
+
+_MASK = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _splitmix64(z):
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def checksum(T):
+    """Bit-exact checksum of a float64 field (same as the C stages)"""
+    bits = np.ascontiguousarray(T, dtype=np.float64).view(np.uint64).ravel()
+    position = np.arange(1, bits.size + 1, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        z = bits + position * np.uint64(0x9E3779B97F4A7C15)
+        total = int(_splitmix64(z).sum(dtype=np.uint64) & _MASK)
+    return f"{total:016x}"
+
+
+def field_stats(T):
+    """Checksum, sum, L2 and max norm of a field as written to metrics.json"""
+    T = np.asarray(T, dtype=np.float64)
+    return {
+        'checksum': checksum(T),
+        'sum': float(T.sum()),
+        'l2': float(np.sqrt(np.sum(T * T))),
+        'linf': float(np.max(np.abs(T))),
+    }
+
+
+def compare_fields(field, reference):
+    """Absolute and relative differences between a field and its reference"""
+    field = np.asarray(field, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    if field.shape != reference.shape:
+        raise ValueError(f"Shape mismatch: {field.shape} vs {reference.shape}")
+    diff = field - reference
+    scale = float(np.max(np.abs(reference))) or 1.0
+    max_abs = float(np.max(np.abs(diff))) if np.all(np.isfinite(diff)) else float('inf')
+    return {
+        'max_abs_diff': max_abs,
+        'max_rel_diff': max_abs / scale,
+        'rel_l2_diff': float(np.linalg.norm(diff) / (np.linalg.norm(reference) or 1.0)),
+        'bitwise_equal': bool(np.array_equal(field.view(np.uint64), reference.view(np.uint64))),
+    }
+
+
+def compare_stats(stats, reference):
+    """Compare metrics.json field summaries when the full field is unavailable"""
+    scale = reference['linf'] or 1.0
+    rel = {
+        key: abs(stats[key] - reference[key]) / (abs(reference[key]) or scale)
+        for key in ('sum', 'l2', 'linf')
+    }
+    worst = max(rel.values()) if all(np.isfinite(list(rel.values()))) else float('inf')
+    return {
+        'max_rel_diff': worst,
+        'bitwise_equal': stats.get('checksum') == reference.get('checksum'),
+    }
+
+
+def load_field(directory):
+    """field.npy from a stage output directory, or None"""
+    path = os.path.join(directory, 'field.npy')
+    return np.load(path) if os.path.exists(path) else None
@@ -0,0 +1,403 @@
+// src/lib/heat_kernels.c
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#include "../core/timing.h"
+#include "../core/boundary_conditions.h"
+#include "../core/stencil_ops.h"
+#include "../core/temporal_blocking.h"
+#include "../core/tuning.h"
+#include "heat_kernels.h"
+
+#define HEAT_KERNELS_ABI_VERSION 3
+
+// Stage whose tuning cache entries a kernel uses, as keyed by autotune.py
+static const char *kernel_stage(int kernel)
+{
+    switch (kernel)
+    {
+    case HEAT_KERNEL_BLOCKED:
+        return "06_cache_blocking";
+    case HEAT_KERNEL_VECTORIZED:
+        return "07_vectorization";
+    case HEAT_KERNEL_ARCH:
+        return "09_arch_specific";
+    default:
+        return "08_openmp_parallel";
+    }
+}
+
+// Tile shape of a call, chosen as the stage binaries do (tile_select): the
+// caller's nonzero entries, then the stage's tuning cache entry, then the
+// stages' 32x64x4 default. The shape used is written back to tile.
+static tile_shape kernel_tile(int kernel, int size, int threads, int *tile, const char *tuning_cache)
+{
+    solver_options opts;
+    memset(&opts, 0, sizeof(opts));
+    opts.tuning_cache = tuning_cache;
+    if (tile)
+    {
+        opts.row_block = tile[0] > 0 ? tile[0] : 0;
+        opts.col_block = tile[1] > 0 ? tile[1] : 0;
+        opts.temporal_block = tile[2] > 0 ? tile[2] : 0;
+    }
+    // Stages 06/07 are single-threaded and tuned for one thread
+    int tuned_threads = kernel == HEAT_KERNEL_BLOCKED || kernel == HEAT_KERNEL_VECTORIZED ? 1 : threads;
+    tile_shape shape;
+    tile_select(&opts, kernel_stage(kernel), size, tuned_threads, (tile_shape){32, 64, 4}, &shape);
+    if (tile)
+    {
+        tile[0] = shape.row_block;
+        tile[1] = shape.col_block;
+        tile[2] = shape.temporal_block;
+    }
+    return shape;
+}
+
+// 05_contiguous_memory
+static void step_contig(const double *T, double *T_new, int size, double alpha, double dt, double dx)
+{
+    for (int i = 1; i < size - 1; i++)
+    {
+        for (int j = 1; j < size - 1; j++)
+        {
+            T_new[i * size + j] = heat_stencil(T[i * size + j], T[(i + 1) * size + j], T[(i - 1) * size + j], T[i * size + j + 1], T[i * size + j - 1], alpha, dt, dx);
+        }
+    }
+}
+
+// 06_cache_blocking / 07_vectorization: one trapezoid pass of k steps
+static void pass_blocked(const double *restrict T, double *restrict T_new, int size, int k, tile_shape tile,
+                         double alpha, double dt, double dx, double *scratch, size_t scratch_size)
+{
+    for (int i_start = 1; i_start < size - 1; i_start += tile.row_block)
+    {
+        int i_lo, i_hi;
+        trapezoid_tile_bounds(i_start, tile.row_block, size, &i_lo, &i_hi);
+
+        for (int j_start = 1; j_start < size - 1; j_start += tile.col_block)
+        {
+            int j_lo, j_hi;
+            trapezoid_tile_bounds(j_start, tile.col_block, size, &j_lo, &j_hi);
+
+            trapezoid_tile(T, T_new, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, scratch, scratch + scratch_size);
+        }
+    }
+}
+
+// 08_openmp_parallel / 09_arch_specific
+static void pass_openmp(const double *restrict T, double *restrict T_new, int size, int k, tile_shape tile,
+                        double alpha, double dt, double dx, double *scratch, size_t scratch_size, int threads)
+{
+#pragma omp parallel for collapse(2) num_threads(threads)
+    for (int i_start = 1; i_start < size - 1; i_start += tile.row_block)
+    {
+        for (int j_start = 1; j_start < size - 1; j_start += tile.col_block)
+        {
+            int i_lo, i_hi, j_lo, j_hi;
+            trapezoid_tile_bounds(i_start, tile.row_block, size, &i_lo, &i_hi);
+            trapezoid_tile_bounds(j_start, tile.col_block, size, &j_lo, &j_hi);
+
+            int tid = 0;
+#ifdef _OPENMP
+            tid = omp_get_thread_num();
+#endif
+            double *buf_a = scratch + (size_t)tid * 2 * scratch_size;
+            trapezoid_tile(T, T_new, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, buf_a, buf_a + scratch_size);
+        }
+    }
+}
+
+int heat_solve(double *T, double *scratch, int size, int steps, double alpha, double dx,
+               int threads, int kernel, int *tile, const char *tuning_cache, double *timings)
+{
+    if (!T || size < 3 || steps < 0 || alpha <= 0.0 || dx <= 0.0)
+        return HEAT_EINVAL;
+    if (kernel < HEAT_KERNEL_CONTIG || kernel > HEAT_KERNEL_ARCH)
+        return HEAT_EINVAL;
+
+#ifdef _OPENMP
+    if (threads <= 0)
+        threads = omp_get_max_threads();
+#else
+    threads = 1;
+#endif
+
+    double *owned = NULL;
+    if (!scratch)
+    {
+        owned = (double *)malloc((size_t)size * size * sizeof(double));
+        if (!owned)
+            return HEAT_ENOMEM;
+        scratch = owned;
+    }
+    // Boundary cells are rewritten every step, but keep scratch deterministic
+    memcpy(scratch, T, (size_t)size * size * sizeof(double));
+
+    double dt = 0.24 * dx * dx / alpha; // to ensure stability
+
+    struct timespec start, end;
+    struct timespec stencil_start, stencil_end;
+    struct timespec boundary_start, boundary_end;
+    struct timespec swap_start, swap_end;
+
+    double total_stencil_time = 0.0;
+    double total_boundary_time = 0.0;
+    double total_swap_time = 0.0;
+
+    // Temporally blocked kernels advance `temporal_block` steps per pass
+    int blocked = kernel != HEAT_KERNEL_CONTIG;
+    tile_shape shape = {0, 0, 1};
+    size_t scratch_size = 0;
+    double *tiles = NULL;
+    if (blocked)
+    {
+        shape = kernel_tile(kernel, size, threads, tile, tuning_cache);
+        scratch_size = trapezoid_scratch_size(shape.row_block, shape.col_block, shape.temporal_block);
+        tiles = (double *)malloc((size_t)threads * 2 * scratch_size * sizeof(double));
+        if (!tiles)
+        {
+            free(owned);
+            return HEAT_ENOMEM;
+        }
+    }
+
+    double *cur = T;
+    double *next = scratch;
+
+    get_time(&start);
+
+    for (int step = 0; step < steps; step += shape.temporal_block)
+    {
+        int k = steps - step < shape.temporal_block ? steps - step : shape.temporal_block;
+
+        get_time(&stencil_start);
+        switch (kernel)
+        {
+        case HEAT_KERNEL_CONTIG:
+            step_contig(cur, next, size, alpha, dt, dx);
+            break;
+        case HEAT_KERNEL_BLOCKED:
+        case HEAT_KERNEL_VECTORIZED:
+            pass_blocked(cur, next, size, k, shape, alpha, dt, dx, tiles, scratch_size);
+            break;
+        default:
+            pass_openmp(cur, next, size, k, shape, alpha, dt, dx, tiles, scratch_size, threads);
+            break;
+        }
+        get_time(&stencil_end);
+        total_stencil_time += time_diff(&stencil_start, &stencil_end);
+
+        // Boundaries (applied inside the tiles for the blocked kernels)
+        get_time(&boundary_start);
+        if (!blocked)
+            neumann_boundaries_contig(next, size);
+        get_time(&boundary_end);
+        total_boundary_time += time_diff(&boundary_start, &boundary_end);
+
+        // Swapping
+        get_time(&swap_start);
+        double *tmp = cur;
+        cur = next;
+        next = tmp;
+        get_time(&swap_end);
+        total_swap_time += time_diff(&swap_start, &swap_end);
+    }
+
+    // An odd number of passes leaves the result in scratch
+    if (cur != T)
+        memcpy(T, cur, (size_t)size * size * sizeof(double));
+
+    get_time(&end);
+    double total_time = time_diff(&start, &end);
+
+    if (timings)
+    {
+        timings[HEAT_TIMING_TOTAL] = total_time;
+        timings[HEAT_TIMING_STENCIL] = total_stencil_time;
+        timings[HEAT_TIMING_BOUNDARY] = total_boundary_time;
+        timings[HEAT_TIMING_SWAP] = total_swap_time;
+        timings[HEAT_TIMING_OTHER] = total_time - total_stencil_time - total_boundary_time - total_swap_time;
+    }
+
+    free(tiles);
+    free(owned);
+    return HEAT_OK;
+}
+
+// Batch of fewer scenarios than threads: one parallel loop over (scenario,
+// tile row, tile column) per pass, so the team is filled across scenarios as
+// well as within each grid
+static void pass_batch(const double *restrict T, double *restrict T_new, int batch, int size, int k, tile_shape tile,
+                       const double *alpha, const double *dt, const double *dx,
+                       double *scratch, size_t scratch_size, int threads)
+{
+    size_t cells = (size_t)size * size;
+#pragma omp parallel for collapse(3) schedule(static) num_threads(threads)
+    for (int b = 0; b < batch; b++)
+    {
+        for (int i_start = 1; i_start < size - 1; i_start += tile.row_block)
+        {
+            for (int j_start = 1; j_start < size - 1; j_start += tile.col_block)
+            {
+                int i_lo, i_hi, j_lo, j_hi;
+                trapezoid_tile_bounds(i_start, tile.row_block, size, &i_lo, &i_hi);
+                trapezoid_tile_bounds(j_start, tile.col_block, size, &j_lo, &j_hi);
+
+                int tid = 0;
+#ifdef _OPENMP
+                tid = omp_get_thread_num();
+#endif
+                double *buf_a = scratch + (size_t)tid * 2 * scratch_size;
+                trapezoid_tile(T + b * cells, T_new + b * cells, size, i_lo, i_hi, j_lo, j_hi, k,
+                               alpha[b], dt[b], dx[b], buf_a, buf_a + scratch_size);
+            }
+        }
+    }
+}
+
+// Enough scenarios for every thread: each thread advances whole scenarios
+// through all steps, so a grid stays in that core's cache and passes need no
+// barrier. Leaves every result in T.
+static void solve_scenarios(double *T, double *scratch, int batch, int size, int steps, tile_shape tile,
+                            const double *alpha, const double *dt, const double *dx,
+                            double *tiles, size_t scratch_size, int threads)
+{
+    size_t cells = (size_t)size * size;
+#pragma omp parallel for schedule(dynamic) num_threads(threads)
+    for (int b = 0; b < batch; b++)
+    {
+        int tid = 0;
+#ifdef _OPENMP
+        tid = omp_get_thread_num();
+#endif
+        double *buf_a = tiles + (size_t)tid * 2 * scratch_size;
+        double *cur = T + b * cells;
+        double *next = scratch + b * cells;
+        for (int step = 0; step < steps; step += tile.temporal_block)
+        {
+            int k = steps - step < tile.temporal_block ? steps - step : tile.temporal_block;
+            for (int i_start = 1; i_start < size - 1; i_start += tile.row_block)
+            {
+                int i_lo, i_hi;
+                trapezoid_tile_bounds(i_start, tile.row_block, size, &i_lo, &i_hi);
+                for (int j_start = 1; j_start < size - 1; j_start += tile.col_block)
+                {
+                    int j_lo, j_hi;
+                    trapezoid_tile_bounds(j_start, tile.col_block, size, &j_lo, &j_hi);
+                    trapezoid_tile(cur, next, size, i_lo, i_hi, j_lo, j_hi, k, alpha[b], dt[b], dx[b],
+                                   buf_a, buf_a + scratch_size);
+                }
+            }
+            double *tmp = cur;
+            cur = next;
+            next = tmp;
+        }
+        if (cur != T + b * cells)
+            memcpy(T + b * cells, cur, cells * sizeof(double));
+    }
+}
+
+int heat_solve_batch(double *T, double *scratch, int batch, int size, int steps,
+                     const double *alpha, const double *dx, int threads, int *tile, const char *tuning_cache,
+                     double *timings)
+{
+    if (!T || !alpha || !dx || batch < 1 || size < 3 || steps < 0)
+        return HEAT_EINVAL;
+    for (int b = 0; b < batch; b++)
+        if (alpha[b] <= 0.0 || dx[b] <= 0.0)
+            return HEAT_EINVAL;
+
+#ifdef _OPENMP
+    if (threads <= 0)
+        threads = omp_get_max_threads();
+#else
+    threads = 1;
+#endif
+
+    size_t bytes = (size_t)batch * size * size * sizeof(double);
+    tile_shape shape = kernel_tile(HEAT_KERNEL_OPENMP, size, threads, tile, tuning_cache);
+    size_t scratch_size = trapezoid_scratch_size(shape.row_block, shape.col_block, shape.temporal_block);
+    double *owned = NULL;
+    double *tiles = (double *)malloc((size_t)threads * 2 * scratch_size * sizeof(double));
+    double *dt = (double *)malloc((size_t)batch * sizeof(double));
+    if (!scratch)
+        scratch = owned = (double *)malloc(bytes);
+    if (!tiles || !dt || !scratch)
+    {
+        free(tiles);
+        free(dt);
+        free(owned);
+        return HEAT_ENOMEM;
+    }
+    memcpy(scratch, T, bytes);
+    for (int b = 0; b < batch; b++)
+        dt[b] = 0.24 * dx[b] * dx[b] / alpha[b]; // to ensure stability
+
+    struct timespec start, end;
+    struct timespec stencil_start, stencil_end;
+    struct timespec swap_start, swap_end;
+
+    double total_stencil_time = 0.0;
+    double total_swap_time = 0.0;
+
+    double *cur = T;
+    double *next = scratch;
+
+    get_time(&start);
+
+    if (batch >= threads)
+    {
+        get_time(&stencil_start);
+        solve_scenarios(T, scratch, batch, size, steps, shape, alpha, dt, dx, tiles, scratch_size, threads);
+        get_time(&stencil_end);
+        total_stencil_time += time_diff(&stencil_start, &stencil_end);
+        steps = 0; // done, skip the shared passes below
+    }
+
+    for (int step = 0; step < steps; step += shape.temporal_block)
+    {
+        int k = steps - step < shape.temporal_block ? steps - step : shape.temporal_block;
+
+        // Boundaries are applied inside the tiles
+        get_time(&stencil_start);
+        pass_batch(cur, next, batch, size, k, shape, alpha, dt, dx, tiles, scratch_size, threads);
+        get_time(&stencil_end);
+        total_stencil_time += time_diff(&stencil_start, &stencil_end);
+
+        get_time(&swap_start);
+        double *tmp = cur;
+        cur = next;
+        next = tmp;
+        get_time(&swap_end);
+        total_swap_time += time_diff(&swap_start, &swap_end);
+    }
+
+    if (cur != T)
+        memcpy(T, cur, bytes);
+
+    get_time(&end);
+    double total_time = time_diff(&start, &end);
+
+    if (timings)
+    {
+        timings[HEAT_TIMING_TOTAL] = total_time;
+        timings[HEAT_TIMING_STENCIL] = total_stencil_time;
+        timings[HEAT_TIMING_BOUNDARY] = 0.0;
+        timings[HEAT_TIMING_SWAP] = total_swap_time;
+        timings[HEAT_TIMING_OTHER] = total_time - total_stencil_time - total_swap_time;
+    }
+
+    free(tiles);
+    free(dt);
+    free(owned);
+    return HEAT_OK;
+}
+
+int heat_kernels_version(void)
+{
+    return HEAT_KERNELS_ABI_VERSION;
+}
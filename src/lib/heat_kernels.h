@@ -0,0 +1,59 @@
+#ifndef HEAT_KERNELS_H
+#define HEAT_KERNELS_H
+
+// Shared library entry points for the contiguous stencil kernels (stages 05-09).
+// All buffers are caller owned, row-major size*size doubles.
+
+enum heat_kernel
+{
+    HEAT_KERNEL_CONTIG = 5,     // 05_contiguous_memory
+    HEAT_KERNEL_BLOCKED = 6,    // 06_cache_blocking
+    HEAT_KERNEL_VECTORIZED = 7, // 07_vectorization
+    HEAT_KERNEL_OPENMP = 8,     // 08_openmp_parallel
+    HEAT_KERNEL_ARCH = 9        // 09_arch_specific (same kernel as 08, differs in build flags)
+};
+
+enum heat_timing
+{
+    HEAT_TIMING_TOTAL = 0,
+    HEAT_TIMING_STENCIL,
+    HEAT_TIMING_BOUNDARY,
+    HEAT_TIMING_SWAP,
+    HEAT_TIMING_OTHER,
+    HEAT_TIMING_COUNT
+};
+
+enum heat_status
+{
+    HEAT_OK = 0,
+    HEAT_EINVAL = -1,
+    HEAT_ENOMEM = -2
+};
+
+// Advance T by `steps` explicit time steps. On return T holds the final field.
+// scratch: second size*size buffer, or NULL to allocate one internally.
+// threads: OpenMP team size for kernels 8/9, <= 0 keeps the OpenMP default.
+// tile: NULL, or {row_block, col_block, temporal_block} of kernels 6-9. Entries
+//   <= 0 are chosen as by the stage binaries: the tuning cache entry of the
+//   kernel's stage for this host, grid size and threads, else 32x64x4. The
+//   shape used is written back.
+// tuning_cache: autotune cache file, NULL for $HEATKERNEL_TUNING_CACHE, "" for none.
+// timings: optional array of HEAT_TIMING_COUNT doubles (seconds).
+int heat_solve(double *T, double *scratch, int size, int steps, double alpha, double dx,
+               int threads, int kernel, int *tile, const char *tuning_cache, double *timings);
+
+// Advance `batch` independent fields stored back to back in T (batch*size*size
+// doubles), scenario b with its own alpha[b] and dx[b], by `steps` steps with
+// the temporally blocked OpenMP kernel. With at least as many scenarios as
+// threads each thread runs whole scenarios, otherwise the tiles of all
+// scenarios share one parallel loop per pass. scratch is a second buffer of
+// the same size or NULL. tile and tuning_cache as for heat_solve, with the
+// tuned tiles of stage 08.
+int heat_solve_batch(double *T, double *scratch, int batch, int size, int steps,
+                     const double *alpha, const double *dx, int threads, int *tile, const char *tuning_cache,
+                     double *timings);
+
+// ABI version, bumped whenever an entry point changes signature.
+int heat_kernels_version(void);
+
+#endif
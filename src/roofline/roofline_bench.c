@@ -0,0 +1,197 @@
+// src/roofline/roofline_bench.c
+// STREAM-style bandwidth and peak FLOP/s microbenchmark for the roofline plot.
+//
+// usage: roofline_bench <output.json> [max_array_mb]
+//
+// Copy (a = b, 16 bytes/element) and triad (a = b + s*c, 24 bytes/element)
+// are timed over a ladder of array sizes from L1-resident up to max_array_mb
+// per array, once with one thread and once with all OpenMP threads. Peak
+// FLOP/s comes from independent vector FMA chains. Best-of-N times, as in STREAM.
+#include <stdio.h>
+#include <stdlib.h>
+#include <omp.h>
+
+#define REPEATS 5
+#define MIN_SECONDS 0.05
+#define FMA_CHAINS 12
+
+// Widest vectors the target supports (GCC/Clang vector extensions); 12
+// independent chains cover FMA latency x throughput on current cores
+#if defined(__AVX512F__)
+#define VEC_BYTES 64
+#else
+#define VEC_BYTES 32
+#endif
+#define VEC_LANES (VEC_BYTES / (int)sizeof(double))
+typedef double vdouble __attribute__((vector_size(VEC_BYTES)));
+
+static double copy_kernel(double *a, const double *b, size_t n, int threads)
+{
+    double t0 = omp_get_wtime();
+#pragma omp parallel for num_threads(threads) schedule(static)
+    for (size_t i = 0; i < n; i++)
+        a[i] = b[i];
+    return omp_get_wtime() - t0;
+}
+
+static double triad_kernel(double *a, const double *b, const double *c, size_t n, int threads)
+{
+    const double s = 3.0;
+    double t0 = omp_get_wtime();
+#pragma omp parallel for num_threads(threads) schedule(static)
+    for (size_t i = 0; i < n; i++)
+        a[i] = b[i] + s * c[i];
+    return omp_get_wtime() - t0;
+}
+
+// Best GB/s of a kernel; small arrays are repeated until a pass takes MIN_SECONDS
+static double bandwidth(int triad, double *a, double *b, double *c, size_t n, int threads)
+{
+    double bytes_per_elem = triad ? 24.0 : 16.0;
+    long inner = 1;
+    double best = 0.0;
+    for (int r = 0; r < REPEATS; r++)
+    {
+        double elapsed;
+        for (;;)
+        {
+            elapsed = 0.0;
+            for (long it = 0; it < inner; it++)
+                elapsed += triad ? triad_kernel(a, b, c, n, threads) : copy_kernel(a, b, n, threads);
+            if (elapsed >= MIN_SECONDS || r > 0)
+                break;
+            inner *= 2;
+        }
+        double gbs = bytes_per_elem * n * inner / elapsed * 1e-9;
+        if (gbs > best)
+            best = gbs;
+    }
+    return best;
+}
+
+// Named vector accumulators so they stay in registers (an array gets spilled)
+#define CHAIN_STEP(v) v = v * vx + vy
+static double fma_chains(long iters, double x, double y)
+{
+    vdouble vx = x + (vdouble){0}, vy = y + (vdouble){0};
+    vdouble a0 = vy, a1 = 2 * vy, a2 = 3 * vy, a3 = 4 * vy, a4 = 5 * vy, a5 = 6 * vy;
+    vdouble a6 = 7 * vy, a7 = 8 * vy, a8 = 9 * vy, a9 = 10 * vy, a10 = 11 * vy, a11 = 12 * vy;
+    for (long it = 0; it < iters; it++)
+    {
+        CHAIN_STEP(a0); CHAIN_STEP(a1); CHAIN_STEP(a2); CHAIN_STEP(a3);
+        CHAIN_STEP(a4); CHAIN_STEP(a5); CHAIN_STEP(a6); CHAIN_STEP(a7);
+        CHAIN_STEP(a8); CHAIN_STEP(a9); CHAIN_STEP(a10); CHAIN_STEP(a11);
+    }
+    vdouble sum = a0 + a1 + a2 + a3 + a4 + a5 + a6 + a7 + a8 + a9 + a10 + a11;
+    double total = 0.0;
+    for (int j = 0; j < VEC_LANES; j++)
+        total += sum[j];
+    return total;
+}
+
+static double peak_gflops(int threads)
+{
+    long iters = 1000000;
+    double best = 0.0, sink = 0.0;
+    for (int r = 0; r < REPEATS; r++)
+    {
+        double t0 = omp_get_wtime();
+#pragma omp parallel num_threads(threads) reduction(+ : sink)
+        sink += fma_chains(iters, 0.999999, 1e-9);
+        double elapsed = omp_get_wtime() - t0;
+        if (elapsed < MIN_SECONDS && r == 0)
+        {
+            iters *= 2;
+            r--;
+            continue;
+        }
+        double gflops = 2.0 * FMA_CHAINS * VEC_LANES * iters * threads / elapsed * 1e-9;
+        if (gflops > best)
+            best = gflops;
+    }
+    if (sink == 42.0) // keep the chains alive
+        printf(" ");
+    return best;
+}
+
+// {"1": v1, "<threads>": v_all}, a single entry when only one thread is available
+static void print_pair(FILE *f, double v1, int threads, double v_all)
+{
+    if (threads == 1)
+        fprintf(f, "{\"1\": %.3f}", v1);
+    else
+        fprintf(f, "{\"1\": %.3f, \"%d\": %.3f}", v1, threads, v_all);
+}
+
+int main(int argc, char *argv[])
+{
+    if (argc < 2)
+    {
+        fprintf(stderr, "usage: %s <output.json> [max_array_mb]\n", argv[0]);
+        return 1;
+    }
+    const char *output = argv[1];
+    size_t max_bytes = (size_t)(argc > 2 ? atof(argv[2]) : 256.0) * 1024 * 1024;
+    size_t max_n = max_bytes / sizeof(double);
+    int all = omp_get_max_threads();
+
+    double *a = (double *)malloc(max_n * sizeof(double));
+    double *b = (double *)malloc(max_n * sizeof(double));
+    double *c = (double *)malloc(max_n * sizeof(double));
+    if (!a || !b || !c)
+    {
+        fprintf(stderr, "Cannot allocate 3 x %zu MB\n", max_bytes >> 20);
+        return 1;
+    }
+    // first touch with the same static schedule as the kernels
+#pragma omp parallel for num_threads(all) schedule(static)
+    for (size_t i = 0; i < max_n; i++)
+    {
+        a[i] = 0.0;
+        b[i] = 1.0;
+        c[i] = 2.0;
+    }
+
+    FILE *f = fopen(output, "w");
+    if (!f)
+    {
+        fprintf(stderr, "Cannot write %s\n", output);
+        return 1;
+    }
+
+    double peak_1 = peak_gflops(1), peak_all = peak_gflops(all);
+    fprintf(f, "{\n  \"threads\": %d,\n", all);
+    fprintf(f, "  \"peak_gflops\": ");
+    print_pair(f, peak_1, all, peak_all);
+    fprintf(f, ",\n");
+    fprintf(f, "  \"ladder\": [\n");
+
+    double dram_1 = 0.0, dram_all = 0.0;
+    for (size_t n = 2048; n <= max_n; n *= 4)
+    {
+        double copy_1 = bandwidth(0, a, b, c, n, 1), copy_all = bandwidth(0, a, b, c, n, all);
+        double triad_1 = bandwidth(1, a, b, c, n, 1), triad_all = bandwidth(1, a, b, c, n, all);
+        fprintf(f, "    {\"array_bytes\": %zu, \"copy_gbs\": ", n * sizeof(double));
+        print_pair(f, copy_1, all, copy_all);
+        fprintf(f, ", \"triad_gbs\": ");
+        print_pair(f, triad_1, all, triad_all);
+        fprintf(f, "}%s\n", n * 4 <= max_n ? "," : "");
+        printf("%10zu KB  copy %8.1f / %8.1f GB/s  triad %8.1f / %8.1f GB/s (1 / %d threads)\n",
+               n * sizeof(double) >> 10, copy_1, copy_all, triad_1, triad_all, all);
+        dram_1 = copy_1;
+        dram_all = copy_all;
+    }
+    fprintf(f, "  ],\n");
+    // the largest arrays stand for main memory; copy matches the stencil's read + write pattern
+    fprintf(f, "  \"dram_gbs\": ");
+    print_pair(f, dram_1, all, dram_all);
+    fprintf(f, "\n}\n");
+    fclose(f);
+
+    printf("Peak %.1f / %.1f GFLOP/s, memory %.1f / %.1f GB/s (1 / %d threads) -> %s\n",
+           peak_1, peak_all, dram_1, dram_all, all, output);
+    free(a);
+    free(b);
+    free(c);
+    return 0;
+}
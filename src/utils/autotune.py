@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tile Shape Autotuner
+
+Searches the trapezoid tile shape (row block, column block, temporal block) of
+stages 06-09 for a grid size and thread count, seeded by a cache model of the
+detected L1/L2 sizes (see heatkernel.autotune). The best shape is stored per
+(host, stage, grid, threads) in the tuning cache, which later stage runs use
+automatically unless tile options are given explicitly.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.autotune import autotune, cache_sizes, write_cache_entry  # noqa: E402
+from heatkernel.benchmark import THREADED_STAGES  # noqa: E402
+from heatkernel.paths import TUNING_CACHE  # noqa: E402
+from heatkernel.sweep import TILED_STAGES  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description='Autotune tile shapes of stages 06-09')
+    parser.add_argument('--stages', nargs='+', default=list(TILED_STAGES))
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--threads', nargs='+', type=int, default=[os.cpu_count() or 1],
+                        help='Thread counts to tune stages 08/09 for (06/07 always use 1)')
+    parser.add_argument('--steps', type=int, help='Time steps per measurement (default: scaled to the grid)')
+    parser.add_argument('--seeds', type=int, default=6, help='Model-ranked shapes measured first')
+    parser.add_argument('--budget', type=int, default=24, help='Maximum measured shapes per point')
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--cache', default=TUNING_CACHE, help=f'Tuning cache file (default: {TUNING_CACHE})')
+    args = parser.parse_args()
+
+    caches = cache_sizes()
+    for stage in args.stages:
+        if stage not in TILED_STAGES:
+            parser.error(f"{stage} has no tile parameters")
+        for threads in (args.threads if stage in THREADED_STAGES else [1]):
+            result = autotune(stage, args.size, threads, steps=args.steps, seeds=args.seeds,
+                              budget=args.budget, repetitions=args.repetitions, caches=caches)
+            rb, cb, k = result['tile']
+            write_cache_entry(stage, args.size, threads, result['tile'], result['performance'], args.cache)
+            print(f"{stage} grid={args.size} threads={threads}: best {rb}x{cb}x{k} "
+                  f"({result['performance']:,.0f} steps/s, {len(result['measured'])} shapes measured)")
+
+    print(f"Tuning cache: {args.cache}")
+
+if __name__ == "__main__":
+    main()
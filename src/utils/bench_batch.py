@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Batched Scenario Benchmark
+
+Throughput in scenarios/s of many independent small grids (random hot spot,
+alpha and dx per scenario) for a range of batch sizes:
+
+    numpy-batch    heatkernel.solve_batch, NumPy on the whole stack
+    native-batch   heatkernel.solve_batch, one heat_solve_batch call
+    native-loop    one in-process heat_solve call per scenario
+    subprocess     one stage 08 process per scenario (the Makefile way),
+                   only up to --subprocess-max scenarios
+
+Scenarios/s is the batch size over the wall time of the whole batch. Results
+go to <results-dir>/batch/batch_scaling.json and batch_report.md.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel import solve_batch  # noqa: E402
+from heatkernel.backends.c_stage import run_stage, stage_binary  # noqa: E402
+from heatkernel.batch import hot_spot_stack  # noqa: E402
+from heatkernel.native import NativeKernel  # noqa: E402
+
+MODES = ('numpy-batch', 'native-batch', 'native-loop', 'subprocess')
+SUBPROCESS_STAGE = '08_openmp_parallel'
+
+def make_scenarios(batch, size, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.integers(1, size - 1, (batch, 2))
+    alpha = rng.uniform(0.1, 0.3, batch)
+    dx = rng.uniform(0.005, 0.02, batch)
+    return hot_spot_stack(size, centers), alpha, dx
+
+def run_mode(mode, fields, steps, alpha, dx, threads):
+    start = time.perf_counter()
+    if mode == 'numpy-batch':
+        solve_batch(fields, steps, alpha, dx, backend='numpy')
+    elif mode == 'native-batch':
+        solve_batch(fields, steps, alpha, dx, backend='native', threads=threads)
+    elif mode == 'native-loop':
+        handle = NativeKernel('openmp', threads)
+        for b in range(fields.shape[0]):
+            handle.advance(fields[b].copy(), steps, alpha[b], dx[b])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            for b in range(fields.shape[0]):
+                path = os.path.join(tmp, 'initial.npy')
+                np.save(path, fields[b])
+                run_stage(SUBPROCESS_STAGE, fields.shape[1], steps, float(alpha[b]), float(dx[b]),
+                          threads=threads or None, args=[f'--initial-field={path}'])
+    return time.perf_counter() - start
+
+def write_report(path, args, rows):
+    with open(path, 'w') as f:
+        f.write("# Batched Scenario Throughput\n\n")
+        f.write(f"Grid {args.size}, {args.steps} steps per scenario\n\n")
+        f.write("| Batch | Mode | Time (s) | Scenarios/s |\n")
+        f.write("|-------|------|----------|-------------|\n")
+        for row in rows:
+            f.write(f"| {row['batch']} | {row['mode']} | {row['time']:.6f} | {row['scenarios_per_second']:.2f} |\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Scenarios/s of batched vs one-at-a-time solves')
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 4, 16, 64, 256])
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=0, help='OpenMP threads (default: OpenMP default)')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--subprocess-max', type=int, default=16,
+                        help='Largest batch run as one process per scenario')
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    args = parser.parse_args()
+
+    # Load the shared library and build the stage binary before timing anything
+    solve_batch(np.zeros((1, args.size, args.size)), 1, backend='native', threads=args.threads)
+    if 'subprocess' in args.modes:
+        stage_binary(SUBPROCESS_STAGE)
+
+    rows = []
+    for batch in args.batches:
+        fields, alpha, dx = make_scenarios(batch, args.size)
+        for mode in args.modes:
+            if mode == 'subprocess' and batch > args.subprocess_max:
+                continue
+            elapsed = run_mode(mode, fields, args.steps, alpha, dx, args.threads)
+            rows.append({'batch': batch, 'mode': mode, 'time': elapsed, 'scenarios_per_second': batch / elapsed})
+            print(f"batch={batch} {mode}: {batch / elapsed:,.1f} scenarios/s")
+
+    batch_dir = os.path.join(args.results_dir, 'batch')
+    os.makedirs(batch_dir, exist_ok=True)
+    with open(os.path.join(batch_dir, 'batch_scaling.json'), 'w') as f:
+        json.dump({'grid_size': args.size, 'time_steps': args.steps, 'threads': args.threads, 'runs': rows}, f, indent=2)
+    write_report(os.path.join(batch_dir, 'batch_report.md'), args, rows)
+    print(f"Report: {os.path.join(batch_dir, 'batch_report.md')}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Implicit vs Explicit Time-to-Solution Benchmark
+
+Reaches the physical time of --steps explicit steps (t = steps * 0.24 dx^2 /
+alpha) from the hot spot with:
+
+    explicit    the explicit stages (--explicit-stages) and the NumPy engine,
+                at their stability-limited dt
+    implicit    stage 11_implicit_adi and the numpy-adi backend, at each
+                multiple of the explicit dt in --dt-factors (the step count
+                is rounded and dt adjusted so every run ends at the same t)
+
+Accuracy is the relative L2 error against the exact-in-time solution of the
+same spatial discretization (heatkernel.exact), so both schemes are judged
+by their time stepping alone. A run meets --tolerance when its error is at
+most that. Results go to <results-dir>/implicit/implicit.json and
+implicit_report.md, with the fastest run within tolerance for the C stages
+and for NumPy; speedups are against the fastest explicit run of the same
+engine.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel import solve  # noqa: E402
+from heatkernel.benchmark import benchmark_point  # noqa: E402
+from heatkernel.exact import relative_error, semi_discrete_solution  # noqa: E402
+from heatkernel.grid import initial_field, time_step  # noqa: E402
+from heatkernel.validation import load_field  # noqa: E402
+
+IMPLICIT_STAGE = '11_implicit_adi'
+
+def run_c(stage, size, steps, args, output_dir, extra=()):
+    os.makedirs(output_dir, exist_ok=True)
+    metrics = benchmark_point(stage, size, steps, args.alpha, args.dx, threads=args.threads or None,
+                              warmup=args.warmup, repetitions=args.repetitions,
+                              args=['--dump-field', *extra], output_dir=output_dir)
+    return metrics['total_time'], load_field(output_dir)
+
+def run_numpy(backend, size, steps, args, **options):
+    start = time.perf_counter()
+    result = solve(size, steps, args.alpha, args.dx, backend=backend, **options)
+    return time.perf_counter() - start, result.field
+
+def write_report(path, args, physical_time, rows):
+    with open(path, 'w') as f:
+        f.write("# Implicit ADI vs Explicit Stepping\n\n")
+        f.write(f"Grid {args.size}, physical time {physical_time:.6g} s ({args.steps} explicit steps), "
+                f"tolerance {args.tolerance:g} relative L2 against the exact-in-time solution\n\n")
+        f.write("| Engine | Solver | dt / explicit dt | Steps | Time (s) | Error | Within tolerance | Speedup |\n")
+        f.write("|--------|--------|------------------|-------|----------|-------|------------------|---------|\n")
+        for row in rows:
+            f.write(f"| {row['engine']} | {row['solver']} | {row['dt_factor']:g} | {row['steps']} | {row['time']:.6f} | "
+                    f"{row['error']:.3e} | {'yes' if row['within_tolerance'] else 'no'} | {row['speedup']:.2f} |\n")
+
+        f.write("\n## Fastest within tolerance\n\n")
+        for engine in dict.fromkeys(row['engine'] for row in rows):
+            ok = [row for row in rows if row['engine'] == engine and row['within_tolerance']]
+            if ok:
+                best = min(ok, key=lambda row: row['time'])
+                f.write(f"- {engine}: {best['solver']} at {best['dt_factor']:g}x dt, {best['time']:.6f} s "
+                        f"({best['speedup']:.2f}x the explicit run)\n")
+            else:
+                f.write(f"- {engine}: no run within tolerance\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Time to reach a physical time and accuracy, implicit vs explicit')
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--steps', type=int, default=20000, help='Explicit steps defining the physical time')
+    parser.add_argument('--alpha', type=float, default=0.2)
+    parser.add_argument('--dx', type=float, default=0.01)
+    parser.add_argument('--dt-factors', type=float, nargs='+', default=[1, 4, 16, 64, 256])
+    parser.add_argument('--tolerance', type=float, default=1e-3)
+    parser.add_argument('--explicit-stages', nargs='+', default=['08_openmp_parallel'])
+    parser.add_argument('--threads', type=int, default=0, help='OpenMP threads (default: OpenMP default)')
+    parser.add_argument('--numpy-adi-max-steps', type=int, default=2000,
+                        help='Largest step count run with numpy-adi (a Python loop over cells per step)')
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    args = parser.parse_args()
+
+    implicit_dir = os.path.abspath(os.path.join(args.results_dir, 'implicit'))
+    explicit_dt = time_step(args.alpha, args.dx)
+    physical_time = args.steps * explicit_dt
+    reference = semi_discrete_solution(initial_field(args.size), args.alpha, args.dx, physical_time)
+
+    rows = []
+    def record(engine, solver, factor, steps, elapsed, field, baseline):
+        error = relative_error(field, reference)
+        row = {'engine': engine, 'solver': solver, 'dt_factor': factor, 'steps': steps,
+               'dt': physical_time / steps, 'time': elapsed, 'error': error,
+               'within_tolerance': bool(np.isfinite(error) and error <= args.tolerance),
+               'speedup': (baseline or elapsed) / elapsed}
+        rows.append(row)
+        print(f"{solver} {factor:g}x dt: {steps} steps, {elapsed:.4f} s, error {error:.3e}")
+        return elapsed
+
+    # Explicit baselines: C stages and the NumPy engine
+    c_baseline = None
+    for stage in args.explicit_stages:
+        elapsed, field = run_c(stage, args.size, args.steps, args, os.path.join(implicit_dir, stage))
+        record('c', stage, 1, args.steps, elapsed, field, c_baseline)
+        c_baseline = min(c_baseline or elapsed, elapsed)
+    elapsed, field = run_numpy('numpy-inplace', args.size, args.steps, args)
+    numpy_baseline = record('numpy', 'numpy-inplace', 1, args.steps, elapsed, field, None)
+
+    # Implicit at each multiple of the explicit dt, ending at the same physical time
+    for factor in args.dt_factors:
+        steps = max(1, round(args.steps / factor))
+        dt = physical_time / steps
+        output_dir = os.path.join(implicit_dir, IMPLICIT_STAGE, f'dt_x{factor:g}')
+        elapsed, field = run_c(IMPLICIT_STAGE, args.size, steps, args, output_dir, [f'--dt={dt!r}'])
+        record('c', IMPLICIT_STAGE, factor, steps, elapsed, field, c_baseline)
+        if steps <= args.numpy_adi_max_steps:
+            elapsed, field = run_numpy('numpy-adi', args.size, steps, args, dt=dt)
+            record('numpy', 'numpy-adi', factor, steps, elapsed, field, numpy_baseline)
+
+    with open(os.path.join(implicit_dir, 'implicit.json'), 'w') as f:
+        json.dump({'grid_size': args.size, 'physical_time': physical_time, 'explicit_dt': explicit_dt,
+                   'tolerance': args.tolerance, 'runs': rows}, f, indent=2)
+    write_report(os.path.join(implicit_dir, 'implicit_report.md'), args, physical_time, rows)
+    print(f"Report: {os.path.join(implicit_dir, 'implicit_report.md')}")
+
+if __name__ == "__main__":
+    main()
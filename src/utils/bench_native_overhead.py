@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Native Binding Overhead
+
+Compares the per-call overhead of running a stencil kernel in-process through
+the ctypes bindings against launching the stage binary as a subprocess.
+Overhead is wall time minus the kernel time each path reports itself.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.backends.c_stage import run_stage, stage_binary  # noqa: E402
+from heatkernel.grid import prepare_field  # noqa: E402
+from heatkernel.native import NativeKernel  # noqa: E402
+
+KERNEL_STAGES = {
+    'contig': '05_contiguous_memory',
+    'blocked': '06_cache_blocking',
+    'vectorized': '07_vectorization',
+    'openmp': '08_openmp_parallel',
+    'arch': '09_arch_specific',
+}
+
+def measure_native(kernel, size, steps, calls, threads):
+    handle = NativeKernel(kernel, threads)
+    T = prepare_field(size)
+    handle.advance(T, steps, 0.2, 0.01)  # warm up library and scratch buffer
+    overheads = []
+    for _ in range(calls):
+        T = prepare_field(size)
+        start = time.perf_counter()
+        timings = handle.advance(T, steps, 0.2, 0.01)
+        overheads.append(time.perf_counter() - start - timings['total_time'])
+    return sorted(overheads)[len(overheads) // 2]
+
+def measure_subprocess(stage, size, steps, calls, threads):
+    stage_binary(stage)
+    overheads = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        metrics = run_stage(stage, size, steps, 0.2, 0.01, threads=threads or None)
+        overheads.append(time.perf_counter() - start - metrics['total_time'])
+    return sorted(overheads)[len(overheads) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-call overhead: ctypes bindings vs stage subprocess')
+    parser.add_argument('--kernel', choices=sorted(KERNEL_STAGES), default='openmp')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 200, 500])
+    parser.add_argument('--steps', type=int, default=10)
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=0)
+    parser.add_argument('--output', help='Optional JSON output file')
+    args = parser.parse_args()
+
+    stage = KERNEL_STAGES[args.kernel]
+    rows = []
+    for size in args.sizes:
+        native = measure_native(args.kernel, size, args.steps, args.calls, args.threads)
+        subproc = measure_subprocess(stage, size, args.steps, args.calls, args.threads)
+        rows.append({'grid_size': size, 'native_overhead': native, 'subprocess_overhead': subproc})
+
+    print(f"# Per-call overhead: {args.kernel} kernel vs {stage} binary ({args.steps} steps, median of {args.calls})")
+    print("")
+    print("| Grid | ctypes (us) | subprocess (ms) | Ratio |")
+    print("|------|-------------|-----------------|-------|")
+    for row in rows:
+        ratio = row['subprocess_overhead'] / row['native_overhead'] if row['native_overhead'] > 0 else float('inf')
+        print(f"| {row['grid_size']} | {row['native_overhead'] * 1e6:.1f} | {row['subprocess_overhead'] * 1e3:.2f} | {ratio:,.0f}x |")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'kernel': args.kernel, 'stage': stage, 'steps': args.steps, 'results': rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Persistent Parallel Region Benchmark
+
+Compares stage 08 (one OpenMP parallel region per tile pass) with the
+08_openmp_persistent variant (one region for the whole time loop, one barrier
+per pass) at small grids, where fork/join and per-pass bookkeeping are a
+large part of each step. Every (grid, threads) point runs both stages with
+warmup and repetitions; metrics go to
+<results-dir>/persistent/<stage>/grid_<n>/threads_<t>/ and the table of
+median steps/s to <results-dir>/persistent/persistent_report.md.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.benchmark import benchmark_point  # noqa: E402
+from bench_runner import parse_threads  # noqa: E402
+
+BASELINE_STAGE = '08_openmp_parallel'
+PERSISTENT_STAGE = '08_openmp_persistent'
+
+def write_report(path, args, rows):
+    with open(path, 'w') as f:
+        f.write("# Persistent Parallel Region vs Stage 08\n\n")
+        f.write(f"{args.steps} steps per run, median of {args.repetitions} repetitions\n\n")
+        f.write("| Grid | Threads | Stage 08 (steps/s) | Persistent (steps/s) | Speedup |\n")
+        f.write("|------|---------|--------------------|----------------------|---------|\n")
+        for row in rows:
+            f.write(f"| {row['grid_size']} | {row['threads']} | {row[BASELINE_STAGE]:.2f} | "
+                    f"{row[PERSISTENT_STAGE]:.2f} | {row['speedup']:.2f} |\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Stage 08 vs the persistent parallel region variant')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[50, 100, 200])
+    parser.add_argument('--steps', type=int, default=20000)
+    parser.add_argument('--alpha', type=float, default=0.2)
+    parser.add_argument('--dx', type=float, default=0.01)
+    parser.add_argument('--threads', default=f"1-{os.cpu_count() or 1}",
+                        help="Thread counts, e.g. '1-8,12,16'")
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    args = parser.parse_args()
+
+    persistent_dir = os.path.join(args.results_dir, 'persistent')
+    rows = []
+    for size in args.sizes:
+        for threads in parse_threads(args.threads):
+            row = {'grid_size': size, 'threads': threads}
+            for stage in (BASELINE_STAGE, PERSISTENT_STAGE):
+                output_dir = os.path.abspath(os.path.join(persistent_dir, stage, f'grid_{size}', f'threads_{threads}'))
+                os.makedirs(output_dir, exist_ok=True)
+                metrics = benchmark_point(stage, size, args.steps, args.alpha, args.dx, threads=threads,
+                                          warmup=args.warmup, repetitions=args.repetitions, output_dir=output_dir)
+                row[stage] = metrics['performance']
+            row['speedup'] = row[PERSISTENT_STAGE] / row[BASELINE_STAGE]
+            rows.append(row)
+            print(f"grid={size} threads={threads}: stage 08 {row[BASELINE_STAGE]:,.0f} steps/s, "
+                  f"persistent {row[PERSISTENT_STAGE]:,.0f} steps/s ({row['speedup']:.2f}x)")
+
+    with open(os.path.join(persistent_dir, 'persistent.json'), 'w') as f:
+        json.dump(rows, f, indent=2)
+    write_report(os.path.join(persistent_dir, 'persistent_report.md'), args, rows)
+    print(f"Report: {os.path.join(persistent_dir, 'persistent_report.md')}")
+
+if __name__ == "__main__":
+    main()
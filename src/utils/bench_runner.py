@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Repeated Benchmark Runner
+
+Runs every (stage, grid size, threads) point with warmup runs and several
+timed repetitions, and writes metrics.json files in the usual results layout
+(stage_results/<stage>/ and stage_results/<stage>/threads_<n>/). Headline
+numbers are medians; min, stddev and a bootstrap confidence interval are
+stored under "statistics". With several grid sizes each one gets its own
+results directory (<results-dir>/grid_<size>).
+
+Stages 08/09 are swept once per thread placement (--placements, OMP_PROC_BIND
+and OMP_PLACES as '<bind>@<places>'); non-default placements go to
+stage_results/<stage>/placement_<bind>_<places>/threads_<n>/ and every
+placement's performance, speedup and NUMA nodes in use are collected in
+stage_results/<stage>/placement_report.md.
+
+Each point is added to the results index of --results-dir (heatkernel.store)
+as soon as its metrics.json is written.
+
+Run report_helper.py afterwards to pick the thread count for stages 08/09.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.backends.c_stage import DEFAULT_RANKS, NUMA_STAGES, RANK_STAGES, placement_dir  # noqa: E402
+from heatkernel.benchmark import THREADED_STAGES, bench_stages, benchmark_point  # noqa: E402
+from heatkernel.store import RESULTS_STORE, connect, ingest_results  # noqa: E402
+
+def parse_threads(spec):
+    """'1-4,8,16' -> [1, 2, 3, 4, 8, 16]"""
+    threads = set()
+    for part in spec.split(','):
+        if '-' in part:
+            lo, hi = part.split('-')
+            threads.update(range(int(lo), int(hi) + 1))
+        elif part:
+            threads.add(int(part))
+    return sorted(threads)
+
+def format_point(metrics):
+    stats = metrics['statistics']['performance']
+    return (f"median {stats['median']:,.0f} steps/s "
+            f"[{stats['ci_low']:,.0f}, {stats['ci_high']:,.0f}], "
+            f"min time {metrics['statistics']['total_time']['min']:.6f}s, "
+            f"stddev {stats['stddev']:,.0f}")
+
+def placement_results(stage_results, placement):
+    """Results directory of a thread placement; the default one keeps the plain layout"""
+    return stage_results if placement == 'default' else os.path.join(stage_results, placement_dir(placement))
+
+def write_placement_report(stage_results, stage, rows, first_touch):
+    with open(os.path.join(stage_results, 'placement_report.md'), 'w') as f:
+        f.write(f"# Thread Placement: {stage}\n\n")
+        f.write(f"First touch: {first_touch}\n\n")
+        f.write("| Placement | Threads | Performance (steps/s) | Speedup | NUMA nodes |\n")
+        f.write("|-----------|---------|----------------------|---------|------------|\n")
+        base = {}
+        for placement, threads, metrics in rows:
+            base.setdefault(placement, metrics['performance'])
+            nodes = metrics.get('placement', {}).get('numa_nodes_used', 'n/a')
+            f.write(f"| {placement} | {threads} | {metrics['performance']:.2f} | "
+                    f"{metrics['performance'] / base[placement]:.2f} | {nodes} |\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark stages with warmup and repetitions')
+    parser.add_argument('--dim', type=int, choices=(2, 3), default=2,
+                        help='Benchmark the 2D or the 3D stages (ignored with --stages)')
+    parser.add_argument('--stages', nargs='+', default=None)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[200])
+    parser.add_argument('--steps', type=int, default=20000)
+    parser.add_argument('--alpha', type=float, default=0.2)
+    parser.add_argument('--dx', type=float, default=0.01)
+    parser.add_argument('--threads', default=f"1-{os.cpu_count() or 1}",
+                        help="Thread counts for stages 08/09, e.g. '1-8,12,16'")
+    parser.add_argument('--placements', nargs='+', default=['default'],
+                        help="Thread placements of stages 08/09: default or <bind>@<places>, e.g. close@cores")
+    parser.add_argument('--first-touch', type=int, default=0,
+                        help='Stages 08/09 initialize their fields with a parallel first touch')
+    parser.add_argument('--ranks', type=int, default=DEFAULT_RANKS, help='Ranks of stage 10')
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--engine', default='loop', help='Stage 00 engine')
+    parser.add_argument('--dump-field', type=int, default=0)
+    parser.add_argument('--perf', type=int, default=0, help='Record perf_event counters (C stages)')
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    parser.add_argument('--store', default=None,
+                        help=f'Results index (default: <results-dir>/{RESULTS_STORE})')
+    args = parser.parse_args()
+    args.stages = args.stages or list(bench_stages(args.dim))
+    os.makedirs(args.results_dir, exist_ok=True)
+    conn = connect(args.store or os.path.join(args.results_dir, RESULTS_STORE))
+
+    stage_args = [f'--dump-field={args.dump_field}', f'--perf={args.perf}']
+    for size in args.sizes:
+        results_dir = args.results_dir if len(args.sizes) == 1 else os.path.join(args.results_dir, f'grid_{size}')
+        for stage in args.stages:
+            stage_results = os.path.join(results_dir, 'stage_results', stage)
+            if stage in THREADED_STAGES:
+                points = [(placement, t, os.path.join(placement_results(stage_results, placement), f'threads_{t}'))
+                          for placement in args.placements for t in parse_threads(args.threads)]
+            else:
+                points = [(None, None, stage_results)]
+            numa_args = [f'--first-touch={args.first_touch}'] if stage in NUMA_STAGES else []
+            rank_args = [f'--ranks={args.ranks}'] if stage in RANK_STAGES else []
+
+            rows = []
+            for placement, threads, output_dir in points:
+                os.makedirs(output_dir, exist_ok=True)
+                metrics = benchmark_point(stage, size, args.steps, args.alpha, args.dx, threads=threads,
+                                          warmup=args.warmup, repetitions=args.repetitions,
+                                          engine=args.engine, args=stage_args + numa_args + rank_args,
+                                          confidence=args.confidence, output_dir=os.path.abspath(output_dir),
+                                          placement=placement)
+                label = stage if threads is None else f"{stage} threads={threads}"
+                if placement not in (None, 'default'):
+                    label += f" placement={placement}"
+                print(f"{label} grid={size}: {format_point(metrics)}")
+                ingest_results(conn, output_dir)
+                rows.append((placement, threads, metrics))
+            if stage in NUMA_STAGES:
+                write_placement_report(stage_results, stage, rows, args.first_touch)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Multi-process Scaling Runner
+
+Runs the numpy-mp backend (row strips in shared memory) over a range of
+worker counts and writes one metrics.json per count in the same threads_<n>
+layout as the OpenMP stages, plus a thread_scaling_report.md:
+
+    <results-dir>/mp_scaling/strong/threads_<n>/   fixed grid
+    <results-dir>/mp_scaling/weak/threads_<n>/     grid grown to keep cells per worker fixed
+
+plot_thread_scaling.py plots both directories when they exist.
+"""
+
+import argparse
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel import Solver  # noqa: E402
+from bench_runner import parse_threads  # noqa: E402
+
+STAGE = '00_python_multiprocess'
+
+def weak_size(size, workers):
+    """Grid whose interior has `workers` times the interior cells of `size`"""
+    return 2 + round((size - 2) * math.sqrt(workers))
+
+def write_report(mode_dir, rows):
+    with open(os.path.join(mode_dir, 'thread_scaling_report.md'), 'w') as f:
+        f.write(f"# Multi-process {os.path.basename(mode_dir).capitalize()} Scaling\n\n")
+        f.write("| Workers | Grid | Time (s) | Performance (steps/s) | Speedup |\n")
+        f.write("|---------|------|----------|----------------------|---------|\n")
+        for workers, size, time, performance, speedup in rows:
+            f.write(f"| {workers} | {size} | {time:.6f} | {performance:.2f} | {speedup:.2f} |\n")
+
+def run_mode(mode, args, worker_counts):
+    mode_dir = os.path.join(args.results_dir, 'mp_scaling', mode)
+    solver = Solver('numpy-mp')
+    rows = []
+    base_time = None
+    for workers in worker_counts:
+        size = weak_size(args.size, workers) if mode == 'weak' else args.size
+        result = solver.solve(size, args.steps, args.alpha, args.dx, workers=workers)
+        result.extras.update({'threads': workers, 'scaling': mode, 'base_size': args.size})
+        result.write_metrics(os.path.join(mode_dir, f'threads_{workers}'), STAGE)
+
+        base_time = base_time or result.total_time
+        # weak scaling: scaled speedup n * t1 / tn
+        speedup = base_time / result.total_time * (workers if mode == 'weak' else 1)
+        rows.append((workers, size, result.total_time, result.performance, speedup))
+        print(f"{mode} workers={workers} grid={size}: {result.performance:,.1f} steps/s, "
+              f"speedup {speedup:.2f}, load imbalance {result.extras['load_imbalance']:.3f}")
+    write_report(mode_dir, rows)
+
+def main():
+    parser = argparse.ArgumentParser(description='Strong/weak scaling of the multi-process NumPy solver')
+    parser.add_argument('--size', type=int, default=1000, help='Grid size (base size for weak scaling)')
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--alpha', type=float, default=0.2)
+    parser.add_argument('--dx', type=float, default=0.01)
+    parser.add_argument('--workers', default=f"1-{os.cpu_count() or 1}",
+                        help="Worker counts, e.g. '1-8,12,16'")
+    parser.add_argument('--mode', choices=('strong', 'weak', 'both'), default='both')
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    args = parser.parse_args()
+
+    worker_counts = parse_threads(args.workers)
+    if 1 not in worker_counts:
+        worker_counts.insert(0, 1)  # speedups are relative to one worker
+    for mode in (('strong', 'weak') if args.mode == 'both' else (args.mode,)):
+        run_mode(mode, args, worker_counts)
+
+if __name__ == "__main__":
+    main()
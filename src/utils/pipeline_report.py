@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Pipeline Summary Report
+
+Writes <results-dir>/pipeline_summary.md, one row per pipeline stage, from the
+results index (heatkernel.store) instead of grepping every metrics.json.
+Stages without results are NOT RUN; stages whose validation.json says "fail"
+are REJECTED, and "weak" (no field.npy, only the norms checked) is noted. The report is only rewritten when a stage result or validation
+status changed since the last run.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.store import mark_rendered, open_results, stage_result, stale_digest  # noqa: E402
+
+def validation_status(stage_dir):
+    try:
+        with open(os.path.join(stage_dir, 'validation.json')) as f:
+            return json.load(f).get('status')
+    except (OSError, ValueError):
+        return None
+
+def write_report(path, stages, rows, statuses):
+    with open(path, 'w') as f:
+        f.write("# Pipeline Results\n")
+        f.write(f"Generated: {time.strftime('%a %b %d %H:%M:%S %Z %Y')}\n\n")
+        f.write("| Stage | Time (s) | Time/Step (ms) | Performance (steps/s) |\n")
+        f.write("|-------|----------|----------------|----------------------|\n")
+        for stage in stages:
+            row = rows[stage]
+            if row is None:
+                f.write(f"| {stage} | NOT RUN | NOT RUN | NOT RUN |\n")
+                continue
+            performance = row['performance']
+            if statuses[stage] == 'fail':
+                performance = "REJECTED (field diverged)"
+            elif statuses[stage] == 'weak':
+                performance = f"{performance} (field norms only)"
+            f.write(f"| {stage} | {row['total_time']} | {row['time_per_step']} | {performance} |\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the pipeline summary table from the results index')
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    parser.add_argument('--stage-results-dir', default=None,
+                       help='Path to stage results (default: <results-dir>/stage_results)')
+    parser.add_argument('--stages', nargs='+', required=True)
+    args = parser.parse_args()
+
+    stage_results_dir = args.stage_results_dir or os.path.join(args.results_dir, 'stage_results')
+    os.makedirs(args.results_dir, exist_ok=True)
+    conn = open_results(stage_results_dir)
+    rows = {stage: stage_result(conn, os.path.join(stage_results_dir, stage)) for stage in args.stages}
+    statuses = {stage: validation_status(os.path.join(stage_results_dir, stage)) for stage in args.stages}
+
+    output_file = os.path.join(args.results_dir, 'pipeline_summary.md')
+    digest = stale_digest(conn, output_file, [row for row in rows.values() if row], args.stages, statuses)
+    if digest is None:
+        print(f"{output_file} is up to date")
+        return
+    write_report(output_file, args.stages, rows, statuses)
+    mark_rendered(conn, output_file, digest)
+
+if __name__ == "__main__":
+    main()
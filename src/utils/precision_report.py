@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Precision Report
+
+Benchmarks the float64, float32 and mixed-precision (float32 storage,
+float64 arithmetic) builds of stages 05-09 and the matching NumPy engines,
+and compares each final field with the float64 NumPy reference. Results go
+to <results-dir>/precision/<stage>/<precision>/metrics.json, with a
+precision_report.md table of throughput, speedup over the same stage in
+float64 and error:
+
+    max rel error  max |T - T_ref| / max |T_ref|
+    rel L2 error   ||T - T_ref|| / ||T_ref||
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel import solve  # noqa: E402
+from heatkernel.backends.c_stage import PRECISION_STAGES  # noqa: E402
+from heatkernel.benchmark import PYTHON_STAGE, THREADED_STAGES, benchmark_point  # noqa: E402
+from heatkernel.validation import compare_fields, load_field  # noqa: E402
+
+PRECISIONS = ('float64', 'float32', 'mixed')
+# Stage 00 engine per precision
+NUMPY_ENGINES = {'float64': 'numpy-inplace', 'float32': 'numpy-f32', 'mixed': 'numpy-mixed'}
+
+def write_report(path, args, rows):
+    with open(path, 'w') as f:
+        f.write("# Precision Report\n\n")
+        f.write(f"Grid {args.size}, {args.steps} steps, reference: numpy-inplace (float64)\n\n")
+        f.write("| Stage | Precision | Performance (steps/s) | GB/s | Speedup | Max rel error | Rel L2 error |\n")
+        f.write("|-------|-----------|----------------------|------|---------|---------------|--------------|\n")
+        for row in rows:
+            f.write(f"| {row['stage']} | {row['precision']} | {row['performance']:.2f} | {row['gbytes_per_s']:.2f} | "
+                    f"{row['speedup']:.2f} | {row['max_rel_diff']:.3e} | {row['rel_l2_diff']:.3e} |\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput and error of the float32/mixed-precision variants')
+    parser.add_argument('--stages', nargs='+', default=[PYTHON_STAGE] + list(PRECISION_STAGES))
+    parser.add_argument('--precisions', nargs='+', choices=PRECISIONS, default=list(PRECISIONS))
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--steps', type=int, default=20000)
+    parser.add_argument('--alpha', type=float, default=0.2)
+    parser.add_argument('--dx', type=float, default=0.01)
+    parser.add_argument('--threads', type=int, default=None,
+                        help='Threads of stages 08/09 (default: OpenMP default)')
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    args = parser.parse_args()
+
+    precision_dir = os.path.join(args.results_dir, 'precision')
+    reference = solve(args.size, args.steps, args.alpha, args.dx).field
+
+    rows = []
+    for stage in args.stages:
+        base = None
+        for precision in args.precisions:
+            output_dir = os.path.abspath(os.path.join(precision_dir, stage, precision))
+            os.makedirs(output_dir, exist_ok=True)
+            metrics = benchmark_point(stage, args.size, args.steps, args.alpha, args.dx,
+                                      threads=args.threads if stage in THREADED_STAGES else None,
+                                      warmup=args.warmup, repetitions=args.repetitions,
+                                      engine=NUMPY_ENGINES[precision], args=['--dump-field=1'],
+                                      output_dir=output_dir, precision=precision)
+            error = compare_fields(load_field(output_dir), reference)
+            base = base or (metrics['performance'] if precision == 'float64' else None)
+            rows.append({
+                'stage': stage,
+                'precision': precision,
+                'performance': metrics['performance'],
+                'gbytes_per_s': metrics['roofline']['gbytes_per_s'],
+                'speedup': metrics['performance'] / base if base else float('nan'),
+                'max_rel_diff': error['max_rel_diff'],
+                'rel_l2_diff': error['rel_l2_diff'],
+            })
+            print(f"{stage} {precision}: {metrics['performance']:,.1f} steps/s, "
+                  f"max rel error {error['max_rel_diff']:.3e}")
+
+    with open(os.path.join(precision_dir, 'precision.json'), 'w') as f:
+        json.dump(rows, f, indent=2)
+    write_report(os.path.join(precision_dir, 'precision_report.md'), args, rows)
+    print(f"Report: {os.path.join(precision_dir, 'precision_report.md')}")
+
+if __name__ == "__main__":
+    main()
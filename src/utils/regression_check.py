@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Check
+
+Compares the stage runs of a results directory with the same (stage, grid,
+threads, host, precision) points of archived results (heatkernel.regression):
+Mann-Whitney on the time per step of every repetition, pooled over the
+--baselines most recent archives or the --baseline directories given. Writes
+a markdown report and exits with status 1 when a point got significantly
+slower by more than --threshold, so it can gate kernel changes:
+
+    make archive                 # baseline
+    ... change a kernel ...
+    make bench && make regression
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.regression import archive_dirs, collect_samples, compare  # noqa: E402
+
+VERDICT_ORDER = ('slower', 'inconclusive', 'new', 'unchanged', 'faster')
+
+def format_ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.4f}"
+
+def write_report(path, args, baselines, rows):
+    with open(path, 'w') as f:
+        f.write("# Performance Regression Check\n\n")
+        f.write(f"Current: `{args.results_dir}`  \n")
+        f.write("Baselines: " + ', '.join(f"`{b}`" for b in baselines) + "  \n")
+        f.write(f"A point regresses when its median time per step grows by more than {args.threshold:.0%} "
+                f"and the Mann-Whitney p-value is below {args.alpha:g}.\n\n")
+
+        counts = {verdict: sum(row['verdict'] == verdict for row in rows) for verdict in VERDICT_ORDER}
+        f.write(', '.join(f"{counts[v]} {v}" for v in VERDICT_ORDER) + "\n\n")
+
+        slower = [row for row in rows if row['verdict'] == 'slower']
+        if slower:
+            f.write("## Regressions\n\n")
+            for row in slower:
+                threads = '' if row['threads'] is None else f" threads {row['threads']}"
+                f.write(f"- {row['stage']} grid {row['grid_size']}{threads}: "
+                        f"{row['change']:+.1%} (p={row['p_value']:.3g})\n")
+            f.write("\n")
+
+        f.write("## All points\n\n")
+        f.write("| Stage | Grid | Threads | Host | Precision | Baseline (ms/step) | n | Current (ms/step) | n | Change | p | Verdict |\n")
+        f.write("|-------|------|---------|------|-----------|--------------------|---|-------------------|---|--------|---|---------|\n")
+        for row in sorted(rows, key=lambda r: VERDICT_ORDER.index(r['verdict'])):
+            change = '-' if row['change'] is None else f"{row['change']:+.1%}"
+            p = '-' if row['p_value'] is None else f"{row['p_value']:.3g}"
+            threads = '-' if row['threads'] is None else row['threads']
+            f.write(f"| {row['stage']} | {row['grid_size']} | {threads} | {row['host'] or '-'} | {row['precision']} | "
+                    f"{format_ms(row['baseline_median'])} | {row['baseline_count']} | "
+                    f"{format_ms(row['current_median'])} | {row['current_count']} | {change} | {p} | {row['verdict']} |\n")
+
+        if counts['inconclusive']:
+            f.write("\nInconclusive points have too few samples for the test to reach the level; "
+                    "`make bench` records REPETITIONS samples per point.\n")
+
+def main():
+    parser = argparse.ArgumentParser(description='Flag significant slowdowns against archived results')
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    parser.add_argument('--archive-dir', default='results/archive')
+    parser.add_argument('--baselines', type=int, default=1,
+                        help='Most recent archives pooled as the baseline, 0 for all (default: 1)')
+    parser.add_argument('--baseline', action='append', default=[],
+                        help='Baseline results directory instead of the archives (repeatable)')
+    parser.add_argument('--alpha', type=float, default=0.05, help='Significance level')
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help='Smallest relative slowdown of the median flagged (default: 0.05)')
+    parser.add_argument('--output', default=None,
+                        help='Markdown report (default: <results-dir>/regression_report.md)')
+    parser.add_argument('--store', default=None,
+                        help="SQLite store for all directories (default: each results directory's own index)")
+    args = parser.parse_args()
+
+    baselines = args.baseline or archive_dirs(args.archive_dir, args.baselines)
+    if not baselines:
+        print(f"No baselines: no results_* archives in {args.archive_dir} (make archive)")
+        return 2
+    if not os.path.isdir(args.results_dir):
+        print(f"Results directory not found: {args.results_dir}")
+        return 2
+
+    current = collect_samples(args.results_dir, args.store)
+    baseline = {}
+    for directory in baselines:
+        for key, samples in collect_samples(directory, args.store).items():
+            baseline.setdefault(key, []).extend(samples)
+    rows = compare(baseline, current, args.alpha, args.threshold)
+
+    output = args.output or os.path.join(args.results_dir, 'regression_report.md')
+    write_report(output, args, baselines, rows)
+    for row in rows:
+        if row['verdict'] in ('slower', 'faster'):
+            threads = '' if row['threads'] is None else f" threads={row['threads']}"
+            print(f"{row['verdict'].upper()}: {row['stage']} grid={row['grid_size']}{threads} "
+                  f"{row['change']:+.1%} (p={row['p_value']:.3g})")
+    regressions = sum(row['verdict'] == 'slower' for row in rows)
+    print(f"{len(rows)} points, {regressions} regressions. Report: {output}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,27 @@ Copy Optimal Thread Results
 
 This script finds the best performing thread configuration from OpenMP parallel
 and architecture-specific runs and copies their results to the main stage directories.
+The choice uses the median of repeated runs with a Mann-Whitney significance test
+when bench_runner.py recorded several repetitions.
 """
 
-import json
-import glob
 import os
 import shutil
 import argparse
+import sys
 
-def find_best_thread_performance(parent_dir, stage_name):
-    """Find the thread directory with the best performance"""
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.stats import select_threads  # noqa: E402
+from heatkernel.store import open_results, store_base, thread_results  # noqa: E402
+
+def find_best_thread_performance(parent_dir, stage_name, alpha=0.05):
+    """Find the thread directory with the best median performance.
+
+    Runs from bench_runner.py carry repeated total_time samples; the fastest
+    median wins unless fewer threads are not significantly slower (see
+    heatkernel.stats.select_threads). Single-sample runs reduce to the max.
+    """
     best_performance = 0
     best_dir = None
     best_thread_count = None
@@ -22,30 +33,30 @@ def find_best_thread_performance(parent_dir, stage_name):
         print(f"Directory not found: {parent_dir}")
         return best_performance, best_dir, best_thread_count
     
-    # Look for thread directories - handle both thread_* and threads_* patterns
-    thread_dirs = glob.glob(f"{parent_dir}/thread_*") + glob.glob(f"{parent_dir}/threads_*")
+    # thread_<n> and threads_<n> runs, from the results index
+    conn = open_results(parent_dir)
+    rows = thread_results(conn, parent_dir)
     
-    if not thread_dirs:
+    if not rows:
         print(f"No thread directories found in: {parent_dir}")
         return best_performance, best_dir, best_thread_count
     
-    for thread_dir in thread_dirs:
-        metrics_file = os.path.join(thread_dir, "metrics.json")
-        if os.path.exists(metrics_file):
-            try:
-                with open(metrics_file) as f:
-                    data = json.load(f)
-                    performance = data['performance']
-                    thread_count = os.path.basename(thread_dir).split('_')[-1]
-                    
-                    if performance > best_performance:
-                        best_performance = performance
-                        best_dir = thread_dir
-                        best_thread_count = thread_count
-            except (json.JSONDecodeError, KeyError) as e:
-                print(f"Error reading {metrics_file}: {e}")
+    samples = {}
+    candidates = {}
+    for row in rows:
+        data = row['metrics']
+        if 'statistics' in data:
+            samples[row['threads']] = data['statistics']['total_time']['samples']
         else:
-            continue
+            samples[row['threads']] = [row['total_time']]
+        candidates[row['threads']] = (row['performance'], os.path.join(store_base(conn), row['dir']))
+
+    if samples:
+        best_thread_count, details = select_threads(samples, alpha)
+        best_performance, best_dir = candidates[best_thread_count]
+        if best_thread_count != details['fastest_median']:
+            print(f"{stage_name}: {best_thread_count} threads not significantly slower than "
+                  f"{details['fastest_median']} (p={details['p_values'][best_thread_count]:.3f})")
         
     return best_performance, best_dir, best_thread_count
 
@@ -137,6 +148,25 @@ def main():
                     f.write(f"Performance: {stage9_best_perf:,.0f} steps/sec\n")
     else:
         print("No optimal thread configuration found for Stage 9")
+
+    # Stage 8 3D - OpenMP, only present in DIM=3 runs
+    stage8_3d_parent = f"{results_dir}/stage_results/08_openmp_parallel_3d"
+    if os.path.exists(stage8_3d_parent):
+        stage8_3d_best_perf, stage8_3d_best_dir, stage8_3d_threads = find_best_thread_performance(
+            stage8_3d_parent, "Stage 8 3D (OpenMP)"
+        )
+        if stage8_3d_best_dir:
+            if dry_run:
+                print(f"Would copy Stage 8 3D from: {stage8_3d_best_dir}")
+                print(f"   To: {stage8_3d_parent}")
+            elif copy_thread_results(stage8_3d_best_dir, stage8_3d_parent, "Stage 8 3D"):
+                note_file = os.path.join(stage8_3d_parent, "optimal_thread_note.txt")
+                with open(note_file, 'w') as f:
+                    f.write(f"Optimal thread configuration: {stage8_3d_threads} threads\n")
+                    f.write(f"Source: {os.path.basename(stage8_3d_best_dir)}\n")
+                    f.write(f"Performance: {stage8_3d_best_perf:,.0f} steps/sec\n")
+        else:
+            print("No optimal thread configuration found for Stage 8 3D")
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Results Index
+
+Brings the `results` table of a results index (heatkernel.store) up to date
+with the metrics.json files under one or more directories: new and changed
+files are parsed, deleted ones dropped. By default each directory goes into
+the index of the results directory holding it (<results>/results_index.db),
+so archives and unrelated trees stay apart; --store indexes them all into one
+store to query them together. `make run` and bench_runner.py call this as
+each stage finishes, reports and plots for the directories they read; `make
+index` refreshes RESULTS_DIR and every archive.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.store import RESULTS_STORE, connect, ingest_results, results_store  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description='Index metrics.json files into the results store')
+    parser.add_argument('roots', nargs='*', default=['results/latest'],
+                        help='Directories to index (default: results/latest)')
+    parser.add_argument('--store', default=None,
+                        help=f'SQLite store for all roots (default: the {RESULTS_STORE} of the results '
+                             'directory holding each root)')
+    parser.add_argument('--quiet', action='store_true', help='Only report errors')
+    args = parser.parse_args()
+
+    for root in args.roots:
+        if not os.path.isdir(root):
+            print(f"{root}: not a directory, skipped")
+            continue
+        store = args.store or results_store(root)
+        conn = connect(store)
+        added, updated, removed = ingest_results(conn, root)
+        if not args.quiet:
+            total = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            print(f"{root}: {added} added, {updated} updated, {removed} removed ({total} indexed in {store})")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep Driver
+
+Runs a declarative sweep matrix (stages x grid sizes x threads x tile shapes,
+see heatkernel.sweep) and stores one row per point in a SQLite store.
+Re-running the same command resumes an interrupted sweep.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.store import DEFAULT_STORE, connect, completed_keys, point_key, query_runs  # noqa: E402
+from heatkernel.sweep import expand_matrix, run_sweep  # noqa: E402
+
+def print_best(conn, sweep):
+    """Best stored point per (stage, grid size)"""
+    best = {}
+    for run in query_runs(conn, sweep=sweep):
+        best.setdefault((run['stage'], run['grid_size']), run)
+    print("| Stage | Grid | Threads | Tile (rows x cols x steps) | Performance (steps/s) | 95% CI |")
+    print("|-------|------|---------|----------------------------|-----------------------|--------|")
+    for (stage, size), run in sorted(best.items()):
+        tile = 'x'.join(str(run[k]) for k in ('row_block', 'col_block', 'temporal_block')) if run['row_block'] else '-'
+        ci = f"[{run['ci_low']:,.0f}, {run['ci_high']:,.0f}]" if run['ci_low'] is not None else '-'
+        print(f"| {stage} | {size} | {run['threads'] or '-'} | {tile} | {run['performance']:,.0f} | {ci} |")
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a parameter sweep into the result store')
+    parser.add_argument('--matrix', required=True, help='Sweep matrix JSON file')
+    parser.add_argument('--store', default=DEFAULT_STORE, help=f'SQLite store (default: {DEFAULT_STORE})')
+    parser.add_argument('--sweep', help='Sweep name recorded with each run (default: matrix file name)')
+    parser.add_argument('--jobs', type=int, help='Concurrent single-threaded points (default: one per core)')
+    parser.add_argument('--dry-run', action='store_true', help='List the points still to run and exit')
+    args = parser.parse_args()
+
+    with open(args.matrix) as f:
+        spec = json.load(f)
+    sweep = args.sweep or os.path.splitext(os.path.basename(args.matrix))[0]
+    conn = connect(args.store)
+
+    if args.dry_run:
+        done = completed_keys(conn)
+        for point in expand_matrix(spec):
+            if point_key(point) not in done:
+                print(point_key(point))
+        return
+
+    run_sweep(spec, conn, jobs=args.jobs, sweep=sweep)
+    print_best(conn, sweep)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Validate Stage Output Fields
+
+Compares the final field of every stage run (every directory under
+stage_results with a metrics.json: stage directories, threads_* runs and the
+threads_* runs of placement_* sweeps) against a reference solution for the
+same grid size, step count, alpha and dx. The full field.npy is compared when
+a stage dumped it. Otherwise only the sum/L2/max-norm summary in metrics.json
+can be compared; a matching summary is a weaker check and is reported as
+WEAK, not PASS, unless the bit-exact checksum matches. Checksums are compared
+with the stepping reference (numpy-inplace, numpy-3d in 3D), which the stages
+built without -ffast-math reproduce bit for bit, whatever --reference is.
+
+The default reference is the `spectral` backend, the explicit scheme's field
+by cosine transform without stepping, so it costs the same at any step count.
+It matches the stages to rounding, not bit for bit; `--reference
+numpy-inplace` steps the same operations as the C stages instead, for the
+bitwise column.
+
+Runs of float32 and mixed-precision builds ("precision" in metrics.json) are
+held to the looser --rtol-float32. A validation.json is written next to each
+metrics.json; generate_report marks the throughput of failing stages as
+REJECTED.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel import solve  # noqa: E402
+from heatkernel.validation import checksum, compare_fields, compare_stats, field_stats, load_field  # noqa: E402
+
+DEFAULT_ALPHA = 0.2
+DEFAULT_DX = 0.01
+
+# Bit-compatible references for the checksum of summary-only runs, by dimension
+CHECKSUM_REFERENCES = {2: 'numpy-inplace', 3: 'numpy-3d'}
+
+def natural_key(name):
+    """threads_2 before threads_10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+def run_dirs(stage_results_dir):
+    """(stage, run directory) pairs for every directory with a metrics.json under stage_results"""
+    pairs = []
+    for directory, subdirs, files in os.walk(stage_results_dir):
+        subdirs.sort(key=natural_key)
+        if directory != stage_results_dir and 'metrics.json' in files:
+            pairs.append((os.path.relpath(directory, stage_results_dir).split(os.sep)[0], directory))
+    return pairs
+
+class References:
+    """Reference fields keyed by (size, steps, alpha, dx, dimension, initial field), computed on demand"""
+
+    def __init__(self, backend, stage_results_dir):
+        self.backend = backend
+        self.stage_results_dir = stage_results_dir
+        self.cache = {}
+
+    def backend_for(self, dimension):
+        """3D runs are checked against the 3D counterpart of the reference unless a stage is the reference"""
+        if dimension == 3 and not self.backend.startswith('stage:'):
+            return 'spectral-3d' if self.backend == 'spectral' else 'numpy-3d'
+        return self.backend
+
+    def checksum(self, size, steps, alpha, dx, dimension=2, initial_field=None):
+        """Checksum of the stepping reference, the one the exact stages match bit for bit"""
+        backend = CHECKSUM_REFERENCES[dimension]
+        if self.backend_for(dimension) == backend or self.backend.startswith('stage:'):
+            return self.get(size, steps, alpha, dx, dimension, initial_field)[1]['checksum']
+        key = (backend, size, steps, alpha, dx, initial_field)
+        if key not in self.cache:
+            initial = np.load(initial_field) if initial_field else None
+            self.cache[key] = checksum(solve(size, steps, alpha, dx, backend=backend, initial=initial).field)
+        return self.cache[key]
+
+    def get(self, size, steps, alpha, dx, dimension=2, initial_field=None):
+        key = (size, steps, alpha, dx, dimension, initial_field)
+        if key not in self.cache:
+            if self.backend.startswith('stage:'):
+                stage_dir = os.path.join(self.stage_results_dir, self.backend.split(':', 1)[1])
+                field = load_field(stage_dir)
+                with open(os.path.join(stage_dir, 'metrics.json')) as f:
+                    stats = json.load(f).get('field')
+                self.cache[key] = (field, stats if field is None else field_stats(field))
+            else:
+                initial = np.load(initial_field) if initial_field else None
+                field = solve(size, steps, alpha, dx, backend=self.backend_for(dimension), initial=initial).field
+                self.cache[key] = (field, field_stats(field))
+        return self.cache[key]
+
+def validate_run(directory, references, rtol, rtol_float32=None):
+    with open(os.path.join(directory, 'metrics.json')) as f:
+        metrics = json.load(f)
+
+    # A restarted run is compared with a run from its original start field
+    size, steps = metrics['grid_size'], metrics['time_steps'] + metrics.get('start_step', 0)
+    alpha, dx = metrics.get('alpha', DEFAULT_ALPHA), metrics.get('dx', DEFAULT_DX)
+    dimension = metrics.get('dimension', 2)
+    ref_field, ref_stats = references.get(size, steps, alpha, dx, dimension, metrics.get('initial_field'))
+
+    field = load_field(directory)
+    if field is not None and ref_field is not None:
+        result = compare_fields(field, ref_field)
+        result['method'] = 'field'
+    elif metrics.get('field') and ref_stats:
+        result = compare_stats(metrics['field'], ref_stats)
+        result['method'] = 'summary'
+    else:
+        return {'status': 'unverified', 'reason': 'no field data in metrics.json'}
+
+    precision = metrics.get('precision', 'float64')
+    if result['method'] == 'summary' and not result['bitwise_equal'] and precision == 'float64':
+        result['bitwise_equal'] = metrics['field'].get('checksum') == references.checksum(
+            size, steps, alpha, dx, dimension, metrics.get('initial_field'))
+    if precision != 'float64' and rtol_float32 is not None:
+        rtol = max(rtol, rtol_float32)
+        result['precision'] = precision
+    if result['max_rel_diff'] > rtol:
+        result['status'] = 'fail'
+    elif result['method'] == 'summary' and not result['bitwise_equal']:
+        # Norms within tolerance do not rule out a wrong field
+        result['status'] = 'weak'
+    else:
+        result['status'] = 'pass'
+    result['tolerance'] = rtol
+    result['reference'] = references.backend_for(dimension)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate stage output fields against a reference')
+    parser.add_argument('--results-dir', default='results/latest',
+                       help='Path to results directory (default: results/latest)')
+    parser.add_argument('--reference', default='spectral',
+                       help="heatkernel backend, or 'stage:<name>' to use another stage's output")
+    parser.add_argument('--rtol', type=float, default=1e-9,
+                       help='Maximum difference relative to the reference max norm')
+    parser.add_argument('--rtol-float32', type=float, default=1e-4,
+                       help='Tolerance of float32 and mixed-precision runs')
+    parser.add_argument('--strict', action='store_true',
+                       help='Exit non-zero when any run fails validation')
+    args = parser.parse_args()
+
+    stage_results_dir = os.path.join(args.results_dir, 'stage_results')
+    references = References(args.reference, stage_results_dir)
+
+    rows = []
+    for stage, directory in run_dirs(stage_results_dir):
+        result = validate_run(directory, references, args.rtol, args.rtol_float32)
+        with open(os.path.join(directory, 'validation.json'), 'w') as f:
+            json.dump(result, f, indent=2)
+        rows.append((stage, os.path.relpath(directory, stage_results_dir), result))
+
+    summary = os.path.join(args.results_dir, 'validation_summary.md')
+    with open(summary, 'w') as f:
+        f.write("# Field Validation\n")
+        f.write(f"Reference: {args.reference}, tolerance: {args.rtol:g} (relative to max norm), "
+                f"{args.rtol_float32:g} for float32/mixed runs\n")
+        f.write("WEAK: no field.npy and the checksum differs from the stepping reference, only the sum/L2/max norms "
+                "agree (run with DUMP_FIELD=1 for a full check)\n\n")
+        f.write("| Run | Status | Method | Max rel diff | Bitwise |\n")
+        f.write("|-----|--------|--------|--------------|---------|\n")
+        for stage, run, result in rows:
+            diff = result.get('max_rel_diff')
+            f.write(f"| {run} | {result['status'].upper()} | {result.get('method', '-')} | "
+                    f"{'-' if diff is None else f'{diff:.3e}'} | {result.get('bitwise_equal', '-')} |\n")
+
+    failed = [run for _, run, result in rows if result['status'] == 'fail']
+    weak = [run for _, run, result in rows if result['status'] in ('weak', 'unverified')]
+    for run in failed:
+        print(f"Validation FAILED: {run}")
+    passed = len(rows) - len(failed) - len(weak)
+    print(f"Validated {len(rows)} runs: {passed} passed, {len(failed)} failed, "
+          f"{len(weak)} only summary-checked or unverified. Summary: {summary}")
+
+    if args.strict and failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+// src/verify/verify_temporal_blocking.c
+// Checks the trapezoid tile kernel of temporal_blocking.h against the naive
+// stage 05 kernel over a matrix of grid sizes, step counts, tile shapes and
+// temporal depths, in a plain time loop of its own. The stages' loops around
+// it (active region, snapshot and convergence clipping) are checked by
+// verify_stages.py on the stage binaries. Exits non-zero on any mismatch
+// beyond the tolerance.
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#include "../core/grid_management.h"
+#include "../core/boundary_conditions.h"
+#include "../core/stencil_ops.h"
+#include "../core/temporal_blocking.h"
+
+// 05_contiguous_memory reference
+static double *run_naive(double *T, double *T_new, int size, int timesteps, double alpha, double dt, double dx)
+{
+    for (int step = 0; step < timesteps; step++)
+    {
+        for (int i = 1; i < size - 1; i++)
+        {
+            for (int j = 1; j < size - 1; j++)
+            {
+                T_new[i * size + j] = heat_stencil(T[i * size + j], T[(i + 1) * size + j], T[(i - 1) * size + j], T[i * size + j + 1], T[i * size + j - 1], alpha, dt, dx);
+            }
+        }
+        neumann_boundaries_contig(T_new, size);
+        double *tmp = T;
+        T = T_new;
+        T_new = tmp;
+    }
+    return T;
+}
+
+static double *run_blocked(double *T, double *T_new, int size, int timesteps, double alpha, double dt, double dx,
+                        int row_block_size, int col_block_size, int temporal_block)
+{
+    int nthreads = 1;
+#ifdef _OPENMP
+    nthreads = omp_get_max_threads();
+#endif
+    size_t scratch_size = trapezoid_scratch_size(row_block_size, col_block_size, temporal_block);
+    double *scratch = (double *)malloc((size_t)nthreads * 2 * scratch_size * sizeof(double));
+
+    for (int step = 0; step < timesteps; step += temporal_block)
+    {
+        int k = timesteps - step < temporal_block ? timesteps - step : temporal_block;
+
+#pragma omp parallel for collapse(2)
+        for (int i_start = 1; i_start < size - 1; i_start += row_block_size)
+        {
+            for (int j_start = 1; j_start < size - 1; j_start += col_block_size)
+            {
+                int i_lo, i_hi, j_lo, j_hi;
+                trapezoid_tile_bounds(i_start, row_block_size, size, &i_lo, &i_hi);
+                trapezoid_tile_bounds(j_start, col_block_size, size, &j_lo, &j_hi);
+                int tid = 0;
+#ifdef _OPENMP
+                tid = omp_get_thread_num();
+#endif
+                double *buf_a = scratch + (size_t)tid * 2 * scratch_size;
+                trapezoid_tile(T, T_new, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, buf_a, buf_a + scratch_size);
+            }
+        }
+        double *tmp = T;
+        T = T_new;
+        T_new = tmp;
+    }
+    free(scratch);
+    return T;
+}
+
+static void seed(double *T, int size, int variant)
+{
+    memset(T, 0, (size_t)size * size * sizeof(double));
+    if (variant == 0)
+    {
+        T[(size / 2) * size + size / 2] = 100.0; // the stages' hot spot
+        return;
+    }
+    // Non-trivial field touching the boundaries
+    unsigned int state = 12345u + (unsigned int)size;
+    for (int i = 0; i < size * size; i++)
+    {
+        state = state * 1103515245u + 12345u;
+        T[i] = (double)(state >> 8) / (double)(1u << 24) * 100.0;
+    }
+}
+
+int main(int argc, char *argv[])
+{
+    double tolerance = argc > 1 ? atof(argv[1]) : 0.0;
+    const double alpha = 0.2, dx = 0.01;
+    const double dt = 0.24 * dx * dx / alpha;
+
+    const int sizes[] = {3, 7, 33, 100, 131};
+    const int steps[] = {1, 5, 37, 100};
+    const int tiles[][2] = {{2, 3}, {5, 13}, {8, 8}, {32, 64}, {200, 200}};
+    const int depths[] = {1, 3, 8, 50};
+
+    int checks = 0, failures = 0;
+    double worst = 0.0;
+
+    for (size_t s = 0; s < sizeof(sizes) / sizeof(sizes[0]); s++)
+    {
+        int size = sizes[s];
+        double *ref = grid_create_contig(size);
+        double *ref_tmp = grid_create_contig(size);
+        double *blk = grid_create_contig(size);
+        double *blk_tmp = grid_create_contig(size);
+
+        for (int variant = 0; variant < 2; variant++)
+            for (size_t n = 0; n < sizeof(steps) / sizeof(steps[0]); n++)
+            {
+                seed(ref, size, variant);
+                memcpy(ref_tmp, ref, (size_t)size * size * sizeof(double));
+                const double *expected = run_naive(ref, ref_tmp, size, steps[n], alpha, dt, dx);
+
+                for (size_t t = 0; t < sizeof(tiles) / sizeof(tiles[0]); t++)
+                    for (size_t d = 0; d < sizeof(depths) / sizeof(depths[0]); d++)
+                    {
+                        seed(blk, size, variant);
+                        memcpy(blk_tmp, blk, (size_t)size * size * sizeof(double));
+                        const double *got = run_blocked(blk, blk_tmp, size, steps[n], alpha, dt, dx, tiles[t][0], tiles[t][1], depths[d]);
+
+                        double max_diff = 0.0;
+                        for (int i = 0; i < size * size; i++)
+                        {
+                            double diff = fabs(expected[i] - got[i]);
+                            if (diff > max_diff || diff != diff)
+                                max_diff = diff != diff ? INFINITY : diff;
+                        }
+                        checks++;
+                        if (max_diff > worst)
+                            worst = max_diff;
+                        if (max_diff > tolerance)
+                        {
+                            failures++;
+                            printf("FAIL size=%d steps=%d tile=%dx%d k=%d field=%d max|diff|=%.3e\n",
+                                   size, steps[n], tiles[t][0], tiles[t][1], depths[d], variant, max_diff);
+                        }
+                    }
+            }
+
+        grid_destroy_contig(ref);
+        grid_destroy_contig(ref_tmp);
+        grid_destroy_contig(blk);
+        grid_destroy_contig(blk_tmp);
+    }
+
+    printf("temporal blocking: %d/%d configurations within %.1e (worst %.3e)\n",
+           checks - failures, checks, tolerance, worst);
+    return failures ? 1 : 0;
+}
@@ -1,37 +1,33 @@
-import json
-import glob
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.store import mark_rendered, open_results, stale_digest, thread_results  # noqa: E402
 
 def plot_thread_scaling(results_dir="results/latest/stage_results/09_arch_specific", output_dir="results/latest/performance_plots"):
     """Plot OpenMP thread scaling analysis"""
     os.makedirs(output_dir, exist_ok=True)
     
-    threads = []
-    performances = []
-    total_times = []
-    
-    # Find all thread directories
-    thread_dirs = glob.glob(f"{results_dir}/threads_*")
-    
-    for thread_dir in sorted(thread_dirs, key=lambda x: int(x.split('_')[-1])):
-        metrics_file = os.path.join(thread_dir, "metrics.json")
-        if os.path.exists(metrics_file):
-            with open(metrics_file) as f:
-                data = json.load(f)
-                
-                # Extract thread count from directory name
-                thread_count = int(os.path.basename(thread_dir).split('_')[-1])
-                threads.append(thread_count)
-                
-                # Get performance data
-                performances.append(data['performance'])
-                total_times.append(data['total_time'])
-    
+    # threads_* runs from the results store
+    conn = open_results(results_dir)
+    rows = thread_results(conn, results_dir)
+    threads = [row['threads'] for row in rows]
+    performances = [row['performance'] for row in rows]
+    total_times = [row['total_time'] for row in rows]
+
     if not threads:
         print("No thread scaling data found!")
         return
+
+    # Only re-render when the runs behind the plot changed
+    output_file = f'{output_dir}/arch_thread_scaling_analysis.png'
+    digest = stale_digest(conn, output_file, rows)
+    if digest is None:
+        print(f"{output_file} is up to date")
+        return
     
     # Calculate speedup and efficiency
     single_thread_time = None
@@ -90,7 +86,9 @@ def plot_thread_scaling(results_dir="results/latest/stage_results/09_arch_specif
                  fontweight='bold', fontsize=14)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/arch_thread_scaling_analysis.png', dpi=150, bbox_inches='tight')
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close()
+    mark_rendered(conn, output_file, digest)
 
 if __name__ == "__main__":
     plot_thread_scaling()
\ No newline at end of file
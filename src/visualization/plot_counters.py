@@ -0,0 +1,84 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.perf import perf_summary  # noqa: E402
+from heatkernel.store import mark_rendered, open_results, stage_runs, stale_digest  # noqa: E402
+
+PANELS = [
+    ('performance', 'Performance (steps/second)'),
+    ('ipc', 'Stencil IPC'),
+    ('l1d_miss_rate', 'Stencil L1D miss rate'),
+    ('llc_miss_rate', 'Stencil LLC miss rate'),
+    ('backend_stall_fraction', 'Stencil backend-stall fraction'),
+    ('llc_misses_per_cell', 'Stencil LLC misses per cell update'),
+]
+
+def load_runs(runs):
+    """(label, performance, stencil counters) for every run profiled with PERF=1, and the rows used"""
+    profiled = []
+    used_rows = []
+    skipped = set()
+    for stage, rows in runs.items():
+        for row in rows:
+            data = row['metrics']
+            summary = perf_summary(data)
+            if summary is None:
+                continue
+            if not summary['hardware']:
+                skipped.add(summary['reason'])
+            label = stage.split('_', 1)[0]
+            if row['threads'] is not None:
+                label += f" ({row['threads']}t)"
+            profiled.append((label, data['performance'], summary.get('stencil', summary['total'])))
+            used_rows.append(row)
+    return profiled, used_rows, skipped
+
+def plot_counters(results_dir="results/latest", output_dir="results/latest/performance_plots"):
+    """Throughput next to IPC and miss rates per stage and thread count"""
+    os.makedirs(output_dir, exist_ok=True)
+
+    conn = open_results(f"{results_dir}/stage_results")
+    runs, used_rows, skipped = load_runs(stage_runs(conn, f"{results_dir}/stage_results"))
+    if not runs:
+        print("No hardware counter data found, run 'make run PERF=1' first!")
+        return
+    for reason in skipped:
+        print(f"Some runs have no hardware counters ({reason})")
+
+    # Only re-render when the profiled runs changed
+    output_file = f"{output_dir}/hardware_counters.png"
+    digest = stale_digest(conn, output_file, used_rows)
+    if digest is None:
+        print(f"{output_file} is up to date")
+        return
+
+    labels = [r[0] for r in runs]
+    x = np.arange(len(runs))
+    colors = plt.cm.viridis(np.linspace(0, 0.9, len(runs)))
+
+    fig, axes = plt.subplots(len(PANELS), 1, figsize=(max(12, 0.5 * len(runs)), 4 * len(PANELS)), sharex=True)
+    for ax, (key, title) in zip(axes, PANELS):
+        values = [r[1] if key == 'performance' else r[2].get(key) for r in runs]
+        heights = [v if v is not None else 0.0 for v in values]
+        ax.bar(x, heights, color=colors, edgecolor='black')
+        for i, v in enumerate(values):
+            if v is None:
+                ax.annotate('n/a', (i, 0), textcoords="offset points", xytext=(0, 3), ha='center', fontsize=8)
+        ax.set_ylabel(title)
+        ax.grid(True, axis='y', alpha=0.3)
+    axes[0].set_title('Hardware Counters per Stage (stencil phase)', fontweight='bold')
+    axes[-1].set_xticks(x)
+    axes[-1].set_xticklabels(labels, rotation=60, ha='right', fontsize=8)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.close()
+    mark_rendered(conn, output_file, digest)
+    print(f"Hardware counter plot saved to {output_dir}/hardware_counters.png")
+
+if __name__ == "__main__":
+    plot_counters()
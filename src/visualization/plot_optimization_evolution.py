@@ -1,123 +1,65 @@
-import json
-import glob
+import argparse
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+import sys
 
-def plot_optimization_journey(results_dir="results/latest", output_dir="results/latest/performance_plots"):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.store import mark_rendered, open_results, query_results, stale_digest, thread_results  # noqa: E402
+
+def plot_optimization_journey(results_dir="results/latest", output_dir="results/latest/performance_plots", dimension=2):
     """Plot complete optimization journey with line+bar combination"""
     os.makedirs(output_dir, exist_ok=True)
+    # 3D stages share the stage_results directory and carry a _3d suffix
+    suffix = "_3d" if dimension == 3 else ""
     
     stages = []
     stage_names = []  # Clean names for display
     performances = []
     times_per_step = []
-    
-    # Get all stage directories in order
-    stage_dirs = []
-    for i in range(0, 10):  # 00 to 09
-        stage_dir = f"{results_dir}/stage_results/{i:02d}_*"
-        matching_dirs = glob.glob(stage_dir)
-        if matching_dirs:
-            stage_dirs.append(matching_dirs[0])
-    
-    # Special handling for OpenMP - use best thread performance
-    openmp_best_performance = 0
-    openmp_best_dir = None
-    
-    # Find best OpenMP thread performance
-    openmp_threads_dir = f"{results_dir}/stage_results/08_openmp_parallel"
-    if os.path.exists(openmp_threads_dir):
-        thread_dirs = glob.glob(f"{openmp_threads_dir}/threads_*")
-        for thread_dir in thread_dirs:
-            metrics_file = os.path.join(thread_dir, "metrics.json")
-            if os.path.exists(metrics_file):
-                with open(metrics_file) as f:
-                    data = json.load(f)
-                    if data['performance'] > openmp_best_performance:
-                        openmp_best_performance = data['performance']
-                        openmp_best_dir = thread_dir
 
-    # Special handling for M4 architecture - use best thread performance
-    arch_best_performance = 0
-    arch_best_dir = None
+    # One stage per number 00-09 from the results store, in order
+    stage_results_dir = f"{results_dir}/stage_results"
+    conn = open_results(stage_results_dir)
+    stage_rows = {}
+    for row in query_results(conn, order_by='dir', parent=stage_results_dir):
+        stage_name = os.path.basename(row['dir'])
+        number = stage_name.split('_', 1)[0]
+        if number.isdigit() and int(number) < 10 and stage_name.endswith("_3d") == (dimension == 3):
+            stage_rows.setdefault(number, row)
+
+    # OpenMP stages: use the best thread performance
+    best_threads = {}
+    for stage_name in [f"08_openmp_parallel{suffix}"] + (["09_arch_specific"] if dimension == 2 else []):
+        runs = thread_results(conn, f"{stage_results_dir}/{stage_name}")
+        if runs:
+            best_threads[stage_name.split('_', 1)[0]] = (stage_name, max(runs, key=lambda row: row['performance']))
+    openmp_best = best_threads.get('08', (None, None))[1]
+
+    used_rows = []
+    for number in sorted(set(stage_rows) | set(best_threads)):
+        if number in best_threads:
+            stage_name, row = best_threads[number]
+        else:
+            row = stage_rows[number]
+            stage_name = os.path.basename(row['dir'])
+        used_rows.append(row)
+        stages.append(stage_name)
+        stage_names.append(f"Stage {int(number)}")  # Simple stage number
+        performances.append(row['performance'])
+        times_per_step.append(row['time_per_step'])
 
-    # Find best OpenMP thread performance
-    arch_threads_dir = f"{results_dir}/stage_results/09_arch_specific"
-    if os.path.exists(arch_threads_dir):
-        thread_dirs = glob.glob(f"{arch_threads_dir}/threads_*")
-        for thread_dir in thread_dirs:
-            metrics_file = os.path.join(thread_dir, "metrics.json")
-            if os.path.exists(metrics_file):
-                with open(metrics_file) as f:
-                    data = json.load(f)
-                    if data['performance'] > arch_best_performance:
-                        arch_best_performance = data['performance']
-                        arch_best_dir = thread_dir
-    
-    # Load data for all stages
-    for stage_dir in stage_dirs:
-        stage_name = os.path.basename(stage_dir)
-        
-        # For OpenMP, use best thread performance
-        if stage_name.startswith('08_') and openmp_best_dir:
-            metrics_file = os.path.join(openmp_best_dir, "metrics.json")
-            if os.path.exists(metrics_file):
-                with open(metrics_file) as f:
-                    data = json.load(f)
-                    stages.append(stage_name)
-                    stage_names.append(f"Stage 8")  # Simple stage number
-                    performances.append(data['performance'])
-                    times_per_step.append(data['time_per_step'])
-                    continue
-        
-        if stage_name.startswith('09_') and arch_best_dir:
-            metrics_file = os.path.join(arch_best_dir, "metrics.json")
-            if os.path.exists(metrics_file):
-                with open(metrics_file) as f:
-                    data = json.load(f)
-                    stages.append(stage_name)
-                    stage_names.append(f"Stage 9")  # Simple stage number
-                    performances.append(data['performance'])
-                    times_per_step.append(data['time_per_step'])
-                    continue
-        
-        # For other stages, use normal metrics
-        metrics_file = os.path.join(stage_dir, "metrics.json")
-        if os.path.exists(metrics_file):
-            with open(metrics_file) as f:
-                data = json.load(f)
-                stages.append(stage_name)
-                
-                # Create simple stage numbers
-                if stage_name.startswith('00_'):
-                    clean_name = "Stage 0"
-                elif stage_name.startswith('01_'):
-                    clean_name = "Stage 1" 
-                elif stage_name.startswith('02_'):
-                    clean_name = "Stage 2"
-                elif stage_name.startswith('03_'):
-                    clean_name = "Stage 3"
-                elif stage_name.startswith('04_'):
-                    clean_name = "Stage 4"
-                elif stage_name.startswith('05_'):
-                    clean_name = "Stage 5"
-                elif stage_name.startswith('06_'):
-                    clean_name = "Stage 6"
-                elif stage_name.startswith('07_'):
-                    clean_name = "Stage 7"
-                elif stage_name.startswith('08_'):
-                    clean_name = "Stage 8"
-                elif stage_name.startswith('09_'):
-                    clean_name = "Stage 9"
-                
-                stage_names.append(clean_name)
-                performances.append(data['performance'])
-                times_per_step.append(data['time_per_step'])
-    
     if not stages:
         print("No stage results found!")
         return
+
+    # Only re-render when the runs behind the plot changed
+    output_file = f'{output_dir}/complete_optimization_journey{suffix}.png'
+    digest = stale_digest(conn, output_file, used_rows)
+    if digest is None:
+        print(f"{output_file} is up to date")
+        return
     
     # Create unique colors for each stage
     colors = plt.cm.Set3(np.linspace(0, 1, len(stages)))
@@ -202,7 +144,9 @@ def plot_optimization_journey(results_dir="results/latest", output_dir="results/
     plt.tight_layout()
     
     # Save plots
-    plt.savefig(f'{output_dir}/complete_optimization_journey.png', dpi=150, bbox_inches='tight')
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close()
+    mark_rendered(conn, output_file, digest)
     #plt.show()
     
     # Print comprehensive analysis
@@ -224,10 +168,10 @@ def plot_optimization_journey(results_dir="results/latest", output_dir="results/
     print("="*90)
     
     # Print OpenMP thread info if available
-    if openmp_best_performance > 0:
-        if openmp_best_dir:
-            thread_count = os.path.basename(openmp_best_dir).split('_')[-1]
-            print(f"Best Thread Count: {thread_count} threads")
+    if openmp_best:
+        print(f"Best Thread Count: {openmp_best['threads']} threads")
 
 if __name__ == "__main__":
-    plot_optimization_journey()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Plot the optimization journey of the 2D or 3D stages')
+    parser.add_argument('--dim', type=int, choices=(2, 3), default=2)
+    plot_optimization_journey(dimension=parser.parse_args().dim)
\ No newline at end of file
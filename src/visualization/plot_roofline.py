@@ -0,0 +1,93 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.roofline import load_machine, roofline_metrics  # noqa: E402
+from heatkernel.store import mark_rendered, open_results, stage_runs, stale_digest  # noqa: E402
+
+def load_points(runs):
+    """(label, stage, threads, arithmetic intensity, GFLOP/s) for every stage and thread run"""
+    points = []
+    for stage, rows in runs.items():
+        for row in rows:
+            data = row['metrics']
+            # Older metrics.json files have no roofline block
+            roof = data.get('roofline') or roofline_metrics(data['grid_size'], data['time_steps'],
+                                                            data['total_time'], data.get('temporal_block', 1),
+                                                            data.get('dimension', 2),
+                                                            method=data.get('method', 'stencil'))
+            if roof is None:
+                continue  # no stencil steps to place
+            threads = row['threads'] or 1
+            label = stage.split('_', 1)[0] + (f" ({threads}t)" if row['threads'] is not None else "")
+            points.append((label, stage, threads, roof['arithmetic_intensity'], roof['gflops']))
+    return points
+
+def plot_roofline(results_dir="results/latest", output_dir="results/latest/performance_plots"):
+    """Place every stage and thread count on the measured roofline"""
+    os.makedirs(output_dir, exist_ok=True)
+
+    machine = load_machine(os.path.join(results_dir, "roofline.json"))
+    if machine is None:
+        print("No roofline.json found, run 'make roofline_bench' first!")
+        return
+    conn = open_results(f"{results_dir}/stage_results")
+    runs = stage_runs(conn, f"{results_dir}/stage_results")
+    points = load_points(runs)
+    if not points:
+        print("No stage results found!")
+        return
+
+    # Only re-render when the runs or the machine ceilings changed
+    output_file = f"{output_dir}/roofline.png"
+    digest = stale_digest(conn, output_file, [row for rows in runs.values() for row in rows], machine)
+    if digest is None:
+        print(f"{output_file} is up to date")
+        return
+
+    fig, ax = plt.subplots(figsize=(14, 9))
+    intensities = np.logspace(-2, 1.5, 400)
+
+    # One roof per measured thread count: main memory and best cache bandwidth
+    styles = {'1': ('tab:blue', '1 thread')}
+    if machine['threads'] > 1:
+        styles[str(machine['threads'])] = ('tab:red', f"{machine['threads']} threads")
+    for key, (color, name) in styles.items():
+        peak = machine['peak_gflops'][key]
+        dram = machine['dram_gbs'][key]
+        cache = max(level['copy_gbs'][key] for level in machine['ladder'])
+        ax.plot(intensities, np.minimum(peak, intensities * dram), '-', color=color, linewidth=2,
+                label=f"{name}: DRAM {dram:.1f} GB/s, peak {peak:.1f} GFLOP/s")
+        ax.plot(intensities, np.minimum(peak, intensities * cache), '--', color=color, linewidth=1, alpha=0.6,
+                label=f"{name}: cache {cache:.1f} GB/s")
+
+    stages = sorted({p[1] for p in points})
+    colors = plt.cm.viridis(np.linspace(0, 0.9, len(stages)))
+    for stage, color in zip(stages, colors):
+        stage_points = [p for p in points if p[1] == stage]
+        x = [p[3] for p in stage_points]
+        y = [p[4] for p in stage_points]
+        ax.scatter(x, y, color=color, s=60, edgecolor='black', zorder=3, label=stage)
+        # Label single runs and the fastest thread count
+        best = max(stage_points, key=lambda p: p[4])
+        ax.annotate(best[0], (best[3], best[4]), textcoords="offset points", xytext=(6, 4), fontsize=9)
+
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('Arithmetic Intensity (FLOP/byte)')
+    ax.set_ylabel('Performance (GFLOP/s)')
+    ax.set_title('Roofline: 5-point Stencil Stages', fontweight='bold')
+    ax.grid(True, which='both', alpha=0.3)
+    ax.legend(fontsize=8, loc='lower right')
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.close()
+    mark_rendered(conn, output_file, digest)
+    print(f"Roofline plot saved to {output_dir}/roofline.png")
+
+if __name__ == "__main__":
+    plot_roofline()
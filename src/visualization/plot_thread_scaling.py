@@ -1,38 +1,40 @@
-import json
+import argparse
 import glob
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+import sys
 
-def plot_thread_scaling(results_dir="results/latest/stage_results/08_openmp_parallel", output_dir="results/latest/performance_plots"):
-    """Plot OpenMP thread scaling analysis"""
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from heatkernel.store import mark_rendered, open_results, stale_digest, thread_results  # noqa: E402
+
+def plot_thread_scaling(results_dir="results/latest/stage_results/08_openmp_parallel", output_dir="results/latest/performance_plots",
+                        title="OpenMP Thread Scaling", filename="thread_scaling_analysis.png", weak=False):
+    """Plot thread scaling analysis of threads_* runs.
+
+    With weak=True the grid grows with the thread count, so the speedup shown
+    is the scaled speedup n * t1 / tn and efficiency is t1 / tn.
+    """
     os.makedirs(output_dir, exist_ok=True)
     
-    threads = []
-    performances = []
-    total_times = []
-    efficiencies = []
-    
-    # Find all thread directories
-    thread_dirs = glob.glob(f"{results_dir}/threads_*")
-    
-    for thread_dir in sorted(thread_dirs, key=lambda x: int(x.split('_')[-1])):
-        metrics_file = os.path.join(thread_dir, "metrics.json")
-        if os.path.exists(metrics_file):
-            with open(metrics_file) as f:
-                data = json.load(f)
-                
-                # Extract thread count from directory name
-                thread_count = int(os.path.basename(thread_dir).split('_')[-1])
-                threads.append(thread_count)
-                
-                # Get performance data
-                performances.append(data['performance'])
-                total_times.append(data['total_time'])
-    
+    # threads_* runs from the results store
+    conn = open_results(results_dir)
+    rows = thread_results(conn, results_dir)
+    threads = [row['threads'] for row in rows]
+    performances = [row['performance'] for row in rows]
+    total_times = [row['total_time'] for row in rows]
+
     if not threads:
         print("No thread scaling data found!")
         return
+
+    # Only re-render when the runs behind the plot changed
+    output_file = f'{output_dir}/{filename}'
+    digest = stale_digest(conn, output_file, rows, title, weak)
+    if digest is None:
+        print(f"{output_file} is up to date")
+        return
     
     # Calculate speedup and efficiency
     single_thread_time = None
@@ -50,7 +52,8 @@ def plot_thread_scaling(results_dir="results/latest/stage_results/08_openmp_para
         return
     
     # Calculate speedup and efficiency
-    speedups = [single_thread_time / time for time in total_times]
+    speedups = [single_thread_time / time * (thread_count if weak else 1)
+                for time, thread_count in zip(total_times, threads)]
     efficiencies = [(speedup / thread_count) * 100 for speedup, thread_count in zip(speedups, threads)]
     
     # Create subplots
@@ -60,7 +63,7 @@ def plot_thread_scaling(results_dir="results/latest/stage_results/08_openmp_para
     ax1.plot(threads, performances, 'bo-', linewidth=2, markersize=6)
     ax1.set_xlabel('Number of Threads')
     ax1.set_ylabel('Performance (steps/second)')
-    ax1.set_title('OpenMP Thread Scaling: Performance', fontweight='bold')
+    ax1.set_title(f'{title}: Performance', fontweight='bold')
     ax1.grid(True, alpha=0.3)
     ax1.set_xticks(threads)
 
@@ -77,10 +80,10 @@ def plot_thread_scaling(results_dir="results/latest/stage_results/08_openmp_para
                         xytext=(0,10), ha='center', fontsize=9)
     
     # Plot 2: Speedup vs Threads
-    ax2.plot(threads, speedups, 'ro-', linewidth=2, markersize=6, label='Actual Speedup')
+    ax2.plot(threads, speedups, 'ro-', linewidth=2, markersize=6, label='Scaled Speedup' if weak else 'Actual Speedup')
     ax2.set_xlabel('Number of Threads')
     ax2.set_ylabel('Speedup (vs Single Thread)')
-    ax2.set_title('OpenMP Thread Scaling: Speedup', fontweight='bold')
+    ax2.set_title(f'{title}: Speedup', fontweight='bold')
     ax2.grid(True, alpha=0.3)
     ax2.set_xticks(threads)
     ax2.legend()
@@ -90,11 +93,30 @@ def plot_thread_scaling(results_dir="results/latest/stage_results/08_openmp_para
              label=f'Optimal: {speedups[optimal_idx]:.1f}x')
     
     # Add overall analysis
-    fig.suptitle(f'OpenMP Thread Scaling Analysis\nOptimal: {threads[optimal_idx]} threads', 
+    fig.suptitle(f'{title} Analysis\nOptimal: {threads[optimal_idx]} threads', 
                  fontweight='bold', fontsize=14)
     
     plt.tight_layout()
-    plt.savefig(f'{output_dir}/thread_scaling_analysis.png', dpi=150, bbox_inches='tight')
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close()
+    mark_rendered(conn, output_file, digest)
 
 if __name__ == "__main__":
-    plot_thread_scaling()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Plot OpenMP and multi-process thread scaling')
+    parser.add_argument('--dim', type=int, choices=(2, 3), default=2)
+    if parser.parse_args().dim == 3:
+        plot_thread_scaling("results/latest/stage_results/08_openmp_parallel_3d", title="OpenMP 3D Scaling",
+                            filename="openmp_3d_scaling_analysis.png")
+    else:
+        plot_thread_scaling()
+        # Non-default thread placements (PLACEMENTS in config.mk)
+        for placement_dir in sorted(glob.glob("results/latest/stage_results/08_openmp_parallel/placement_*")):
+            name = os.path.basename(placement_dir)
+            plot_thread_scaling(placement_dir, title=f"OpenMP Thread Scaling ({name})",
+                                filename=f"thread_scaling_{name}.png")
+    # Multi-process Python solver, written by src/utils/mp_scaling.py
+    for mode in ("strong", "weak"):
+        mp_dir = f"results/latest/mp_scaling/{mode}"
+        if os.path.isdir(mp_dir):
+            plot_thread_scaling(mp_dir, title=f"Python Multi-process {mode.capitalize()} Scaling",
+                                filename=f"mp_{mode}_scaling_analysis.png", weak=mode == "weak")
\ No newline at end of file
@@ -0,0 +1,50 @@
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+
+from heatkernel import Solver  # noqa: E402
+from heatkernel.checkpoint import start_field  # noqa: E402
+
+ENGINES = ('numpy-3d',)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PDE Solver - 3D NumPy Reference')
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--timesteps', type=int, default=200)
+    parser.add_argument('--alpha', type=float, default=0.2)
+    parser.add_argument('--dx', type=float, default=0.01)
+    parser.add_argument('--engine', choices=ENGINES, default='numpy-3d')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--dump-field', type=int, nargs='?', const=1, default=0,
+                        help='Also write the final field to field.npy')
+    parser.add_argument('--perf', type=int, nargs='?', const=1, default=0,
+                        help='Hardware counters (C stages only)')
+    parser.add_argument('--initial-field', default=None,
+                        help='.npy start field instead of the hot spot')
+    parser.add_argument('--restart', default=None,
+                        help='Resume from DIR/checkpoint.npy (--timesteps is the total step count)')
+    parser.add_argument('--checkpoint-every', type=int, default=0,
+                        help='Write checkpoint.npy to the output directory every N steps')
+    args = parser.parse_args(argv)
+
+    initial, steps, start_step, origin = start_field(args.size, args.timesteps, args.initial_field, args.restart,
+                                                     dimension=3)
+    result = Solver(args.engine).solve(args.size, steps, args.alpha, args.dx, initial=initial,
+                                       checkpoint_every=args.checkpoint_every, checkpoint_dir=args.output_dir,
+                                       start_step=start_step, origin=origin)
+
+    # Metrics
+    result.extras['engine'] = args.engine
+    if origin:
+        result.extras['initial_field'] = origin
+    if start_step:
+        result.extras['start_step'] = start_step
+    if args.perf:
+        result.extras['perf'] = {'available': False, 'hardware': False,
+                                 'reason': 'perf_event counters are only collected by the C stages'}
+    result.write_metrics(args.output_dir, '00_numpy_3d', dump_field=args.dump_field)
+
+if __name__ == '__main__':
+    main()
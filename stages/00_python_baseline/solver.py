@@ -1,75 +1,73 @@
 import os
-import time
-import json
-import numpy as np
+import sys
 import argparse
 
-def heat_equation_solver(size=100, timesteps=250, alpha=0.2, dx=0.01):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
 
-    dt = 0.24 * dx * dx / alpha
-    T = np.zeros((size, size))
-    center = size // 2
-    T[center, center] = 100.0
-    
-    total_stencil_time = 0.0
-    total_boundary_time = 0.0
-    total_swap_time = 0.0
-    
-    start_time = time.time()
+from heatkernel import Solver  # noqa: E402
+from heatkernel.checkpoint import start_field  # noqa: E402
 
-    for step in range(1, timesteps + 1):
-        T_new = np.zeros_like(T)
-        
-        start_stencil_time = time.time()
-        for i in range(1, size-1):
-            for j in range(1, size-1):
-                T_new[i,j] = T[i,j] + alpha * dt/(dx*dx) * (T[i+1,j] + T[i-1,j] + T[i,j+1] + T[i,j-1] - 4*T[i,j])
-        total_stencil_time += time.time() - start_stencil_time
-        
-        start_boundary_time = time.time()
-        T_new[0,:] = T_new[1,:]
-        T_new[-1,:] = T_new[-2,:]  
-        T_new[:,0] = T_new[:,1]
-        T_new[:,-1] = T_new[:,-2]
-        total_boundary_time += time.time() - start_boundary_time
+ENGINES = ('loop', 'numpy', 'numpy-inplace', 'numpy-mp', 'numpy-f32', 'numpy-mixed')
+# Engines that can stop at steady state and skip the cells the front has not reached
+CONVERGE_ENGINES = ('numpy', 'numpy-inplace', 'numpy-f32', 'numpy-mixed')
 
-        start_swap_time = time.time()
-        T = T_new
-        total_swap_time += time.time() - start_swap_time
-    
-    total_time = time.time() - start_time
+def heat_equation_solver(size=100, timesteps=250, alpha=0.2, dx=0.01, engine='loop'):
+    result = Solver(engine).solve(size, timesteps, alpha, dx)
+    return dict(result.timings, field=result.field)
 
-    return {
-            'total_time': total_time,
-            'stencil_time': total_stencil_time,
-            'boundary_time': total_boundary_time,
-            'swap_time': total_swap_time,
-            'other_time': total_time - total_stencil_time - total_boundary_time - total_swap_time,
-        }
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PDE Solver - Python Baseline')
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--timesteps', type=int, default=200)
+    parser.add_argument('--alpha', type=float, default=0.2)
+    parser.add_argument('--dx', type=float, default=0.01)
+    parser.add_argument('--engine', choices=ENGINES, default='loop')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for the numpy-mp engine (default: all CPUs)')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--dump-field', type=int, nargs='?', const=1, default=0,
+                        help='Also write the final field to field.npy')
+    parser.add_argument('--perf', type=int, nargs='?', const=1, default=0,
+                        help='Hardware counters (C stages only)')
+    parser.add_argument('--initial-field', default=None,
+                        help='.npy start field instead of the hot spot')
+    parser.add_argument('--restart', default=None,
+                        help='Resume from DIR/checkpoint.npy (--timesteps is the total step count)')
+    parser.add_argument('--checkpoint-every', type=int, default=0,
+                        help='Write checkpoint.npy to the output directory every N steps')
+    parser.add_argument('--converge-tol', type=float, default=0.0,
+                        help='Stop once the update residual is below this (--timesteps is the limit)')
+    parser.add_argument('--converge-every', type=int, default=100,
+                        help='Steps between residual checks')
+    parser.add_argument('--residual', choices=('max', 'l2'), default='max')
+    parser.add_argument('--active-region', type=int, nargs='?', const=1, default=0,
+                        help='Only update the bounding box the heat front can have reached')
+    args = parser.parse_args(argv)
 
-parser = argparse.ArgumentParser(description='PDE Solver - Python Baseline')
-parser.add_argument('--size', type=int, default=100)
-parser.add_argument('--timesteps', type=int, default=200)
-parser.add_argument('--alpha', type=float, default=0.2)
-parser.add_argument('--dx', type=float, default=0.01)
-parser.add_argument('--output-dir', default='.')
-args = parser.parse_args()
-results = heat_equation_solver(args.size, args.timesteps, args.alpha, args.dx)
+    options = {'workers': args.workers} if args.engine == 'numpy-mp' else {}
+    if args.converge_tol > 0:
+        if args.engine not in CONVERGE_ENGINES:
+            parser.error(f"--converge-tol needs one of the engines {', '.join(CONVERGE_ENGINES)}")
+        options.update(converge_tol=args.converge_tol, converge_every=args.converge_every, residual=args.residual)
+    if args.active_region:
+        if args.engine not in CONVERGE_ENGINES:
+            parser.error(f"--active-region needs one of the engines {', '.join(CONVERGE_ENGINES)}")
+        options['active_region'] = True
+    initial, steps, start_step, origin = start_field(args.size, args.timesteps, args.initial_field, args.restart)
+    result = Solver(args.engine).solve(args.size, steps, args.alpha, args.dx, initial=initial,
+                                       checkpoint_every=args.checkpoint_every, checkpoint_dir=args.output_dir,
+                                       start_step=start_step, origin=origin, **options)
 
-# Metrics
-os.makedirs(args.output_dir, exist_ok=True)
-with open(f'{args.output_dir}/metrics.json', 'w') as f:
-    json.dump({
-        'stage': 'python_baseline',
-        'grid_size': args.size,
-        'time_steps': args.timesteps,
-        'total_time': results['total_time'],
-        'time_per_step': results['total_time'] / args.timesteps * 1000,
-        'performance': args.timesteps / results['total_time'],
-        'breakdown': {
-            'stencil_time': results['stencil_time'],
-            'boundary_time': results['boundary_time'],
-            'swap_time': results['swap_time'],
-            'other_time': results['other_time'],
-        }
-    }, f, indent=2)
\ No newline at end of file
+    # Metrics
+    result.extras['engine'] = args.engine
+    if origin:
+        result.extras['initial_field'] = origin
+    if start_step:
+        result.extras['start_step'] = start_step
+    if args.perf:
+        result.extras['perf'] = {'available': False, 'hardware': False,
+                                 'reason': 'perf_event counters are only collected by the C stages'}
+    result.write_metrics(args.output_dir, '00_python_baseline', dump_field=args.dump_field)
+
+if __name__ == '__main__':
+    main()
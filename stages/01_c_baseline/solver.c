@@ -7,6 +7,11 @@
 #include "../../src/core/boundary_conditions.h"
 #include "../../src/core/stencil_ops.h"
 #include "../../src/core/metrics.h"
+#include "../../src/core/field_io.h"
+#include "../../src/core/roofline.h"
+#include "../../src/core/perf_counters.h"
+#include "../../src/core/options.h"
+#include "../../src/core/checkpoint.h"
 
 int main(int argc, char *argv[])
 {
@@ -16,13 +21,20 @@ int main(int argc, char *argv[])
     double dx = atof(argv[4]);
     const char *output_dir = argv[5];
 
+    solver_options opts;
+    if (parse_solver_options(argc, argv, 6, "01_c_baseline", 0, &opts) != 0)
+        return 1;
+
     double dt = 0.24 * dx * dx / alpha; // to ensure stability dt*alpha/dx*dx<0.25
 
     double **T = grid_create_ptr(size);
     double **T_new = grid_create_ptr(size);
 
-    int center = size / 2;
-    T[center][center] = 100.0;
+    // Hot spot, --initial-field or --restart checkpoint
+    checkpoint_ctx ckpt;
+    checkpoint_init(&ckpt, &opts, output_dir);
+    if (checkpoint_start_ptr(&ckpt, &opts, T, size, &timesteps) != 0)
+        return 1;
 
     struct timespec start, end;
     struct timespec stencil_start, stencil_end;
@@ -34,11 +46,14 @@ int main(int argc, char *argv[])
     double total_swap_time = 0.0;
     volatile double result = 0.0;
 
+    perf_counters pc;
+    perf_counters_open(&pc, opts.perf);
     get_time(&start);
 
     for (int step = 0; step < timesteps; step++)
     {
         // Stencil
+        perf_phase_begin(&pc);
         get_time(&stencil_start);
         for (int j = 1; j < size - 1; j++)
         {
@@ -49,33 +64,49 @@ int main(int argc, char *argv[])
             }
         }
         get_time(&stencil_end);
+        perf_phase_end(&pc, PERF_PHASE_STENCIL);
         total_stencil_time += time_diff(&stencil_start, &stencil_end);
 
         // Boundaries
+        perf_phase_begin(&pc);
         get_time(&boundary_start);
         neumann_boundaries_ptr(T_new, size);
         get_time(&boundary_end);
+        perf_phase_end(&pc, PERF_PHASE_BOUNDARY);
         total_boundary_time += time_diff(&boundary_start, &boundary_end);
 
         // Swapping
+        perf_phase_begin(&pc);
         get_time(&swap_start);
         double **tmp = T;
         T = T_new;
         T_new = tmp;
         get_time(&swap_end);
+        perf_phase_end(&pc, PERF_PHASE_SWAP);
         total_swap_time += time_diff(&swap_start, &swap_end);
+
+        // Checkpointing
+        checkpoint_ptr(&ckpt, T, size, step, step + 1);
     }
 
     get_time(&end);
     double total_time = time_diff(&start, &end);
-    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time;
+    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time - ckpt.time;
 
     // Saving
-    save_metrics_detailed(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "01_c_baseline");
+    metrics_extra extra = {0};
+    metrics_add_number(&extra, "alpha", alpha);
+    metrics_add_number(&extra, "dx", dx);
+    checkpoint_report(&ckpt, &extra);
+    int failed = field_report_ptr(&extra, output_dir, T, size, opts.dump_field) != 0;
+    roofline_report(&extra, size, timesteps, total_time, 1);
+    perf_counters_report(&pc, &extra);
+    failed |= save_metrics_extended(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "01_c_baseline", &extra) != 0;
 
     // Cleaning
+    perf_counters_close(&pc);
     grid_destroy_ptr(T, size);
     grid_destroy_ptr(T_new, size);
 
-    return 0;
+    return failed || ckpt.failed;
 }
\ No newline at end of file
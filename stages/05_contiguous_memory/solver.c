@@ -1,4 +1,4 @@
-// stages/01_c_baseline/solver.c
+// stages/05_contiguous_memory/solver.c
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
@@ -7,6 +7,12 @@
 #include "../../src/core/boundary_conditions.h"
 #include "../../src/core/stencil_ops.h"
 #include "../../src/core/metrics.h"
+#include "../../src/core/field_io.h"
+#include "../../src/core/roofline.h"
+#include "../../src/core/perf_counters.h"
+#include "../../src/core/options.h"
+#include "../../src/core/checkpoint.h"
+#include "../../src/core/convergence.h"
 
 int main(int argc, char *argv[])
 {
@@ -16,13 +22,22 @@ int main(int argc, char *argv[])
     double dx = atof(argv[4]);
     const char *output_dir = argv[5];
 
+    solver_options opts;
+    if (parse_solver_options(argc, argv, 6, "05_contiguous_memory", OPT_CONVERGE, &opts) != 0)
+        return 1;
+
     double dt = 0.24 * dx * dx / alpha; // to ensure stability
 
-    double *T = grid_create_contig(size);
-    double *T_new = grid_create_contig(size);
+    real *T = grid_create_real(size);
+    real *T_new = grid_create_real(size);
 
-    int center = size / 2;
-    T[center * size + center] = 100.0;
+    // Hot spot, --initial-field or --restart checkpoint
+    checkpoint_ctx ckpt;
+    checkpoint_init(&ckpt, &opts, output_dir);
+    if (checkpoint_start_real(&ckpt, &opts, T, size, 2, &timesteps) != 0)
+        return 1;
+    convergence_ctx conv;
+    convergence_init(&conv, &opts);
 
     struct timespec start, end;
     struct timespec stencil_start, stencil_end;
@@ -33,47 +48,96 @@ int main(int argc, char *argv[])
     double total_boundary_time = 0.0;
     double total_swap_time = 0.0;
 
+    perf_counters pc;
+    perf_counters_open(&pc, opts.perf);
     get_time(&start);
 
     for (int step = 0; step < timesteps; step++)
     {
+        int check = convergence_due(&conv, ckpt.start + step, ckpt.start + step + 1);
+        double res_max = 0.0, res_sq = 0.0;
+
+        perf_phase_begin(&pc);
         get_time(&stencil_start);
-        for (int i = 1; i < size - 1; i++)
+        if (check)
+        {
+            // Same sweep with the update residual reduced on the fly
+            for (int i = 1; i < size - 1; i++)
+            {
+                for (int j = 1; j < size - 1; j++)
+                {
+                    T_new[i * size + j] = heat_stencil_real(T[i * size + j], T[(i + 1) * size + j], T[(i - 1) * size + j], T[i * size + j + 1], T[i * size + j - 1], alpha, dt, dx);
+                    double d = fabs((double)T_new[i * size + j] - (double)T[i * size + j]);
+                    res_max = d > res_max ? d : res_max;
+                    res_sq += d * d;
+                }
+            }
+        }
+        else
         {
-            for (int j = 1; j < size - 1; j++)
+            for (int i = 1; i < size - 1; i++)
             {
-                // AoS to SoA
-                T_new[i * size + j] = heat_stencil(T[i * size + j], T[(i + 1) * size + j], T[(i - 1) * size + j], T[i * size + j + 1], T[i * size + j - 1], alpha, dt, dx);
+                for (int j = 1; j < size - 1; j++)
+                {
+                    // AoS to SoA
+                    T_new[i * size + j] = heat_stencil_real(T[i * size + j], T[(i + 1) * size + j], T[(i - 1) * size + j], T[i * size + j + 1], T[i * size + j - 1], alpha, dt, dx);
+                }
             }
         }
         get_time(&stencil_end);
+        perf_phase_end(&pc, PERF_PHASE_STENCIL);
         total_stencil_time += time_diff(&stencil_start, &stencil_end);
 
         // Boundaries
+        perf_phase_begin(&pc);
         get_time(&boundary_start);
-        neumann_boundaries_contig(T_new, size);
+        neumann_boundaries_real(T_new, size);
         get_time(&boundary_end);
+        perf_phase_end(&pc, PERF_PHASE_BOUNDARY);
         total_boundary_time += time_diff(&boundary_start, &boundary_end);
 
         // Swapping
+        perf_phase_begin(&pc);
         get_time(&swap_start);
-        double *tmp = T;
+        real *tmp = T;
         T = T_new;
         T_new = tmp;
         get_time(&swap_end);
+        perf_phase_end(&pc, PERF_PHASE_SWAP);
         total_swap_time += time_diff(&swap_start, &swap_end);
+
+        // Checkpointing
+        checkpoint_real(&ckpt, T, size, 2, step, step + 1);
+
+        // Steady state: stop after the step that converged
+        convergence_record(&conv, check, 1, time_diff(&stencil_start, &stencil_end));
+        if (check && convergence_test(&conv, res_max, res_sq))
+        {
+            timesteps = step + 1;
+            break;
+        }
     }
 
     get_time(&end);
     double total_time = time_diff(&start, &end);
-    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time;
+    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time - ckpt.time;
 
     // Saving
-    save_metrics_detailed(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "01_c_baseline");
+    metrics_extra extra = {0};
+    metrics_add_number(&extra, "alpha", alpha);
+    metrics_add_number(&extra, "dx", dx);
+    metrics_add_string(&extra, "precision", PRECISION_NAME);
+    checkpoint_report(&ckpt, &extra);
+    convergence_report(&conv, &extra, timesteps, total_time);
+    int failed = field_report_real(&extra, output_dir, T, size, opts.dump_field) != 0;
+    roofline_report_real(&extra, size, timesteps, total_time, 1);
+    perf_counters_report(&pc, &extra);
+    failed |= save_metrics_extended(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "05_contiguous_memory", &extra) != 0;
 
     // Cleanup
-    grid_destroy_contig(T);
-    grid_destroy_contig(T_new);
+    perf_counters_close(&pc);
+    grid_destroy_real(T);
+    grid_destroy_real(T_new);
 
-    return 0;
+    return failed || ckpt.failed;
 }
\ No newline at end of file
@@ -1,4 +1,4 @@
-// stages/01_c_baseline/solver.c
+// stages/06_cache_blocking/solver.c
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
@@ -7,6 +7,15 @@
 #include "../../src/core/boundary_conditions.h"
 #include "../../src/core/stencil_ops.h"
 #include "../../src/core/metrics.h"
+#include "../../src/core/field_io.h"
+#include "../../src/core/roofline.h"
+#include "../../src/core/perf_counters.h"
+#include "../../src/core/options.h"
+#include "../../src/core/checkpoint.h"
+#include "../../src/core/convergence.h"
+#include "../../src/core/temporal_blocking.h"
+#include "../../src/core/tuning.h"
+#include "../../src/core/active_region.h"
 
 int main(int argc, char *argv[])
 {
@@ -16,85 +25,131 @@ int main(int argc, char *argv[])
     double dx = atof(argv[4]);
     const char *output_dir = argv[5];
 
+    solver_options opts;
+    if (parse_solver_options(argc, argv, 6, "06_cache_blocking", OPT_TILES | OPT_CONVERGE | OPT_ACTIVE_REGION, &opts) != 0)
+        return 1;
+
     double dt = 0.24 * dx * dx / alpha; // to ensure stability
 
-    double *T = grid_create_contig(size);
-    double *T_new = grid_create_contig(size);
+    real *T = grid_create_real(size);
+    real *T_new = grid_create_real(size);
 
-    int center = size / 2;
-    T[center * size + center] = 100.0;
+    // Hot spot, --initial-field or --restart checkpoint
+    checkpoint_ctx ckpt;
+    checkpoint_init(&ckpt, &opts, output_dir);
+    if (checkpoint_start_real(&ckpt, &opts, T, size, 2, &timesteps) != 0)
+        return 1;
+    convergence_ctx conv;
+    convergence_init(&conv, &opts);
+    // --active-region: only the tiles the front has reached
+    active_region act;
+    active_region_init(&act, &opts, T, size);
 
     struct timespec start, end;
     struct timespec stencil_start, stencil_end;
-    struct timespec boundary_start, boundary_end;
     struct timespec swap_start, swap_end;
 
     double total_stencil_time = 0.0;
     double total_boundary_time = 0.0;
     double total_swap_time = 0.0;
-    int row_block_size = 32;
-    int col_block_size = 64;
-    int temporal_block = 50;
+
+    tile_shape tile;
+    const char *tile_source = tile_select(&opts, "06_cache_blocking", size, 1, (tile_shape){32, 64, 4}, &tile);
+    int row_block_size = tile.row_block;
+    int col_block_size = tile.col_block;
+    int temporal_block = tile.temporal_block;
+
+    // Two private scratch buffers for the halo-extended tile
+    size_t scratch_size = trapezoid_scratch_size(row_block_size, col_block_size, temporal_block);
+    real *buf_a = (real *)malloc(2 * scratch_size * sizeof(real));
+    real *buf_b = buf_a + scratch_size;
+    perf_counters pc;
+    perf_counters_open(&pc, opts.perf);
     get_time(&start);
 
-    // temporal blocking
-    for (int step = 1; step <= timesteps; step += temporal_block)
+    // temporal blocking: each pass advances every tile k genuine steps
+    for (int step = 0, k; step < timesteps; step += k)
     {
+        k = timesteps - step < temporal_block ? timesteps - step : temporal_block;
+        k = convergence_clip(&conv, ckpt.start + step, k);
+        int check = convergence_due(&conv, ckpt.start + step, ckpt.start + step + k);
+        double res_max = 0.0, res_sq = 0.0;
+        active_region_pass(&act, ckpt.start + step, k, row_block_size, col_block_size);
+
+        perf_phase_begin(&pc);
         get_time(&stencil_start);
-        for (int i_start = 1; i_start < size - 1; i_start += row_block_size)
+        for (int i_start = act.i_first; i_start < act.i_end; i_start += row_block_size)
         {
             // row blocking
-            int i_end = i_start + row_block_size;
-            if (i_end > size - 1)
-                i_end = size - 1;
+            int i_lo, i_hi;
+            trapezoid_tile_bounds(i_start, row_block_size, size, &i_lo, &i_hi);
 
-            for (int j_start = 1; j_start < size - 1; j_start += col_block_size)
+            for (int j_start = act.j_first; j_start < act.j_end; j_start += col_block_size)
             {
                 // column blocking
-                int j_end = j_start + col_block_size;
-                if (j_end > size - 1)
-                    j_end = size - 1;
-
-                for (int t = 0; t < temporal_block && (step + t) <= timesteps; t++)
-                {
-                    for (int i = i_start; i < i_end; i++)
-                    {
-                        for (int j = j_start; j < j_end; j++)
-                        {
-                            T_new[i * size + j] = heat_stencil(T[i * size + j], T[(i + 1) * size + j], T[(i - 1) * size + j], T[i * size + j + 1], T[i * size + j - 1], alpha, dt, dx);
-                        }
-                    }
-                }
+                int j_lo, j_hi;
+                trapezoid_tile_bounds(j_start, col_block_size, size, &j_lo, &j_hi);
+
+                if (check)
+                    trapezoid_tile_residual(T, T_new, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, buf_a, buf_b, &res_max, &res_sq);
+                else
+                    trapezoid_tile(T, T_new, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, buf_a, buf_b);
             }
         }
         get_time(&stencil_end);
+        perf_phase_end(&pc, PERF_PHASE_STENCIL);
         total_stencil_time += time_diff(&stencil_start, &stencil_end);
 
-        // Boundaries
-        get_time(&boundary_start);
-        neumann_boundaries_contig(T_new, size);
-        get_time(&boundary_end);
-        total_boundary_time += time_diff(&boundary_start, &boundary_end);
+        // Boundaries are applied inside each tile, boundary_time stays 0
 
         // Swapping
+        perf_phase_begin(&pc);
         get_time(&swap_start);
-        double *tmp = T;
+        real *tmp = T;
         T = T_new;
         T_new = tmp;
         get_time(&swap_end);
+        perf_phase_end(&pc, PERF_PHASE_SWAP);
         total_swap_time += time_diff(&swap_start, &swap_end);
+
+        // Checkpointing
+        checkpoint_real(&ckpt, T, size, 2, step, step + k);
+
+        // Steady state: stop after the pass that converged
+        convergence_record(&conv, check, k, time_diff(&stencil_start, &stencil_end));
+        if (check && convergence_test(&conv, res_max, res_sq))
+        {
+            timesteps = step + k;
+            break;
+        }
     }
 
     get_time(&end);
     double total_time = time_diff(&start, &end);
-    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time;
+    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time - ckpt.time;
 
     // Saving
-    save_metrics_detailed(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "01_c_baseline");
+    metrics_extra extra = {0};
+    metrics_add_number(&extra, "alpha", alpha);
+    metrics_add_number(&extra, "dx", dx);
+    metrics_add_string(&extra, "precision", PRECISION_NAME);
+    metrics_add_int(&extra, "row_block", row_block_size);
+    metrics_add_int(&extra, "col_block", col_block_size);
+    metrics_add_int(&extra, "temporal_block", temporal_block);
+    metrics_add_string(&extra, "tile_source", tile_source);
+    checkpoint_report(&ckpt, &extra);
+    convergence_report(&conv, &extra, timesteps, total_time);
+    active_region_report(&act, &extra, timesteps, total_time);
+    int failed = field_report_real(&extra, output_dir, T, size, opts.dump_field) != 0;
+    roofline_report_real(&extra, size, timesteps, total_time, temporal_block);
+    perf_counters_report(&pc, &extra);
+    failed |= save_metrics_extended(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "06_cache_blocking", &extra) != 0;
 
     // Cleanup
-    grid_destroy_contig(T);
-    grid_destroy_contig(T_new);
+    perf_counters_close(&pc);
+    grid_destroy_real(T);
+    grid_destroy_real(T_new);
+    free(buf_a);
 
-    return 0;
+    return failed || ckpt.failed;
 }
\ No newline at end of file
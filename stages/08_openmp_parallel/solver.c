@@ -1,12 +1,24 @@
-// stages/01_c_baseline/solver.c
+// stages/08_openmp_parallel/solver.c
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
+#include <omp.h>
 #include "../../src/core/timing.h"
 #include "../../src/core/grid_management.h"
 #include "../../src/core/boundary_conditions.h"
 #include "../../src/core/stencil_ops.h"
 #include "../../src/core/metrics.h"
+#include "../../src/core/field_io.h"
+#include "../../src/core/roofline.h"
+#include "../../src/core/perf_counters.h"
+#include "../../src/core/options.h"
+#include "../../src/core/checkpoint.h"
+#include "../../src/core/convergence.h"
+#include "../../src/core/snapshot.h"
+#include "../../src/core/temporal_blocking.h"
+#include "../../src/core/tuning.h"
+#include "../../src/core/active_region.h"
+#include "../../src/core/numa.h"
 
 int main(int argc, char *argv[])
 {
@@ -16,87 +28,148 @@ int main(int argc, char *argv[])
     double dx = atof(argv[4]);
     const char *output_dir = argv[5];
 
+    solver_options opts;
+    if (parse_solver_options(argc, argv, 6, "08_openmp_parallel", OPT_TILES | OPT_CONVERGE | OPT_ACTIVE_REGION | OPT_FIRST_TOUCH | OPT_SNAPSHOT, &opts) != 0)
+        return 1;
+
     double dt = 0.24 * dx * dx / alpha; // to ensure stability
 
-    double *restrict T = grid_create_contig(size);
-    double *restrict T_new = grid_create_contig(size);
+    tile_shape tile;
+    const char *tile_source = tile_select(&opts, "08_openmp_parallel", size, omp_get_max_threads(), (tile_shape){32, 64, 4}, &tile);
+    int row_block_size = tile.row_block;
+    int col_block_size = tile.col_block;
+    int temporal_block = tile.temporal_block;
+
+    // Snapshots are written by a background thread, the loop only copies them out.
+    // It starts before the counters so its writes are not counted.
+    snapshot_writer snapshots;
+    if (snapshot_writer_open(&snapshots, &opts, output_dir, size, 2) != 0)
+        return 1;
+    // Before the first parallel region (--first-touch): counters only follow threads created after them
+    perf_counters pc;
+    perf_counters_open(&pc, opts.perf);
+
+    // --first-touch: pages start on the NUMA node of the thread that updates them
+    real *restrict T = opts.first_touch ? grid_first_touch_real(size, row_block_size, col_block_size) : grid_create_real(size);
+    real *restrict T_new = opts.first_touch ? grid_first_touch_real(size, row_block_size, col_block_size) : grid_create_real(size);
 
-    int center = size / 2;
-    T[center * size + center] = 100.0;
+    // Hot spot, --initial-field or --restart checkpoint
+    checkpoint_ctx ckpt;
+    checkpoint_init(&ckpt, &opts, output_dir);
+    if (checkpoint_start_real(&ckpt, &opts, T, size, 2, &timesteps) != 0)
+        return 1;
+    convergence_ctx conv;
+    convergence_init(&conv, &opts);
+    // --active-region: only the tiles the front has reached
+    active_region act;
+    active_region_init(&act, &opts, T, size);
 
     struct timespec start, end;
     struct timespec stencil_start, stencil_end;
-    struct timespec boundary_start, boundary_end;
     struct timespec swap_start, swap_end;
 
     double total_stencil_time = 0.0;
     double total_boundary_time = 0.0;
     double total_swap_time = 0.0;
-    int row_block_size = 32;
-    int col_block_size = 64;
-    int temporal_block = 50;
+
+    // Private pair of scratch buffers per thread
+    size_t scratch_size = trapezoid_scratch_size(row_block_size, col_block_size, temporal_block);
+    real *scratch = (real *)malloc((size_t)omp_get_max_threads() * 2 * scratch_size * sizeof(real));
+    if (opts.first_touch)
+        scratch_first_touch(scratch, scratch_size);
     get_time(&start);
 
-    for (int step = 1; step <= timesteps; step += temporal_block)
+    for (int step = 0, k; step < timesteps; step += k)
     {
+        k = timesteps - step < temporal_block ? timesteps - step : temporal_block;
+        k = snapshot_clip(&snapshots, ckpt.start + step, k);
+        k = convergence_clip(&conv, ckpt.start + step, k);
+        int check = convergence_due(&conv, ckpt.start + step, ckpt.start + step + k);
+        double res_max = 0.0, res_sq = 0.0;
+        active_region_pass(&act, ckpt.start + step, k, row_block_size, col_block_size);
+
+        perf_phase_begin(&pc);
         get_time(&stencil_start);
-#pragma omp parallel for collapse(2)
-        for (int i_start = 1; i_start < size - 1; i_start += row_block_size)
+#pragma omp parallel for collapse(2) schedule(static) reduction(max : res_max) reduction(+ : res_sq)
+        for (int i_start = act.i_first; i_start < act.i_end; i_start += row_block_size)
         {
-            int i_end = i_start + row_block_size;
-            if (i_end > size - 1)
-                i_end = size - 1;
-
-            for (int j_start = 1; j_start < size - 1; j_start += col_block_size)
+            for (int j_start = act.j_first; j_start < act.j_end; j_start += col_block_size)
             {
-                int j_end = j_start + col_block_size;
-                if (j_end > size - 1)
-                    j_end = size - 1;
-
-                for (int t = 0; t < temporal_block && (step + t) <= timesteps; t++)
-                {
-#pragma clang loop vectorize(enable)
-#pragma clang loop vectorize_width(16)
-                    for (int i = i_start; i < i_end; i++)
-                    {
-#pragma clang loop vectorize(enable)
-#pragma clang loop vectorize_width(16)
-                        for (int j = j_start; j < j_end; j++)
-                        {
-                            T_new[i * size + j] = heat_stencil(T[i * size + j], T[(i + 1) * size + j], T[(i - 1) * size + j], T[i * size + j + 1], T[i * size + j - 1], alpha, dt, dx);
-                        }
-                    }
-                }
+                // collapse(2) needs perfectly nested tile loops (GCC)
+                int i_lo, i_hi, j_lo, j_hi;
+                trapezoid_tile_bounds(i_start, row_block_size, size, &i_lo, &i_hi);
+                trapezoid_tile_bounds(j_start, col_block_size, size, &j_lo, &j_hi);
+
+                real *buf_a = scratch + (size_t)omp_get_thread_num() * 2 * scratch_size;
+                if (check)
+                    trapezoid_tile_residual(T, T_new, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, buf_a, buf_a + scratch_size,
+                                            &res_max, &res_sq);
+                else
+                    trapezoid_tile(T, T_new, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, buf_a, buf_a + scratch_size);
             }
         }
         get_time(&stencil_end);
+        perf_phase_end(&pc, PERF_PHASE_STENCIL);
         total_stencil_time += time_diff(&stencil_start, &stencil_end);
 
-        // Boundaries
-        get_time(&boundary_start);
-        neumann_boundaries_contig(T_new, size);
-        get_time(&boundary_end);
-        total_boundary_time += time_diff(&boundary_start, &boundary_end);
+        // Boundaries are applied inside each tile, boundary_time stays 0
 
         // Swapping
+        perf_phase_begin(&pc);
         get_time(&swap_start);
-        double *tmp = T;
+        real *tmp = T;
         T = T_new;
         T_new = tmp;
         get_time(&swap_end);
+        perf_phase_end(&pc, PERF_PHASE_SWAP);
         total_swap_time += time_diff(&swap_start, &swap_end);
+
+        // Checkpointing
+        checkpoint_real(&ckpt, T, size, 2, step, step + k);
+        if (snapshot_due(&snapshots, ckpt.start + step, ckpt.start + step + k))
+            snapshot_submit(&snapshots, T, ckpt.start + step + k);
+
+        // Steady state: stop after the pass that converged
+        convergence_record(&conv, check, k, time_diff(&stencil_start, &stencil_end));
+        if (check && convergence_test(&conv, res_max, res_sq))
+        {
+            timesteps = step + k;
+            break;
+        }
     }
 
     get_time(&end);
     double total_time = time_diff(&start, &end);
-    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time;
+    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time - ckpt.time
+                        - snapshots.copy_time - snapshots.blocked_time;
+
+    // Waiting for the last snapshots to be written is not part of the run
+    snapshot_writer_close(&snapshots);
 
     // Saving
-    save_metrics_detailed(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "01_c_baseline");
+    metrics_extra extra = {0};
+    metrics_add_number(&extra, "alpha", alpha);
+    metrics_add_number(&extra, "dx", dx);
+    metrics_add_string(&extra, "precision", PRECISION_NAME);
+    metrics_add_int(&extra, "row_block", row_block_size);
+    metrics_add_int(&extra, "col_block", col_block_size);
+    metrics_add_int(&extra, "temporal_block", temporal_block);
+    metrics_add_string(&extra, "tile_source", tile_source);
+    placement_report(&extra, opts.first_touch);
+    checkpoint_report(&ckpt, &extra);
+    convergence_report(&conv, &extra, timesteps, total_time);
+    active_region_report(&act, &extra, timesteps, total_time);
+    snapshot_report(&snapshots, &extra);
+    int failed = field_report_real(&extra, output_dir, T, size, opts.dump_field) != 0;
+    roofline_report_real(&extra, size, timesteps, total_time, temporal_block);
+    perf_counters_report(&pc, &extra);
+    failed |= save_metrics_extended(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "08_openmp_parallel", &extra) != 0;
 
     // Cleanup
-    grid_destroy_contig(T);
-    grid_destroy_contig(T_new);
+    perf_counters_close(&pc);
+    grid_destroy_real(T);
+    grid_destroy_real(T_new);
+    free(scratch);
 
-    return 0;
+    return failed || ckpt.failed;
 }
\ No newline at end of file
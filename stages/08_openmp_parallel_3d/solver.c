@@ -0,0 +1,148 @@
+// stages/08_openmp_parallel_3d/solver.c
+// Stage 07 3D with the (j tile, k tile, i plane) iterations shared between
+// threads; a static schedule hands each thread a contiguous run of planes
+// of a tile, so the plane reuse of the tiling is kept
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include <omp.h>
+#include "../../src/core/timing.h"
+#include "../../src/core/grid_management.h"
+#include "../../src/core/boundary_conditions.h"
+#include "../../src/core/stencil_ops.h"
+#include "../../src/core/metrics.h"
+#include "../../src/core/field_io.h"
+#include "../../src/core/roofline.h"
+#include "../../src/core/perf_counters.h"
+#include "../../src/core/options.h"
+#include "../../src/core/checkpoint.h"
+#include "../../src/core/tuning.h"
+
+// One k row of a tile: out[k] from the centre row and its six neighbour rows
+static inline void row_update(double *restrict out, const double *restrict c,
+                              const double *restrict i_next, const double *restrict i_prev,
+                              const double *restrict j_next, const double *restrict j_prev,
+                              int n, double alpha, double dt, double dx)
+{
+#pragma omp simd
+    for (int k = 0; k < n; k++)
+        out[k] = heat_stencil_3d(c[k], i_next[k], i_prev[k], j_next[k], j_prev[k], c[k + 1], c[k - 1], alpha, dt, dx);
+}
+
+int main(int argc, char *argv[])
+{
+    int size = atoi(argv[1]);
+    int timesteps = atoi(argv[2]);
+    double alpha = atof(argv[3]);
+    double dx = atof(argv[4]);
+    const char *output_dir = argv[5];
+
+    solver_options opts;
+    if (parse_solver_options(argc, argv, 6, "08_openmp_parallel_3d", OPT_TILES, &opts) != 0)
+        return 1;
+
+    double dt = 0.16 * dx * dx / alpha; // 3D stability needs alpha*dt/dx^2 < 1/6
+
+    double *T = grid_create_3d(size);
+    double *T_new = grid_create_3d(size);
+    size_t plane = (size_t)size * size;
+
+    // Hot spot, --initial-field or --restart checkpoint
+    checkpoint_ctx ckpt;
+    checkpoint_init(&ckpt, &opts, output_dir);
+    if (checkpoint_start_contig(&ckpt, &opts, T, size, 3, &timesteps) != 0)
+        return 1;
+
+    struct timespec start, end;
+    struct timespec stencil_start, stencil_end;
+    struct timespec boundary_start, boundary_end;
+    struct timespec swap_start, swap_end;
+
+    double total_stencil_time = 0.0;
+    double total_boundary_time = 0.0;
+    double total_swap_time = 0.0;
+
+    // row_block tiles j, col_block tiles k; there is no temporal blocking in 3D
+    tile_shape tile;
+    const char *tile_source = tile_select(&opts, "08_openmp_parallel_3d", size, omp_get_max_threads(), (tile_shape){16, 128, 1}, &tile);
+    int j_block = tile.row_block;
+    int k_block = tile.col_block;
+
+    perf_counters pc;
+    perf_counters_open(&pc, opts.perf);
+    get_time(&start);
+
+    for (int step = 0; step < timesteps; step++)
+    {
+        perf_phase_begin(&pc);
+        get_time(&stencil_start);
+#pragma omp parallel for collapse(3) schedule(static)
+        for (int j_start = 1; j_start < size - 1; j_start += j_block)
+        {
+            for (int k_start = 1; k_start < size - 1; k_start += k_block)
+            {
+                for (int i = 1; i < size - 1; i++)
+                {
+                    // collapse(3) needs perfectly nested loops
+                    int j_end = j_start + j_block < size - 1 ? j_start + j_block : size - 1;
+                    int k_end = k_start + k_block < size - 1 ? k_start + k_block : size - 1;
+                    for (int j = j_start; j < j_end; j++)
+                    {
+                        size_t c = i * plane + (size_t)j * size + k_start;
+                        row_update(&T_new[c], &T[c], &T[c + plane], &T[c - plane], &T[c + size], &T[c - size],
+                                   k_end - k_start, alpha, dt, dx);
+                    }
+                }
+            }
+        }
+        get_time(&stencil_end);
+        perf_phase_end(&pc, PERF_PHASE_STENCIL);
+        total_stencil_time += time_diff(&stencil_start, &stencil_end);
+
+        // Boundaries
+        perf_phase_begin(&pc);
+        get_time(&boundary_start);
+        neumann_boundaries_3d(T_new, size);
+        get_time(&boundary_end);
+        perf_phase_end(&pc, PERF_PHASE_BOUNDARY);
+        total_boundary_time += time_diff(&boundary_start, &boundary_end);
+
+        // Swapping
+        perf_phase_begin(&pc);
+        get_time(&swap_start);
+        double *tmp = T;
+        T = T_new;
+        T_new = tmp;
+        get_time(&swap_end);
+        perf_phase_end(&pc, PERF_PHASE_SWAP);
+        total_swap_time += time_diff(&swap_start, &swap_end);
+
+        // Checkpointing
+        checkpoint_contig(&ckpt, T, size, 3, step, step + 1);
+    }
+
+    get_time(&end);
+    double total_time = time_diff(&start, &end);
+    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time - ckpt.time;
+
+    // Saving
+    metrics_extra extra = {0};
+    metrics_add_number(&extra, "alpha", alpha);
+    metrics_add_number(&extra, "dx", dx);
+    metrics_add_int(&extra, "dimension", 3);
+    metrics_add_int(&extra, "row_block", j_block);
+    metrics_add_int(&extra, "col_block", k_block);
+    metrics_add_string(&extra, "tile_source", tile_source);
+    checkpoint_report(&ckpt, &extra);
+    int failed = field_report_3d(&extra, output_dir, T, size, opts.dump_field) != 0;
+    roofline_report_dims(&extra, 3, size, timesteps, total_time, 1);
+    perf_counters_report(&pc, &extra);
+    failed |= save_metrics_extended(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "08_openmp_parallel_3d", &extra) != 0;
+
+    // Cleanup
+    perf_counters_close(&pc);
+    grid_destroy_3d(T);
+    grid_destroy_3d(T_new);
+
+    return failed || ckpt.failed;
+}
@@ -0,0 +1,211 @@
+// stages/08_openmp_persistent/solver.c
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include <omp.h>
+#include "../../src/core/timing.h"
+#include "../../src/core/grid_management.h"
+#include "../../src/core/boundary_conditions.h"
+#include "../../src/core/stencil_ops.h"
+#include "../../src/core/metrics.h"
+#include "../../src/core/field_io.h"
+#include "../../src/core/roofline.h"
+#include "../../src/core/perf_counters.h"
+#include "../../src/core/options.h"
+#include "../../src/core/checkpoint.h"
+#include "../../src/core/convergence.h"
+#include "../../src/core/temporal_blocking.h"
+#include "../../src/core/tuning.h"
+#include "../../src/core/numa.h"
+
+// Stage 08 with one parallel region around the whole time loop instead of a
+// fork/join per pass. Every thread walks the same pass sequence with its own
+// copies of the field pointers, takes its static share of the tiles (edge
+// tiles apply the Neumann copies) and meets the others at the implicit
+// barrier of the tile loop: one barrier per pass and no serial phase.
+//
+// The master thread does the bookkeeping right after that barrier while the
+// others already run the next pass: a timestamp per pass, checkpoints (the
+// next pass only reads the field being written out) and the convergence
+// test. Residuals are reduced through per-thread slots, alternating between
+// two sets so a slow reader never sees the next check's values; every thread
+// sums them in the same order and so reaches the same decision to stop.
+
+#define SLOT_STRIDE 8 // doubles per slot, one cache line
+
+int main(int argc, char *argv[])
+{
+    int size = atoi(argv[1]);
+    int timesteps = atoi(argv[2]);
+    double alpha = atof(argv[3]);
+    double dx = atof(argv[4]);
+    const char *output_dir = argv[5];
+
+    solver_options opts;
+    if (parse_solver_options(argc, argv, 6, "08_openmp_persistent", OPT_TILES | OPT_CONVERGE | OPT_FIRST_TOUCH, &opts) != 0)
+        return 1;
+
+    double dt = 0.24 * dx * dx / alpha; // to ensure stability
+
+    int threads = omp_get_max_threads();
+    tile_shape tile;
+    const char *tile_source = tile_select(&opts, "08_openmp_persistent", size, threads, (tile_shape){32, 64, 4}, &tile);
+    int row_block_size = tile.row_block;
+    int col_block_size = tile.col_block;
+    int temporal_block = tile.temporal_block;
+
+    // Before the first parallel region (--first-touch): counters only follow threads created after them
+    perf_counters pc;
+    perf_counters_open(&pc, opts.perf);
+
+    // --first-touch: pages start on the NUMA node of the thread that updates them
+    real *restrict T = opts.first_touch ? grid_first_touch_real(size, row_block_size, col_block_size) : grid_create_real(size);
+    real *restrict T_new = opts.first_touch ? grid_first_touch_real(size, row_block_size, col_block_size) : grid_create_real(size);
+
+    // Hot spot, --initial-field or --restart checkpoint
+    checkpoint_ctx ckpt;
+    checkpoint_init(&ckpt, &opts, output_dir);
+    if (checkpoint_start_real(&ckpt, &opts, T, size, 2, &timesteps) != 0)
+        return 1;
+    convergence_ctx conv;
+    convergence_init(&conv, &opts);
+
+    struct timespec start, end;
+
+    double total_stencil_time = 0.0;
+    double total_boundary_time = 0.0;
+    double total_swap_time = 0.0;
+
+    // Private pair of scratch buffers per thread
+    size_t scratch_size = trapezoid_scratch_size(row_block_size, col_block_size, temporal_block);
+    real *scratch = (real *)malloc((size_t)threads * 2 * scratch_size * sizeof(real));
+    if (opts.first_touch)
+        scratch_first_touch(scratch, scratch_size);
+    // Residual slots: [set][thread * SLOT_STRIDE] for max, then the same for the sum of squares
+    double *slots = (double *)calloc((size_t)2 * 2 * threads * SLOT_STRIDE, sizeof(double));
+    int passes = 0, steps_taken = timesteps;
+    real *final_field = T;
+
+    perf_phase_begin(&pc);
+    get_time(&start);
+
+#pragma omp parallel num_threads(threads)
+    {
+        int tid = omp_get_thread_num();
+        real *buf_a = scratch + (size_t)tid * 2 * scratch_size;
+        real *cur = T;
+        real *next = T_new;
+        int steps = timesteps;
+        struct timespec pass_start = start, pass_end;
+
+        for (int step = 0, k, checks = 0; step < steps; step += k)
+        {
+            k = steps - step < temporal_block ? steps - step : temporal_block;
+            k = convergence_clip(&conv, ckpt.start + step, k);
+            int check = convergence_due(&conv, ckpt.start + step, ckpt.start + step + k);
+            double res_max = 0.0, res_sq = 0.0;
+
+            // Implicit barrier at the end: the pass is complete for everyone
+#pragma omp for collapse(2) schedule(static)
+            for (int i_start = 1; i_start < size - 1; i_start += row_block_size)
+            {
+                for (int j_start = 1; j_start < size - 1; j_start += col_block_size)
+                {
+                    // collapse(2) needs perfectly nested tile loops (GCC)
+                    int i_lo, i_hi, j_lo, j_hi;
+                    trapezoid_tile_bounds(i_start, row_block_size, size, &i_lo, &i_hi);
+                    trapezoid_tile_bounds(j_start, col_block_size, size, &j_lo, &j_hi);
+
+                    if (check)
+                        trapezoid_tile_residual(cur, next, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, buf_a, buf_a + scratch_size,
+                                                &res_max, &res_sq);
+                    else
+                        trapezoid_tile(cur, next, size, i_lo, i_hi, j_lo, j_hi, k, alpha, dt, dx, buf_a, buf_a + scratch_size);
+                }
+            }
+
+            real *tmp = cur;
+            cur = next;
+            next = tmp;
+
+            int done = 0;
+            double *set = slots + (size_t)(checks % 2) * 2 * threads * SLOT_STRIDE;
+            if (check)
+            {
+                // Publish this thread's share, then wait for the others' before reducing
+                set[tid * SLOT_STRIDE] = res_max;
+                set[(threads + tid) * SLOT_STRIDE] = res_sq;
+#pragma omp barrier
+                res_max = res_sq = 0.0;
+                for (int t = 0; t < threads; t++)
+                {
+                    res_max = fmax(res_max, set[t * SLOT_STRIDE]);
+                    res_sq += set[(threads + t) * SLOT_STRIDE];
+                }
+                done = (conv.norm == RESIDUAL_L2 ? sqrt(res_sq) : res_max) < conv.tol;
+                checks++;
+            }
+
+#pragma omp master
+            {
+                get_time(&pass_end);
+                convergence_record(&conv, check, k, time_diff(&pass_start, &pass_end));
+                pass_start = pass_end;
+                passes++;
+                checkpoint_real(&ckpt, cur, size, 2, step, step + k);
+                if (check)
+                    convergence_test(&conv, res_max, res_sq);
+            }
+
+            // Steady state: stop after the pass that converged
+            if (done)
+                steps = step + k;
+        }
+
+#pragma omp master
+        {
+            final_field = cur;
+            steps_taken = steps;
+        }
+    }
+
+    get_time(&end);
+    perf_phase_end(&pc, PERF_PHASE_STENCIL);
+    timesteps = steps_taken;
+    double total_time = time_diff(&start, &end);
+    // Tiles, barriers and boundaries are one phase here; checkpoints are timed on their own
+    total_stencil_time = total_time - ckpt.time;
+    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time - ckpt.time;
+    if (final_field != T)
+    {
+        T_new = T;
+        T = final_field;
+    }
+
+    // Saving
+    metrics_extra extra = {0};
+    metrics_add_number(&extra, "alpha", alpha);
+    metrics_add_number(&extra, "dx", dx);
+    metrics_add_string(&extra, "precision", PRECISION_NAME);
+    metrics_add_int(&extra, "row_block", row_block_size);
+    metrics_add_int(&extra, "col_block", col_block_size);
+    metrics_add_int(&extra, "temporal_block", temporal_block);
+    metrics_add_string(&extra, "tile_source", tile_source);
+    metrics_add_int(&extra, "passes", passes);
+    placement_report(&extra, opts.first_touch);
+    checkpoint_report(&ckpt, &extra);
+    convergence_report(&conv, &extra, timesteps, total_time);
+    int failed = field_report_real(&extra, output_dir, T, size, opts.dump_field) != 0;
+    roofline_report_real(&extra, size, timesteps, total_time, temporal_block);
+    perf_counters_report(&pc, &extra);
+    failed |= save_metrics_extended(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "08_openmp_persistent", &extra) != 0;
+
+    // Cleanup
+    perf_counters_close(&pc);
+    grid_destroy_real(T);
+    grid_destroy_real(T_new);
+    free(scratch);
+    free(slots);
+
+    return failed || ckpt.failed;
+}
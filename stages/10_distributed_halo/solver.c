@@ -0,0 +1,404 @@
+// stages/10_distributed_halo/solver.c
+// 2D block domain decomposition with non-blocking halo exchange (see comm.h:
+// MPI when built with MPI=1, forked local ranks otherwise). Each step posts
+// the halo messages, updates the cells that do not need halos while they are
+// in flight, then waits and updates the outer ring of the block. Checkpoints
+// are written by every rank into one shared mapping of checkpoint.npy.
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../../src/core/timing.h"
+#include "../../src/core/grid_management.h"
+#include "../../src/core/boundary_conditions.h"
+#include "../../src/core/stencil_ops.h"
+#include "../../src/core/metrics.h"
+#include "../../src/core/field_io.h"
+#include "../../src/core/roofline.h"
+#include "../../src/core/perf_counters.h"
+#include "../../src/core/options.h"
+#include "../../src/core/checkpoint.h"
+#include "../../src/core/comm.h"
+
+// Halo tags name the side the message arrives from
+enum
+{
+    FROM_NORTH,
+    FROM_SOUTH,
+    FROM_WEST,
+    FROM_EAST
+};
+
+enum
+{
+    STAT_COMPUTE,
+    STAT_COMM,
+    STAT_WAIT,
+    STAT_BOUNDARY,
+    STAT_SWAP,
+    STAT_CHECKPOINT,
+    STAT_TOTAL,
+    STAT_COUNT
+};
+
+static const char *const stat_names[STAT_COUNT] = {
+    "compute_time", "comm_time", "wait_time", "boundary_time", "swap_time", "checkpoint_time", "total_time"};
+
+// px x py rank grid with px <= py as close to square as possible
+static void decompose(int ranks, int *px, int *py)
+{
+    *px = 1;
+    for (int d = 1; d * d <= ranks; d++)
+        if (ranks % d == 0)
+            *px = d;
+    *py = ranks / *px;
+}
+
+// First interior row/column of block `index` out of `blocks` (global coordinates)
+static int block_start(int size, int blocks, int index)
+{
+    return 1 + (size - 2) * index / blocks;
+}
+
+// Every rank stores its block into the mapped checkpoint, ranks on the global
+// edge also their Neumann halo; rank 0 creates the file and publishes it
+static int write_checkpoint(checkpoint_ctx *ckpt, comm_ctx *comm, const double *T, int w, int size,
+                            int r0, int nr, int c0, int nc, int step)
+{
+    char tmp[1024];
+    field_map m = {.fd = -1};
+    int ok = 1;
+    checkpoint_tmp_path(ckpt, tmp, sizeof(tmp));
+    if (comm->rank == 0)
+        ok = field_map_create(&m, tmp, size, 2) == 0;
+    comm_barrier(comm);
+    if (comm->rank != 0)
+        ok = field_map_open(&m, tmp, size, 2, 1) == 0;
+
+    if (ok)
+    {
+        int i_lo = r0 == 1 ? 0 : 1, i_hi = r0 + nr == size - 1 ? nr + 1 : nr;
+        int j_lo = c0 == 1 ? 0 : 1, j_hi = c0 + nc == size - 1 ? nc + 1 : nc;
+        for (int i = i_lo; i <= i_hi; i++)
+            memcpy(&m.data[(size_t)(r0 - 1 + i) * size + c0 - 1 + j_lo], &T[i * w + j_lo],
+                   (size_t)(j_hi - j_lo + 1) * sizeof(double));
+    }
+    comm_barrier(comm);
+    if (comm->rank != 0)
+    {
+        field_map_close(&m);
+        return ok ? 0 : -1;
+    }
+    if (!ok)
+        return -1;
+
+    // Block halos have no corners: fill them as neumann_boundaries_contig does
+    double *F = m.data;
+    F[0] = F[1];
+    F[size - 1] = F[size - 2];
+    F[(size_t)(size - 1) * size] = F[(size_t)(size - 1) * size + 1];
+    F[(size_t)size * size - 1] = F[(size_t)size * size - 2];
+    return checkpoint_commit(ckpt, &m, size, step);
+}
+
+static inline void update_cell(const double *T, double *T_new, int w, int i, int j, double alpha, double dt, double dx)
+{
+    T_new[i * w + j] = heat_stencil(T[i * w + j], T[(i + 1) * w + j], T[(i - 1) * w + j], T[i * w + j + 1], T[i * w + j - 1], alpha, dt, dx);
+}
+
+int main(int argc, char *argv[])
+{
+    int size = atoi(argv[1]);
+    int timesteps = atoi(argv[2]);
+    double alpha = atof(argv[3]);
+    double dx = atof(argv[4]);
+    const char *output_dir = argv[5];
+
+    solver_options opts;
+    if (parse_solver_options(argc, argv, 6, "10_distributed_halo", OPT_RANKS, &opts) != 0)
+        return 1;
+
+    double dt = 0.24 * dx * dx / alpha; // to ensure stability
+
+    // Stand-in capacities from the requested local ranks (MPI ignores them)
+    int px, py;
+    decompose(option_or(opts.ranks, 1), &px, &py);
+    size_t block_capacity = (size_t)((size - 2 + px - 1) / px) * ((size - 2 + py - 1) / py);
+    comm_ctx comm;
+    if (comm_init(&comm, &argc, &argv, option_or(opts.ranks, 1), size, block_capacity + STAT_COUNT) != 0)
+        return 1;
+    decompose(comm.size, &px, &py);
+    if (px > size - 2 || py > size - 2)
+    {
+        if (comm.rank == 0)
+            fprintf(stderr, "%d ranks (%dx%d) do not fit a %d grid\n", comm.size, px, py, size);
+        comm_finalize(&comm);
+        return 1;
+    }
+
+    // This rank's block: rows [r0, r0 + nr), columns [c0, c0 + nc), plus a one-cell halo
+    int cx = comm.rank / py, cy = comm.rank % py;
+    int r0 = block_start(size, px, cx), nr = block_start(size, px, cx + 1) - r0;
+    int c0 = block_start(size, py, cy), nc = block_start(size, py, cy + 1) - c0;
+    int north = cx > 0 ? comm.rank - py : -1;
+    int south = cx < px - 1 ? comm.rank + py : -1;
+    int west = cy > 0 ? comm.rank - 1 : -1;
+    int east = cy < py - 1 ? comm.rank + 1 : -1;
+    int w = nc + 2;
+
+    double *T = (double *)calloc((size_t)(nr + 2) * w, sizeof(double));
+    double *T_new = (double *)calloc((size_t)(nr + 2) * w, sizeof(double));
+    double *halo = (double *)malloc((size_t)(2 * nc + 4 * nr) * sizeof(double));
+    double *recv_north = halo, *recv_south = halo + nc;
+    double *recv_west = halo + 2 * nc, *recv_east = recv_west + nr;
+    double *send_west = recv_east + nr, *send_east = send_west + nr;
+
+    // Hot spot, or this block and its halo ring cut out of the mapped start field
+    checkpoint_ctx ckpt;
+    checkpoint_init(&ckpt, &opts, output_dir);
+    field_map start_map;
+    int mapped = checkpoint_map_start(&ckpt, &opts, size, 2, &timesteps, &start_map);
+    if (mapped < 0)
+    {
+        comm_finalize(&comm);
+        return 1;
+    }
+    if (mapped)
+    {
+        for (int i = 0; i < nr + 2; i++)
+            memcpy(&T[i * w], &start_map.data[(size_t)(r0 - 1 + i) * size + c0 - 1], (size_t)w * sizeof(double));
+        field_map_close(&start_map);
+    }
+    else
+    {
+        int center = size / 2;
+        if (center >= r0 && center < r0 + nr && center >= c0 && center < c0 + nc)
+            T[(center - r0 + 1) * w + (center - c0 + 1)] = 100.0;
+    }
+
+    struct timespec start, end, t0, t1;
+    double stats[STAT_COUNT] = {0};
+
+    perf_counters pc;
+    perf_counters_open(&pc, opts.perf && comm.rank == 0);
+    comm_barrier(&comm);
+    get_time(&start);
+
+    for (int step = 0; step < timesteps; step++)
+    {
+        // Post the halo exchange: receives first, then this block's edge rows/columns
+        get_time(&t0);
+        comm_request reqs[8];
+        int n = 0;
+        if (north >= 0)
+            comm_irecv(&comm, recv_north, nc, north, FROM_NORTH, &reqs[n++]);
+        if (south >= 0)
+            comm_irecv(&comm, recv_south, nc, south, FROM_SOUTH, &reqs[n++]);
+        if (west >= 0)
+            comm_irecv(&comm, recv_west, nr, west, FROM_WEST, &reqs[n++]);
+        if (east >= 0)
+            comm_irecv(&comm, recv_east, nr, east, FROM_EAST, &reqs[n++]);
+        for (int i = 0; i < nr; i++)
+        {
+            send_west[i] = T[(i + 1) * w + 1];
+            send_east[i] = T[(i + 1) * w + nc];
+        }
+        if (north >= 0)
+            comm_isend(&comm, &T[w + 1], nc, north, FROM_SOUTH, &reqs[n++]);
+        if (south >= 0)
+            comm_isend(&comm, &T[nr * w + 1], nc, south, FROM_NORTH, &reqs[n++]);
+        if (west >= 0)
+            comm_isend(&comm, send_west, nr, west, FROM_EAST, &reqs[n++]);
+        if (east >= 0)
+            comm_isend(&comm, send_east, nr, east, FROM_WEST, &reqs[n++]);
+        get_time(&t1);
+        stats[STAT_COMM] += time_diff(&t0, &t1);
+
+        // Interior cells need no halo: overlap them with the exchange
+        perf_phase_begin(&pc);
+        get_time(&t0);
+        for (int i = 2; i < nr; i++)
+            for (int j = 2; j < nc; j++)
+                update_cell(T, T_new, w, i, j, alpha, dt, dx);
+        get_time(&t1);
+        perf_phase_end(&pc, PERF_PHASE_STENCIL);
+        stats[STAT_COMPUTE] += time_diff(&t0, &t1);
+
+        get_time(&t0);
+        comm_waitall(&comm, n, reqs);
+        get_time(&t1);
+        stats[STAT_WAIT] += time_diff(&t0, &t1);
+        stats[STAT_COMM] += time_diff(&t0, &t1);
+        get_time(&t0);
+        for (int j = 0; j < nc; j++)
+        {
+            if (north >= 0)
+                T[j + 1] = recv_north[j];
+            if (south >= 0)
+                T[(nr + 1) * w + j + 1] = recv_south[j];
+        }
+        for (int i = 0; i < nr; i++)
+        {
+            if (west >= 0)
+                T[(i + 1) * w] = recv_west[i];
+            if (east >= 0)
+                T[(i + 1) * w + nc + 1] = recv_east[i];
+        }
+        get_time(&t1);
+        stats[STAT_COMM] += time_diff(&t0, &t1);
+
+        // Outer ring of the block, now that the halos are in
+        perf_phase_begin(&pc);
+        get_time(&t0);
+        for (int j = 1; j <= nc; j++)
+        {
+            update_cell(T, T_new, w, 1, j, alpha, dt, dx);
+            if (nr > 1)
+                update_cell(T, T_new, w, nr, j, alpha, dt, dx);
+        }
+        for (int i = 2; i < nr; i++)
+        {
+            update_cell(T, T_new, w, i, 1, alpha, dt, dx);
+            if (nc > 1)
+                update_cell(T, T_new, w, i, nc, alpha, dt, dx);
+        }
+        get_time(&t1);
+        perf_phase_end(&pc, PERF_PHASE_STENCIL);
+        stats[STAT_COMPUTE] += time_diff(&t0, &t1);
+
+        // Neumann boundaries: halos on the global edge mirror the block's edge
+        perf_phase_begin(&pc);
+        get_time(&t0);
+        for (int j = 1; j <= nc; j++)
+        {
+            if (north < 0)
+                T_new[j] = T_new[w + j];
+            if (south < 0)
+                T_new[(nr + 1) * w + j] = T_new[nr * w + j];
+        }
+        for (int i = 1; i <= nr; i++)
+        {
+            if (west < 0)
+                T_new[i * w] = T_new[i * w + 1];
+            if (east < 0)
+                T_new[i * w + nc + 1] = T_new[i * w + nc];
+        }
+        get_time(&t1);
+        perf_phase_end(&pc, PERF_PHASE_BOUNDARY);
+        stats[STAT_BOUNDARY] += time_diff(&t0, &t1);
+
+        // Swapping
+        perf_phase_begin(&pc);
+        get_time(&t0);
+        double *tmp = T;
+        T = T_new;
+        T_new = tmp;
+        get_time(&t1);
+        perf_phase_end(&pc, PERF_PHASE_SWAP);
+        stats[STAT_SWAP] += time_diff(&t0, &t1);
+
+        // Checkpointing
+        if (checkpoint_due(&ckpt, step, step + 1))
+        {
+            get_time(&t0);
+            // Failures only fail the exit status, every rank has to keep calling the barriers
+            if (write_checkpoint(&ckpt, &comm, T, w, size, r0, nr, c0, nc, ckpt.start + step + 1) != 0)
+            {
+                fprintf(stderr, "Rank %d failed to write the step %d checkpoint\n", comm.rank, ckpt.start + step + 1);
+                ckpt.failed = 1;
+            }
+            get_time(&t1);
+            stats[STAT_CHECKPOINT] += time_diff(&t0, &t1);
+        }
+    }
+
+    get_time(&end);
+    stats[STAT_TOTAL] = time_diff(&start, &end);
+
+    // Gather per-rank timings and the blocks (padded to block_capacity) on rank 0
+    size_t gather_count = block_capacity + STAT_COUNT;
+    double *send = (double *)calloc(gather_count, sizeof(double));
+    for (int s = 0; s < STAT_COUNT; s++)
+        send[s] = stats[s];
+    for (int i = 0; i < nr; i++)
+        for (int j = 0; j < nc; j++)
+            send[STAT_COUNT + (size_t)i * nc + j] = T[(i + 1) * w + j + 1];
+    double *all = comm.rank == 0 ? (double *)malloc(gather_count * comm.size * sizeof(double)) : NULL;
+    comm_gather(&comm, send, (int)gather_count, all);
+
+    int failed = 0;
+    if (comm.rank == 0)
+    {
+        double *field = grid_create_contig(size);
+        int slowest = 0;
+        for (int r = 0; r < comm.size; r++)
+        {
+            const double *part = all + (size_t)r * gather_count;
+            int rr0 = block_start(size, px, r / py), rnr = block_start(size, px, r / py + 1) - rr0;
+            int rc0 = block_start(size, py, r % py), rnc = block_start(size, py, r % py + 1) - rc0;
+            for (int i = 0; i < rnr; i++)
+                for (int j = 0; j < rnc; j++)
+                    field[(rr0 + i) * size + rc0 + j] = part[STAT_COUNT + (size_t)i * rnc + j];
+            if (part[STAT_TOTAL] > all[(size_t)slowest * gather_count + STAT_TOTAL])
+                slowest = r;
+        }
+        neumann_boundaries_contig(field, size);
+
+        // The slowest rank bounds the step rate; its breakdown is the one reported
+        const double *worst = all + (size_t)slowest * gather_count;
+        double total_time = worst[STAT_TOTAL];
+        double halo_time = worst[STAT_COMM];
+        double other_time = total_time - worst[STAT_COMPUTE] - worst[STAT_BOUNDARY] - worst[STAT_SWAP] - halo_time - worst[STAT_CHECKPOINT];
+        ckpt.time = worst[STAT_CHECKPOINT];
+
+        char buf[METRICS_VALUE_LEN];
+        int len = snprintf(buf, sizeof(buf), "{\n    \"count\": %d,\n    \"grid\": [%d, %d],\n    \"backend\": \"%s\",\n    \"slowest\": %d",
+                           comm.size, px, py, comm_backend(), slowest);
+        // Per-rank arrays; beyond 48 ranks only max/mean fit in a metrics value
+        int per_rank = comm.size <= 48;
+        for (int s = 0; s < STAT_COUNT; s++)
+        {
+            double max = 0.0, sum = 0.0;
+            for (int r = 0; r < comm.size; r++)
+            {
+                double v = all[(size_t)r * gather_count + s];
+                max = v > max ? v : max;
+                sum += v;
+            }
+            len += snprintf(buf + len, sizeof(buf) - len, ",\n    \"%s\": ", stat_names[s]);
+            if (per_rank)
+            {
+                for (int r = 0; r < comm.size && len < (int)sizeof(buf); r++)
+                    len += snprintf(buf + len, sizeof(buf) - len, "%s%.6f", r ? ", " : "[", all[(size_t)r * gather_count + s]);
+                len += snprintf(buf + len, sizeof(buf) - len, "]");
+            }
+            else
+                len += snprintf(buf + len, sizeof(buf) - len, "{\"max\": %.6f, \"mean\": %.6f}", max, sum / comm.size);
+        }
+        snprintf(buf + len, sizeof(buf) - len, "\n  }");
+
+        // Saving
+        metrics_extra extra = {0};
+        metrics_add_number(&extra, "alpha", alpha);
+        metrics_add_number(&extra, "dx", dx);
+        metrics_add_breakdown(&extra, "halo_exchange_time", halo_time);
+        metrics_add_raw(&extra, "ranks", buf);
+        checkpoint_report(&ckpt, &extra);
+        failed = field_report_contig(&extra, output_dir, field, size, opts.dump_field) != 0;
+        roofline_report(&extra, size, timesteps, total_time, 1);
+        perf_counters_report(&pc, &extra);
+        failed |= save_metrics_extended(output_dir, total_time, worst[STAT_COMPUTE], worst[STAT_BOUNDARY], worst[STAT_SWAP], other_time, size, timesteps, "10_distributed_halo", &extra) != 0;
+
+        grid_destroy_contig(field);
+        free(all);
+    }
+
+    // Cleanup
+    perf_counters_close(&pc);
+    free(send);
+    free(T);
+    free(T_new);
+    free(halo);
+    comm_finalize(&comm);
+
+    return failed || ckpt.failed;
+}
@@ -0,0 +1,143 @@
+// stages/11_implicit_adi/solver.c
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include <omp.h>
+#include "../../src/core/timing.h"
+#include "../../src/core/grid_management.h"
+#include "../../src/core/boundary_conditions.h"
+#include "../../src/core/metrics.h"
+#include "../../src/core/field_io.h"
+#include "../../src/core/roofline.h"
+#include "../../src/core/perf_counters.h"
+#include "../../src/core/options.h"
+#include "../../src/core/checkpoint.h"
+#include "../../src/core/adi.h"
+
+// Implicit Peaceman-Rachford ADI (see adi.h) instead of the explicit stencil.
+// The time step is --dt, so reaching a physical time takes as many steps as
+// accuracy needs rather than the explicit stability limit allows; without it
+// dt is the explicit 0.24*dx^2/alpha. The first --damping-steps steps (default
+// ADI_DAMPING_STEPS) are damped, see adi.h. Both sweeps are OpenMP parallel over
+// independent lines: column strips for the i sweep, groups of ADI_LINES rows
+// for the j sweep.
+
+int main(int argc, char *argv[])
+{
+    int size = atoi(argv[1]);
+    int timesteps = atoi(argv[2]);
+    double alpha = atof(argv[3]);
+    double dx = atof(argv[4]);
+    const char *output_dir = argv[5];
+
+    solver_options opts;
+    if (parse_solver_options(argc, argv, 6, "11_implicit_adi", OPT_IMPLICIT, &opts) != 0)
+        return 1;
+
+    double dt = opts.dt > 0 ? opts.dt : 0.24 * dx * dx / alpha;
+    double courant = alpha * dt / (dx * dx);
+    int damping_steps = opts.damping_steps >= 0 ? opts.damping_steps : ADI_DAMPING_STEPS;
+
+    double *restrict T = grid_create_contig(size);
+    double *restrict W = grid_create_contig(size);
+
+    // Hot spot, --initial-field or --restart checkpoint
+    checkpoint_ctx ckpt;
+    checkpoint_init(&ckpt, &opts, output_dir);
+    if (checkpoint_start_contig(&ckpt, &opts, T, size, 2, &timesteps) != 0)
+        return 1;
+
+    adi_factor factor;
+    if (adi_factor_init(&factor, size - 2, 0.5 * courant) != 0)
+        return 1;
+    int threads = omp_get_max_threads();
+    double *lines = (double *)malloc((size_t)threads * (size - 2) * ADI_LINES * sizeof(double));
+
+    struct timespec start, end;
+    struct timespec stencil_start, stencil_end;
+    struct timespec boundary_start, boundary_end;
+
+    double total_stencil_time = 0.0;
+    double total_boundary_time = 0.0;
+    double total_swap_time = 0.0;
+
+    perf_counters pc;
+    perf_counters_open(&pc, opts.perf);
+    get_time(&start);
+
+    for (int step = 0; step < timesteps; step++)
+    {
+        // Rannacher start: damped steps are two backward-Euler steps of dt/2
+        int damped = ckpt.start + step < damping_steps;
+        for (int sub = 0; sub < 1 + damped; sub++)
+        {
+            double he = damped ? 0.0 : factor.h;
+
+            // Implicit along i
+            perf_phase_begin(&pc);
+            get_time(&stencil_start);
+#pragma omp parallel for schedule(static)
+            for (int j_lo = 1; j_lo < size - 1; j_lo += ADI_STRIP)
+                adi_sweep_i(T, W, size, &factor, he, j_lo, j_lo + ADI_STRIP < size - 1 ? j_lo + ADI_STRIP : size - 1);
+            get_time(&stencil_end);
+            perf_phase_end(&pc, PERF_PHASE_STENCIL);
+            total_stencil_time += time_diff(&stencil_start, &stencil_end);
+
+            perf_phase_begin(&pc);
+            get_time(&boundary_start);
+            adi_ghost_rows(W, size);
+            get_time(&boundary_end);
+            perf_phase_end(&pc, PERF_PHASE_BOUNDARY);
+            total_boundary_time += time_diff(&boundary_start, &boundary_end);
+
+            // Implicit along j, back into T
+            perf_phase_begin(&pc);
+            get_time(&stencil_start);
+#pragma omp parallel for schedule(static)
+            for (int i_lo = 1; i_lo < size - 1; i_lo += ADI_LINES)
+                adi_sweep_j(W, T, size, &factor, he, i_lo, lines + (size_t)omp_get_thread_num() * (size - 2) * ADI_LINES);
+            get_time(&stencil_end);
+            perf_phase_end(&pc, PERF_PHASE_STENCIL);
+            total_stencil_time += time_diff(&stencil_start, &stencil_end);
+
+            perf_phase_begin(&pc);
+            get_time(&boundary_start);
+            neumann_boundaries_contig(T, size);
+            get_time(&boundary_end);
+            perf_phase_end(&pc, PERF_PHASE_BOUNDARY);
+            total_boundary_time += time_diff(&boundary_start, &boundary_end);
+        }
+
+        // Checkpointing
+        checkpoint_contig(&ckpt, T, size, 2, step, step + 1);
+    }
+
+    get_time(&end);
+    double total_time = time_diff(&start, &end);
+    double other_time = total_time - total_boundary_time - total_stencil_time - total_swap_time - ckpt.time;
+
+    // Saving
+    metrics_extra extra = {0};
+    metrics_add_number(&extra, "alpha", alpha);
+    metrics_add_number(&extra, "dx", dx);
+    metrics_add_string(&extra, "method", "adi");
+    metrics_add_number(&extra, "dt", dt);
+    metrics_add_number(&extra, "courant", courant);
+    metrics_add_number(&extra, "physical_time", (ckpt.start + timesteps) * dt);
+    metrics_add_int(&extra, "damping_steps", damping_steps);
+    metrics_add_int(&extra, "threads", threads);
+    checkpoint_report(&ckpt, &extra);
+    int failed = field_report_contig(&extra, output_dir, T, size, opts.dump_field) != 0;
+    roofline_report_model(&extra, 2, size, timesteps, total_time, ADI_FLOPS_PER_CELL, ADI_BYTES_PER_CELL);
+    perf_counters_report(&pc, &extra);
+    failed |= save_metrics_extended(output_dir, total_time, total_stencil_time, total_boundary_time, total_swap_time, other_time, size, timesteps, "11_implicit_adi", &extra) != 0;
+
+    // Cleanup
+    perf_counters_close(&pc);
+    adi_factor_free(&factor);
+    grid_destroy_contig(T);
+    grid_destroy_contig(W);
+    free(lines);
+
+    return failed || ckpt.failed;
+}
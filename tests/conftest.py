@@ -0,0 +1,25 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from heatkernel.backends.c_stage import run_stage  # noqa: E402
+
+ALPHA = 0.2
+DX = 0.01
+
+needs_compiler = pytest.mark.skipif(shutil.which('make') is None or shutil.which('cc') is None,
+                                    reason="stage binaries need make and a C compiler")
+
+
+def stage_field(stage, size, steps, args=(), threads=None, output_dir=None):
+    """Final field of one stage binary run (--dump-field)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = output_dir or tmp
+        run_stage(stage, size, steps, ALPHA, DX, threads=threads, args=['--dump-field', *args], output_dir=out)
+        return np.load(os.path.join(out, 'field.npy'))
@@ -0,0 +1,201 @@
+"""Every backend and stage binary computes the same field.
+
+Backends and stages built without -ffast-math reproduce numpy-inplace bit
+for bit; stages 07-09 (-ffast-math) and the spectral backends agree to
+rounding. Grid sizes and step counts are chosen so that tiles and temporal
+blocks do not divide them evenly.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import heatkernel
+from heatkernel.autotune import write_cache_entry
+from heatkernel.backends.c_stage import C_STAGES, C_STAGES_3D, C_STAGE_VARIANTS
+from heatkernel.backends.numpy_engine import numpy3d_step, numpy_step
+from heatkernel.batch import hot_spot_stack
+from heatkernel.exact import explicit_solution, semi_discrete_solution
+from heatkernel.grid import neumann_boundaries, neumann_boundaries_3d, stencil_coefficient
+from heatkernel.native import NativeKernel
+
+from conftest import ALPHA, DX, needs_compiler, stage_field
+
+SIZE = 40
+STEPS = 50
+
+EXACT_STAGES = C_STAGES[:6]
+FAST_MATH_STAGES = C_STAGES[6:9] + ('08_openmp_persistent',)
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend='numpy-inplace').field
+
+
+@pytest.fixture(scope='module')
+def random_field():
+    return np.random.default_rng(0).random((SIZE, SIZE))
+
+
+def assert_rounding(field, reference):
+    np.testing.assert_allclose(field, reference, rtol=0, atol=1e-12 * np.abs(reference).max())
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown backend"):
+        heatkernel.get_backend('no-such-backend')
+
+
+def test_registered_backend_is_solvable():
+    @heatkernel.register_backend('test-identity')
+    def run(size, steps, alpha, dx, initial=None):
+        T = heatkernel.grid.prepare_field(size, initial)
+        return T, {'total_time': 1.0, 'stencil_time': 1.0, 'boundary_time': 0.0,
+                   'swap_time': 0.0, 'other_time': 0.0}, {}
+
+    try:
+        assert 'test-identity' in heatkernel.available_backends()
+        result = heatkernel.solve(8, 3, backend='test-identity')
+        assert result.field[4, 4] == 100.0
+        assert result.to_metrics()['performance'] == 3.0
+    finally:
+        heatkernel.backends._BACKENDS.pop('test-identity')
+
+
+@pytest.mark.parametrize('backend', ['loop', 'numpy', 'numpy-mp'])
+def test_python_backends_match(backend, reference, random_field):
+    np.testing.assert_array_equal(heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend=backend).field, reference)
+    expected = heatkernel.solve(SIZE, STEPS, ALPHA, DX, initial=random_field).field
+    np.testing.assert_array_equal(heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend=backend,
+                                                   initial=random_field).field, expected)
+
+
+def test_active_region_matches(reference):
+    result = heatkernel.solve(SIZE, STEPS, ALPHA, DX, active_region=True)
+    np.testing.assert_array_equal(result.field, reference)
+
+
+@pytest.mark.parametrize('backend', ['spectral', 'spectral-3d'])
+def test_spectral_matches_stepping(backend):
+    stepped = 'numpy-inplace' if backend == 'spectral' else 'numpy-3d'
+    size = SIZE if backend == 'spectral' else 16
+    assert_rounding(heatkernel.solve(size, STEPS, ALPHA, DX, backend=backend).field,
+                    heatkernel.solve(size, STEPS, ALPHA, DX, backend=stepped).field)
+
+
+def test_spectral_has_no_roofline():
+    assert 'roofline' not in heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend='spectral').to_metrics()
+    assert 'roofline' in heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend='numpy-inplace').to_metrics()
+
+
+@pytest.mark.parametrize('solution', [explicit_solution, semi_discrete_solution])
+@pytest.mark.parametrize('shape', [(2, 2), (2, 2, 2), (5, 2), (5,)])
+def test_exact_solutions_need_an_interior(solution, shape):
+    with pytest.raises(ValueError, match='at least 3 cells'):
+        solution(np.zeros(shape), ALPHA, DX, 1)
+
+
+@pytest.mark.parametrize('shape', [(9, 14), (7, 10, 12)])
+def test_explicit_solution_non_square(shape):
+    # Random ghost cells, so the first step is taken explicitly
+    T = np.random.default_rng(1).random(shape)
+    coef = stencil_coefficient(ALPHA, DX, len(shape))
+    interior = tuple(n - 2 for n in shape)
+    expected = T.copy()
+    for _ in range(STEPS):
+        nxt = expected.copy()
+        if len(shape) == 3:
+            numpy3d_step(expected, nxt, coef, np.empty(interior), np.empty(interior))
+            neumann_boundaries_3d(nxt)
+        else:
+            numpy_step(expected, nxt, coef)
+            neumann_boundaries(nxt)
+        expected = nxt
+    assert_rounding(explicit_solution(T, ALPHA, DX, STEPS), expected)
+
+
+@needs_compiler
+@pytest.mark.parametrize('kernel', ['contig', 'blocked', 'vectorized', 'openmp', 'arch'])
+def test_native_kernels_match(kernel, reference, random_field):
+    result = heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend='native', kernel=kernel, threads=3)
+    np.testing.assert_array_equal(result.field, reference)
+    expected = heatkernel.solve(SIZE, STEPS, ALPHA, DX, initial=random_field).field
+    np.testing.assert_array_equal(heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend='native', kernel=kernel,
+                                                   initial=random_field).field, expected)
+
+
+@needs_compiler
+@pytest.mark.parametrize('kernel', ['blocked', 'openmp'])
+def test_native_tile_option(kernel, reference):
+    result = heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend='native', kernel=kernel, threads=3, tile=(5, 7, 3))
+    np.testing.assert_array_equal(result.field, reference)
+    assert [result.extras[key] for key in ('row_block', 'col_block', 'temporal_block')] == [5, 7, 3]
+
+
+@needs_compiler
+def test_native_tile_from_tuning_cache(tmp_path, reference):
+    cache = str(tmp_path / 'tuning_cache.txt')
+    write_cache_entry('08_openmp_parallel', SIZE, 3, (6, 9, 2), 1.0, path=cache)
+    T = reference.copy()
+    for tuning_cache, tile, expected in [(cache, None, (6, 9, 2)), (cache, (0, 11, 0), (6, 11, 2)),
+                                         ('', None, (32, 64, 4))]:
+        kernel = NativeKernel('openmp', 3, tile=tile, tuning_cache=tuning_cache)
+        kernel.advance(T, 1, ALPHA, DX)
+        assert kernel.last_tile == expected
+        kernel.advance_batch(T[None].copy(), 1, ALPHA, DX)
+        assert kernel.last_tile == expected
+
+
+@pytest.mark.parametrize('backend', ['numpy', pytest.param('native', marks=needs_compiler)])
+def test_batch_matches_single_solves(backend):
+    fields = hot_spot_stack(SIZE, [(5, 5), (20, 20), (33, 11)])
+    alpha = [0.1, 0.2, 0.3]
+    batch = heatkernel.solve_batch(fields, STEPS, alpha, DX, backend=backend, threads=2)
+    for b in range(len(alpha)):
+        single = heatkernel.solve(SIZE, STEPS, alpha[b], DX, initial=fields[b]).field
+        np.testing.assert_array_equal(batch.fields[b], single)
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage', EXACT_STAGES)
+def test_exact_stages_match(stage, reference):
+    np.testing.assert_array_equal(stage_field(stage, SIZE, STEPS), reference)
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage', FAST_MATH_STAGES)
+def test_fast_math_stages_match(stage, reference):
+    assert_rounding(stage_field(stage, SIZE, STEPS, threads=3), reference)
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage', ['05_contiguous_memory', '08_openmp_parallel'])
+def test_stage_initial_field(stage, random_field, tmp_path):
+    path = os.path.join(tmp_path, 'initial.npy')
+    np.save(path, random_field)
+    expected = heatkernel.solve(SIZE, STEPS, ALPHA, DX, initial=random_field).field
+    assert_rounding(stage_field(stage, SIZE, STEPS, args=[f'--initial-field={path}']), expected)
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage', C_STAGES_3D)
+def test_3d_stages_match(stage):
+    expected = heatkernel.solve(16, STEPS, ALPHA, DX, backend='numpy-3d').field
+    assert_rounding(stage_field(stage, 16, STEPS), expected)
+
+
+@needs_compiler
+def test_implicit_stage_matches_numpy_adi():
+    assert '11_implicit_adi' in C_STAGE_VARIANTS
+    dt = 16 * heatkernel.grid.time_step(ALPHA, DX)
+    expected = heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend='numpy-adi', dt=dt).field
+    np.testing.assert_array_equal(stage_field('11_implicit_adi', SIZE, STEPS, args=[f'--dt={dt!r}']), expected)
+
+
+@needs_compiler
+def test_distributed_stage_matches(reference):
+    np.testing.assert_array_equal(stage_field('10_distributed_halo', SIZE, STEPS, args=['--ranks=3']), reference)
+    result = heatkernel.solve(SIZE, STEPS, ALPHA, DX, backend='10_distributed_halo', ranks=2)
+    assert result.extras['ranks']['count'] == 2
@@ -0,0 +1,97 @@
+"""Checkpoint and restart: an interrupted run resumes to the uninterrupted field.
+
+Python and C checkpoints share one format (checkpoint.npy + checkpoint.json),
+so a checkpoint written by either side restarts the other.
+"""
+
+import os
+import subprocess
+
+import numpy as np
+import pytest
+
+import heatkernel
+from heatkernel.backends.c_stage import stage_binary, stage_dir
+from heatkernel.checkpoint import read_checkpoint_info, start_field, write_checkpoint
+
+from conftest import ALPHA, DX, needs_compiler, stage_field
+
+SIZE = 40
+STEPS = 50
+EVERY = 20
+
+
+@pytest.fixture(scope='module')
+def reference():
+    return heatkernel.solve(SIZE, STEPS, ALPHA, DX).field
+
+
+def test_python_checkpoint_restart(reference, tmp_path):
+    heatkernel.solve(SIZE, STEPS, ALPHA, DX, checkpoint_every=EVERY, checkpoint_dir=str(tmp_path))
+    assert read_checkpoint_info(tmp_path)['step'] == 40
+    np.testing.assert_array_equal(np.load(os.path.join(tmp_path, 'checkpoint.npy')),
+                                  heatkernel.solve(SIZE, 40, ALPHA, DX).field)
+
+    initial, steps, start, origin = start_field(SIZE, STEPS, restart=str(tmp_path))
+    assert (steps, start, origin) == (10, 40, None)
+    result = heatkernel.solve(SIZE, steps, ALPHA, DX, initial=initial, start_step=start)
+    np.testing.assert_array_equal(result.field, reference)
+
+
+def test_restart_past_end_rejected(tmp_path):
+    write_checkpoint(str(tmp_path), heatkernel.grid.initial_field(SIZE), STEPS)
+    with pytest.raises(ValueError, match="already at step"):
+        start_field(SIZE, STEPS, restart=str(tmp_path))
+
+
+def test_checkpoint_shape_checked(tmp_path):
+    write_checkpoint(str(tmp_path), heatkernel.grid.initial_field(SIZE + 1), 10)
+    with pytest.raises(ValueError, match="expected float64"):
+        start_field(SIZE, STEPS, restart=str(tmp_path))
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage', ['01_c_baseline', '05_contiguous_memory', '06_cache_blocking',
+                                   '08_openmp_parallel', '08_openmp_persistent', '11_implicit_adi'])
+def test_stage_checkpoint_restart(stage, tmp_path):
+    first, resumed = os.path.join(tmp_path, 'first'), os.path.join(tmp_path, 'resumed')
+    full = stage_field(stage, SIZE, STEPS, args=[f'--checkpoint-every={EVERY}'], output_dir=first)
+    assert read_checkpoint_info(first)['step'] == 40
+    np.testing.assert_array_equal(stage_field(stage, SIZE, STEPS, args=[f'--restart={first}'], output_dir=resumed),
+                                  full)
+
+
+@needs_compiler
+def test_stage_restarts_python_checkpoint(reference, tmp_path):
+    heatkernel.solve(SIZE, STEPS, ALPHA, DX, checkpoint_every=EVERY, checkpoint_dir=str(tmp_path))
+    np.testing.assert_array_equal(stage_field('05_contiguous_memory', SIZE, STEPS, args=[f'--restart={tmp_path}']),
+                                  reference)
+
+
+@needs_compiler
+def test_python_restarts_stage_checkpoint(reference, tmp_path):
+    stage_field('05_contiguous_memory', SIZE, STEPS, args=[f'--checkpoint-every={EVERY}'], output_dir=str(tmp_path))
+    initial, steps, start, _ = start_field(SIZE, STEPS, restart=str(tmp_path))
+    np.testing.assert_array_equal(heatkernel.solve(SIZE, steps, ALPHA, DX, initial=initial, start_step=start).field,
+                                  reference)
+
+
+def run_binary(stage, output_dir, *args):
+    return subprocess.run([stage_binary(stage), str(SIZE), str(STEPS), repr(ALPHA), repr(DX), str(output_dir), *args],
+                          cwd=stage_dir(stage), capture_output=True, text=True)
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage', ['01_c_baseline', '05_contiguous_memory', '08_openmp_parallel',
+                                   '10_distributed_halo', '01_naive_3d'])
+def test_stage_write_failures_exit_nonzero(stage, tmp_path):
+    result = run_binary(stage, tmp_path / 'missing', '--dump-field')
+    assert result.returncode != 0
+    assert 'Failed to write' in result.stderr
+
+    # A directory in the way of the checkpoint's temporary file: the run finishes, the exit status fails
+    os.mkdir(tmp_path / 'checkpoint.npy.tmp')
+    result = run_binary(stage, tmp_path, f'--checkpoint-every={EVERY}')
+    assert result.returncode != 0
+    assert os.path.exists(tmp_path / 'metrics.json')
+    assert run_binary(stage, tmp_path / 'checkpoint.npy.tmp').returncode == 0
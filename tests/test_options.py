@@ -0,0 +1,54 @@
+"""A stage rejects the options it does not implement instead of ignoring them."""
+
+import subprocess
+
+import pytest
+
+from heatkernel.backends.c_stage import stage_binary, stage_dir
+
+from conftest import ALPHA, DX, needs_compiler
+
+UNSUPPORTED = [
+    ('01_c_baseline', '--active-region'),
+    ('01_c_baseline', '--first-touch'),
+    ('01_c_baseline', '--ranks=2'),
+    ('03_loop', '--row-block=8'),
+    ('05_contiguous_memory', '--active-region=1'),
+    ('05_contiguous_memory', '--first-touch=1'),
+    ('06_cache_blocking_3d', '--converge-tol=1e-6'),
+    ('07_vectorization', '--first-touch'),
+    ('08_openmp_persistent', '--active-region'),
+    ('08_openmp_persistent', '--snapshot-every=10'),
+    ('09_arch_specific', '--snapshot-every=10'),
+    ('10_distributed_halo', '--first-touch'),
+    ('11_implicit_adi', '--ranks=2'),
+]
+
+SUPPORTED = [
+    ('08_openmp_persistent', '--first-touch'),
+    ('09_arch_specific', '--active-region'),
+    ('10_distributed_halo', '--ranks=2'),
+    ('11_implicit_adi', '--damping-steps=2'),
+]
+
+
+def run(stage, option, tmp_path):
+    return subprocess.run([stage_binary(stage), '20', '5', repr(ALPHA), repr(DX), str(tmp_path), option],
+                          cwd=stage_dir(stage), capture_output=True, text=True)
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage,option', UNSUPPORTED)
+def test_unsupported_option_rejected(stage, option, tmp_path):
+    result = run(stage, option, tmp_path)
+    assert result.returncode != 0
+    assert f"{stage} does not support {option}" in result.stderr
+    assert not (tmp_path / 'metrics.json').exists()
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage,option', SUPPORTED)
+def test_supported_option_accepted(stage, option, tmp_path):
+    result = run(stage, option, tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert (tmp_path / 'metrics.json').exists()
@@ -0,0 +1,33 @@
+"""--perf counts every thread of the team, with and without --first-touch.
+
+Counters only follow threads created after they are opened, so a stage that
+started its team before opening them would report about 1/threads of the
+real counts.
+"""
+
+import pytest
+
+from heatkernel.backends.c_stage import NUMA_STAGES, run_stage
+
+from conftest import ALPHA, DX, needs_compiler
+
+THREADS = 4
+
+
+def stencil_task_clock(stage, first_touch):
+    metrics = run_stage(stage, 400, 100, ALPHA, DX, threads=THREADS,
+                        args=['--perf', f'--first-touch={first_touch}'])
+    perf = metrics.get('perf', {})
+    clock = perf.get('phases', {}).get('stencil', perf.get('total', {})).get('task_clock_ns')
+    if not clock:
+        pytest.skip(f"perf_event_open unavailable: {perf.get('reason')}")
+    return clock
+
+
+@needs_compiler
+@pytest.mark.parametrize('stage', NUMA_STAGES)
+def test_first_touch_counts_whole_team(stage):
+    plain = stencil_task_clock(stage, 0)
+    first_touch = stencil_task_clock(stage, 1)
+    # A lost team would leave 1/THREADS; page faults and noise stay well inside this
+    assert 0.5 < first_touch / plain < 2.0
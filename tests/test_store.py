@@ -0,0 +1,78 @@
+"""Results index: one store per results directory, relocatable with it."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from heatkernel.store import (RESULTS_STORE, ingest_results, open_results, results_root, results_store,
+                              stage_runs)
+
+REPORT_HELPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'utils', 'report_helper.py')
+
+
+def write_metrics(directory, **metrics):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'metrics.json'), 'w') as f:
+        json.dump(dict({'grid_size': 50, 'time_steps': 10, 'total_time': 1.0}, **metrics), f)
+
+
+def make_results(root):
+    write_metrics(os.path.join(root, 'stage_results', '05_contiguous_memory'), stage='05_contiguous_memory')
+    for threads in (1, 2):
+        write_metrics(os.path.join(root, 'stage_results', '08_openmp_parallel', f'threads_{threads}'),
+                      stage='08_openmp_parallel')
+
+
+def test_store_lives_in_results_directory(tmp_path):
+    root = os.path.join(tmp_path, 'latest')
+    make_results(root)
+    stage_results = os.path.join(root, 'stage_results')
+    assert results_root(os.path.join(stage_results, '08_openmp_parallel', 'threads_2')) == root
+
+    conn = open_results(stage_results)
+    assert os.path.exists(os.path.join(root, RESULTS_STORE))
+    assert {row[0] for row in conn.execute("SELECT path FROM results")} == {
+        os.path.join('stage_results', '05_contiguous_memory', 'metrics.json'),
+        os.path.join('stage_results', '08_openmp_parallel', 'threads_1', 'metrics.json'),
+        os.path.join('stage_results', '08_openmp_parallel', 'threads_2', 'metrics.json'),
+    }
+    runs = stage_runs(conn, stage_results)
+    assert [len(runs[stage]) for stage in sorted(runs)] == [1, 2]
+    # Found again from any directory below the results directory
+    assert results_store(os.path.join(stage_results, '05_contiguous_memory')) == os.path.join(root, RESULTS_STORE)
+
+
+def test_copied_results_keep_their_index(tmp_path):
+    root = os.path.join(tmp_path, 'latest')
+    make_results(root)
+    open_results(root).close()
+    archive = os.path.join(tmp_path, 'archive', 'results_1')
+    shutil.copytree(root, archive)
+    write_metrics(os.path.join(root, 'stage_results', '01_c_baseline'), stage='01_c_baseline')
+
+    conn = open_results(archive)
+    assert conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 3
+    assert set(stage_runs(conn, os.path.join(archive, 'stage_results'))) == {'05_contiguous_memory',
+                                                                             '08_openmp_parallel'}
+    # The run added after the copy only reaches the original's index
+    assert ingest_results(open_results(root), root) == (0, 0, 0)
+    assert open_results(root).execute("SELECT COUNT(*) FROM results").fetchone()[0] == 4
+
+
+def test_copy_optimal_finds_indexed_threads(tmp_path):
+    root = os.path.join(tmp_path, 'latest')
+    stage = os.path.join(root, 'stage_results', '08_openmp_parallel')
+    for threads, performance in ((1, 100.0), (2, 300.0), (3, 200.0)):
+        write_metrics(os.path.join(stage, f'threads_{threads}'), stage='08_openmp_parallel',
+                      total_time=10.0 / performance, performance=performance, threads=threads)
+    ingest_results(open_results(root), root)
+
+    # Run from elsewhere: the index paths are relative to the store, not the repository or cwd
+    subprocess.run([sys.executable, REPORT_HELPER, '--results-dir', root], check=True, capture_output=True,
+                   cwd=str(tmp_path))
+    with open(os.path.join(stage, 'metrics.json')) as f:
+        assert json.load(f)['threads'] == 2
+    with open(os.path.join(stage, 'optimal_thread_note.txt')) as f:
+        assert 'Source: threads_2' in f.read()
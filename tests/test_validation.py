@@ -0,0 +1,57 @@
+"""validate_fields.py checks every run directory and tells full from summary-only checks."""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import heatkernel
+
+from conftest import ALPHA, DX
+
+VALIDATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'utils', 'validate_fields.py')
+
+
+def write_run(directory, field=None, dump_field=True):
+    result = heatkernel.solve(30, 40, ALPHA, DX)
+    if field is not None:
+        result.field = field
+    result.write_metrics(directory, stage='08_openmp_parallel', dump_field=dump_field)
+
+
+def status(directory):
+    with open(os.path.join(directory, 'validation.json')) as f:
+        return json.load(f)['status']
+
+
+def test_every_run_directory_validated(tmp_path):
+    stage = os.path.join(tmp_path, 'stage_results', '08_openmp_parallel')
+    good = os.path.join(stage, 'threads_2')
+    diverged = os.path.join(stage, 'placement_spread_cores', 'threads_2')
+    summary_only = os.path.join(stage, 'placement_close_cores', 'threads_10')
+    write_run(good)
+    write_run(diverged, field=np.zeros((30, 30)))
+    # Rounding-level differences, as from the -ffast-math stages: the norms agree, the checksum does not
+    write_run(summary_only, field=heatkernel.solve(30, 40, ALPHA, DX).field * (1 + 1e-15), dump_field=False)
+
+    subprocess.run([sys.executable, VALIDATE, '--results-dir', str(tmp_path)], check=True, capture_output=True)
+    assert status(good) == 'pass'
+    assert status(diverged) == 'fail'
+    assert status(summary_only) == 'weak'
+    with open(os.path.join(tmp_path, 'validation_summary.md')) as f:
+        summary = f.read()
+    assert '| 08_openmp_parallel/placement_close_cores/threads_10 | WEAK | summary |' in summary
+    assert '| 08_openmp_parallel/placement_spread_cores/threads_2 | FAIL | field |' in summary
+
+
+def test_matching_checksum_passes_without_field(tmp_path):
+    run = os.path.join(tmp_path, 'stage_results', '05_contiguous_memory')
+    write_run(run, dump_field=False)
+    # The default spectral reference never matches bit for bit; the checksum is taken from stepping
+    subprocess.run([sys.executable, VALIDATE, '--results-dir', str(tmp_path)], check=True, capture_output=True)
+    assert status(run) == 'pass'
+    subprocess.run([sys.executable, VALIDATE, '--results-dir', str(tmp_path), '--reference', 'numpy-inplace'],
+                   check=True, capture_output=True)
+    assert status(run) == 'pass'